@@ -10,20 +10,140 @@ FastAPI suporta Dependency Injection, permitindo:
 
 import logging
 from pathlib import Path
-from functools import lru_cache
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Optional
 
+from app.core.admission import AdmissionController
 from app.core.config import get_settings
+from app.core.executor import CPUExecutor
+from app.core.cache import TieredCache
+from app.core.job_queue import JobQueue
+from app.core.rate_limit import LLMRateLimiter
+from app.core.stage_store import StageStore
+from app.integrations import ClassificationAPIClient, build_conversion_store, init_docling_worker
+from app.integrations.pdf_raster import PdfRasterizer
 from app.services import (
     ClassificationService,
     ParagraphDetectionService,
     TextAnalysisService,
     ComplianceService,
-    DocumentAnalysisOrchestrator
+    DocumentAnalysisOrchestrator,
+    JobWorkerPool,
+    CascadeClassifier,
+    ImagePreprocessor,
+    LLMResponseCache,
+    NearDuplicateIndex,
+    TermStatsAggregator,
+    WarmupState,
 )
 
+if TYPE_CHECKING:
+    from app.services import AnthropicService
+
 logger = logging.getLogger(__name__)
 
 
+def _conversion_store_path() -> Optional[str]:
+    """Arquivo SQLite das conversões docling (None = apenas memória)."""
+    settings = get_settings()
+    if not settings.DOCLING_STORE_DISK:
+        return None
+    return str(Path(settings.CACHE_DIR) / "docling_documents.sqlite3")
+
+
+def docling_worker_initializer() -> partial:
+    """Initializer dos processos com docling (ProcessPool local ou model host)."""
+    settings = get_settings()
+    return partial(
+        init_docling_worker,
+        settings.DOCLING_PROFILE,
+        settings.DOCLING_STORE_MEMORY_ITEMS,
+        _conversion_store_path(),
+        settings.CACHE_MAX_SIZE_MB * 1024 * 1024
+    )
+
+
+@lru_cache()
+def get_cpu_executor() -> CPUExecutor:
+    """
+    Cria e retorna o executor CPU compartilhado (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Um único executor por processo uvicorn garante que o limite de fila
+    vale para todas as requisições, e que os workers do ProcessPool (com
+    docling aquecido via init_docling_worker) sejam reaproveitados.
+    Com MODEL_HOST_SOCKET, o ProcessPool fica no model host e é
+    compartilhado por todos os workers uvicorn (python -m app.model_host).
+    """
+    settings = get_settings()
+
+    return CPUExecutor(
+        process_workers=settings.CPU_PROCESS_WORKERS,
+        thread_workers=settings.CPU_THREAD_WORKERS,
+        max_queue_depth=settings.CPU_MAX_QUEUE_DEPTH,
+        use_processes=settings.CPU_EXECUTOR_USE_PROCESSES,
+        process_initializer=docling_worker_initializer(),
+        model_host_socket=settings.MODEL_HOST_SOCKET or None
+    )
+
+
+@lru_cache()
+def get_admission_controller() -> Optional[AdmissionController]:
+    """
+    Cria e retorna o controle de admissão (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    O orçamento vale por processo uvicorn: com N workers, a memória
+    disponível para documentos é ~N * ADMISSION_BUDGET unidades.
+
+    Returns:
+        AdmissionController, ou None se ADMISSION_ENABLED=false
+    """
+    settings = get_settings()
+
+    if not settings.ADMISSION_ENABLED:
+        return None
+
+    return AdmissionController(
+        budget=settings.ADMISSION_BUDGET,
+        max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        cost_per_page=settings.ADMISSION_COST_PER_PAGE,
+        cost_per_mb=settings.ADMISSION_COST_PER_MB
+    )
+
+
+@lru_cache()
+def get_pdf_rasterizer() -> Optional[PdfRasterizer]:
+    """
+    Cria e retorna o rasterizador de PDFs (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Compartilhado pelo orchestrator (etapa RASTER) e pela cascata do
+    /classify: o mesmo PDF enviado aos dois é renderizado uma vez só
+    (cache pelo hash do arquivo).
+
+    Returns:
+        PdfRasterizer, ou None se PDF_RASTER_ENABLED=false
+    """
+    settings = get_settings()
+
+    if not settings.PDF_RASTER_ENABLED:
+        return None
+
+    return PdfRasterizer(
+        dpi=settings.PDF_RASTER_DPI,
+        max_pages=settings.PDF_RASTER_PAGES,
+        cache=TieredCache(
+            db_path=Path(settings.CACHE_DIR) / "pdf_raster.sqlite3",
+            namespace="pdf_raster",
+            memory_max_items=settings.PDF_RASTER_CACHE_ITEMS,
+            disk_max_bytes=settings.CACHE_MAX_SIZE_MB * 1024 * 1024
+        ) if settings.ENABLE_CACHE else None,
+        executor=get_cpu_executor()
+    )
+
+
 @lru_cache()
 def get_orchestrator() -> DocumentAnalysisOrchestrator:
     """
@@ -34,29 +154,246 @@ def get_orchestrator() -> DocumentAnalysisOrchestrator:
     FastAPI reutiliza esta instância em todas as requisições.
     """
     settings = get_settings()
+    executor = get_cpu_executor()
+
+    # Primeiras páginas de PDFs para o classificador local (etapa RASTER)
+    pdf_rasterizer = get_pdf_rasterizer()
 
     # Criar serviços
     classification_service = ClassificationService(
         api_url=None,  # Configurar se tiver API externa
         api_key=None,
-        use_api=False  # Usar classificador local
+        use_api=False,  # Usar classificador local
+        executor=executor,
+        pdf_rasterizer=pdf_rasterizer
     )
 
-    paragraph_service = ParagraphDetectionService()
+    paragraph_service = ParagraphDetectionService(
+        executor=executor,
+        default_profile=settings.DOCLING_PROFILE,
+        text_layer_min_chars=settings.DOCLING_TEXT_LAYER_MIN_CHARS,
+        shard_pages=settings.DOCLING_SHARD_PAGES,
+        conversion_store=build_conversion_store(
+            memory_items=settings.DOCLING_STORE_MEMORY_ITEMS,
+            db_path=_conversion_store_path(),
+            disk_max_bytes=settings.CACHE_MAX_SIZE_MB * 1024 * 1024
+        )
+    )
 
     text_analysis_service = TextAnalysisService()
 
     template_path = Path(__file__).parent.parent / "templates" / "compliance_report.md"
     compliance_service = ComplianceService(template_path=template_path)
 
+    # Cache de resultados (memória + SQLite compartilhado entre workers)
+    result_cache_backend = None
+    if settings.ENABLE_CACHE:
+        result_cache_backend = TieredCache(
+            db_path=Path(settings.CACHE_DIR) / "analysis_results.sqlite3",
+            namespace="analysis_result",
+            memory_max_items=settings.CACHE_MEMORY_ITEMS,
+            disk_max_bytes=settings.CACHE_MAX_SIZE_MB * 1024 * 1024
+        )
+
+    # Resultados por etapa (reanálise quando só UC3/UC4 mudam)
+    stage_store = None
+    if settings.STAGE_STORE_ENABLED:
+        stage_store = StageStore(Path(settings.CACHE_DIR) / "stages.sqlite3")
+
+    # Termos mais frequentes do acervo (memória limitada por worker)
+    term_stats = None
+    if settings.TERM_STATS_ENABLED:
+        term_stats = TermStatsAggregator(
+            db_path=Path(settings.CACHE_DIR) / "term_stats.sqlite3",
+            capacity=settings.TERM_STATS_CAPACITY,
+            bucket_seconds=settings.TERM_STATS_BUCKET_SECONDS,
+            flush_seconds=settings.TERM_STATS_FLUSH_SECONDS,
+            retention_seconds=settings.TERM_STATS_RETENTION_DAYS * 86400,
+            stopwords=text_analysis_service.stopwords
+        )
+
+    # Reescaneamentos/reexportações de documentos já analisados
+    near_duplicates = None
+    if settings.NEAR_DUPLICATE_ENABLED:
+        near_duplicates = NearDuplicateIndex(
+            db_path=Path(settings.CACHE_DIR) / "near_duplicates.sqlite3",
+            radius=settings.NEAR_DUPLICATE_RADIUS
+        )
+
     # Criar orchestrator
     orchestrator = DocumentAnalysisOrchestrator(
         classification_service=classification_service,
         paragraph_service=paragraph_service,
         text_analysis_service=text_analysis_service,
-        compliance_service=compliance_service
+        compliance_service=compliance_service,
+        executor=executor,
+        result_cache_backend=result_cache_backend,
+        speculative_uc2=settings.SPECULATIVE_UC2,
+        stage_store=stage_store,
+        term_stats=term_stats,
+        pdf_rasterizer=pdf_rasterizer,
+        near_duplicates=near_duplicates
     )
 
     logger.info("Orchestrator criado e pronto para uso")
 
     return orchestrator
+
+
+@lru_cache()
+def get_job_workers() -> JobWorkerPool:
+    """
+    Cria e retorna o pool de workers de jobs (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    A fila fica em SQLite dentro de JOBS_DIR, então todos os processos
+    uvicorn do host compartilham os mesmos jobs; cada processo roda
+    JOB_WORKERS workers que usam o mesmo orchestrator das rotas síncronas.
+    """
+    settings = get_settings()
+
+    queue = JobQueue(
+        db_path=Path(settings.JOBS_DIR) / "jobs.sqlite3",
+        stale_after_seconds=settings.JOB_STALE_SECONDS
+    )
+
+    return JobWorkerPool(
+        queue=queue,
+        orchestrator=get_orchestrator(),
+        workers=settings.JOB_WORKERS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        result_ttl_seconds=settings.JOB_RESULT_TTL_SECONDS,
+        retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS
+    )
+
+
+@lru_cache()
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Cria e retorna o cache de classificações do LLM (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    O AnthropicService é criado por requisição, mas o cache precisa ser
+    único por processo para acumular hits. Com LLM_CACHE_PERSIST, o tier
+    SQLite também é compartilhado entre processos e reinícios.
+
+    Returns:
+        LLMResponseCache ou None se desabilitado
+    """
+    settings = get_settings()
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    db_path = None
+    if settings.LLM_CACHE_PERSIST:
+        db_path = Path(settings.CACHE_DIR) / "llm_responses.sqlite3"
+
+    return LLMResponseCache(
+        TieredCache(
+            db_path=db_path,
+            namespace="llm_classification",
+            memory_max_items=settings.LLM_CACHE_MEMORY_ITEMS,
+            disk_max_bytes=settings.LLM_CACHE_MAX_SIZE_MB * 1024 * 1024,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+    )
+
+
+@lru_cache()
+def get_llm_service() -> Optional["AnthropicService"]:
+    """
+    Cria e retorna o service Anthropic do processo (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Um único cliente por processo reutiliza conexões HTTP e compartilha
+    o mesmo limitador entre todas as requisições; criar um cliente por
+    requisição abria uma conexão TLS nova a cada chamada e não impunha
+    nenhum teto de chamadas simultâneas.
+
+    Returns:
+        AnthropicService ou None se ANTHROPIC_API_KEY não configurada
+    """
+    settings = get_settings()
+    if not settings.ANTHROPIC_API_KEY:
+        return None
+
+    # Importação adiada: o SDK da Anthropic só é carregado se houver chave
+    from app.services import create_anthropic_service
+
+    limiter = LLMRateLimiter(
+        max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE
+    )
+
+    return create_anthropic_service(
+        api_key=settings.ANTHROPIC_API_KEY,
+        model=settings.ANTHROPIC_MODEL,
+        max_retries=settings.LLM_MAX_RETRIES,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        response_cache=get_llm_response_cache(),
+        limiter=limiter,
+        base_url=settings.ANTHROPIC_BASE_URL,
+        max_connections=settings.LLM_MAX_IN_FLIGHT,
+        backoff_base_seconds=settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=settings.LLM_BACKOFF_MAX_SECONDS
+    )
+
+
+@lru_cache()
+def get_image_preprocessor() -> Optional[ImagePreprocessor]:
+    """
+    Cria e retorna o pré-processador de imagens do LLM (singleton).
+
+    Returns:
+        ImagePreprocessor ou None se LLM_IMAGE_PREPROCESS desabilitado
+    """
+    settings = get_settings()
+    if not settings.LLM_IMAGE_PREPROCESS:
+        return None
+
+    return ImagePreprocessor(
+        max_long_edge=settings.LLM_IMAGE_MAX_LONG_EDGE,
+        jpeg_quality=settings.LLM_IMAGE_JPEG_QUALITY
+    )
+
+
+@lru_cache()
+def get_cascade_classifier() -> CascadeClassifier:
+    """
+    Cria e retorna o classificador em cascata (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Singleton para acumular a taxa de escalonamento e as médias de
+    latência/custo do LLM usadas na estimativa de economia. O estágio
+    local roda no mesmo CPUExecutor do UC1; PDFs usam o mesmo
+    rasterizador (e cache) da etapa RASTER.
+    """
+    settings = get_settings()
+    pdf_rasterizer = get_pdf_rasterizer()
+
+    return CascadeClassifier(
+        local_client=ClassificationAPIClient(
+            use_api=False,
+            executor=get_cpu_executor(),
+            pdf_rasterizer=pdf_rasterizer
+        ),
+        threshold=settings.CASCADE_CONFIDENCE_THRESHOLD,
+        escalate_labels=settings.cascade_escalate_labels_list,
+        pdf_rasterizer=pdf_rasterizer
+    )
+
+
+@lru_cache()
+def get_warmup_state() -> WarmupState:
+    """
+    Retorna o estado de aquecimento do processo (singleton).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Cada worker uvicorn aquece o próprio pipeline e responde o próprio
+    /ready; o balanceador só envia tráfego aos workers já aquecidos.
+    """
+    state = WarmupState()
+    if not get_settings().WARMUP_ENABLED:
+        state.status = "disabled"
+    return state
@@ -4,20 +4,50 @@ Endpoints da API REST.
 Define rotas HTTP para análise de documentos científicos.
 """
 
+import asyncio
 import logging
-import tempfile
+import time
+from datetime import datetime
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 
-from app.models import AnalysisResult
-from app.services import DocumentAnalysisOrchestrator, InvalidDocumentError
-from app.api.dependencies import get_orchestrator
+from app.models import AnalysisResult, DoclingProfile, JobInfo
+from app.services import (
+    DocumentAnalysisOrchestrator,
+    InvalidDocumentError,
+    JobWorkerPool,
+    StageDataMissingError,
+)
+from app.core.config import settings
+from app.core.executor import CPUExecutor, ExecutorSaturatedError
+from app.api.dependencies import (
+    get_admission_controller,
+    get_cpu_executor,
+    get_job_workers,
+    get_orchestrator,
+)
+from app.core.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    admission_http_exception,
+    admission_slot,
+)
+from app.core.uploads import save_upload_to_temp
+from app.core.responses import FastJSONResponse, build_selector, json_response, project
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["Document Analysis"])
 
+FIELDS_DESCRIPTION = (
+    "Campos do resultado separados por vírgula, com caminhos pontuados "
+    "(ex.: summary,compliance,top_words ou text_analysis.total_words). "
+    "Atalhos: summary, top_words, word_frequencies, report"
+)
+EXCLUDE_DESCRIPTION = "Campos a omitir (ex.: paragraphs.text,text_analysis.word_frequencies)"
+
 
 @router.post(
     "/analyze",
@@ -29,11 +59,30 @@ router = APIRouter(prefix="/api/v1", tags=["Document Analysis"])
     - UC2: Detecta parágrafos usando docling
     - UC3: Analisa texto e conta palavras frequentes
     - UC4: Gera relatório de conformidade
-    """
+
+    O parâmetro `profile` escolhe o perfil do docling (fast, balanced,
+    accurate). PDFs com camada de texto pulam o OCR nos perfis fast e balanced.
+
+    `fields` e `exclude` reduzem a resposta (ex.: `fields=summary,compliance`);
+    com `Accept-Encoding: gzip` (ou `br`) a resposta vem comprimida.
+
+    Sob sobrecarga (orçamento de páginas em processamento esgotado) a
+    requisição espera até ADMISSION_MAX_WAIT_SECONDS e depois recebe 503
+    com `Retry-After`.
+    """,
+    response_class=FastJSONResponse
 )
 async def analyze_document(
+    request: Request,
     file: UploadFile = File(..., description="Arquivo PDF ou imagem"),
-    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+    profile: Optional[DoclingProfile] = Query(
+        None,
+        description="Perfil do docling (padrão: DOCLING_PROFILE)"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=EXCLUDE_DESCRIPTION),
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator),
+    admission: Optional[AdmissionController] = Depends(get_admission_controller)
 ) -> AnalysisResult:
     """
     Analisa documento científico.
@@ -41,9 +90,12 @@ async def analyze_document(
     EXPLICAÇÃO EDUCATIVA:
     Endpoint principal que:
     1. Recebe arquivo via multipart/form-data
-    2. Salva temporariamente
-    3. Executa pipeline de análise
-    4. Retorna resultado JSON
+    2. Salva temporariamente (em blocos; 413 se exceder o limite,
+       415 se o conteúdo não for PDF/imagem)
+    3. Aguarda orçamento no controle de admissão (503 + Retry-After)
+    4. Executa pipeline de análise
+    5. Retorna resultado JSON (projetado, serializado com orjson e
+       comprimido conforme Accept-Encoding)
     5. Remove arquivo temporário
     """
     # Validar formato
@@ -56,26 +108,38 @@ async def analyze_document(
             detail=f"Formato não suportado: {file_ext}. Use: {', '.join(allowed_formats)}"
         )
 
-    # Salvar arquivo temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_ext}") as tmp:
-        tmp_path = Path(tmp.name)
-        content = await file.read()
-        tmp.write(content)
+    # Validar projeção antes de executar o pipeline (400 para campo inexistente)
+    build_selector(AnalysisResult, fields)
+    build_selector(AnalysisResult, exclude)
+
+    # Fila de admissão cheia: recusar antes de gravar o upload
+    if admission is not None:
+        try:
+            admission.check_queue("analyze")
+        except AdmissionRejectedError as e:
+            raise admission_http_exception(e)
+
+    # Salvar arquivo temporário (em blocos, com limite de tamanho)
+    tmp_path, content_type, size = await save_upload_to_temp(
+        file, settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    )
 
     try:
-        logger.info(f"Analisando arquivo: {file.filename}")
-
-        # Executar análise passando o nome original do arquivo
-        # EXPLICAÇÃO: tmp_path.name seria "tmpXYZ.pdf", mas queremos exibir
-        # o nome original que o usuário enviou (ex: "artigo.pdf")
-        result = await orchestrator.analyze_document(
-            tmp_path,
-            original_filename=file.filename
-        )
+        async with admission_slot(admission, tmp_path, content_type, size, "analyze"):
+            logger.info(f"Analisando arquivo: {file.filename}")
+
+            # Executar análise passando o nome original do arquivo
+            # EXPLICAÇÃO: tmp_path.name seria "tmpXYZ.pdf", mas queremos exibir
+            # o nome original que o usuário enviou (ex: "artigo.pdf")
+            result = await orchestrator.analyze_document(
+                tmp_path,
+                original_filename=file.filename,
+                profile=profile.value if profile is not None else None
+            )
 
         logger.info(f"Análise concluída: {file.filename}")
 
-        return result
+        return json_response(request, project(result, fields, exclude))
 
     except InvalidDocumentError as e:
         logger.warning(f"Documento inválido: {e}")
@@ -84,6 +148,16 @@ async def analyze_document(
             detail=str(e)
         )
 
+    except AdmissionRejectedError as e:
+        raise admission_http_exception(e)
+
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Executor saturado: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
     except Exception as e:
         logger.error(f"Erro ao analisar: {e}", exc_info=True)
         raise HTTPException(
@@ -104,7 +178,8 @@ async def analyze_document(
 )
 async def classify_document(
     file: UploadFile = File(...),
-    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator),
+    admission: Optional[AdmissionController] = Depends(get_admission_controller)
 ) -> dict:
     """
     Classifica documento (apenas UC1).
@@ -121,16 +196,16 @@ async def classify_document(
             detail=f"Formato não suportado: {file_ext}"
         )
 
-    # Salvar temporariamente
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_ext}") as tmp:
-        tmp_path = Path(tmp.name)
-        content = await file.read()
-        tmp.write(content)
+    # Salvar temporariamente (em blocos, com limite de tamanho)
+    tmp_path, content_type, size = await save_upload_to_temp(
+        file, settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    )
 
     try:
-        is_scientific, confidence = await orchestrator.classification_service.is_scientific_paper(
-            tmp_path
-        )
+        async with admission_slot(admission, tmp_path, content_type, size, "classify_v1"):
+            is_scientific, confidence = await orchestrator.classification_service.is_scientific_paper(
+                tmp_path
+            )
 
         return {
             "filename": file.filename,
@@ -138,6 +213,16 @@ async def classify_document(
             "confidence": confidence
         }
 
+    except AdmissionRejectedError as e:
+        raise admission_http_exception(e)
+
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Executor saturado: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
     except Exception as e:
         logger.error(f"Erro na classificação: {e}")
         raise HTTPException(
@@ -150,6 +235,321 @@ async def classify_document(
             tmp_path.unlink()
 
 
+@router.post(
+    "/documents/{file_hash}/reanalyze",
+    response_model=AnalysisResult,
+    summary="Reanalisa documento sem reenviar o arquivo",
+    description="""
+    Refaz UC3/UC4 com as regras atuais a partir do veredito (UC1) e dos
+    parágrafos (UC2) armazenados na análise anterior. `file_hash` é o
+    SHA-256 do arquivo; `profile` deve ser o mesmo perfil usado na análise.
+
+    Responde 409 se UC1/UC2 estiverem desatualizados (ex.: configuração do
+    docling mudou): nesse caso, reenvie o arquivo em /api/v1/analyze.
+    """,
+    response_class=FastJSONResponse
+)
+async def reanalyze_document(
+    request: Request,
+    file_hash: str,
+    profile: Optional[DoclingProfile] = Query(
+        None,
+        description="Perfil do docling usado na análise original"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=EXCLUDE_DESCRIPTION),
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> AnalysisResult:
+    """
+    Reanalisa documento a partir das etapas armazenadas.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Depois de mudar ComplianceService.MIN_WORDS ou as stopwords, basta
+    chamar este endpoint (ou python -m app.rescore para o acervo inteiro):
+    o docling não roda de novo.
+
+    Raises:
+        HTTPException 404: Documento nunca analisado
+        HTTPException 409: UC1/UC2 desatualizados (reenviar o arquivo)
+        HTTPException 422: Documento rejeitado no UC1
+    """
+    build_selector(AnalysisResult, fields)
+    build_selector(AnalysisResult, exclude)
+
+    try:
+        result = await orchestrator.reanalyze(
+            file_hash,
+            profile=profile.value if profile is not None else None
+        )
+
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    except StageDataMissingError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    except InvalidDocumentError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    return json_response(request, project(result, fields, exclude))
+
+
+@router.get(
+    "/stages/stats",
+    summary="Resultados armazenados por etapa",
+    description="Entradas de UC1/UC2/UC3 na versão atual e em versões anteriores"
+)
+async def stage_stats(
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> dict:
+    """
+    Retorna contagem de resultados armazenados por etapa.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Após mudar uma configuração, "stale" mostra quantos documentos
+    ainda precisam ser reprocessados naquela etapa.
+    """
+    if orchestrator.stage_store is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "versions": orchestrator.stage_versions,
+        "stages": await asyncio.to_thread(
+            orchestrator.stage_store.get_stats, orchestrator.stage_versions
+        ),
+    }
+
+
+@router.get(
+    "/near-duplicates/stats",
+    summary="Índice de quase-duplicatas",
+    description="Documentos indexados pelo hash perceptual da primeira página e reaproveitamentos"
+)
+async def near_duplicate_stats(
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> dict:
+    """
+    Retorna estatísticas do índice de quase-duplicatas.
+
+    EXPLICAÇÃO EDUCATIVA:
+    match_rate é a fração das análises (sem acerto exato no cache) que
+    reconheceram um documento anterior dentro do raio; taxa alta depois
+    de aumentar NEAR_DUPLICATE_RADIUS pode indicar artigos diferentes
+    sendo confundidos.
+    """
+    if orchestrator.near_duplicates is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.near_duplicates.get_stats()}
+
+
+@router.get(
+    "/terms/top",
+    summary="Termos mais frequentes do acervo",
+    description="""
+    Termos (sem stopwords) mais frequentes nos documentos analisados na
+    janela de tempo, com limite de erro por termo (algoritmo Space-Saving).
+    A janela é alinhada a TERM_STATS_BUCKET_SECONDS.
+    """
+)
+async def top_terms(
+    n: int = Query(20, ge=1, le=500, description="Número de termos"),
+    hours: float = Query(24.0, gt=0, description="Tamanho da janela em horas (ignorado se `since` for informado)"),
+    since: Optional[datetime] = Query(None, description="Início da janela (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Fim da janela (ISO 8601; padrão: agora)"),
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> dict:
+    """
+    Retorna os termos mais frequentes na janela.
+
+    EXPLICAÇÃO EDUCATIVA:
+    "count" é um limite superior e "min_count" um limite inferior da
+    frequência real; com guaranteed_top=true, os N termos retornados são
+    com certeza os N mais frequentes da janela.
+    """
+    if orchestrator.term_stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Estatísticas de termos desabilitadas (TERM_STATS_ENABLED=false)"
+        )
+
+    until_ts = until.timestamp() if until is not None else time.time()
+    since_ts = since.timestamp() if since is not None else until_ts - hours * 3600
+
+    # Combinar snapshots lê o SQLite: fora do event loop
+    return await asyncio.to_thread(orchestrator.term_stats.top_terms, n, since_ts, until_ts)
+
+
+@router.post(
+    "/jobs",
+    response_model=JobInfo,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Cria job de análise assíncrona",
+    description="""
+    Enfileira a análise completa (UC1-UC4) e retorna o ID do job na hora.
+    Consulte o andamento em GET /api/v1/jobs/{job_id}.
+    """
+)
+async def create_job(
+    file: UploadFile = File(..., description="Arquivo PDF ou imagem"),
+    workers: JobWorkerPool = Depends(get_job_workers)
+) -> JobInfo:
+    """
+    Cria job de análise.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O arquivo é gravado em JOBS_DIR/files (não no /tmp do sistema) para
+    continuar disponível se o servidor reiniciar antes do job rodar.
+    O worker remove o arquivo quando o job termina.
+    """
+    tmp_path, _, _ = await save_upload_to_temp(
+        file,
+        settings.MAX_FILE_SIZE_MB * 1024 * 1024,
+        directory=Path(settings.JOBS_DIR) / "files"
+    )
+
+    try:
+        # Gravação no SQLite fora do event loop
+        return await asyncio.to_thread(workers.submit, tmp_path, file.filename)
+
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.error(f"Erro ao criar job: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno: {str(e)}"
+        )
+
+
+@router.get(
+    "/jobs/stats",
+    summary="Estatísticas da fila de jobs",
+    description="Número de workers e de jobs por status"
+)
+async def job_stats(
+    workers: JobWorkerPool = Depends(get_job_workers)
+) -> dict:
+    """
+    Retorna estatísticas da fila de jobs.
+
+    EXPLICAÇÃO EDUCATIVA:
+    "queued" crescendo continuamente indica que JOB_WORKERS é pequeno
+    para a taxa de chegada de documentos.
+    """
+    return await asyncio.to_thread(workers.get_stats)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobInfo,
+    summary="Status de job de análise",
+    description="Status, progresso por etapa e resultado final (quando concluído). "
+                "`fields` e `exclude` se aplicam ao resultado.",
+    response_class=FastJSONResponse
+)
+async def get_job(
+    request: Request,
+    job_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    exclude: Optional[str] = Query(None, description=EXCLUDE_DESCRIPTION),
+    workers: JobWorkerPool = Depends(get_job_workers)
+) -> JobInfo:
+    """
+    Consulta job de análise.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Clientes que consultam o job periodicamente podem pedir só o status
+    (ex.: fields=summary) e buscar o resultado completo uma única vez.
+
+    Raises:
+        HTTPException 404: Job inexistente ou expirado
+    """
+    # Leitura do resultado (pode ter vários MB) e validação fora do event loop
+    job = await asyncio.to_thread(workers.get, job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job não encontrado ou expirado: {job_id}"
+        )
+
+    return json_response(request, project(job, fields, exclude, within="result"))
+
+
+@router.get(
+    "/executor/stats",
+    summary="Estatísticas do executor CPU",
+    description="Profundidade das filas e tempos de espera/execução por etapa"
+)
+async def executor_stats(
+    executor: CPUExecutor = Depends(get_cpu_executor)
+) -> dict:
+    """
+    Retorna estatísticas do executor CPU.
+
+    EXPLICAÇÃO EDUCATIVA:
+    avg_wait_ms alto com avg_run_ms estável indica falta de workers;
+    avg_run_ms alto indica que a etapa em si ficou mais lenta.
+    """
+    return executor.get_stats()
+
+
+@router.get(
+    "/admission/stats",
+    summary="Estatísticas do controle de admissão",
+    description="Orçamento em uso, fila de espera e requisições recusadas"
+)
+async def admission_stats(
+    admission: Optional[AdmissionController] = Depends(get_admission_controller)
+) -> dict:
+    """
+    Retorna estatísticas do controle de admissão.
+
+    EXPLICAÇÃO EDUCATIVA:
+    "waited" crescendo indica picos absorvidos pela fila; "rejected"
+    crescendo indica capacidade insuficiente (mais workers ou réplicas).
+    """
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.get_stats()}
+
+
+@router.get(
+    "/speculation/stats",
+    summary="Estatísticas do UC2 especulativo",
+    description="Trabalho descartado e latência economizada pelo modo especulativo"
+)
+async def speculation_stats(
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> dict:
+    """
+    Retorna estatísticas do modo especulativo (SPECULATIVE_UC2).
+
+    EXPLICAÇÃO EDUCATIVA:
+    wasted_work_ratio alto (muitos documentos rejeitados no UC1) indica
+    que a especulação consome workers sem retorno; overlap_saved_ms
+    mostra quanto de latência ela economizou nos documentos aceitos.
+    """
+    return orchestrator.get_speculation_stats()
+
+
+@router.get(
+    "/docling/stats",
+    summary="Latência por perfil do docling",
+    description="Documentos e latência do UC2 por perfil, com e sem OCR"
+)
+async def docling_stats(
+    orchestrator: DocumentAnalysisOrchestrator = Depends(get_orchestrator)
+) -> dict:
+    """
+    Retorna contadores de latência por perfil docling.
+
+    EXPLICAÇÃO EDUCATIVA:
+    "text_layer" conta documentos que pularam o OCR graças à camada de
+    texto; comparar avg_ms entre perfis mostra o ganho de cada um.
+    """
+    return orchestrator.paragraph_service.get_profile_stats()
+
+
 @router.get(
     "/health",
     summary="Health check",
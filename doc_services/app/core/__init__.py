@@ -5,9 +5,14 @@ Contém configurações, utilitários centrais e inicialização.
 """
 
 from app.core.config import settings, get_settings, Settings
+from app.core.executor import CPUExecutor, ExecutorSaturatedError
+from app.core.document_context import DocumentContext
 
 __all__ = [
     "settings",
     "get_settings",
     "Settings",
+    "CPUExecutor",
+    "ExecutorSaturatedError",
+    "DocumentContext",
 ]
@@ -0,0 +1,374 @@
+"""
+Controle de admissão (backpressure) dos endpoints de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+O CPUExecutor já limita quantas TAREFAS esperam na fila, mas não quanto
+trabalho cada documento representa: dez PDFs escaneados de 200 páginas
+cabem na fila e, juntos, estouram a memória do container (OOM kill).
+
+O controle de admissão atua antes do pipeline:
+1. Estima o custo do documento: páginas + tamanho em MB (PDF escaneado
+   pesado custa mais que um PDF de texto com as mesmas páginas)
+2. Admite enquanto a soma dos custos em andamento cabe no orçamento
+   (ADMISSION_BUDGET, por processo)
+3. Sem orçamento, a requisição espera na fila (ordem de chegada) por até
+   ADMISSION_MAX_WAIT_SECONDS; fila cheia ou espera esgotada geram 503
+   com Retry-After, e o cliente tenta de novo mais tarde
+
+Assim a vazão degrada de forma controlada (mais 503, latência limitada)
+em vez de o processo morrer levando junto as requisições em andamento.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Deque, Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(RuntimeError):
+    """
+    Requisição recusada por falta de orçamento.
+
+    Atributos:
+        reason: "queue_full" (fila de espera cheia) ou "timeout" (espera esgotada)
+        retry_after: Segundos sugeridos para o cliente tentar de novo
+    """
+
+    def __init__(self, message: str, reason: str, retry_after: int):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def admission_http_exception(error: AdmissionRejectedError) -> HTTPException:
+    """Converte a recusa em 503 com cabeçalho Retry-After."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def estimate_pages(source: Union[Path, BinaryIO], content_type: str) -> int:
+    """
+    Conta páginas sem decodificar o conteúdo.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Para PDF basta a tabela de páginas (PyPDF2); para TIFF, o número de
+    quadros (Pillow lê só os cabeçalhos). Se a leitura falhar, o documento
+    conta como uma página: o tamanho em MB ainda entra no custo.
+
+    Args:
+        source: Caminho ou arquivo aberto (volta ao início após a leitura)
+        content_type: Tipo detectado pelos magic bytes
+
+    Returns:
+        Número de páginas (>= 1)
+    """
+    try:
+        if content_type == "application/pdf":
+            from PyPDF2 import PdfReader
+
+            reader = PdfReader(source if not isinstance(source, Path) else str(source), strict=False)
+            return max(1, len(reader.pages))
+        if content_type == "image/tiff":
+            from PIL import Image
+
+            with Image.open(source) as image:
+                return max(1, getattr(image, "n_frames", 1))
+    except Exception as e:
+        logger.debug(f"Não foi possível contar páginas ({content_type}): {e}")
+    finally:
+        if not isinstance(source, Path):
+            source.seek(0)
+    return 1
+
+
+def estimate_cost(
+    size_bytes: int,
+    pages: int,
+    cost_per_page: float = 1.0,
+    cost_per_mb: float = 1.0
+) -> float:
+    """
+    Custo estimado de um documento em unidades do orçamento.
+
+    Args:
+        size_bytes: Tamanho do arquivo
+        pages: Número de páginas
+        cost_per_page: Peso de cada página
+        cost_per_mb: Peso de cada MB (imagens escaneadas são grandes)
+
+    Returns:
+        Custo (> 0)
+    """
+    return pages * cost_per_page + size_bytes / (1024 * 1024) * cost_per_mb
+
+
+class AdmissionController:
+    """
+    Orçamento de trabalho em andamento com fila de espera limitada.
+
+    EXPLICAÇÃO EDUCATIVA:
+    A fila é estritamente FIFO: um documento grande na frente não é
+    ultrapassado pelos pequenos que chegaram depois (senão ele poderia
+    esperar para sempre). Um documento mais caro que o orçamento inteiro
+    é limitado ao orçamento e roda sozinho.
+
+    Atributos:
+        budget: Custo máximo em andamento
+        max_wait_seconds: Espera máxima na fila (0 = recusa imediata)
+        max_queue: Máximo de requisições aguardando
+    """
+
+    def __init__(
+        self,
+        budget: float = 200.0,
+        max_wait_seconds: float = 10.0,
+        max_queue: int = 32,
+        cost_per_page: float = 1.0,
+        cost_per_mb: float = 1.0
+    ):
+        """
+        Inicializa o controlador.
+
+        Args:
+            budget: Custo máximo em andamento (páginas + MB)
+            max_wait_seconds: Espera máxima por orçamento antes do 503
+            max_queue: Requisições aguardando antes de recusar na chegada
+            cost_per_page: Peso de cada página na estimativa
+            cost_per_mb: Peso de cada MB na estimativa
+        """
+        if budget <= 0:
+            raise ValueError("budget deve ser positivo")
+
+        self.budget = budget
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue = max_queue
+        self.cost_per_page = cost_per_page
+        self.cost_per_mb = cost_per_mb
+
+        self._in_use = 0.0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+        self._avg_hold_seconds = 1.0  # Média móvel do tempo de uso do orçamento
+
+        self._admitted = 0
+        self._rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+        self._waited = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+
+        logger.info(
+            f"AdmissionController: orçamento={budget}, espera_max={max_wait_seconds}s, "
+            f"fila_max={max_queue}"
+        )
+
+    def cost_of(self, size_bytes: int, pages: int) -> float:
+        """Custo do documento com os pesos configurados."""
+        return estimate_cost(size_bytes, pages, self.cost_per_page, self.cost_per_mb)
+
+    def retry_after(self) -> int:
+        """
+        Segundos sugeridos no Retry-After.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Tempo médio de uso do orçamento vezes quantas "rodadas" a fila
+        atual representa; limitado entre 1 s e 60 s.
+        """
+        queued_cost = sum(cost for cost, _ in self._waiters)
+        rounds = 1 + queued_cost / self.budget
+        return int(min(60, max(1, math.ceil(self._avg_hold_seconds * rounds))))
+
+    def check_queue(self, endpoint: str) -> None:
+        """
+        Recusa na chegada se a fila de espera já está cheia.
+
+        Chamado antes de receber o upload inteiro: sob sobrecarga, a API
+        nem grava o arquivo em disco.
+
+        Raises:
+            AdmissionRejectedError: Fila cheia
+        """
+        if len(self._waiters) >= self.max_queue:
+            self._reject(endpoint, "queue_full", 0.0)
+
+    @asynccontextmanager
+    async def admit(self, cost: float, endpoint: str) -> AsyncIterator[float]:
+        """
+        Reserva orçamento durante o bloco.
+
+        Uso:
+            async with controller.admit(cost, "analyze"):
+                result = await orchestrator.analyze_document(...)
+
+        Args:
+            cost: Custo estimado (ver cost_of)
+            endpoint: Nome do endpoint (métricas)
+
+        Yields:
+            Segundos de espera na fila
+
+        Raises:
+            AdmissionRejectedError: Fila cheia ou espera esgotada
+        """
+        cost = min(cost, self.budget)
+        start = time.monotonic()
+
+        if not self._waiters and self._in_use + cost <= self.budget:
+            self._in_use += cost
+        else:
+            await self._wait(cost, endpoint, start)
+
+        waited = time.monotonic() - start
+        self._record_admission(endpoint, waited)
+        metrics.ADMISSION_IN_USE.inc(cost)
+
+        try:
+            yield waited
+        finally:
+            held = time.monotonic() - start - waited
+            self._avg_hold_seconds = 0.8 * self._avg_hold_seconds + 0.2 * held
+            self._release(cost)
+
+    async def _wait(self, cost: float, endpoint: str, start: float) -> None:
+        """Aguarda na fila até receber orçamento ou esgotar a espera."""
+        if self.max_wait_seconds <= 0 or len(self._waiters) >= self.max_queue:
+            self._reject(endpoint, "queue_full", 0.0)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        metrics.ADMISSION_QUEUED.inc()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._remove(entry)
+            self._reject(endpoint, "timeout", time.monotonic() - start)
+        except asyncio.CancelledError:
+            # Cliente desconectou: devolve o orçamento se já tinha sido concedido
+            if future.done() and not future.cancelled():
+                self._in_use = max(0.0, self._in_use - cost)
+            else:
+                self._remove(entry)
+            raise
+        finally:
+            metrics.ADMISSION_QUEUED.dec()
+
+    def _remove(self, entry: Tuple[float, asyncio.Future]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        self._wake()  # O primeiro da fila pode ter ficado elegível
+
+    def _release(self, cost: float) -> None:
+        """Devolve orçamento e admite quem estiver esperando."""
+        self._in_use = max(0.0, self._in_use - cost)
+        metrics.ADMISSION_IN_USE.dec(cost)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Concede orçamento aos primeiros da fila, em ordem."""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()  # Desistiu (timeout/cancelamento)
+                continue
+            if self._in_use + cost > self.budget:
+                break
+            self._waiters.popleft()
+            self._in_use += cost
+            future.set_result(None)
+
+    def _record_admission(self, endpoint: str, waited: float) -> None:
+        self._admitted += 1
+        if waited > 0.001:
+            self._waited += 1
+        self._total_wait_ms += waited * 1000
+        self._max_wait_ms = max(self._max_wait_ms, waited * 1000)
+        metrics.ADMISSION_WAIT.labels(endpoint=endpoint, outcome="admitted").observe(waited)
+
+    def _reject(self, endpoint: str, reason: str, waited: float) -> None:
+        self._rejected[reason] += 1
+        metrics.ADMISSION_REJECTED.labels(endpoint=endpoint, reason=reason).inc()
+        metrics.ADMISSION_WAIT.labels(endpoint=endpoint, outcome="rejected").observe(waited)
+
+        retry_after = self.retry_after()
+        logger.warning(
+            f"Admissão recusada ({endpoint}, {reason}): em uso={self._in_use:.1f}/{self.budget}, "
+            f"fila={len(self._waiters)}, retry_after={retry_after}s"
+        )
+        raise AdmissionRejectedError(
+            "Servidor no limite de documentos em processamento. "
+            f"Tente novamente em {retry_after}s.",
+            reason=reason,
+            retry_after=retry_after
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas de admissão.
+
+        Returns:
+            Orçamento em uso, fila atual, admitidas/recusadas e esperas
+        """
+        return {
+            "budget": self.budget,
+            "in_use": round(self._in_use, 2),
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "admitted": self._admitted,
+            "waited": self._waited,
+            "rejected": dict(self._rejected),
+            "avg_wait_ms": self._total_wait_ms / max(self._admitted, 1),
+            "max_wait_ms": self._max_wait_ms,
+            "avg_hold_seconds": round(self._avg_hold_seconds, 3),
+            "retry_after": self.retry_after(),
+        }
+
+
+@asynccontextmanager
+async def admission_slot(
+    controller: Optional[AdmissionController],
+    source: Union[Path, BinaryIO],
+    content_type: str,
+    size_bytes: int,
+    endpoint: str
+) -> AsyncIterator[None]:
+    """
+    Estima o custo do upload e reserva orçamento durante o bloco.
+
+    EXPLICAÇÃO EDUCATIVA:
+    A contagem de páginas lê o arquivo (PyPDF2), então roda numa thread
+    para não bloquear o event loop. Sem controlador (ADMISSION_ENABLED=false)
+    o bloco executa direto.
+
+    Args:
+        controller: Controle de admissão, ou None
+        source: Arquivo salvo (Path) ou aberto (SpooledUpload.file)
+        content_type: Tipo detectado pelos magic bytes
+        size_bytes: Tamanho do upload
+        endpoint: Nome do endpoint (métricas)
+
+    Raises:
+        AdmissionRejectedError: Sem orçamento dentro da espera máxima
+    """
+    if controller is None:
+        yield
+        return
+
+    pages = await asyncio.to_thread(estimate_pages, source, content_type)
+    async with controller.admit(controller.cost_of(size_bytes, pages), endpoint):
+        yield
@@ -0,0 +1,392 @@
+"""
+Cache em dois níveis (memória + disco) endereçado por conteúdo.
+
+EXPLICAÇÃO EDUCATIVA:
+Cache endereçado por conteúdo usa o hash dos dados como chave: o mesmo
+arquivo sempre gera a mesma chave, independente do nome ou do momento
+do upload.
+
+Dois níveis (tiers):
+1. Memória (LRU): OrderedDict com as entradas mais recentes.
+   Acesso em microssegundos, mas local ao processo.
+2. Disco (SQLite): sobrevive a reinícios e é compartilhado por todos os
+   workers uvicorn do mesmo host. O modo WAL permite leituras
+   concorrentes enquanto outro processo escreve.
+
+Eviction (remoção) no disco é por tamanho: quando a soma dos valores
+passa do limite, removemos as entradas acessadas há mais tempo. A soma
+por namespace fica na tabela cache_sizes, mantida por triggers a cada
+inserção/remoção: consultar o total não varre as entradas, e o valor é
+o mesmo para todos os processos que usam o arquivo.
+
+As operações são síncronas (SQLite, com lock): chamadores async devem
+usá-las fora do event loop (asyncio.to_thread).
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula SHA-256 de um arquivo lendo em blocos.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Ler em blocos mantém o uso de memória constante mesmo para
+    arquivos grandes.
+
+    Args:
+        file_path: Caminho do arquivo
+        chunk_size: Tamanho de cada bloco lido
+
+    Returns:
+        Hash hexadecimal (64 caracteres)
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_fingerprint(config: Dict[str, Any]) -> str:
+    """
+    Calcula hash estável de um dicionário de configuração.
+
+    EXPLICAÇÃO EDUCATIVA:
+    sort_keys=True garante que a ordem das chaves não altera o hash.
+    Qualquer mudança de configuração gera um fingerprint diferente e,
+    portanto, chaves de cache diferentes (invalidação automática).
+
+    Args:
+        config: Configuração serializável em JSON
+
+    Returns:
+        Hash hexadecimal da configuração
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Cache chave/valor (bytes) com tier em memória e tier em SQLite.
+
+    Atributos:
+        db_path: Arquivo SQLite (None desabilita o tier de disco)
+        namespace: Prefixo lógico para separar caches no mesmo arquivo
+        memory_max_items: Máximo de entradas no LRU em memória
+        disk_max_bytes: Tamanho máximo somado dos valores em disco
+        ttl_seconds: Validade das entradas (None = sem expiração)
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        namespace: str = "default",
+        memory_max_items: int = 128,
+        disk_max_bytes: int = 500 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            db_path: Caminho do arquivo SQLite (None = apenas memória)
+            namespace: Namespace das entradas
+            memory_max_items: Capacidade do LRU em memória
+            disk_max_bytes: Limite de tamanho do tier de disco
+            ttl_seconds: Tempo de vida das entradas em segundos
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.namespace = namespace
+        self.memory_max_items = memory_max_items
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # Memória: chave -> (valor, timestamp de criação)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+        if self.db_path is not None:
+            self._init_db()
+
+        logger.info(
+            f"TieredCache '{namespace}' inicializado: memória={memory_max_items} itens, "
+            f"disco={'desabilitado' if self.db_path is None else self.db_path}"
+        )
+
+    def _init_db(self) -> None:
+        """Cria conexão e tabela SQLite."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # check_same_thread=False: a conexão é protegida por self._lock
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            check_same_thread=False,
+            isolation_level=None  # autocommit
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed "
+            "ON cache_entries (namespace, accessed_at)"
+        )
+
+        # EXPLICAÇÃO EDUCATIVA:
+        # Total de bytes por namespace mantido pelo próprio SQLite. Os
+        # triggers rodam na mesma transação da escrita, então o total vale
+        # para todos os workers. Arquivos criados antes dos triggers têm o
+        # total calculado uma única vez, aqui.
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            has_triggers = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'cache_size_insert'"
+            ).fetchone() is not None
+            if not has_triggers:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_sizes "
+                    "(namespace TEXT PRIMARY KEY, total INTEGER NOT NULL)"
+                )
+                self._conn.execute(
+                    """
+                    CREATE TRIGGER cache_size_insert AFTER INSERT ON cache_entries BEGIN
+                        INSERT INTO cache_sizes (namespace, total) VALUES (NEW.namespace, NEW.size)
+                        ON CONFLICT (namespace) DO UPDATE SET total = total + NEW.size;
+                    END
+                    """
+                )
+                self._conn.execute(
+                    """
+                    CREATE TRIGGER cache_size_delete AFTER DELETE ON cache_entries BEGIN
+                        UPDATE cache_sizes SET total = total - OLD.size WHERE namespace = OLD.namespace;
+                    END
+                    """
+                )
+                self._conn.execute(
+                    """
+                    CREATE TRIGGER cache_size_update AFTER UPDATE OF size ON cache_entries BEGIN
+                        UPDATE cache_sizes SET total = total - OLD.size + NEW.size
+                        WHERE namespace = NEW.namespace;
+                    END
+                    """
+                )
+                self._conn.execute("DELETE FROM cache_sizes")
+                self._conn.execute(
+                    "INSERT INTO cache_sizes (namespace, total) "
+                    "SELECT namespace, SUM(size) FROM cache_entries GROUP BY namespace"
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        """Verifica se entrada passou do TTL."""
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Busca valor no cache (memória primeiro, depois disco).
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor em bytes ou None se ausente/expirado
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    metrics.CACHE_LOOKUPS.labels(cache=self.namespace, result="memory_hit").inc()
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+
+                if row is not None:
+                    value, created_at = row
+                    if not self._is_expired(created_at, now):
+                        self._conn.execute(
+                            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                            (now, self.namespace, key)
+                        )
+                        # Promover para memória
+                        self._memory_put(key, bytes(value), created_at)
+                        self._stats["disk_hits"] += 1
+                        metrics.CACHE_LOOKUPS.labels(cache=self.namespace, result="disk_hit").inc()
+                        return bytes(value)
+
+                    self._conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, key)
+                    )
+
+            self._stats["misses"] += 1
+            metrics.CACHE_LOOKUPS.labels(cache=self.namespace, result="miss").inc()
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Armazena valor nos dois tiers.
+
+        Args:
+            key: Chave da entrada
+            value: Valor em bytes
+        """
+        now = time.time()
+
+        with self._lock:
+            self._memory_put(key, value, now)
+            self._stats["sets"] += 1
+
+            if self._conn is not None:
+                # Upsert (e não INSERT OR REPLACE): a substituição passa pelo
+                # trigger de UPDATE e o total continua correto
+                self._conn.execute(
+                    "INSERT INTO cache_entries "
+                    "(namespace, key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+                    "size = excluded.size, created_at = excluded.created_at, "
+                    "accessed_at = excluded.accessed_at",
+                    (self.namespace, key, sqlite3.Binary(value), len(value), now, now)
+                )
+                self._evict_disk()
+
+    def delete(self, key: str) -> None:
+        """Remove entrada dos dois tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+
+    def clear(self) -> None:
+        """Remove todas as entradas do namespace."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,)
+                )
+
+    def _memory_put(self, key: str, value: bytes, created_at: float) -> None:
+        """Insere no LRU em memória removendo o item mais antigo se cheio."""
+        if self.memory_max_items <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """
+        Remove entradas menos recentemente acessadas até caber no limite.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Removemos até 90% do limite (não 100%) para não precisar executar
+        eviction novamente a cada nova inserção.
+        """
+        total = self._disk_bytes()
+        if total <= self.disk_max_bytes:
+            return
+
+        # Percorre o índice (namespace, accessed_at) só até atingir o alvo
+        target = int(self.disk_max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at ASC",
+            (self.namespace,)
+        )
+
+        to_delete = []
+        for key, size in rows:
+            if total <= target:
+                break
+            to_delete.append((self.namespace, key))
+            total -= size
+
+        rows.close()
+        self._conn.executemany(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            to_delete
+        )
+        self._stats["evictions"] += len(to_delete)
+        logger.debug(f"Cache '{self.namespace}': {len(to_delete)} entradas removidas do disco")
+
+    def _disk_bytes(self) -> int:
+        """Soma dos tamanhos em disco do namespace (tabela cache_sizes)."""
+        row = self._conn.execute(
+            "SELECT total FROM cache_sizes WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+        return row[0] if row is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas de uso do cache.
+
+        Returns:
+            Contadores de hits/misses e tamanho atual de cada tier
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_items"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,)
+                ).fetchone()[0]
+                stats["disk_bytes"] = self._disk_bytes()
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Fecha a conexão SQLite."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
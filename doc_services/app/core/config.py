@@ -58,14 +58,59 @@ class Settings(BaseSettings):
     LLM_TIMEOUT_SECONDS: int = 30
     LLM_MAX_RETRIES: int = 3
 
+    # LLM Client Pool (um cliente por processo)
+    ANTHROPIC_BASE_URL: Optional[str] = None  # Ex.: servidor falso para testes de carga
+    LLM_MAX_IN_FLIGHT: int = 8  # Chamadas simultâneas (também o tamanho do pool HTTP)
+    LLM_REQUESTS_PER_MINUTE: int = 50  # 0 = sem limite local
+    LLM_TOKENS_PER_MINUTE: int = 50000  # 0 = sem limite local
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 30.0
+
+    # LLM Image Preprocessing (conversão de TIFF, redução e recodificação)
+    LLM_IMAGE_PREPROCESS: bool = True
+    LLM_IMAGE_MAX_LONG_EDGE: int = 1024  # px (A4 ~ 990 tokens; a API reduz acima de 1568 px)
+    LLM_IMAGE_JPEG_QUALITY: int = 85
+
+    # LLM Response Cache (classificações repetidas não chamam a API)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MEMORY_ITEMS: int = 256
+    LLM_CACHE_PERSIST: bool = True  # SQLite em CACHE_DIR (sobrevive a reinícios)
+    LLM_CACHE_MAX_SIZE_MB: int = 50
+
     # Cache Configuration
     ENABLE_CACHE: bool = True
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL_SECONDS: int = 3600
     CACHE_MAX_SIZE_MB: int = 500
+    CACHE_DIR: str = "cache"  # Tier de disco (SQLite) compartilhado entre workers
+    CACHE_MEMORY_ITEMS: int = 128  # Entradas no LRU em memória por processo
+    STAGE_STORE_ENABLED: bool = True  # UC1-UC3 por etapa em CACHE_DIR (reanálise sem docling)
+
+    # Termos mais frequentes do acervo (/api/v1/terms/top), snapshots em CACHE_DIR
+    TERM_STATS_ENABLED: bool = True
+    TERM_STATS_CAPACITY: int = 1000  # Termos monitorados por bucket (erro <= palavras / capacidade)
+    TERM_STATS_BUCKET_SECONDS: int = 3600  # Granularidade das janelas de consulta
+    TERM_STATS_FLUSH_SECONDS: float = 30.0  # Intervalo entre snapshots de cada worker
+    TERM_STATS_RETENTION_DAYS: int = 90
+
+    # Aquecimento na inicialização (/ready só responde 200 depois dele)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 300.0
+
+    # Rasterização de PDFs para o UC1 (pdfium no próprio processo, cache por hash)
+    PDF_RASTER_ENABLED: bool = True
+    PDF_RASTER_DPI: int = 100  # ~1000 px de altura, como as imagens do RVL-CDIP
+    PDF_RASTER_PAGES: int = 1  # Primeiras páginas renderizadas por documento
+    PDF_RASTER_CACHE_ITEMS: int = 64  # Rasters no LRU em memória (disco em CACHE_DIR)
+
+    # Quase-duplicatas (reescaneamentos/reexportações) pelo dHash da primeira página
+    NEAR_DUPLICATE_ENABLED: bool = False  # Reaproveita o resultado de OUTRO arquivo: opt-in
+    NEAR_DUPLICATE_RADIUS: int = 20  # Bits diferentes (de 256) aceitos como o mesmo documento
 
     # File Upload Limits
     MAX_FILE_SIZE_MB: int = 50
+    UPLOAD_SPOOL_MEMORY_MB: int = 1  # Acima disso, uploads vão para disco
     ALLOWED_EXTENSIONS: str = "pdf,png,jpg,jpeg,tiff,tif"
 
     @property
@@ -80,6 +125,62 @@ class Settings(BaseSettings):
     REQUEST_TIMEOUT_SECONDS: int = 60
     ENABLE_ASYNC_PROCESSING: bool = True
 
+    # Classificação em lote (/classify/batch)
+    BATCH_MAX_CONCURRENCY: int = 4  # Documentos classificados em paralelo
+    BATCH_MAX_ITEMS: int = 1000  # Máximo de documentos por lote
+
+    # Cascata (/classify com cascade=true): local primeiro, LLM na dúvida
+    CASCADE_CONFIDENCE_THRESHOLD: float = 0.8  # Abaixo disso, escala para o LLM
+    CASCADE_ESCALATE_LABELS: str = "other"  # Rótulos locais que sempre escalam
+
+    @property
+    def cascade_escalate_labels_list(self) -> List[str]:
+        """Retorna rótulos que sempre escalam para o LLM."""
+        return [label.strip() for label in self.CASCADE_ESCALATE_LABELS.split(',') if label.strip()]
+
+    # CPU Executor (etapas UC1/UC2 fora do event loop)
+    CPU_EXECUTOR_USE_PROCESSES: bool = True  # False = apenas threads
+    CPU_PROCESS_WORKERS: int = 2  # Processos com docling aquecido
+    CPU_THREAD_WORKERS: int = 4  # Threads para OpenCV (libera o GIL)
+    CPU_MAX_QUEUE_DEPTH: int = 16  # Tarefas pendentes por pool antes de 503
+    SPECULATIVE_UC2: bool = False  # Inicia UC2 junto com UC1 (descarta se UC1 rejeitar)
+
+    # Model host (python -m app.model_host): um único processo com os modelos
+    # do docling compartilhado por todos os workers uvicorn
+    MODEL_HOST_SOCKET: str = ""  # Vazio = ProcessPool próprio em cada worker
+    MODEL_HOST_WORKERS: int = 2  # Processos com docling aquecido no host
+    MODEL_HOST_MAX_QUEUE_DEPTH: int = 64  # Tarefas no host (todos os workers) antes de 503
+
+    # Controle de admissão (/api/v1/analyze e /classify): orçamento por worker
+    # em "páginas + MB" dos documentos em processamento
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_BUDGET: float = 200.0  # Custo máximo em andamento por processo
+    ADMISSION_MAX_WAIT_SECONDS: float = 10.0  # Espera por orçamento antes de 503 (0 = sem fila)
+    ADMISSION_MAX_QUEUE: int = 32  # Requisições aguardando antes de 503 imediato
+    ADMISSION_COST_PER_PAGE: float = 1.0
+    ADMISSION_COST_PER_MB: float = 1.0
+
+    # Docling (UC2)
+    DOCLING_PROFILE: str = "balanced"  # fast, balanced ou accurate
+    DOCLING_TEXT_LAYER_MIN_CHARS: int = 50  # Caracteres por página para pular OCR
+    DOCLING_SHARD_PAGES: int = 10  # Páginas por faixa em PDFs grandes (0 = sem divisão)
+    DOCLING_STORE_MEMORY_ITEMS: int = 8  # Conversões docling mantidas em memória por processo
+    DOCLING_STORE_DISK: bool = False  # Persistir conversões em CACHE_DIR (compartilhado)
+
+    # Jobs assíncronos (/api/v1/jobs)
+    JOBS_DIR: str = "jobs"  # Fila SQLite e arquivos enviados
+    JOB_WORKERS: int = 2  # Jobs processados em paralelo por processo (0 = desabilita)
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0  # Dobra a cada tentativa
+    JOB_RESULT_TTL_SECONDS: int = 86400  # 24 horas
+    JOB_STALE_SECONDS: int = 900  # Job "running" sem progresso é reprocessado
+
+    # Respostas JSON (projeção ?fields=/?exclude=, orjson e compressão)
+    RESPONSE_COMPRESSION: bool = True  # gzip/br conforme Accept-Encoding
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024  # Respostas menores não são comprimidas
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4  # 0-11; acima de ~5 o ganho não compensa a CPU
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
@@ -88,6 +189,15 @@ class Settings(BaseSettings):
     # Monitoring
     ENABLE_METRICS: bool = True
     METRICS_PORT: int = 9090
+    PROMETHEUS_NAMESPACE: str = "doc_classification"
+    PROMETHEUS_MULTIPROC_DIR: str = ""  # Vazio = processo único; com vários workers, diretório compartilhado
+
+    # Tracing (spans por requisição em JSONL, ver app.core.tracing)
+    TRACING_ENABLED: bool = True
+    TRACING_EXPORT_PATH: str = "logs/traces.jsonl"
+    TRACING_SAMPLE_RATE: float = 0.01  # Fração dos traces rápidos gravada
+    TRACING_SLOW_THRESHOLD_MS: float = 5000.0  # Traces mais lentos (ou com erro) sempre gravados
+    TRACING_MAX_FILE_MB: int = 100  # Rotaciona para <arquivo>.1 ao ultrapassar
 
     # CORS
     CORS_ORIGINS: str = "*"
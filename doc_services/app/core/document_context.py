@@ -0,0 +1,155 @@
+"""
+Contexto de documento compartilhado entre as etapas do pipeline.
+
+EXPLICAÇÃO EDUCATIVA:
+Antes, uma única análise lia e decodificava o mesmo arquivo várias vezes:
+- STEP 0 abria a imagem para corrigir a orientação e gravava uma cópia
+- UC1 fazia cv2.imread de novo (no arquivo original, não no corrigido!)
+- UC2 (docling) decodificava mais uma vez
+
+O DocumentContext é criado uma vez por requisição e guarda:
+- As páginas já decodificadas e com orientação corrigida (em memória)
+- Derivados calculados sob demanda e reaproveitados: tons de cinza e
+  imagem binária (Otsu)
+- Os bytes re-codificados para o docling, apenas quando houve rotação
+- Para PDFs, o raster das primeiras páginas (etapa RASTER, usado só no UC1)
+
+Nenhum arquivo temporário corrigido é gravado em disco.
+"""
+
+import io
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps, ImageSequence
+
+logger = logging.getLogger(__name__)
+
+# Extensões tratadas como imagem (demais: PDF)
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+# Tag EXIF de orientação
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+@dataclass
+class DocumentContext:
+    """
+    Documento decodificado uma única vez por requisição.
+
+    Atributos:
+        file_path: Caminho do arquivo original
+        pages: Páginas decodificadas (orientação corrigida). Vazio para PDF.
+        was_rotated: True se a orientação EXIF foi aplicada
+        raster: Primeiras páginas renderizadas de um PDF (etapa RASTER).
+            Separado de `pages` para o PDF continuar sendo tratado como
+            PDF pelo UC2.
+    """
+
+    file_path: Path
+    pages: List[Image.Image] = field(default_factory=list)
+    was_rotated: bool = False
+    raster: List[Image.Image] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, file_path: Path) -> "DocumentContext":
+        """
+        Lê e decodifica o documento.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Scanners e celulares gravam a rotação na tag EXIF "Orientation" em
+        vez de girar os pixels. ImageOps.exif_transpose aplica a rotação em
+        memória. Sem rotação, basta decodificar a primeira página (a única
+        usada pelo UC1); o docling lê o arquivo original.
+
+        Args:
+            file_path: Caminho do arquivo (PDF ou imagem)
+
+        Returns:
+            DocumentContext pronto para as etapas seguintes
+        """
+        if file_path.suffix.lower() not in IMAGE_EXTENSIONS:
+            return cls(file_path=file_path)
+
+        with Image.open(file_path) as image:
+            orientation = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+            was_rotated = orientation not in (None, 1)
+
+            if was_rotated:
+                # Todas as páginas: serão re-codificadas para o docling
+                pages = [ImageOps.exif_transpose(frame.copy()) for frame in ImageSequence.Iterator(image)]
+            else:
+                image.load()
+                pages = [image.copy()]
+
+        if was_rotated:
+            logger.info(f"[STEP 0] Orientação EXIF {orientation} aplicada em memória")
+
+        return cls(file_path=file_path, pages=pages, was_rotated=was_rotated)
+
+    @property
+    def is_image(self) -> bool:
+        """True se o documento é uma imagem (há páginas decodificadas)."""
+        return bool(self.pages)
+
+    @property
+    def first_page(self) -> Optional[Image.Image]:
+        """Primeira página decodificada ou rasterizada, ou None."""
+        if self.pages:
+            return self.pages[0]
+        if self.raster:
+            return self.raster[0]
+        return None
+
+    @cached_property
+    def gray(self) -> Optional[np.ndarray]:
+        """Primeira página em tons de cinza (uint8), ou None para PDF sem raster."""
+        page = self.first_page
+        if page is None:
+            return None
+        return np.asarray(page.convert("L"))
+
+    @cached_property
+    def binary(self) -> Optional[np.ndarray]:
+        """Primeira página binarizada com Otsu, ou None para PDF sem raster."""
+        if self.gray is None:
+            return None
+        return binarize(self.gray)
+
+    def docling_content(self) -> Optional[Tuple[str, bytes]]:
+        """
+        Bytes da versão corrigida para o docling, se houve rotação.
+
+        EXPLICAÇÃO EDUCATIVA:
+        O docling só aceita arquivos codificados (não arrays). Sem rotação,
+        ele lê o arquivo original direto do disco (retorna None). Com
+        rotação, re-codificamos em memória num formato sem perdas: PNG
+        para uma página, TIFF para várias.
+
+        Returns:
+            Tupla (nome, bytes) ou None se o original pode ser usado
+        """
+        if not self.was_rotated:
+            return None
+
+        buffer = io.BytesIO()
+        if len(self.pages) > 1:
+            suffix = ".tiff"
+            self.pages[0].save(buffer, format="TIFF", save_all=True, append_images=self.pages[1:])
+        else:
+            suffix = ".png"
+            self.pages[0].save(buffer, format="PNG")
+
+        return f"{self.file_path.stem}{suffix}", buffer.getvalue()
+
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """Binariza uma página em tons de cinza com Otsu."""
+    import cv2
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
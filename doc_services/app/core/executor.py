@@ -0,0 +1,413 @@
+"""
+Camada de execução para etapas CPU-bound do pipeline (UC1/UC2).
+
+EXPLICAÇÃO EDUCATIVA:
+Endpoints FastAPI `async` rodam todos no mesmo event loop. Se uma etapa
+pesada (docling com OCR, OpenCV) for chamada de forma síncrona dentro de
+um handler, o loop inteiro congela: nenhuma outra requisição é atendida,
+nem mesmo o `/health`.
+
+Este módulo oferece dois pools:
+- ProcessPool: para código que segura o GIL (docling, layout, OCR).
+  Cada processo mantém seus próprios modelos aquecidos (initializer).
+- ThreadPool: para código que libera o GIL (OpenCV, numpy, I/O).
+
+Ambos têm limite de profundidade de fila (tarefas aguardando + em execução).
+Quando o limite é atingido, a submissão falha imediatamente com
+ExecutorSaturatedError, permitindo responder 503 ao invés de acumular
+trabalho indefinidamente.
+
+Com model_host_socket, as tarefas de run_in_process vão para o model
+host compartilhado (ver app.core.model_host) em vez de um ProcessPool
+próprio: o limite de fila e as métricas continuam valendo por worker.
+
+Também registramos, por etapa (STEP0, UC1, UC2...), o tempo de espera na
+fila e o tempo de execução, para saber se a latência vem do trabalho em si
+ou da falta de workers.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.core import metrics
+from app.core.tracing import SpanContext, get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Fila do executor cheia.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Herda de RuntimeError para manter compatibilidade com quem já trata
+    falhas genéricas, mas permite que a API identifique o caso específico
+    e responda 503 (serviço temporariamente indisponível).
+    """
+    pass
+
+
+@dataclass
+class StageStats:
+    """
+    Estatísticas acumuladas de uma etapa do pipeline.
+
+    Atributos:
+        submitted: Tarefas submetidas
+        completed: Tarefas concluídas com sucesso
+        failed: Tarefas que lançaram exceção
+        rejected: Tarefas recusadas por fila cheia
+        cancelled: Tarefas canceladas pelo chamador (ex: UC2 especulativo),
+            contadas do ponto de vista de quem submeteu: a tarefa que já
+            estava rodando continua no worker até terminar
+        total_wait_ms: Soma dos tempos de espera na fila
+        max_wait_ms: Maior tempo de espera observado
+        total_run_ms: Soma dos tempos de execução
+        cancelled_run_ms: Tempo de execução das tarefas canceladas que já
+            estavam rodando (trabalho do worker sem ninguém aguardando)
+    """
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_run_ms: float = 0.0
+    cancelled_run_ms: float = 0.0
+
+    def record(self, wait_ms: float, run_ms: float) -> None:
+        """Registra uma execução concluída."""
+        self.completed += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_run_ms += run_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte estatísticas para dicionário serializável."""
+        done = max(self.completed, 1)
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": self.total_wait_ms / done,
+            "max_wait_ms": self.max_wait_ms,
+            "avg_run_ms": self.total_run_ms / done,
+            "cancelled_run_ms": self.cancelled_run_ms,
+        }
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict, trace_parent: Optional[SpanContext] = None):
+    """
+    Executa função medindo início e fim (roda dentro do worker).
+
+    EXPLICAÇÃO EDUCATIVA:
+    A função precisa estar no nível do módulo para ser serializável (pickle)
+    e enviada ao ProcessPool. time.time() é comparável entre processos do
+    mesmo host, então o processo pai consegue calcular o tempo de fila.
+    Com trace_parent, os spans criados no worker voltam junto com o
+    resultado para entrar no trace da requisição.
+    """
+    started_at = time.time()
+    if trace_parent is None:
+        return started_at, time.time(), fn(*args, **kwargs), []
+    with get_tracer().remote(trace_parent) as spans:
+        result = fn(*args, **kwargs)
+    return started_at, time.time(), result, spans
+
+
+def _warmup_task(hold_seconds: float) -> int:
+    """Tarefa vazia do aquecimento: segura o worker um instante e devolve o pid."""
+    time.sleep(hold_seconds)
+    return os.getpid()
+
+
+class CPUExecutor:
+    """
+    Executor assíncrono para tarefas CPU-bound.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Uso típico dentro de código async:
+
+        paragraphs = await executor.run_in_process("UC2", detect_fn, path)
+        result = await executor.run_in_thread("UC1", classifier.classify, path)
+
+    O event loop fica livre enquanto o trabalho roda em outro processo/thread,
+    então um único worker uvicorn consegue manter vários documentos em voo.
+
+    Atributos:
+        process_workers: Número de processos do pool
+        thread_workers: Número de threads do pool
+        max_queue_depth: Máximo de tarefas (aguardando + rodando) por pool
+        use_processes: Se False, run_in_process usa o ThreadPool
+    """
+
+    def __init__(
+        self,
+        process_workers: int = 2,
+        thread_workers: int = 4,
+        max_queue_depth: int = 16,
+        use_processes: bool = True,
+        process_initializer: Optional[Callable[[], None]] = None,
+        start_method: str = "spawn",
+        model_host_socket: Optional[str] = None
+    ):
+        """
+        Inicializa o executor.
+
+        Args:
+            process_workers: Número de processos do ProcessPool
+            thread_workers: Número de threads do ThreadPool
+            max_queue_depth: Limite de tarefas pendentes por pool
+            use_processes: Se False, não cria processos (tudo em threads)
+            process_initializer: Função executada uma vez em cada processo
+                (ex: carregar e aquecer modelos do docling)
+            start_method: Método de criação de processos ("spawn" evita
+                herdar threads e estado do event loop do processo pai)
+            model_host_socket: Socket Unix do model host; quando definido,
+                run_in_process executa no host (sem ProcessPool local)
+        """
+        self.process_workers = process_workers
+        self.thread_workers = thread_workers
+        self.max_queue_depth = max_queue_depth
+        self.use_processes = use_processes or model_host_socket is not None
+        self.process_initializer = process_initializer
+        self.start_method = start_method
+        self.model_host_socket = model_host_socket
+
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=thread_workers,
+            thread_name_prefix="cpu-executor"
+        )
+        # ProcessPool é criado sob demanda (lazy) para não pagar o custo
+        # de subir processos se nenhuma tarefa pesada for submetida
+        self._process_pool = None  # ProcessPoolExecutor ou ModelHostPool
+
+        self._lock = threading.Lock()
+        self._pending = {"process": 0, "thread": 0}
+        self._stats: Dict[str, StageStats] = {}
+
+        logger.info(
+            f"CPUExecutor inicializado: processos="
+            f"{'model host ' + model_host_socket if model_host_socket else (process_workers if use_processes else 0)}, "
+            f"threads={thread_workers}, fila_max={max_queue_depth}"
+        )
+
+    def _get_process_pool(self):
+        """Obtém (criando se necessário) o ProcessPool ou a conexão com o model host."""
+        with self._lock:
+            if self._process_pool is None and self.model_host_socket:
+                from app.core.model_host import ModelHostPool
+
+                self._process_pool = ModelHostPool(self.model_host_socket)
+            elif self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.process_initializer
+                )
+                logger.info(f"ProcessPool criado com {self.process_workers} processos")
+            return self._process_pool
+
+    async def warmup_processes(self, hold_seconds: float = 0.2) -> int:
+        """
+        Sobe todos os processos do pool antes da primeira requisição.
+
+        EXPLICAÇÃO EDUCATIVA:
+        O ProcessPool é criado sob demanda e cada processo roda o
+        initializer (carregar e aquecer o docling) ao nascer. Submeter
+        process_workers tarefas ao mesmo tempo faz o pool criar todos os
+        processos; cada tarefa segura seu worker por hold_seconds para que
+        as demais não sejam atendidas pelo primeiro processo pronto. Com
+        o model host, os modelos já foram carregados pelo próprio host.
+
+        Args:
+            hold_seconds: Duração de cada tarefa vazia
+
+        Returns:
+            Número de processos distintos que responderam (0 sem processos)
+        """
+        if not self.use_processes:
+            return 0
+
+        workers = 1 if self.model_host_socket else self.process_workers
+        pids = await asyncio.gather(*[
+            self.run_in_process("WARMUP", _warmup_task, hold_seconds)
+            for _ in range(workers)
+        ])
+        return len(set(pids))
+
+    def _get_stage(self, stage: str) -> StageStats:
+        """Obtém estatísticas da etapa (criando se necessário)."""
+        if stage not in self._stats:
+            self._stats[stage] = StageStats()
+        return self._stats[stage]
+
+    async def run_in_process(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Executa função em processo separado.
+
+        Args:
+            stage: Nome da etapa para métricas (ex: "UC2")
+            fn: Função de nível de módulo (serializável)
+            *args, **kwargs: Argumentos serializáveis
+
+        Returns:
+            Resultado de fn
+
+        Raises:
+            ExecutorSaturatedError: Se a fila estiver cheia
+        """
+        if not self.use_processes:
+            return await self.run_in_thread(stage, fn, *args, **kwargs)
+
+        try:
+            return await self._submit("process", self._get_process_pool(), stage, fn, args, kwargs)
+        except BrokenProcessPool as e:
+            # Um worker morreu (ex: OOM). Descartamos o pool para que
+            # a próxima submissão crie um novo.
+            logger.error(f"ProcessPool quebrado, será recriado: {e}")
+            with self._lock:
+                self._process_pool = None
+            raise RuntimeError(f"Worker de processamento falhou: {str(e)}") from e
+
+    async def run_in_thread(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Executa função no ThreadPool.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Threads só trazem paralelismo real quando o código libera o GIL,
+        o que acontece nas funções nativas do OpenCV e numpy.
+
+        Args:
+            stage: Nome da etapa para métricas (ex: "UC1")
+            fn: Função a executar
+            *args, **kwargs: Argumentos
+
+        Returns:
+            Resultado de fn
+
+        Raises:
+            ExecutorSaturatedError: Se a fila estiver cheia
+        """
+        return await self._submit("thread", self._thread_pool, stage, fn, args, kwargs)
+
+    async def _submit(self, kind: str, pool, stage: str, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        """Submete tarefa ao pool respeitando o limite de fila."""
+        stats = self._get_stage(stage)
+
+        with self._lock:
+            if self._pending[kind] >= self.max_queue_depth:
+                stats.rejected += 1
+                metrics.EXECUTOR_REJECTED.labels(pool=kind, stage=stage).inc()
+                raise ExecutorSaturatedError(
+                    f"Fila de processamento cheia ({self._pending[kind]} tarefas em {kind}). "
+                    f"Tente novamente em instantes."
+                )
+            self._pending[kind] += 1
+            stats.submitted += 1
+        metrics.EXECUTOR_QUEUE_DEPTH.labels(pool=kind).inc()
+
+        tracer = get_tracer()
+        with tracer.span("executor", stage=stage, pool=kind) as span:
+            submitted_at = time.time()
+
+            # EXPLICAÇÃO EDUCATIVA:
+            # A vaga na fila só é liberada quando a tarefa realmente termina no
+            # pool. Se o chamador cancelar, wrap_future cancela a tarefa que
+            # ainda não começou; uma tarefa já em execução não pode ser
+            # interrompida e continua ocupando a vaga até terminar.
+            try:
+                future = pool.submit(_timed_call, fn, args, kwargs, span.context)
+            except BaseException:
+                self._release(kind)
+                raise
+            future.add_done_callback(lambda _: self._release(kind))
+
+            try:
+                started_at, finished_at, result, spans = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                stats.cancelled += 1
+                # Tarefa já em execução ocupa o worker até o fim: seu tempo
+                # entra em cancelled_run_ms quando ela terminar
+                future.add_done_callback(lambda done: self._record_cancelled(stats, done))
+                raise
+            except Exception:
+                stats.failed += 1
+                raise
+
+            wait_ms = max(started_at - submitted_at, 0.0) * 1000
+            run_ms = (finished_at - started_at) * 1000
+            stats.record(wait_ms=wait_ms, run_ms=run_ms)
+            metrics.EXECUTOR_QUEUE_WAIT.labels(stage=stage).observe(wait_ms / 1000)
+            span.set_attributes(wait_ms=round(wait_ms, 2), run_ms=round(run_ms, 2))
+            tracer.adopt(spans)
+
+        logger.debug(f"[{stage}] fila={wait_ms:.1f}ms execução={run_ms:.1f}ms ({kind})")
+
+        return result
+
+    def _record_cancelled(self, stats: StageStats, future) -> None:
+        """Soma o tempo de execução de uma tarefa cancelada que já rodava."""
+        if future.cancelled() or future.exception() is not None:
+            return  # Nem começou (cancelada na fila) ou falhou
+        started_at, finished_at, _, _ = future.result()
+        with self._lock:
+            stats.cancelled_run_ms += (finished_at - started_at) * 1000
+
+    def _release(self, kind: str) -> None:
+        """Libera uma vaga da fila (chamado quando a tarefa termina)."""
+        with self._lock:
+            self._pending[kind] -= 1
+        metrics.EXECUTOR_QUEUE_DEPTH.labels(pool=kind).dec()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Retorna número de tarefas pendentes por pool."""
+        with self._lock:
+            return dict(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do executor.
+
+        Returns:
+            Dicionário com configuração, profundidade atual das filas
+            e métricas por etapa
+        """
+        return {
+            "process_workers": self.process_workers if self.use_processes else 0,
+            "model_host": self._model_host_stats(),
+            "thread_workers": self.thread_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_depth": self.queue_depth(),
+            "stages": {name: s.to_dict() for name, s in self._stats.items()},
+        }
+
+    def _model_host_stats(self) -> Optional[Dict[str, Any]]:
+        """Estatísticas do model host (None sem model host)."""
+        if not self.model_host_socket:
+            return None
+        try:
+            return self._get_process_pool().request_stats()
+        except Exception as e:
+            return {"socket": self.model_host_socket, "error": str(e)}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra os pools liberando processos e threads."""
+        self._thread_pool.shutdown(wait=wait)
+        with self._lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
+        logger.info("CPUExecutor encerrado")
@@ -0,0 +1,180 @@
+"""
+Termos mais frequentes (heavy hitters) com memória limitada: Space-Saving.
+
+EXPLICAÇÃO EDUCATIVA:
+Somar um Counter por documento funciona para alguns milhares de artigos,
+mas o vocabulário do acervo cresce sem limite (nomes próprios, números,
+erros de OCR). O algoritmo Space-Saving (Metwally et al., 2005) mantém no
+máximo `capacity` termos monitorados:
+
+1. Termo monitorado: soma a contagem
+2. Termo novo com espaço livre: passa a ser monitorado
+3. Termo novo sem espaço: substitui o termo de MENOR contagem m; herda
+   m como contagem inicial e registra erro = m
+
+Garantias (N = soma de todas as contagens):
+- Para cada termo monitorado: count - error <= frequência real <= count
+- O erro de qualquer termo é no máximo N / capacity
+- Todo termo com frequência real > N / capacity está monitorado
+
+Resumos de processos ou janelas diferentes podem ser combinados (merge)
+mantendo as mesmas garantias (Agarwal et al., "Mergeable Summaries").
+"""
+
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    Resumo Space-Saving ponderado e combinável.
+
+    Atributos:
+        capacity: Máximo de termos monitorados
+        total: Soma de todas as contagens recebidas (N)
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Inicializa o resumo.
+
+        Args:
+            capacity: Máximo de termos monitorados (erro <= N / capacity)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity deve ser positivo")
+
+        self.capacity = capacity
+        self.total = 0
+        # termo -> [contagem, erro]
+        self._counters: Dict[str, List[int]] = {}
+        # (contagem, termo) com entradas obsoletas removidas sob demanda
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def update(self, term: str, count: int = 1) -> None:
+        """
+        Soma `count` ocorrências de um termo.
+
+        Args:
+            term: Termo
+            count: Ocorrências (> 0)
+        """
+        self.total += count
+        entry = self._counters.get(term)
+
+        if entry is None:
+            if len(self._counters) < self.capacity:
+                entry = self._counters[term] = [0, 0]
+            else:
+                # Substituir o termo de menor contagem (herda a contagem como erro)
+                min_count, min_term = self._pop_min()
+                del self._counters[min_term]
+                entry = self._counters[term] = [min_count, min_count]
+
+        entry[0] += count
+        heapq.heappush(self._heap, (entry[0], term))
+
+        # O heap acumula entradas obsoletas; reconstruir quando crescer demais
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def update_many(self, counts: Dict[str, int]) -> None:
+        """Soma as contagens de um documento (Counter ou dict)."""
+        for term, count in counts.items():
+            if count > 0:
+                self.update(term, count)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        """Retorna (e remove do heap) o termo monitorado de menor contagem."""
+        while True:
+            count, term = heapq.heappop(self._heap)
+            entry = self._counters.get(term)
+            if entry is not None and entry[0] == count:
+                return count, term
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(entry[0], term) for term, entry in self._counters.items()]
+        heapq.heapify(self._heap)
+
+    def min_count(self) -> int:
+        """
+        Contagem mínima entre os monitorados (0 se ainda há espaço).
+
+        EXPLICAÇÃO EDUCATIVA:
+        Limite superior da frequência de qualquer termo NÃO monitorado.
+        """
+        if len(self._counters) < self.capacity:
+            return 0
+        return min(entry[0] for entry in self._counters.values())
+
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        """
+        Retorna os n termos de maior contagem.
+
+        Args:
+            n: Número de termos
+
+        Returns:
+            Lista de (termo, contagem, erro), em ordem decrescente
+        """
+        items = heapq.nlargest(n, self._counters.items(), key=lambda item: (item[1][0], item[0]))
+        return [(term, count, error) for term, (count, error) in items]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Combina dois resumos em um novo.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Um termo ausente em um dos resumos pode ter ocorrido até
+        min_count() vezes nele; essa quantia entra na contagem e no erro.
+        Depois mantêm-se os `capacity` maiores.
+
+        Args:
+            other: Outro resumo
+
+        Returns:
+            Novo SpaceSaving com capacidade igual à maior das duas
+        """
+        capacity = max(self.capacity, other.capacity)
+        self_min, other_min = self.min_count(), other.min_count()
+
+        combined: Dict[str, List[int]] = {}
+        for term in set(self._counters) | set(other._counters):
+            count_a, error_a = self._counters.get(term, (self_min, self_min))
+            count_b, error_b = other._counters.get(term, (other_min, other_min))
+            combined[term] = [count_a + count_b, error_a + error_b]
+
+        merged = SpaceSaving(capacity)
+        merged.total = self.total + other.total
+        kept = heapq.nlargest(capacity, combined.items(), key=lambda item: item[1][0])
+        merged._counters = {term: entry for term, entry in kept}
+        merged._rebuild_heap()
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o resumo (snapshots persistidos)."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": {term: entry for term, entry in self._counters.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        """Reconstrói resumo serializado por to_dict()."""
+        summary = cls(data["capacity"])
+        summary.total = data["total"]
+        summary._counters = {term: list(entry) for term, entry in data["counters"].items()}
+        summary._rebuild_heap()
+        return summary
+
+    @classmethod
+    def merge_all(cls, summaries: Iterable["SpaceSaving"], capacity: Optional[int] = None) -> "SpaceSaving":
+        """Combina vários resumos (resumo vazio se não houver nenhum)."""
+        merged = cls(capacity or 1)
+        for summary in summaries:
+            merged = merged.merge(summary)
+        return merged
@@ -0,0 +1,364 @@
+"""
+Fila persistente de jobs em SQLite.
+
+EXPLICAÇÃO EDUCATIVA:
+Jobs longos (análise com OCR) não devem depender da conexão HTTP. A fila
+guarda cada job em uma tabela SQLite, então:
+- Jobs sobrevivem a reinícios do servidor
+- Vários workers uvicorn do mesmo host compartilham a mesma fila
+- Um job "running" cujo worker morreu (sem heartbeat há muito tempo)
+  volta a ser elegível e é reprocessado
+
+A reserva de um job (claim) usa BEGIN IMMEDIATE: a transação pega o lock
+de escrita antes do SELECT, então dois workers nunca reservam o mesmo job.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """
+    Registro de um job na fila.
+
+    Atributos:
+        id: Identificador do job
+        status: queued, running, succeeded ou failed
+        file_path: Arquivo a processar
+        filename: Nome original do arquivo
+        attempts: Tentativas já iniciadas
+        max_attempts: Máximo de tentativas
+        progress: Estado de cada etapa do pipeline
+        result: Resultado serializado (JSON), se concluído
+        error: Mensagem do último erro
+        created_at: Criação (epoch)
+        updated_at: Última atualização/heartbeat (epoch)
+        available_at: Quando pode ser (re)processado (epoch)
+        expires_at: Quando será removido (epoch), após concluir
+    """
+
+    id: str
+    status: str
+    file_path: str
+    filename: str
+    attempts: int
+    max_attempts: int
+    progress: Dict[str, str] = field(default_factory=dict)
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    available_at: float = 0.0
+    expires_at: Optional[float] = None
+
+
+class JobQueue:
+    """
+    Fila de jobs persistida em SQLite.
+
+    Atributos:
+        db_path: Arquivo SQLite
+        stale_after_seconds: Jobs "running" sem heartbeat há mais tempo que
+            isso são considerados abandonados e voltam para a fila
+    """
+
+    COLUMNS = (
+        "id, status, file_path, filename, attempts, max_attempts, progress, "
+        "result, error, created_at, updated_at, available_at, expires_at"
+    )
+
+    def __init__(self, db_path: Path, stale_after_seconds: float = 900.0):
+        """
+        Inicializa a fila.
+
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+            stale_after_seconds: Tempo sem heartbeat para reprocessar job
+        """
+        self.db_path = Path(db_path)
+        self.stale_after_seconds = stale_after_seconds
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # check_same_thread=False: a conexão é protegida por self._lock
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            check_same_thread=False,
+            isolation_level=None  # autocommit; transações explícitas no claim
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                progress TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)"
+        )
+
+        logger.info(f"JobQueue inicializada: {self.db_path}")
+
+    def _row_to_job(self, row) -> Job:
+        """Converte linha do SQLite em Job."""
+        return Job(
+            id=row[0],
+            status=row[1],
+            file_path=row[2],
+            filename=row[3],
+            attempts=row[4],
+            max_attempts=row[5],
+            progress=json.loads(row[6]),
+            result=row[7],
+            error=row[8],
+            created_at=row[9],
+            updated_at=row[10],
+            available_at=row[11],
+            expires_at=row[12],
+        )
+
+    def enqueue(self, file_path: Path, filename: str, max_attempts: int = 3) -> Job:
+        """
+        Adiciona job à fila.
+
+        Args:
+            file_path: Arquivo a processar
+            filename: Nome original do arquivo
+            max_attempts: Máximo de tentativas
+
+        Returns:
+            Job criado (status queued)
+        """
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            status="queued",
+            file_path=str(file_path),
+            filename=filename,
+            attempts=0,
+            max_attempts=max_attempts,
+            created_at=now,
+            updated_at=now,
+            available_at=now,
+        )
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, file_path, filename, attempts, max_attempts, "
+                "created_at, updated_at, available_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job.id, job.status, job.file_path, filename, max_attempts, now, now, now)
+            )
+
+        return job
+
+    def claim(self, ttl_seconds: float = 86400.0) -> Optional[Job]:
+        """
+        Reserva o próximo job disponível.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Elegíveis: jobs "queued" cujo available_at já passou (respeita o
+        atraso entre tentativas) e jobs "running" abandonados. A reserva
+        incrementa attempts e zera o progresso.
+
+        Um job abandonado que já usou todas as tentativas (ex.: o documento
+        derruba o worker toda vez) é marcado como falho aqui, em vez de
+        ser executado de novo indefinidamente.
+
+        Args:
+            ttl_seconds: Tempo que o status de jobs falhos na reserva fica
+                disponível
+
+        Returns:
+            Job reservado (status running) ou None se a fila estiver vazia
+        """
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        f"SELECT {self.COLUMNS} FROM jobs "
+                        "WHERE (status = 'queued' AND available_at <= ?) "
+                        "OR (status = 'running' AND updated_at < ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (now, now - self.stale_after_seconds)
+                    ).fetchone()
+
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    job = self._row_to_job(row)
+                    if job.status != "running":
+                        break
+                    if job.attempts < job.max_attempts:
+                        logger.warning(f"Job {job.id} abandonado, reprocessando")
+                        break
+
+                    logger.error(f"Job {job.id} abandonado após {job.attempts} tentativas; marcado como falho")
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, "
+                        "expires_at = ? WHERE id = ?",
+                        (
+                            f"Job interrompido (worker encerrado) em todas as {job.attempts} tentativas",
+                            now, now + ttl_seconds, job.id
+                        )
+                    )
+
+                job.status = "running"
+                job.attempts += 1
+                job.progress = {}
+                job.updated_at = now
+
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = ?, progress = '{}', "
+                    "updated_at = ? WHERE id = ?",
+                    (job.attempts, now, job.id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return job
+
+    def update_progress(self, job_id: str, progress: Dict[str, str]) -> None:
+        """Grava progresso por etapa (também serve de heartbeat)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), time.time(), job_id)
+            )
+
+    def complete(self, job_id: str, result: str, ttl_seconds: float) -> None:
+        """
+        Marca job como concluído com sucesso.
+
+        Args:
+            job_id: ID do job
+            result: Resultado serializado (JSON)
+            ttl_seconds: Tempo que o resultado fica disponível
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, "
+                "updated_at = ?, expires_at = ? WHERE id = ?",
+                (result, now, now + ttl_seconds, job_id)
+            )
+
+    def retry(self, job_id: str, error: str, delay_seconds: float) -> None:
+        """
+        Devolve job à fila para nova tentativa após um atraso.
+
+        Args:
+            job_id: ID do job
+            error: Mensagem do erro da tentativa atual
+            delay_seconds: Atraso até a próxima tentativa
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, updated_at = ?, "
+                "available_at = ? WHERE id = ?",
+                (error, now, now + delay_seconds, job_id)
+            )
+
+    def fail(self, job_id: str, error: str, ttl_seconds: float) -> None:
+        """
+        Marca job como falho definitivamente.
+
+        Args:
+            job_id: ID do job
+            error: Mensagem do erro
+            ttl_seconds: Tempo que o status fica disponível
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, "
+                "expires_at = ? WHERE id = ?",
+                (error, now, now + ttl_seconds, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Busca job pelo ID.
+
+        Returns:
+            Job ou None se não existir ou já tiver expirado
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        job = self._row_to_job(row)
+        if job.expires_at is not None and job.expires_at <= time.time():
+            return None
+
+        return job
+
+    def purge_expired(self) -> List[Job]:
+        """
+        Remove jobs expirados.
+
+        Returns:
+            Jobs removidos (para que o chamador apague arquivos associados)
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now,)
+            ).fetchall()
+            self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now,)
+            )
+
+        return [self._row_to_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Retorna número de jobs por status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        """Fecha conexão SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,296 @@
+"""
+Métricas Prometheus da aplicação (exposição em /metrics).
+
+EXPLICAÇÃO EDUCATIVA:
+O orquestrador registra apenas o processing_time_ms total. Para saber se
+uma regressão vem da orientação (STEP0), do UC1, do docling (UC2), da
+análise textual (UC3) ou do relatório (UC4), cada etapa alimenta um
+histograma próprio. Além disso:
+- contadores de análises por desfecho (success, cached, rejected...)
+- gauges de trabalho em andamento (análises e fila do executor)
+- contadores de consultas aos caches por resultado (hit/miss)
+- contadores de tokens, custo e chamadas ao LLM
+
+Razões de acerto (hit ratio) não são gauges: cada worker teria a sua e
+não há como somá-las. Exportamos contadores e a razão é calculada na
+consulta, ex: sum(rate(..._cache_lookups_total{result=~".*hit"}[5m]))
+/ sum(rate(..._cache_lookups_total[5m])).
+
+Múltiplos workers do uvicorn:
+Cada worker é um processo com seus próprios contadores. Com
+PROMETHEUS_MULTIPROC_DIR definido, o prometheus_client grava os valores
+em arquivos mmap nesse diretório e o /metrics de qualquer worker soma os
+arquivos de todos. A variável precisa existir ANTES do primeiro import do
+prometheus_client, por isso este módulo a configura a partir das
+settings antes de importá-lo, e deve ser importado antes do
+instrumentator. O diretório deve ser esvaziado antes de subir os workers
+(prepare_multiprocess_dir).
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict
+
+from app.core.config import settings
+
+if settings.PROMETHEUS_MULTIPROC_DIR and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = settings.PROMETHEUS_MULTIPROC_DIR
+if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+    Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mkdir(parents=True, exist_ok=True)
+
+from prometheus_client import Counter, Gauge, Histogram, multiprocess  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = settings.PROMETHEUS_NAMESPACE
+
+# Etapas vão de milissegundos (UC3/UC4) a minutos (docling com OCR)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Duração de cada etapa do pipeline de análise",
+    ["stage", "outcome"],
+    namespace=NAMESPACE,
+    buckets=STAGE_BUCKETS,
+)
+
+ANALYSIS_DURATION = Histogram(
+    "analysis_duration_seconds",
+    "Duração total da análise de um documento",
+    ["outcome"],
+    namespace=NAMESPACE,
+    buckets=STAGE_BUCKETS,
+)
+
+ANALYSIS_REQUESTS = Counter(
+    "analysis_requests_total",
+    "Análises de documentos por desfecho",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+# livesum: soma apenas processos vivos (worker encerrado não deixa valor preso)
+ANALYSIS_IN_FLIGHT = Gauge(
+    "analysis_in_flight",
+    "Análises em andamento",
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "executor_queue_depth",
+    "Tarefas pendentes (aguardando + executando) no executor CPU",
+    ["pool"],
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+EXECUTOR_QUEUE_WAIT = Histogram(
+    "executor_queue_wait_seconds",
+    "Tempo de espera na fila do executor antes de iniciar a tarefa",
+    ["stage"],
+    namespace=NAMESPACE,
+    buckets=STAGE_BUCKETS,
+)
+
+EXECUTOR_REJECTED = Counter(
+    "executor_rejected_total",
+    "Tarefas recusadas por fila cheia",
+    ["pool", "stage"],
+    namespace=NAMESPACE,
+)
+
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Espera na fila de admissão por desfecho (admitted, rejected)",
+    ["endpoint", "outcome"],
+    namespace=NAMESPACE,
+    buckets=STAGE_BUCKETS,
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requisições recusadas pelo controle de admissão (queue_full, timeout)",
+    ["endpoint", "reason"],
+    namespace=NAMESPACE,
+)
+
+ADMISSION_IN_USE = Gauge(
+    "admission_budget_in_use",
+    "Custo estimado (páginas + MB) dos documentos admitidos em andamento",
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Requisições aguardando admissão",
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Consultas aos caches por resultado (memory_hit, disk_hit, miss)",
+    ["cache", "result"],
+    namespace=NAMESPACE,
+)
+
+LLM_CALLS = Counter(
+    "llm_calls_total",
+    "Chamadas ao LLM por desfecho (success, cache_hit, error)",
+    ["provider", "outcome"],
+    namespace=NAMESPACE,
+)
+
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "Novas tentativas de chamadas ao LLM por status HTTP",
+    ["provider", "status"],
+    namespace=NAMESPACE,
+)
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens consumidos pelo LLM",
+    ["provider", "model", "direction"],
+    namespace=NAMESPACE,
+)
+
+LLM_COST = Counter(
+    "llm_cost_usd_total",
+    "Custo acumulado das chamadas ao LLM (USD)",
+    ["provider", "model"],
+    namespace=NAMESPACE,
+)
+
+
+class StageTimer:
+    """
+    Mede etapas a partir dos eventos (etapa, "running" | "done").
+
+    EXPLICAÇÃO EDUCATIVA:
+    O orquestrador já reporta início e fim de cada etapa para o progresso
+    dos jobs; o timer reaproveita esses eventos. Uma etapa reportada como
+    "running" duas vezes (UC2 especulativo) conta a partir da primeira.
+    Etapas que não chegam ao "done" são registradas por abort() com o
+    desfecho da análise (rejected, error...).
+    """
+
+    def __init__(self):
+        self._started: Dict[str, float] = {}
+
+    def mark(self, stage: str, status: str) -> None:
+        """
+        Registra um evento de etapa.
+
+        Args:
+            stage: Nome da etapa (STEP0, UC1..UC4)
+            status: "running" ou "done"
+        """
+        now = time.perf_counter()
+        if status == "running":
+            self._started.setdefault(stage, now)
+        elif status == "done":
+            started = self._started.pop(stage, None)
+            if started is not None:
+                STAGE_DURATION.labels(stage=stage, outcome="ok").observe(now - started)
+
+    def abort(self, outcome: str) -> None:
+        """
+        Registra as etapas iniciadas e não concluídas.
+
+        Args:
+            outcome: Desfecho da análise interrompida
+        """
+        now = time.perf_counter()
+        for stage, started in self._started.items():
+            STAGE_DURATION.labels(stage=stage, outcome=outcome).observe(now - started)
+        self._started.clear()
+
+
+def record_analysis(outcome: str, duration_seconds: float) -> None:
+    """
+    Registra o desfecho e a duração total de uma análise.
+
+    Args:
+        outcome: success, cached, near_duplicate, rejected, saturated,
+            cancelled ou error
+        duration_seconds: Duração total
+    """
+    ANALYSIS_REQUESTS.labels(outcome=outcome).inc()
+    ANALYSIS_DURATION.labels(outcome=outcome).observe(duration_seconds)
+
+
+def record_llm_usage(provider: str, model: str, input_tokens: int, output_tokens: int, cost_usd: float) -> None:
+    """
+    Registra uma chamada bem-sucedida ao LLM.
+
+    Args:
+        provider: Provedor (anthropic, openai...)
+        model: Modelo utilizado
+        input_tokens: Tokens de entrada
+        output_tokens: Tokens de saída
+        cost_usd: Custo total da chamada
+    """
+    LLM_CALLS.labels(provider=provider, outcome="success").inc()
+    LLM_TOKENS.labels(provider=provider, model=model, direction="input").inc(input_tokens)
+    LLM_TOKENS.labels(provider=provider, model=model, direction="output").inc(output_tokens)
+    LLM_COST.labels(provider=provider, model=model).inc(cost_usd)
+
+
+def is_multiprocess() -> bool:
+    """Indica se as métricas são agregadas entre processos."""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def prepare_multiprocess_dir() -> None:
+    """
+    Esvazia o diretório de métricas multiprocesso.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Arquivos de uma execução anterior seriam somados aos da atual
+    (contadores "voltariam" com valores antigos). Deve ser chamado uma
+    vez, antes de iniciar os workers, nunca por um worker já em execução.
+    """
+    if not is_multiprocess():
+        return
+    directory = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    for path in directory.glob("*.db"):
+        path.unlink()
+    logger.info(f"Diretório de métricas multiprocesso limpo: {directory}")
+
+
+def mark_process_dead() -> None:
+    """Remove os gauges "live" deste processo (chamado no shutdown)."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def setup_metrics(app) -> None:
+    """
+    Instrumenta a aplicação e expõe /metrics.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O instrumentator adiciona métricas HTTP por rota (contagem por
+    status, latência e requisições em andamento). O /metrics gerado por
+    ele já usa o MultiProcessCollector quando PROMETHEUS_MULTIPROC_DIR
+    está definido, somando os arquivos de todos os workers.
+
+    Args:
+        app: Aplicação FastAPI
+    """
+    from prometheus_fastapi_instrumentator import Instrumentator
+
+    Instrumentator(
+        should_instrument_requests_inprogress=True,
+        inprogress_name=f"{NAMESPACE}_http_requests_inprogress",
+        inprogress_labels=True,
+        excluded_handlers=["/metrics"],
+    ).instrument(app, metric_namespace=NAMESPACE).expose(app, tags=["Monitoring"])
+
+    logger.info(f"Métricas Prometheus em /metrics (multiprocesso={is_multiprocess()})")
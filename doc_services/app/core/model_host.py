@@ -0,0 +1,442 @@
+"""
+Processo hospedeiro de modelos (model host) compartilhado pelos workers.
+
+EXPLICAÇÃO EDUCATIVA:
+Sem o model host, cada worker uvicorn cria o próprio ProcessPool com
+CPU_PROCESS_WORKERS processos, e cada processo carrega os modelos do
+docling (layout, OCR, tabelas). Com 8 workers e 2 processos por worker
+são 16 cópias dos mesmos pesos na RAM e 16 aquecimentos.
+
+Com MODEL_HOST_SOCKET definido:
+
+    worker uvicorn 1 ──┐
+    worker uvicorn 2 ──┼── socket Unix ──> model host ──> ProcessPool (docling aquecido)
+    worker uvicorn N ──┘
+
+- O model host (python -m app.model_host) mantém um único ProcessPool
+  com os modelos carregados uma vez: a memória passa a depender do
+  número de processos do host, não do número de workers da API
+- Nos workers, o CPUExecutor troca o ProcessPool local por um
+  ModelHostPool com a mesma interface (submit -> Future). Limite de
+  fila, métricas, tracing e cancelamento continuam iguais
+- Cada worker mantém UMA conexão persistente e envia várias requisições
+  sem esperar as respostas (multiplexação por id); o host executa todas
+  em paralelo no pool e responde na ordem em que terminam
+
+Protocolo (quadros com tamanho de 4 bytes + pickle):
+    cliente -> host: ("call", id, fn, args, kwargs) | ("cancel", id) | ("stats", id)
+    host -> cliente: (id, ok, resultado ou exceção)
+
+Arquivos enviados trafegam pelo caminho (host e workers estão na mesma
+máquina); só bytes já codificados (faixas de PDF, página rotacionada)
+passam pelo socket. O socket é criado com permissão 0600: o pickle só é
+aceito de processos do mesmo usuário.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.executor import ExecutorSaturatedError
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+def _encode(message: Any) -> bytes:
+    """Serializa uma mensagem em um quadro (tamanho + pickle)."""
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Lê exatamente `size` bytes do socket (EOF -> ConnectionError)."""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Conexão com o model host encerrada")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _portable_exception(error: BaseException) -> BaseException:
+    """Garante que a exceção pode ser enviada de volta (pickle)."""
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+class ModelHostPool:
+    """
+    Cliente do model host com a interface de um ProcessPoolExecutor.
+
+    EXPLICAÇÃO EDUCATIVA:
+    submit() envia a chamada pelo socket e devolve um Future comum; uma
+    thread leitora resolve os Futures conforme as respostas chegam. Se a
+    conexão cair, todos os Futures pendentes falham com BrokenProcessPool,
+    o mesmo erro de um ProcessPool local cujo worker morreu: o CPUExecutor
+    descarta o pool e a próxima submissão reconecta.
+
+    Atributos:
+        socket_path: Caminho do socket Unix do model host
+    """
+
+    def __init__(self, socket_path: str, connect_timeout: float = 5.0):
+        """
+        Conecta ao model host.
+
+        Args:
+            socket_path: Caminho do socket Unix
+            connect_timeout: Tempo máximo para conectar (segundos)
+
+        Raises:
+            BrokenProcessPool: Se o model host não estiver disponível
+        """
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(connect_timeout)
+        try:
+            self._sock.connect(socket_path)
+        except OSError as e:
+            self._sock.close()
+            raise BrokenProcessPool(f"Model host indisponível em {socket_path}: {e}") from e
+        self._sock.settimeout(None)
+
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._broken: Optional[BaseException] = None
+
+        self._reader = threading.Thread(target=self._read_loop, name="model-host-reader", daemon=True)
+        self._reader.start()
+
+        logger.info(f"Conectado ao model host: {socket_path}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Envia fn(*args, **kwargs) para execução no model host.
+
+        Args:
+            fn: Função de nível de módulo (serializável)
+            *args, **kwargs: Argumentos serializáveis
+
+        Returns:
+            Future com o resultado
+
+        Raises:
+            BrokenProcessPool: Se a conexão com o host estiver quebrada
+        """
+        return self._request(("call", fn, args, kwargs))
+
+    def request_stats(self, timeout: float = 2.0) -> Dict[str, Any]:
+        """Consulta as estatísticas do model host."""
+        return self._request(("stats",)).result(timeout=timeout)
+
+    def _request(self, message: tuple) -> Future:
+        future: Future = Future()
+        request_id = next(self._ids)
+        frame = _encode((message[0], request_id, *message[1:]))
+
+        with self._lock:
+            if self._broken is not None:
+                raise BrokenProcessPool(str(self._broken))
+            self._pending[request_id] = future
+        future.add_done_callback(lambda f: self._on_done(request_id, f))
+
+        try:
+            self._send(frame)
+        except OSError as e:
+            self._fail_all(e)
+            raise BrokenProcessPool(f"Falha ao enviar ao model host: {e}") from e
+        return future
+
+    def _send(self, frame: bytes) -> None:
+        with self._send_lock:
+            self._sock.sendall(frame)
+
+    def _on_done(self, request_id: int, future: Future) -> None:
+        """Avisa o host quando o chamador cancela uma tarefa ainda pendente."""
+        if not future.cancelled():
+            return
+        with self._lock:
+            self._pending.pop(request_id, None)
+            if self._broken is not None:
+                return
+        try:
+            self._send(_encode(("cancel", request_id)))
+        except OSError:
+            pass
+
+    def _read_loop(self) -> None:
+        """Thread leitora: resolve os Futures conforme as respostas chegam."""
+        try:
+            while True:
+                (size,) = _HEADER.unpack(_recv_exact(self._sock, _HEADER.size))
+                request_id, ok, payload = pickle.loads(_recv_exact(self._sock, size))
+
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue  # Cancelada pelo chamador
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(payload)
+        except Exception as e:
+            self._fail_all(e)
+
+    def _fail_all(self, error: BaseException) -> None:
+        """Marca a conexão como quebrada e falha todos os pendentes."""
+        with self._lock:
+            if self._broken is None:
+                self._broken = error
+                logger.error(f"Conexão com o model host perdida: {error}")
+            pending, self._pending = self._pending, {}
+
+        for future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(BrokenProcessPool(f"Conexão com o model host perdida: {error}"))
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Fecha a conexão (o model host continua rodando)."""
+        with self._lock:
+            if self._broken is None:
+                self._broken = ConnectionError("Conexão com o model host fechada")
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        if wait:
+            self._reader.join(timeout=5)
+
+
+class ModelHost:
+    """
+    Servidor do model host: executa chamadas recebidas no pool local.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Um event loop atende todas as conexões; cada chamada vira uma tarefa
+    no pool (ProcessPool com docling aquecido). max_queue_depth limita o
+    total de tarefas de todos os workers: acima dele o host responde
+    ExecutorSaturatedError, que a API transforma em 503.
+
+    Se um processo do pool morrer (ex.: OOM em um escaneado grande), o
+    ProcessPoolExecutor fica quebrado para sempre. Como o CPUExecutor faz
+    localmente, o host cria um pool novo com pool_factory; as chamadas
+    afetadas recebem um erro e as seguintes usam o pool novo.
+
+    Atributos:
+        socket_path: Caminho do socket Unix
+        pool: Executor que roda as chamadas
+        max_queue_depth: Tarefas simultâneas aceitas (todas as conexões)
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        pool: Executor,
+        max_queue_depth: int = 64,
+        pool_factory: Optional[Callable[[], Executor]] = None
+    ):
+        """
+        Inicializa o host.
+
+        Args:
+            socket_path: Caminho do socket Unix
+            pool: Executor inicial (já aquecido)
+            max_queue_depth: Tarefas simultâneas aceitas
+            pool_factory: Cria um pool novo quando o atual quebra
+                (BrokenProcessPool); sem ela, o pool não é recriado
+        """
+        self.socket_path = socket_path
+        self.pool = pool
+        self.max_queue_depth = max_queue_depth
+        self.pool_factory = pool_factory
+        self._pool_lock = asyncio.Lock()
+        self._pool_restarts = 0
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._pending = 0
+        self._clients = 0
+        self._served = 0
+        self._failed = 0
+        self._rejected = 0
+        self._started_at = time.time()
+
+    async def start(self) -> None:
+        """Cria o socket (removendo um arquivo antigo) e começa a aceitar conexões."""
+        path = Path(self.socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+
+        self._server = await asyncio.start_unix_server(self._handle_client, path=str(path))
+        os.chmod(path, 0o600)
+        logger.info(f"Model host ouvindo em {path} (fila máx. {self.max_queue_depth})")
+
+    async def serve_forever(self) -> None:
+        """Atende conexões até ser cancelado."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Para de aceitar conexões, encerra as abertas e remove o socket."""
+        if self._server is not None:
+            self._server.close()
+            # Os workers recebem BrokenProcessPool e reconectam quando o host voltar
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        Path(self.socket_path).unlink(missing_ok=True)
+
+    async def _replace_pool(self, broken: Executor) -> None:
+        """
+        Substitui o pool quebrado (uma vez, mesmo com várias tarefas afetadas).
+
+        EXPLICAÇÃO: criar o pool aquece o docling em todos os processos
+        (segundos), então roda em uma thread; chamadas que chegam enquanto
+        isso esperam o lock e seguem para o pool novo.
+        """
+        async with self._pool_lock:
+            if self.pool is not broken or self.pool_factory is None:
+                return
+            logger.error("Pool do model host quebrado (processo encerrado); recriando...")
+            self.pool = await asyncio.to_thread(self.pool_factory)
+            self._pool_restarts += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            logger.info("Pool do model host recriado")
+
+    async def _submit(self, fn: Callable, args: tuple, kwargs: dict) -> Future:
+        """Submete ao pool; se estiver quebrado, recria e tenta mais uma vez."""
+        pool = self.pool
+        try:
+            return pool.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            await self._replace_pool(pool)
+            return self.pool.submit(fn, *args, **kwargs)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende uma conexão (um worker da API) até ela ser fechada."""
+        self._clients += 1
+        self._writers.add(writer)
+        in_flight: Dict[int, Future] = {}
+        write_lock = asyncio.Lock()
+
+        async def reply(request_id: int, ok: bool, payload: Any) -> None:
+            try:
+                frame = _encode((request_id, ok, payload))
+            except Exception as e:
+                frame = _encode((request_id, False, RuntimeError(f"Resultado não serializável: {e}")))
+            async with write_lock:
+                if writer.is_closing():
+                    return  # Worker desconectou antes da resposta
+                writer.write(frame)
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+        async def run(request_id: int, future: Future, pool: Executor) -> None:
+            try:
+                result = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                return  # Cancelada a pedido do cliente: nada a responder
+            except BrokenProcessPool as e:
+                # EXPLICAÇÃO: a falha é do processo, não da conexão. Repassar
+                # BrokenProcessPool faria o cliente descartar a conexão; um
+                # RuntimeError falha só esta chamada.
+                self._failed += 1
+                await self._replace_pool(pool)
+                ok, result = False, RuntimeError(f"Processo do model host encerrado: {e}")
+            except BaseException as e:
+                self._failed += 1
+                ok, result = False, _portable_exception(e)
+            else:
+                self._served += 1
+                ok = True
+            finally:
+                # Libera a vaga antes de responder: quem recebe a resposta
+                # já vê a fila sem esta tarefa
+                self._pending -= 1
+                in_flight.pop(request_id, None)
+            await reply(request_id, ok, result)
+
+        try:
+            while True:
+                (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                message = pickle.loads(await reader.readexactly(size))
+                kind, request_id = message[0], message[1]
+
+                if kind == "call":
+                    _, _, fn, args, kwargs = message
+                    if self._pending >= self.max_queue_depth:
+                        self._rejected += 1
+                        await reply(request_id, False, ExecutorSaturatedError(
+                            f"Model host saturado ({self._pending} tarefas). Tente novamente em instantes."
+                        ))
+                        continue
+                    try:
+                        future = await self._submit(fn, args, kwargs)
+                    except Exception as e:
+                        # Pool quebrado sem pool_factory, ou falha ao recriar
+                        self._failed += 1
+                        await reply(request_id, False, RuntimeError(f"Model host sem processos disponíveis: {e}"))
+                        continue
+                    self._pending += 1
+                    in_flight[request_id] = future
+                    asyncio.ensure_future(run(request_id, future, self.pool))
+
+                elif kind == "cancel":
+                    future = in_flight.get(request_id)
+                    if future is not None:
+                        future.cancel()
+
+                elif kind == "stats":
+                    await reply(request_id, True, self.get_stats())
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Worker encerrado
+        finally:
+            self._clients -= 1
+            self._writers.discard(writer)
+            for future in in_flight.values():
+                future.cancel()
+            writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Conexões, tarefas em andamento e contadores do host."""
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "workers": getattr(self.pool, "_max_workers", None),
+            "clients": self._clients,
+            "pending": self._pending,
+            "max_queue_depth": self.max_queue_depth,
+            "served": self._served,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "pool_restarts": self._pool_restarts,
+            "uptime_seconds": round(time.time() - self._started_at, 1),
+        }
@@ -0,0 +1,239 @@
+"""
+Controle de concorrência e taxa para chamadas a APIs externas (LLM).
+
+EXPLICAÇÃO EDUCATIVA:
+Provedores de LLM limitam cada conta em três dimensões:
+- requisições simultâneas (conexões abertas)
+- requisições por minuto (RPM)
+- tokens por minuto (TPM)
+
+Sem controle local, um pico de uploads dispara centenas de chamadas ao
+mesmo tempo e a API responde 429 para a maioria delas. O LLMRateLimiter
+combina:
+1. Semáforo: limita chamadas em andamento
+2. Token bucket de requisições: no máximo N por minuto, com rajada
+   igual à capacidade do balde
+3. Token bucket de tokens: reserva uma estimativa antes da chamada e
+   corrige com o consumo real depois
+
+Quem excede espera na fila (asyncio) em vez de receber 429; o tempo de
+espera é medido para dimensionar os limites.
+
+Para erros transientes que ainda ocorrem (429/5xx), backoff_delay
+implementa backoff exponencial com jitter ("full jitter"), evitando que
+todas as requisições rejeitadas tentem de novo no mesmo instante.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float = 1.0,
+    max_seconds: float = 30.0,
+    retry_after: Optional[float] = None
+) -> float:
+    """
+    Calcula espera antes de uma nova tentativa.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Full jitter: espera aleatória entre 0 e base * 2^attempt (limitada a
+    max_seconds). Se o servidor informou Retry-After, esse valor é o
+    mínimo respeitado.
+
+    Args:
+        attempt: Número da nova tentativa (0 = primeira repetição)
+        base_seconds: Espera base
+        max_seconds: Teto da espera exponencial
+        retry_after: Espera sugerida pelo servidor (segundos)
+
+    Returns:
+        Segundos a aguardar
+    """
+    ceiling = min(max_seconds, base_seconds * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class TokenBucket:
+    """
+    Token bucket assíncrono.
+
+    Atributos:
+        rate_per_second: Reposição de unidades por segundo
+        capacity: Máximo acumulado (tamanho da rajada)
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Inicializa o balde cheio.
+
+        Args:
+            per_minute: Unidades liberadas por minuto
+            capacity: Tamanho máximo da rajada (padrão: per_minute)
+        """
+        if per_minute <= 0:
+            raise ValueError("per_minute deve ser positivo")
+
+        self.rate_per_second = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Repõe unidades proporcionalmente ao tempo decorrido."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """
+        Retira unidades do balde, aguardando a reposição se necessário.
+
+        Pedidos maiores que a capacidade são limitados a ela (senão
+        esperariam para sempre).
+
+        Args:
+            amount: Unidades a consumir
+        """
+        amount = min(amount, self.capacity)
+
+        # O lock garante ordem de chegada (FIFO) entre os que esperam
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate_per_second)
+                self._refill()
+            self._tokens -= amount
+
+    def adjust(self, delta: float) -> None:
+        """
+        Corrige o saldo após conhecer o consumo real.
+
+        Args:
+            delta: Unidades a mais (positivo) ou a menos (negativo) que a reserva
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class LLMRateLimiter:
+    """
+    Limita concorrência, requisições/minuto e tokens/minuto.
+
+    Atributos:
+        max_in_flight: Máximo de chamadas simultâneas
+        requests: Token bucket de requisições (None = sem limite)
+        tokens: Token bucket de tokens (None = sem limite)
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0
+    ):
+        """
+        Inicializa o limitador.
+
+        Args:
+            max_in_flight: Chamadas simultâneas permitidas
+            requests_per_minute: Limite de RPM (0 = desabilitado)
+            tokens_per_minute: Limite de TPM (0 = desabilitado)
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight deve ser >= 1")
+
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "acquired": 0,
+            "waiting": 0,
+            "in_flight": 0,
+            "queue_wait_ms_total": 0.0,
+            "queue_wait_ms_max": 0.0,
+        }
+
+        logger.info(
+            f"LLMRateLimiter: in_flight={max_in_flight}, "
+            f"rpm={requests_per_minute or '-'}, tpm={tokens_per_minute or '-'}"
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0) -> AsyncIterator[Dict[str, float]]:
+        """
+        Reserva uma vaga para uma chamada.
+
+        EXPLICAÇÃO EDUCATIVA:
+        A ordem é: taxa (RPM/TPM) e depois semáforo. Assim uma chamada não
+        ocupa vaga de concorrência enquanto espera reposição do balde.
+
+        Uso:
+            async with limiter.slot(estimated_tokens=2000) as reservation:
+                response = await client.messages.create(...)
+                reservation["actual_tokens"] = usage_total
+
+        Args:
+            estimated_tokens: Tokens reservados no bucket de TPM
+
+        Yields:
+            Dicionário da reserva; preencher "actual_tokens" corrige o TPM
+        """
+        start = time.perf_counter()
+        with self._stats_lock:
+            self._stats["waiting"] += 1
+
+        try:
+            if self.requests is not None:
+                await self.requests.acquire(1)
+            if self.tokens is not None and estimated_tokens > 0:
+                await self.tokens.acquire(estimated_tokens)
+            await self._semaphore.acquire()
+        finally:
+            with self._stats_lock:
+                self._stats["waiting"] -= 1
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._stats["acquired"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["queue_wait_ms_total"] += wait_ms
+            self._stats["queue_wait_ms_max"] = max(self._stats["queue_wait_ms_max"], wait_ms)
+
+        reservation = {"queue_wait_ms": wait_ms, "actual_tokens": None}
+        try:
+            yield reservation
+        finally:
+            self._semaphore.release()
+            with self._stats_lock:
+                self._stats["in_flight"] -= 1
+
+            actual = reservation["actual_tokens"]
+            if self.tokens is not None and actual is not None:
+                self.tokens.adjust(actual - estimated_tokens)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retorna vagas em uso, fila e tempo de espera (ms)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats["max_in_flight"] = self.max_in_flight
+        stats["queue_wait_ms_avg"] = (
+            stats["queue_wait_ms_total"] / stats["acquired"] if stats["acquired"] else 0.0
+        )
+        return stats
@@ -0,0 +1,266 @@
+"""
+Respostas JSON enxutas: projeção de campos, orjson e compressão.
+
+EXPLICAÇÃO EDUCATIVA:
+O AnalysisResult de um artigo longo carrega todos os parágrafos (texto e
+bbox), o dicionário completo de frequências e o relatório em Markdown:
+vários megabytes. Três técnicas reduzem o custo de devolvê-lo:
+
+1. Projeção (?fields=... / ?exclude=...): o cliente pede só o que usa.
+   Os caminhos viram os conjuntos include/exclude do model_dump, então
+   os campos descartados nem chegam a ser serializados
+2. orjson: serializa dict -> bytes em Rust, sem o jsonable_encoder do
+   FastAPI (que percorre o objeto inteiro em Python)
+3. Compressão (Accept-Encoding: br ou gzip): o JSON é muito repetitivo
+   (chaves e palavras), comprimindo para uma fração do tamanho
+
+Exemplos:
+    ?fields=summary,compliance,top_words
+    ?exclude=paragraphs.text,text_analysis.word_frequencies
+"""
+
+import gzip
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple, Type, Union, get_args, get_origin
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson está em requirements.txt
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Atalhos aceitos em ?fields= (expandem para caminhos do AnalysisResult)
+FIELD_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "document_id",
+        "filename",
+        "is_scientific_paper",
+        "classification_confidence",
+        "analyzed_at",
+        "processing_time_ms",
+        "cache_hit",
+    ),
+    "top_words": ("text_analysis.top_words",),
+    "word_frequencies": ("text_analysis.word_frequencies",),
+    "report": ("compliance_report_markdown",),
+}
+
+# Selecionadores no formato do pydantic: {"campo": True | {subcampos}}
+Selector = Dict[Union[str, int], Any]
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada com orjson.
+
+    EXPLICAÇÃO EDUCATIVA:
+    orjson serializa datetime, UUID e enums nativamente e devolve bytes
+    prontos para o corpo da resposta. Sem orjson instalado, cai no json
+    da biblioteca padrão (mesma saída, mais lenta).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    """Tipos fora do JSON padrão (mesma representação do orjson)."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _field_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """
+    Descobre o modelo aninhado de um campo e se ele é uma lista.
+
+    Returns:
+        Tupla (modelo pydantic ou None, é lista)
+    """
+    is_list = False
+    pending = [annotation]
+    while pending:
+        current = pending.pop()
+        origin = get_origin(current)
+        if origin in (list, tuple, set):
+            is_list = True
+        if isinstance(current, type) and issubclass(current, BaseModel):
+            return current, is_list
+        pending.extend(get_args(current))
+    return None, is_list
+
+
+def _add_path(selector: Selector, model: Type[BaseModel], parts: Iterable[str], path: str) -> None:
+    """Acrescenta um caminho pontuado ao selecionador, validando cada nível."""
+    parts = list(parts)
+    name = parts[0]
+    if name not in model.model_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campo desconhecido: {path}"
+        )
+
+    if len(parts) == 1:
+        selector[name] = True
+        return
+
+    nested_model, is_list = _field_model(model.model_fields[name].annotation)
+    if nested_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campo sem subcampos: {name} (em {path})"
+        )
+
+    current = selector.get(name)
+    if current is True:
+        return  # Campo inteiro já selecionado
+    if current is None:
+        current = selector[name] = {}
+
+    # Listas: o pydantic aplica o selecionador a cada item via "__all__"
+    if is_list:
+        current = current.setdefault("__all__", {})
+    _add_path(current, nested_model, parts[1:], path)
+
+
+def build_selector(model: Type[BaseModel], paths: Optional[str]) -> Optional[Selector]:
+    """
+    Converte "a,b.c,grupo" no selecionador include/exclude do pydantic.
+
+    Args:
+        model: Modelo da resposta
+        paths: Caminhos separados por vírgula (None/vazio = sem seleção)
+
+    Returns:
+        Selecionador ou None
+
+    Raises:
+        HTTPException 400: Campo inexistente
+    """
+    if not paths:
+        return None
+
+    selector: Selector = {}
+    for raw in paths.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        for path in FIELD_GROUPS.get(raw, (raw,)):
+            _add_path(selector, model, path.split("."), raw)
+    return selector or None
+
+
+def project(
+    model: BaseModel,
+    fields: Optional[str] = None,
+    exclude: Optional[str] = None,
+    within: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Converte o modelo em dict contendo apenas os campos pedidos.
+
+    Args:
+        model: Instância a serializar
+        fields: Caminhos a incluir (None = todos)
+        exclude: Caminhos a remover
+        within: Campo aninhado ao qual a seleção se aplica (ex.: "result"
+            do JobInfo); os demais campos do modelo são mantidos
+
+    Returns:
+        Dicionário pronto para FastJSONResponse
+    """
+    target = type(model)
+    if within is not None:
+        target, _ = _field_model(target.model_fields[within].annotation)
+
+    include_selector = build_selector(target, fields)
+    exclude_selector = build_selector(target, exclude)
+
+    if within is not None:
+        if include_selector is not None:
+            include_selector = {
+                **{name: True for name in type(model).model_fields if name != within},
+                within: include_selector,
+            }
+        if exclude_selector is not None:
+            exclude_selector = {within: exclude_selector}
+
+    return model.model_dump(include=include_selector, exclude=exclude_selector)
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Escolhe br ou gzip conforme o Accept-Encoding (br tem preferência)."""
+    accepted = {
+        token.split(";")[0].strip().lower()
+        for token in accept_encoding.split(",")
+        if not token.strip().endswith(";q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+    """
+    Comprime o corpo se o cliente aceitar e o ganho compensar.
+
+    Args:
+        body: Corpo serializado
+        accept_encoding: Cabeçalho Accept-Encoding da requisição
+
+    Returns:
+        Tupla (corpo, codificação ou None se não comprimido)
+    """
+    if not settings.RESPONSE_COMPRESSION or len(body) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return body, None
+
+    encoding = _choose_encoding(accept_encoding)
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY), encoding
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL), encoding
+    return body, None
+
+
+def json_response(
+    request: Request,
+    content: Any,
+    status_code: int = status.HTTP_200_OK
+) -> FastJSONResponse:
+    """
+    Serializa com orjson e comprime conforme o Accept-Encoding.
+
+    Args:
+        request: Requisição (para o Accept-Encoding)
+        content: Conteúdo já projetado (dict/list)
+        status_code: Status HTTP
+
+    Returns:
+        Resposta com Content-Encoding e Vary quando comprimida
+    """
+    response = FastJSONResponse(content, status_code=status_code)
+    body, encoding = compress(response.body, request.headers.get("accept-encoding", ""))
+
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        response.body = body
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(body))
+    return response
@@ -0,0 +1,229 @@
+"""
+Resultados por etapa do pipeline persistidos em SQLite.
+
+EXPLICAÇÃO EDUCATIVA:
+O cache de resultados (AnalysisResultCache) guarda só o resultado final:
+qualquer mudança de configuração (ex.: ComplianceService.MIN_WORDS ou as
+stopwords) invalida tudo e obriga a reenviar o arquivo e rodar o docling
+de novo, mesmo que só UC3/UC4 tenham mudado.
+
+Aqui cada etapa é gravada separadamente, com a versão da etapa:
+- UC1: veredito (é artigo científico? confiança)
+- UC2: parágrafos detectados pelo docling
+- UC3: análise textual
+
+A chave é (hash do arquivo, etapa, variante); a variante separa opções
+escolhidas por requisição (perfil docling). Uma entrada só é aproveitada
+se a versão gravada for igual à versão atual da etapa. Cada etapa guarda
+apenas a versão mais recente, então o arquivo não cresce a cada mudança
+de configuração.
+
+Diferente do TieredCache, não há eviction por tamanho: os parágrafos
+armazenados são a base para reprocessar o acervo (python -m app.rescore).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StageStore:
+    """
+    Armazenamento de resultados por etapa, endereçado por conteúdo.
+
+    Atributos:
+        db_path: Arquivo SQLite
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # check_same_thread=False: a conexão é protegida por self._lock
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            check_same_thread=False,
+            isolation_level=None  # autocommit
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stage_results (
+                file_hash TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (file_hash, stage, variant)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                file_hash TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stage_version "
+            "ON stage_results (stage, variant, version, file_hash)"
+        )
+
+        logger.info(f"StageStore inicializado: {self.db_path}")
+
+    def get(self, file_hash: str, stage: str, variant: str, version: str) -> Optional[str]:
+        """
+        Busca resultado de uma etapa.
+
+        Args:
+            file_hash: SHA-256 dos bytes do arquivo
+            stage: Etapa (UC1, UC2, UC3)
+            variant: Opções da requisição (ex.: perfil docling)
+            version: Versão atual da etapa
+
+        Returns:
+            Payload JSON, ou None se ausente ou de outra versão
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, payload FROM stage_results "
+                "WHERE file_hash = ? AND stage = ? AND variant = ?",
+                (file_hash, stage, variant)
+            ).fetchone()
+
+        if row is None or row[0] != version:
+            return None
+        return row[1]
+
+    def put(
+        self,
+        file_hash: str,
+        stage: str,
+        variant: str,
+        version: str,
+        payload: str,
+        filename: Optional[str] = None
+    ) -> None:
+        """
+        Grava resultado de uma etapa (substitui versões anteriores).
+
+        Args:
+            file_hash: SHA-256 dos bytes do arquivo
+            stage: Etapa (UC1, UC2, UC3)
+            variant: Opções da requisição (ex.: perfil docling)
+            version: Versão da etapa que produziu o payload
+            payload: Resultado serializado (JSON)
+            filename: Nome original do arquivo (usado em relatórios)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stage_results "
+                "(file_hash, stage, variant, version, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (file_hash, stage, variant, version, payload, now)
+            )
+            if filename is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (file_hash, filename, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (file_hash, filename, now)
+                )
+
+    def get_filename(self, file_hash: str) -> Optional[str]:
+        """Retorna o nome original do arquivo, se conhecido."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename FROM documents WHERE file_hash = ?",
+                (file_hash,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def iter_stage(
+        self,
+        stage: str,
+        variant: str,
+        version: str,
+        page_size: int = 256
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Percorre todos os documentos com a etapa na versão indicada.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Paginação por chave (file_hash > último visto) em vez de um cursor
+        aberto: o lock não fica preso durante a iteração e o chamador pode
+        gravar no mesmo arquivo entre as páginas.
+
+        Args:
+            stage: Etapa (ex.: UC2)
+            variant: Variante (ex.: perfil docling)
+            version: Versão exigida
+            page_size: Linhas lidas por consulta
+
+        Yields:
+            (file_hash, filename, payload)
+        """
+        last_hash = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT s.file_hash, COALESCE(d.filename, s.file_hash), s.payload "
+                    "FROM stage_results s LEFT JOIN documents d ON d.file_hash = s.file_hash "
+                    "WHERE s.stage = ? AND s.variant = ? AND s.version = ? AND s.file_hash > ? "
+                    "ORDER BY s.file_hash LIMIT ?",
+                    (stage, variant, version, last_hash, page_size)
+                ).fetchall()
+
+            if not rows:
+                return
+
+            yield from rows
+            last_hash = rows[-1][0]
+
+    def get_stats(self, versions: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Conta entradas por etapa.
+
+        Args:
+            versions: Versão atual de cada etapa; quando fornecido, separa
+                entradas atuais ("current") das desatualizadas ("stale")
+
+        Returns:
+            {etapa: {"total": n, "current": n, "stale": n}}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, version, COUNT(*) FROM stage_results GROUP BY stage, version"
+            ).fetchall()
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for stage, version, count in rows:
+            entry = stats.setdefault(stage, {"total": 0, "current": 0, "stale": 0})
+            entry["total"] += count
+            if versions is not None:
+                entry["current" if versions.get(stage) == version else "stale"] += count
+        return stats
+
+    def close(self) -> None:
+        """Fecha a conexão SQLite."""
+        with self._lock:
+            self._conn.close()
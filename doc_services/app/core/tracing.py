@@ -0,0 +1,530 @@
+"""
+Tracing por requisição com exportação local em JSONL.
+
+EXPLICAÇÃO EDUCATIVA:
+Métricas agregadas (app.core.metrics) mostram que o p99 piorou, mas não
+qual requisição nem por quê. Um trace registra a árvore de "spans" de uma
+requisição: cada span é uma operação com início, duração, atributos
+(páginas, bytes, parágrafos, tokens) e o span pai. Com ele dá para
+reconstruir, depois do fato, que uma análise lenta passou 30 s no OCR de
+uma única chamada ao docling.
+
+Funcionamento:
+- O span atual fica numa ContextVar: spans abertos dentro dele (inclusive
+  em outras corrotinas criadas a partir dele) viram filhos
+- Spans concluídos ficam em memória até o span raiz terminar
+- Amostragem na cauda: ao fim do trace decidimos se ele é gravado. Traces
+  com duração acima do limite ou com erro são sempre gravados; os demais
+  com probabilidade sample_rate
+- Gravados como uma linha JSON por span (JSONL), sem coletor externo
+
+Pools do executor: ContextVars não atravessam processos (nem tarefas
+submetidas a um ThreadPoolExecutor). O CPUExecutor envia o contexto do
+span atual junto com a tarefa; no worker, os spans são coletados
+(remote) e devolvidos com o resultado, e o processo principal os anexa
+ao trace (adopt).
+
+Uso:
+    from app.core.tracing import get_tracer
+
+    with get_tracer().span("docling.convert", bytes=1024) as span:
+        ...
+        span.set_attributes(pages=12)
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# (trace_id, span_id) do span pai, enviado aos workers do executor
+SpanContext = Tuple[str, str]
+
+
+class Span:
+    """
+    Uma operação cronometrada dentro de um trace.
+
+    Atributos:
+        name: Nome da operação (ex: "UC2", "docling.convert")
+        trace_id: Identificador do trace (compartilhado pela árvore)
+        span_id: Identificador do span
+        parent_id: span_id do pai (None no span raiz)
+        attributes: Atributos livres (páginas, bytes, tokens...)
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_time", "_start_perf", "duration_ms", "status", "error", "_token",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Define um atributo do span."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Define vários atributos do span."""
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        """Marca o span como falho."""
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def context(self) -> SpanContext:
+        """Contexto para criar filhos em outro processo/thread."""
+        return self.trace_id, self.span_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação exportada (uma linha do JSONL)."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span usado com tracing desabilitado (não registra nada)."""
+
+    attributes: Dict[str, Any] = {}
+    context = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_remote_parent: ContextVar[Optional[SpanContext]] = ContextVar("remote_parent", default=None)
+_collector: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("span_collector", default=None)
+
+
+class JsonlSpanExporter:
+    """
+    Grava spans em arquivo JSONL (append), com rotação por tamanho.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Todos os spans de um trace são gravados numa única escrita em modo
+    append. Em sistemas POSIX, escritas em append de arquivos locais não
+    se intercalam, então vários workers podem compartilhar o arquivo.
+
+    Atributos:
+        path: Arquivo de destino
+        max_bytes: Tamanho a partir do qual o arquivo é rotacionado (.1)
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 100 * 1024 * 1024):
+        """
+        Inicializa o exportador.
+
+        Args:
+            path: Arquivo JSONL de destino
+            max_bytes: Tamanho máximo antes de rotacionar
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        """
+        Grava os spans de um trace.
+
+        Args:
+            spans: Spans serializados (Span.to_dict)
+        """
+        payload = "".join(json.dumps(span, default=str, ensure_ascii=False) + "\n" for span in spans)
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if self.path.stat().st_size > self.max_bytes:
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            except FileNotFoundError:
+                pass
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(payload)
+
+
+class Tracer:
+    """
+    Cria spans, agrupa por trace e decide o que exportar.
+
+    Atributos:
+        exporter: Destino dos traces amostrados (None = não exporta)
+        sample_rate: Fração dos traces rápidos exportada (0.0-1.0)
+        slow_threshold_ms: Traces com duração >= limite são sempre exportados
+        enabled: Se False, span() devolve um span vazio sem custo
+    """
+
+    # Limite de spans por trace em memória (proteção contra laços)
+    MAX_SPANS_PER_TRACE = 1000
+
+    def __init__(
+        self,
+        exporter: Optional[JsonlSpanExporter] = None,
+        sample_rate: float = 0.0,
+        slow_threshold_ms: Optional[float] = 5000.0,
+        enabled: bool = True
+    ):
+        """
+        Inicializa o tracer.
+
+        Args:
+            exporter: Exportador dos traces amostrados
+            sample_rate: Probabilidade de exportar um trace rápido
+            slow_threshold_ms: Duração a partir da qual o trace é sempre
+                exportado (None desativa o critério)
+            enabled: Habilita a criação de spans
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._traces: Dict[str, List[Dict[str, Any]]] = {}
+        self._stats = {"traces": 0, "exported": 0, "exported_slow": 0, "exported_error": 0, "dropped_spans": 0}
+
+    # ------------------------------------------------------------------
+    # Criação de spans
+    # ------------------------------------------------------------------
+
+    def start_span(self, name: str, **attributes: Any) -> Union[Span, _NoopSpan]:
+        """
+        Abre um span e o torna o span atual.
+
+        Deve ser fechado com end_span na mesma corrotina/thread. Prefira
+        o gerenciador de contexto span().
+
+        Args:
+            name: Nome da operação
+            **attributes: Atributos iniciais
+
+        Returns:
+            Span aberto
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif _remote_parent.get() is not None:
+            trace_id, parent_id = _remote_parent.get()
+        else:
+            trace_id, parent_id = uuid.uuid4().hex, None
+            if _collector.get() is None:
+                with self._lock:
+                    self._traces[trace_id] = []
+
+        span = Span(name, trace_id, parent_id, attributes)
+        span._token = _current_span.set(span)
+        return span
+
+    def end_span(self, span: Union[Span, _NoopSpan]) -> None:
+        """
+        Fecha um span aberto por start_span.
+
+        Args:
+            span: Span a fechar
+        """
+        if span is NOOP_SPAN:
+            return
+
+        span.duration_ms = (time.perf_counter() - span._start_perf) * 1000
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Fechado em outro contexto (ex: gerador finalizado por outra tarefa)
+            pass
+
+        record = span.to_dict()
+        collector = _collector.get()
+        if collector is not None:
+            collector.append(record)
+            return
+
+        self._buffer(span.trace_id, [record])
+        if span.parent_id is None:
+            self._finish_trace(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Union[Span, _NoopSpan]]:
+        """
+        Gerenciador de contexto para um span.
+
+        Exceções propagadas marcam o span com status "error".
+
+        Args:
+            name: Nome da operação
+            **attributes: Atributos iniciais
+
+        Yields:
+            Span aberto (set_attributes para completar os atributos)
+        """
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            self.end_span(span)
+
+    def current_context(self) -> Optional[SpanContext]:
+        """Contexto do span atual, para enviar a um worker do executor."""
+        span = _current_span.get()
+        return span.context if span is not None else None
+
+    # ------------------------------------------------------------------
+    # Spans de workers (ProcessPool/ThreadPool)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def remote(self, parent: Optional[SpanContext]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Coleta os spans criados num worker como filhos de um span remoto.
+
+        Args:
+            parent: Contexto enviado pelo processo principal (ou None)
+
+        Yields:
+            Lista preenchida com os spans concluídos no bloco
+        """
+        collected: List[Dict[str, Any]] = []
+        collector_token = _collector.set(collected)
+        parent_token = _remote_parent.set(parent)
+        current_token = _current_span.set(None)
+        try:
+            yield collected
+        finally:
+            _current_span.reset(current_token)
+            _remote_parent.reset(parent_token)
+            _collector.reset(collector_token)
+
+    def adopt(self, spans: List[Dict[str, Any]]) -> None:
+        """
+        Anexa spans coletados num worker ao trace em andamento.
+
+        Spans sem trace ativo (worker chamado fora de uma requisição
+        rastreada) são descartados.
+
+        Args:
+            spans: Spans devolvidos por remote()
+        """
+        if not spans:
+            return
+        collector = _collector.get()
+        if collector is not None:
+            collector.extend(spans)
+            return
+        current = _current_span.get()
+        if current is None:
+            return
+        self._buffer(current.trace_id, [s for s in spans if s["trace_id"] == current.trace_id])
+
+    # ------------------------------------------------------------------
+    # Amostragem e exportação
+    # ------------------------------------------------------------------
+
+    def _buffer(self, trace_id: str, records: List[Dict[str, Any]]) -> None:
+        """Guarda spans concluídos até o fim do trace (spans tardios são descartados)."""
+        with self._lock:
+            buffer = self._traces.get(trace_id)
+            if buffer is None:
+                self._stats["dropped_spans"] += len(records)
+                return
+            room = self.MAX_SPANS_PER_TRACE - len(buffer)
+            if room < len(records):
+                self._stats["dropped_spans"] += len(records) - max(room, 0)
+            buffer.extend(records[:max(room, 0)])
+
+    def should_export(self, duration_ms: float, status: str) -> Tuple[bool, str]:
+        """
+        Decide se um trace concluído é exportado.
+
+        Args:
+            duration_ms: Duração do span raiz
+            status: Status do span raiz
+
+        Returns:
+            Tupla (exportar, motivo: "error", "slow", "sampled" ou "")
+        """
+        if status == "error":
+            return True, "error"
+        if self.slow_threshold_ms is not None and duration_ms >= self.slow_threshold_ms:
+            return True, "slow"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True, "sampled"
+        return False, ""
+
+    def _finish_trace(self, root: Span) -> None:
+        """Aplica a amostragem ao trace cujo span raiz terminou."""
+        with self._lock:
+            records = self._traces.pop(root.trace_id, [])
+            self._stats["traces"] += 1
+
+        export, reason = self.should_export(root.duration_ms, root.status)
+        if not export or self.exporter is None:
+            return
+
+        for record in records:
+            record["sampling"] = reason
+        try:
+            self.exporter.export(records)
+        except OSError as e:
+            logger.warning(f"Falha ao exportar trace {root.trace_id}: {e}")
+            return
+
+        with self._lock:
+            self._stats["exported"] += 1
+            if reason in ("slow", "error"):
+                self._stats[f"exported_{reason}"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de traces e a configuração de amostragem.
+
+        Returns:
+            Dicionário com traces concluídos, exportados e em andamento
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "slow_threshold_ms": self.slow_threshold_ms,
+                "export_path": str(self.exporter.path) if self.exporter else None,
+                "in_progress": len(self._traces),
+                **self._stats,
+            }
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Retorna o tracer do processo, criado a partir das settings.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Módulos de baixo nível (DoclingWrapper, executor) criam spans sem
+    receber o tracer por parâmetro, inclusive dentro dos workers do
+    ProcessPool; por isso o tracer é um singleton de módulo, como as
+    métricas.
+
+    Returns:
+        Tracer compartilhado
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                from app.core.config import settings
+
+                _tracer = Tracer(
+                    exporter=JsonlSpanExporter(
+                        settings.TRACING_EXPORT_PATH,
+                        max_bytes=settings.TRACING_MAX_FILE_MB * 1024 * 1024
+                    ),
+                    sample_rate=settings.TRACING_SAMPLE_RATE,
+                    slow_threshold_ms=settings.TRACING_SLOW_THRESHOLD_MS,
+                    enabled=settings.TRACING_ENABLED
+                )
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Substitui o tracer do processo (testes e configuração manual)."""
+    global _tracer
+    _tracer = tracer
+
+
+def load_traces(path: Union[str, Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Lê um arquivo JSONL e agrupa os spans por trace.
+
+    Args:
+        path: Arquivo exportado
+
+    Returns:
+        Dicionário trace_id -> spans na ordem de início
+    """
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces.setdefault(span["trace_id"], []).append(span)
+    for spans in traces.values():
+        spans.sort(key=lambda span: span["start_time"])
+    return traces
+
+
+def format_trace(spans: List[Dict[str, Any]]) -> str:
+    """
+    Formata um trace como árvore indentada (duração e atributos).
+
+    Args:
+        spans: Spans de um trace (ver load_traces)
+
+    Returns:
+        Texto com uma linha por span
+    """
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            status = "" if span["status"] == "ok" else f" [{span['error']}]"
+            lines.append(
+                f"{'  ' * depth}{span['name']} {span['duration_ms']:.1f}ms "
+                f"{json.dumps(span['attributes'], default=str, ensure_ascii=False)}{status}"
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
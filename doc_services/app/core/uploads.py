@@ -0,0 +1,394 @@
+"""
+Recebimento de uploads em streaming com limite de tamanho.
+
+EXPLICAÇÃO EDUCATIVA:
+`await file.read()` carrega o arquivo inteiro na memória. Com 20 uploads
+simultâneos de 40 MB isso significa ~800 MB só de buffers (mais a cópia
+em base64 do caminho LLM), e o worker entra em swap.
+
+Aqui o conteúdo nunca é montado inteiro em memória:
+- Um middleware ASGI rejeita com 413 antes do parsing multipart quando o
+  Content-Length (ou o corpo recebido até o momento) excede o limite
+- O arquivo temporário que o Starlette já cria é reaproveitado, sem cópia
+- Membros de .zip/.tar e arquivos para o pipeline são copiados em blocos
+  (chunks), verificando o limite a cada bloco
+- Arquivos pequenos ficam em memória; acima de UPLOAD_SPOOL_MEMORY_MB o
+  conteúdo vai para disco
+- O tipo real do arquivo é detectado pelos "magic bytes" do primeiro
+  bloco, sem confiar no content-type ou na extensão enviados
+"""
+
+import base64
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+
+logger = logging.getLogger(__name__)
+
+# Tamanho de cada bloco lido do upload
+CHUNK_SIZE = 1024 * 1024
+
+# Bytes lidos para detectar o tipo do arquivo
+SNIFF_BYTES = 2048
+
+# Assinaturas (magic bytes) dos formatos suportados
+MAGIC_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+# Extensão usada para arquivos temporários de cada tipo
+CONTENT_TYPE_SUFFIX = {
+    "application/pdf": ".pdf",
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/tiff": ".tiff",
+}
+
+
+def sniff_content_type(header: bytes) -> Optional[str]:
+    """
+    Detecta o tipo do arquivo pelos primeiros bytes.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Todo formato binário começa com uma assinatura fixa. Ex: PDFs
+    começam com "%PDF-" e PNGs com "\\x89PNG". Alguns PDFs têm lixo antes
+    da assinatura, por isso procuramos "%PDF-" no primeiro KB.
+
+    Args:
+        header: Primeiros bytes do arquivo
+
+    Returns:
+        Content-type detectado ou None se não reconhecido
+    """
+    for signature, content_type in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+
+    if b"%PDF-" in header[:1024]:
+        return "application/pdf"
+
+    return None
+
+
+@dataclass
+class SpooledUpload:
+    """
+    Upload recebido em streaming.
+
+    Atributos:
+        filename: Nome original do arquivo
+        content_type: Tipo detectado pelos magic bytes
+        size: Tamanho em bytes
+        file: Arquivo temporário (memória ou disco) posicionado no início
+    """
+
+    filename: str
+    content_type: str
+    size: int
+    file: BinaryIO
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Itera sobre o conteúdo em blocos, a partir do início."""
+        self.file.seek(0)
+        for chunk in iter(lambda: self.file.read(chunk_size), b""):
+            yield chunk
+
+    def read_bytes(self) -> bytes:
+        """Lê o conteúdo inteiro (use apenas quando inevitável)."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def to_base64(self) -> str:
+        """
+        Codifica em base64 lendo em blocos.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Blocos múltiplos de 3 bytes geram base64 sem padding intermediário,
+        então concatenar as partes dá o mesmo resultado que codificar tudo
+        de uma vez, sem manter os bytes originais e o base64 em memória
+        ao mesmo tempo.
+        """
+        return "".join(
+            base64.b64encode(chunk).decode("ascii")
+            for chunk in self.iter_chunks(3 * 256 * 1024)
+        )
+
+    def close(self) -> None:
+        """Libera o arquivo temporário."""
+        self.file.close()
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    """Cria exceção 413 padronizada."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Arquivo muito grande (máximo: {max_bytes} bytes)"
+    )
+
+
+def _unsupported(filename: Optional[str]) -> HTTPException:
+    """Cria exceção 415 padronizada."""
+    return HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"Conteúdo de '{filename}' não reconhecido. Use: PDF, PNG, JPG, TIFF"
+    )
+
+
+async def open_upload(upload: UploadFile, max_bytes: int) -> SpooledUpload:
+    """
+    Valida um UploadFile sem copiar seu conteúdo.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O Starlette já grava o upload em um SpooledTemporaryFile durante o
+    parsing multipart (até 1 MB em memória, o resto em disco). Em vez de
+    `await file.read()`, lemos só o cabeçalho para detectar o tipo e
+    medimos o tamanho com seek, reaproveitando o mesmo arquivo.
+
+    Args:
+        upload: Arquivo recebido pelo FastAPI
+        max_bytes: Tamanho máximo aceito
+
+    Returns:
+        SpooledUpload posicionado no início
+
+    Raises:
+        HTTPException 413: Se exceder max_bytes
+        HTTPException 415: Se o tipo não for suportado
+    """
+    header = await upload.read(SNIFF_BYTES)
+    content_type = sniff_content_type(header)
+    if content_type is None:
+        raise _unsupported(upload.filename)
+
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(0)
+
+    if size > max_bytes:
+        raise _too_large(max_bytes)
+
+    return SpooledUpload(filename=upload.filename, content_type=content_type, size=size, file=upload.file)
+
+
+def spool_fileobj(
+    fileobj: BinaryIO,
+    filename: str,
+    max_bytes: int,
+    memory_bytes: int = CHUNK_SIZE
+) -> SpooledUpload:
+    """
+    Copia um objeto de arquivo em blocos para um SpooledTemporaryFile.
+
+    Usada para membros de arquivos .zip/.tar no lote: o limite de tamanho
+    é verificado a cada bloco, sem descompactar o membro inteiro antes.
+
+    Args:
+        fileobj: Objeto de arquivo aberto para leitura
+        filename: Nome do arquivo
+        max_bytes: Tamanho máximo aceito
+        memory_bytes: Acima deste tamanho o conteúdo vai para disco
+
+    Returns:
+        SpooledUpload posicionado no início
+
+    Raises:
+        HTTPException 413: Se exceder max_bytes
+        HTTPException 415: Se o tipo não for suportado
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+    size = 0
+    content_type = None
+
+    try:
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+            if content_type is None:
+                content_type = sniff_content_type(chunk)
+                if content_type is None:
+                    raise _unsupported(filename)
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+
+            spool.write(chunk)
+
+        if content_type is None:
+            raise _unsupported(filename)
+
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return SpooledUpload(filename=filename, content_type=content_type, size=size, file=spool)
+
+
+async def save_upload_to_temp(
+    upload: UploadFile,
+    max_bytes: int,
+    directory: Optional[Path] = None
+) -> Tuple[Path, str, int]:
+    """
+    Grava upload em arquivo temporário no disco, em blocos.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O pipeline de análise (docling) precisa de um caminho de arquivo.
+    Escrevemos direto no disco, bloco a bloco, sem montar o arquivo
+    inteiro em memória. A extensão vem do tipo detectado, não do nome.
+
+    Args:
+        upload: Arquivo recebido pelo FastAPI
+        max_bytes: Tamanho máximo aceito
+        directory: Diretório de destino (padrão: diretório temporário do sistema)
+
+    Returns:
+        Tupla (caminho_temporario, content_type, tamanho)
+
+    Raises:
+        HTTPException 413/415: Tamanho excedido ou tipo não suportado
+    """
+    first_chunk = await upload.read(CHUNK_SIZE)
+    content_type = sniff_content_type(first_chunk)
+    if content_type is None:
+        raise _unsupported(upload.filename)
+
+    if directory is not None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    tmp = tempfile.NamedTemporaryFile(
+        delete=False,
+        suffix=CONTENT_TYPE_SUFFIX[content_type],
+        dir=directory
+    )
+    tmp_path = Path(tmp.name)
+    size = 0
+
+    try:
+        with tmp:
+            chunk = first_chunk
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                tmp.write(chunk)
+                chunk = await upload.read(CHUNK_SIZE)
+
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return tmp_path, content_type, size
+
+
+class _BodyTooLarge(HTTPException):
+    """
+    Corpo de requisição acima do limite (uso interno).
+
+    EXPLICAÇÃO: é lançada dentro do receive(), no meio do parsing do
+    formulário. O FastAPI converte exceções do parsing em 400, exceto
+    HTTPException, que ele repassa: assim o handler da aplicação responde
+    413. Se ela escapar da aplicação, o middleware envia o 413.
+    """
+
+    def __init__(self, max_body_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Requisição muito grande (máximo: {max_body_bytes} bytes)"
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Middleware ASGI que limita o tamanho do corpo das requisições.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O parsing multipart do Starlette acontece antes do endpoint rodar.
+    Este middleware atua antes disso:
+    1. Se o header Content-Length já excede o limite: 413 imediato,
+       sem ler o corpo
+    2. Caso contrário (ou em uploads chunked), conta os bytes recebidos
+       e interrompe com 413 assim que o limite é ultrapassado
+
+    Atributos:
+        app: Aplicação ASGI
+        max_body_bytes: Tamanho máximo do corpo
+        paths: Prefixos de rota onde o limite se aplica
+    """
+
+    def __init__(self, app, max_body_bytes: int, paths: Tuple[str, ...]):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope.get("method") != "POST"
+            or not any(scope.get("path", "") == p for p in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_bytes:
+                await self._send_413(send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    logger.warning(f"Corpo da requisição excedeu {self.max_body_bytes} bytes")
+                    raise _BodyTooLarge(self.max_body_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._send_413(send)
+
+    async def _send_413(self, send) -> None:
+        """Envia resposta 413 em JSON."""
+        body = json.dumps({
+            "error": True,
+            "error_type": "http_error",
+            "errors": [{
+                "code": "HTTP_413",
+                "message": f"Requisição muito grande (máximo: {self.max_body_bytes} bytes)"
+            }]
+        }, ensure_ascii=False).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,182 @@
+"""
+Perfil do tempo de importação da aplicação (cold start).
+
+EXPLICAÇÃO EDUCATIVA:
+Antes de responder qualquer requisição, cada worker uvicorn importa
+app.main. Tudo o que é importado no nível de módulo entra nesse tempo,
+inclusive bibliotecas só usadas em alguns endpoints (docling + torch,
+SDK da Anthropic). Este módulo mede isso num processo novo com
+`python -X importtime` e agrupa o tempo por pacote:
+
+    python -m app.import_profile                     # tabela por pacote
+    python -m app.import_profile --top 40 --modules  # módulos mais lentos
+    python -m app.import_profile --budget-ms 1500    # falha (exit 1) acima do orçamento
+
+Também verifica se algum pacote de DEFERRED_PACKAGES foi carregado na
+importação: eles devem ser importados só quando usados (ver
+DoclingWrapper.get_converter e app.services.__getattr__).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Pacotes pesados que não podem ser importados junto com app.main
+DEFERRED_PACKAGES = ("docling", "torch", "anthropic", "openai", "ultralytics")
+
+# Diretório que contém o pacote app (raiz do serviço)
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class ImportProfile:
+    """
+    Resultado de `python -X importtime`.
+
+    Atributos:
+        module: Módulo importado
+        total_ms: Tempo acumulado da importação do módulo
+        modules: (nome, próprio_ms, acumulado_ms) de cada módulo importado
+        packages: Pacotes de nível superior em sys.modules ao final
+    """
+
+    module: str
+    total_ms: float
+    modules: List[Tuple[str, float, float]] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+
+    def by_package(self) -> Dict[str, float]:
+        """Tempo próprio somado por pacote de nível superior (ms), maiores primeiro."""
+        totals: Counter = Counter()
+        for name, self_ms, _ in self.modules:
+            totals[name.split(".")[0]] += self_ms
+        return {package: round(ms, 2) for package, ms in totals.most_common()}
+
+    def loaded(self, packages: Iterable[str] = DEFERRED_PACKAGES) -> List[str]:
+        """
+        Quais dos pacotes indicados foram importados.
+
+        EXPLICAÇÃO: usa sys.modules do processo medido; a saída do
+        importtime também lista tentativas que falharam (try/except ImportError).
+        """
+        return [package for package in packages if package in self.packages]
+
+
+def parse_importtime(output: str) -> List[Tuple[str, float, float]]:
+    """
+    Interpreta a saída de `-X importtime` (stderr).
+
+    Formato de cada linha:
+        import time: self [us] | cumulative | imported package
+
+    Args:
+        output: Texto do stderr
+
+    Returns:
+        Lista de (módulo, próprio_ms, acumulado_ms) na ordem da saída
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # cabeçalho
+        self_us, cumulative_us, name = parts
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def profile_imports(
+    module: str = "app.main",
+    python: str = sys.executable,
+    env: Optional[Dict[str, str]] = None
+) -> ImportProfile:
+    """
+    Importa o módulo num interpretador novo e mede cada importação.
+
+    Args:
+        module: Módulo a importar
+        python: Interpretador
+        env: Variáveis de ambiente (padrão: as do processo atual)
+
+    Returns:
+        ImportProfile
+
+    Raises:
+        RuntimeError: Se a importação falhar
+    """
+    process_env = dict(os.environ if env is None else env)
+    process_env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SERVICE_ROOT), process_env.get("PYTHONPATH")])
+    )
+
+    # Última linha do stdout: pacotes carregados (a aplicação também imprime)
+    code = (
+        f"import json, sys; import {module}; "
+        "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+    )
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=str(SERVICE_ROOT),
+        env=process_env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Falha ao importar {module}:\n" + "\n".join(errors[-20:]))
+
+    modules = parse_importtime(completed.stderr)
+    total_ms = next((cumulative for name, _, cumulative in modules if name == module), 0.0)
+    packages = json.loads(completed.stdout.strip().splitlines()[-1])
+    return ImportProfile(module=module, total_ms=total_ms, modules=modules, packages=packages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tempo de importação da aplicação por pacote")
+    parser.add_argument("--module", default="app.main", help="Módulo importado (padrão: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Linhas exibidas")
+    parser.add_argument("--modules", action="store_true", help="Módulos mais lentos (acumulado) em vez de pacotes")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Falha se a importação passar disso")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+
+    profile = profile_imports(args.module)
+    packages = profile.by_package()
+    deferred = profile.loaded()
+    slowest = sorted(profile.modules, key=lambda item: item[2], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps({
+            "module": profile.module,
+            "total_ms": profile.total_ms,
+            "packages_ms": dict(list(packages.items())[:args.top]),
+            "slowest_modules": [{"module": n, "self_ms": s, "cumulative_ms": c} for n, s, c in slowest],
+            "deferred_loaded": deferred,
+        }, indent=2))
+    else:
+        print(f"import {profile.module}: {profile.total_ms:.0f} ms ({len(profile.modules)} módulos)")
+        if args.modules:
+            for name, self_ms, cumulative_ms in slowest:
+                print(f"  {cumulative_ms:9.1f} ms  {self_ms:8.1f} ms próprio  {name}")
+        else:
+            for package, ms in list(packages.items())[:args.top]:
+                print(f"  {ms:9.1f} ms  {package}")
+        if deferred:
+            print(f"ATENÇÃO: pacotes pesados importados junto com {profile.module}: {', '.join(deferred)}")
+
+    over_budget = args.budget_ms is not None and profile.total_ms > args.budget_ms
+    if over_budget:
+        print(f"Orçamento excedido: {profile.total_ms:.0f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+    sys.exit(1 if over_budget or deferred else 0)
+
+
+if __name__ == "__main__":
+    main()
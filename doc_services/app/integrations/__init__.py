@@ -15,9 +15,20 @@ com serviços/bibliotecas externas. Benefícios:
 """
 
 from .classification_api import ClassificationAPIClient
-from .docling_wrapper import DoclingWrapper
+from .conversion_store import ConversionStore, build_conversion_store
+from .docling_wrapper import (
+    DoclingWrapper,
+    DOCLING_PROFILES,
+    init_docling_worker,
+    detect_paragraphs_in_worker
+)
 
 __all__ = [
     "ClassificationAPIClient",
-    "DoclingWrapper"
+    "ConversionStore",
+    "build_conversion_store",
+    "DoclingWrapper",
+    "DOCLING_PROFILES",
+    "init_docling_worker",
+    "detect_paragraphs_in_worker"
 ]
@@ -19,15 +19,47 @@ Conceitos importantes:
 
 import httpx
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 import sys
 
+import numpy as np
+
+from app.core.document_context import DocumentContext, binarize
+from app.core.executor import CPUExecutor, ExecutorSaturatedError
+from app.core.tracing import get_tracer
+from app.integrations.pdf_raster import PdfRasterizer, is_pdf
+
 # Adicionar caminho do rvlp ao PYTHONPATH para importar o classificador
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "rvlp"))
 
 logger = logging.getLogger(__name__)
 
+SCIENTIFIC_LABEL = "scientific_publication"
+
+
+def _classify_context(classifier, context: DocumentContext) -> Tuple[str, float, Any]:
+    """
+    Classifica as páginas em memória do contexto.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Imagens: só a primeira página. PDFs rasterizados com mais de uma
+    página (PDF_RASTER_PAGES > 1): cada página é classificada e vence a
+    página "científica" de maior confiança (a capa de um artigo pode ser
+    só título e figura); se nenhuma for, vale o resultado da primeira.
+    """
+    results = [classifier.classify_array(context.gray, context.binary)]
+
+    if not context.pages:
+        for page in context.raster[1:]:
+            gray = np.asarray(page.convert("L"))
+            results.append(classifier.classify_array(gray, binarize(gray)))
+
+    scientific = [result for result in results if result[0] == SCIENTIFIC_LABEL]
+    if scientific:
+        return max(scientific, key=lambda result: result[1])
+    return results[0]
+
 
 class ClassificationAPIClient:
     """
@@ -52,6 +84,7 @@ class ClassificationAPIClient:
         api_key: Chave de autenticação (opcional)
         timeout: Tempo máximo de espera em segundos
         use_api: Se True, usa HTTP; se False, usa classificador local
+        pdf_rasterizer: Rasterizador das primeiras páginas de PDFs (modo local)
     """
 
     def __init__(
@@ -59,7 +92,9 @@ class ClassificationAPIClient:
         api_url: Optional[str] = None,
         api_key: Optional[str] = None,
         timeout: int = 30,
-        use_api: bool = False
+        use_api: bool = False,
+        executor: Optional[CPUExecutor] = None,
+        pdf_rasterizer: Optional[PdfRasterizer] = None
     ):
         """
         Inicializa o cliente da API.
@@ -69,11 +104,17 @@ class ClassificationAPIClient:
             api_key: Chave de autenticação (se necessário)
             timeout: Timeout em segundos para requisições
             use_api: Se True, usa API HTTP; se False, usa classificador local
+            executor: Executor CPU opcional para rodar o classificador
+                local (OpenCV) fora do event loop
+            pdf_rasterizer: Rasterizador de PDFs para o classificador
+                local (sem ele, PDFs não podem ser lidos pelo OpenCV)
         """
         self.api_url = api_url
         self.api_key = api_key
         self.timeout = timeout
         self.use_api = use_api
+        self.executor = executor
+        self.pdf_rasterizer = pdf_rasterizer
 
         # Cliente HTTP com configurações
         self.client = httpx.AsyncClient(
@@ -116,7 +157,8 @@ class ClassificationAPIClient:
 
     async def classify_document(
         self,
-        file_path: Path
+        file_path: Path,
+        context: Optional[DocumentContext] = None
     ) -> Dict[str, Any]:
         """
         Classifica um documento e retorna o tipo detectado.
@@ -132,6 +174,9 @@ class ClassificationAPIClient:
 
         Args:
             file_path: Caminho para o arquivo a ser classificado
+            context: Documento já decodificado (opcional). No modo local,
+                o classificador usa a página em memória em vez de reler
+                o arquivo.
 
         Returns:
             Dicionário com resultado da classificação:
@@ -151,10 +196,19 @@ class ClassificationAPIClient:
 
         logger.info(f"Classificando documento: {file_path.name}")
 
-        if self.use_api:
-            return await self._classify_via_api(file_path)
-        else:
-            return await self._classify_locally(file_path)
+        with get_tracer().span(
+            "classifier.classify",
+            mode="api" if self.use_api else "local",
+            bytes=file_path.stat().st_size,
+            pages=len(context.pages) if context is not None else None
+        ) as span:
+            if self.use_api:
+                result = await self._classify_via_api(file_path)
+            else:
+                result = await self._classify_locally(file_path, context)
+            span.set_attributes(predicted_type=result.get("predicted_type"), confidence=result.get("confidence"))
+
+        return result
 
     async def _classify_via_api(self, file_path: Path) -> Dict[str, Any]:
         """
@@ -223,7 +277,11 @@ class ClassificationAPIClient:
             logger.error(f"Erro inesperado ao classificar via API: {e}")
             raise RuntimeError(f"Erro na classificação: {str(e)}")
 
-    async def _classify_locally(self, file_path: Path) -> Dict[str, Any]:
+    async def _classify_locally(
+        self,
+        file_path: Path,
+        context: Optional[DocumentContext] = None
+    ) -> Dict[str, Any]:
         """
         Classifica documento usando classificador local.
 
@@ -236,6 +294,7 @@ class ClassificationAPIClient:
 
         Args:
             file_path: Caminho do arquivo
+            context: Documento já decodificado (opcional)
 
         Returns:
             Resultado da classificação padronizado
@@ -243,11 +302,32 @@ class ClassificationAPIClient:
         try:
             classifier = self._get_local_classifier()
 
+            # PDF ainda sem raster (ex.: /api/v1/classify, sem etapa RASTER):
+            # renderizar aqui as primeiras páginas (cv2.imread não lê PDF)
+            if self.pdf_rasterizer is not None and is_pdf(file_path) and (context is None or not context.raster):
+                context = context or DocumentContext(file_path=file_path)
+                context.raster = await self.pdf_rasterizer.rasterize(file_path)
+
+            # Com contexto, classifica a página já decodificada (e com
+            # orientação corrigida) ou rasterizada, reaproveitando tons de
+            # cinza e binária
+            if context is not None and (context.is_image or context.raster):
+                classify, args = _classify_context, (classifier, context)
+            else:
+                classify, args = classifier.classify, (file_path,)
+
             # Classificar documento
-            predicted_type, confidence, features = classifier.classify(file_path)
+            # EXPLICAÇÃO: OpenCV libera o GIL, então uma thread basta para
+            # tirar o trabalho do event loop (sem custo de serializar imagens)
+            if self.executor is not None:
+                predicted_type, confidence, features = await self.executor.run_in_thread(
+                    "UC1", classify, *args
+                )
+            else:
+                predicted_type, confidence, features = classify(*args)
 
             # Determinar se é artigo científico
-            is_scientific = (predicted_type == "scientific_publication")
+            is_scientific = (predicted_type == SCIENTIFIC_LABEL)
 
             result = {
                 "predicted_type": predicted_type,
@@ -263,10 +343,33 @@ class ClassificationAPIClient:
 
             return result
 
+        except ExecutorSaturatedError:
+            raise
+
         except Exception as e:
             logger.error(f"Erro ao classificar localmente: {e}")
             raise RuntimeError(f"Erro na classificação local: {str(e)}")
 
+    async def classify_page(self, context: DocumentContext) -> Dict[str, Any]:
+        """
+        Classifica uma página já decodificada com o classificador local.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Usado quando o documento está em memória (ex.: upload do /classify)
+        e não há arquivo em disco para classify_document.
+
+        Args:
+            context: Documento com a primeira página decodificada
+
+        Returns:
+            Resultado da classificação padronizado (ver classify_document)
+        """
+        with get_tracer().span("classifier.classify", mode="local", pages=len(context.pages)) as span:
+            result = await self._classify_locally(context.file_path, context)
+            span.set_attributes(predicted_type=result.get("predicted_type"), confidence=result.get("confidence"))
+
+        return result
+
     async def is_scientific_paper(self, file_path: Path) -> bool:
         """
         Verifica se documento é um artigo científico.
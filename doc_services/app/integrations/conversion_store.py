@@ -0,0 +1,193 @@
+"""
+Armazenamento de conversões do docling.
+
+EXPLICAÇÃO EDUCATIVA:
+A conversão do docling (layout + OCR + tabelas) é a etapa mais cara do
+UC2. Parágrafos, texto completo e estatísticas são apenas visões
+diferentes do mesmo DoclingDocument; convertê-lo de novo para cada visão
+triplica o custo.
+
+O ConversionStore guarda o DoclingDocument já convertido, com a chave
+formada por:
+- hash do conteúdo do arquivo (mesmo arquivo = mesma chave)
+- opções do converter (OCR, tabelas) e versão do docling
+
+Dois níveis:
+1. Memória (LRU de objetos): sem custo de desserialização
+2. Disco opcional (TieredCache/SQLite, JSON do documento): sobrevive a
+   reinícios e é compartilhado entre os processos do ProcessPool
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from app.core import metrics
+from app.core.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+def _load_docling_document(payload: bytes) -> Any:
+    """Reconstrói DoclingDocument a partir do JSON salvo em disco."""
+    from docling_core.types.doc import DoclingDocument
+    return DoclingDocument.model_validate_json(payload)
+
+
+class ConversionStore:
+    """
+    Cache de DoclingDocument por conteúdo + opções do converter.
+
+    Atributos:
+        memory_max_items: Máximo de documentos mantidos em memória
+        disk_cache: Tier de disco opcional (valores em JSON)
+    """
+
+    def __init__(
+        self,
+        memory_max_items: int = 8,
+        disk_cache: Optional[TieredCache] = None,
+        loads: Callable[[bytes], Any] = _load_docling_document
+    ):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            memory_max_items: Capacidade do LRU em memória (0 desabilita)
+            disk_cache: TieredCache para persistir o JSON dos documentos
+            loads: Função que reconstrói o documento a partir do JSON
+        """
+        self.memory_max_items = memory_max_items
+        self.disk_cache = disk_cache
+        self._loads = loads
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(content_hash: str, options: Dict[str, Any]) -> str:
+        """
+        Monta chave a partir do hash do conteúdo e das opções do converter.
+
+        Args:
+            content_hash: SHA-256 dos bytes do documento
+            options: Opções que influenciam a conversão
+
+        Returns:
+            Chave do armazenamento
+        """
+        payload = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{payload}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Busca documento convertido.
+
+        Args:
+            key: Chave (ver make_key)
+
+        Returns:
+            DoclingDocument ou None se ausente
+        """
+        with self._lock:
+            document = self._memory.get(key)
+            if document is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                metrics.CACHE_LOOKUPS.labels(cache="docling_conversion", result="memory_hit").inc()
+                return document
+
+        if self.disk_cache is not None:
+            payload = self.disk_cache.get(key)
+            if payload is not None:
+                try:
+                    document = self._loads(payload)
+                except Exception as e:
+                    # JSON de versão antiga/corrompido: converter de novo
+                    logger.warning(f"Conversão em disco inválida descartada: {e}")
+                    self.disk_cache.delete(key)
+                else:
+                    with self._lock:
+                        self._stats["disk_hits"] += 1
+                        metrics.CACHE_LOOKUPS.labels(cache="docling_conversion", result="disk_hit").inc()
+                        self._memory_put(key, document)
+                    return document
+
+        with self._lock:
+            self._stats["misses"] += 1
+            metrics.CACHE_LOOKUPS.labels(cache="docling_conversion", result="miss").inc()
+        return None
+
+    def put(self, key: str, document: Any) -> None:
+        """
+        Armazena documento convertido nos dois níveis.
+
+        Args:
+            key: Chave (ver make_key)
+            document: DoclingDocument (modelo Pydantic)
+        """
+        with self._lock:
+            self._memory_put(key, document)
+
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.set(key, document.model_dump_json().encode("utf-8"))
+            except Exception as e:
+                # Falha ao persistir não invalida a conversão
+                logger.warning(f"Não foi possível gravar conversão em disco: {e}")
+
+    def _memory_put(self, key: str, document: Any) -> None:
+        """Insere no LRU removendo o documento mais antigo se cheio."""
+        if self.memory_max_items <= 0:
+            return
+        self._memory[key] = document
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_items:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """Retorna contadores de hits/misses e itens em memória."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+def build_conversion_store(
+    memory_items: int = 8,
+    db_path: Optional[Union[str, Path]] = None,
+    disk_max_bytes: int = 500 * 1024 * 1024
+) -> ConversionStore:
+    """
+    Cria ConversionStore com tier de disco opcional.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Recebe apenas valores simples (não objetos) para poder ser chamada
+    no initializer de cada processo do ProcessPool.
+
+    Args:
+        memory_items: Documentos mantidos em memória
+        db_path: Arquivo SQLite do tier de disco (None = apenas memória)
+        disk_max_bytes: Limite do tier de disco
+
+    Returns:
+        ConversionStore configurado
+    """
+    disk_cache = None
+    if db_path is not None:
+        disk_cache = TieredCache(
+            db_path=db_path,
+            namespace="docling_document",
+            memory_max_items=0,  # Memória fica com objetos já desserializados
+            disk_max_bytes=disk_max_bytes
+        )
+
+    return ConversionStore(memory_max_items=memory_items, disk_cache=disk_cache)
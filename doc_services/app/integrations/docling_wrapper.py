@@ -17,20 +17,52 @@ Este wrapper:
 - Fornece interface simplificada
 - Converte resultado para nossos modelos Pydantic
 - Trata erros e casos especiais
+
+Importação adiada: importar o docling carrega torch e os modelos de
+layout (segundos). O pacote só é importado quando o primeiro converter é
+criado (no worker do ProcessPool ou no aquecimento), não ao importar
+app.main; o processo da API sobe e responde /health antes disso.
 """
 
+import hashlib
+import io
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
-from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
+from app.core.cache import compute_file_hash
+from app.core.tracing import get_tracer
+from app.integrations.conversion_store import ConversionStore, build_conversion_store
 from app.models import Paragraph, BoundingBox
 
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache()
+def _docling_version() -> str:
+    """Versão instalada do docling (consultada uma vez por processo)."""
+    try:
+        from importlib.metadata import version
+        return version("docling")
+    except Exception:
+        return "unknown"
+
+
+# EXPLICAÇÃO EDUCATIVA:
+# Perfis de conversão (ver DoclingProfile). "ocr" pode ser:
+# - "auto": OCR apenas se alguma página não tiver camada de texto
+# - "always": OCR em todos os documentos
+DOCLING_PROFILES: Dict[str, dict] = {
+    "fast": {"ocr": "auto", "table_structure": False},
+    "balanced": {"ocr": "auto", "table_structure": True},
+    "accurate": {"ocr": "always", "table_structure": True},
+}
+
+
 class DoclingWrapper:
     """
     Wrapper para biblioteca docling.
@@ -48,11 +80,16 @@ class DoclingWrapper:
     5. Adiciona metadados úteis
 
     Atributos:
-        converter: Instância do DocumentConverter do docling
-        options: Opções de pipeline para processamento
+        converter: DocumentConverter padrão (OCR e tabelas habilitados)
+        store: Documentos já convertidos (parágrafos, texto completo e
+            estatísticas reutilizam a mesma conversão)
     """
 
-    def __init__(self):
+    # Opções do pipeline PDF padrão (perfil "accurate")
+    DO_OCR = True
+    DO_TABLE_STRUCTURE = True
+
+    def __init__(self, store: Optional[ConversionStore] = None):
         """
         Inicializa o wrapper do docling.
 
@@ -61,28 +98,200 @@ class DoclingWrapper:
         - do_ocr: Habilita OCR para imagens sem texto
         - do_table_structure: Detecta estrutura de tabelas
         - table_structure_options: Configurações finas de tabelas
-        """
-        # Configurar opções de pipeline
-        pipeline_options = PdfPipelineOptions()
-        pipeline_options.do_ocr = True  # Habilitar OCR para imagens
-        pipeline_options.do_table_structure = True  # Detectar tabelas
 
-        # Criar converter com opções
-        self.converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: pipeline_options,
-            }
-        )
+        Cada combinação (do_ocr, do_table_structure) tem seu próprio
+        DocumentConverter, criado sob demanda e reutilizado.
+
+        Args:
+            store: Armazenamento de conversões (padrão: LRU em memória)
+        """
+        self._converters: Dict[Tuple[bool, bool], "DocumentConverter"] = {}
+        self.store = store if store is not None else ConversionStore()
 
         logger.info("DoclingWrapper inicializado com OCR e detecção de tabelas")
 
-    def detect_paragraphs(self, file_path: Path) -> List[Paragraph]:
+    @property
+    def converter(self) -> "DocumentConverter":
+        """Converter padrão (OCR e tabelas habilitados)."""
+        return self.get_converter(self.DO_OCR, self.DO_TABLE_STRUCTURE)
+
+    def get_converter(self, do_ocr: bool, do_table_structure: bool) -> "DocumentConverter":
+        """
+        Retorna o converter para uma combinação de opções (lazy).
+
+        Args:
+            do_ocr: Habilitar OCR
+            do_table_structure: Detectar estrutura de tabelas
+
+        Returns:
+            DocumentConverter configurado
+        """
+        key = (do_ocr, do_table_structure)
+        if key not in self._converters:
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions
+            from docling.document_converter import DocumentConverter
+
+            # Configurar opções de pipeline
+            pipeline_options = PdfPipelineOptions()
+            pipeline_options.do_ocr = do_ocr
+            pipeline_options.do_table_structure = do_table_structure
+
+            # Criar converter com opções
+            self._converters[key] = DocumentConverter(
+                format_options={
+                    InputFormat.PDF: pipeline_options,
+                }
+            )
+            logger.info(f"Converter docling criado (ocr={do_ocr}, tabelas={do_table_structure})")
+
+        return self._converters[key]
+
+    @staticmethod
+    def resolve_options(profile: str, has_text_layer: bool) -> Tuple[bool, bool]:
+        """
+        Converte perfil + resultado da pré-análise em opções do pipeline.
+
+        Args:
+            profile: Nome do perfil (fast, balanced, accurate)
+            has_text_layer: Se todas as páginas têm camada de texto
+
+        Returns:
+            Tupla (do_ocr, do_table_structure)
+
+        Raises:
+            ValueError: Se o perfil não existir
+        """
+        if profile not in DOCLING_PROFILES:
+            raise ValueError(
+                f"Perfil docling desconhecido: {profile}. Use: {', '.join(DOCLING_PROFILES)}"
+            )
+
+        options = DOCLING_PROFILES[profile]
+        do_ocr = options["ocr"] == "always" or not has_text_layer
+
+        return do_ocr, options["table_structure"]
+
+    @classmethod
+    def get_pipeline_config(cls) -> dict:
+        """
+        Retorna configuração que influencia o resultado da conversão.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Usado para compor chaves de cache: se a versão do docling ou as
+        opções do pipeline mudarem, resultados antigos deixam de valer.
+        Método de classe para não exigir carregar os modelos.
+        """
+        return {
+            "docling_version": _docling_version(),
+            "profiles": DOCLING_PROFILES,
+        }
+
+    def warmup(self, profile: str = "accurate") -> None:
+        """
+        Carrega antecipadamente os modelos do pipeline PDF.
+
+        EXPLICAÇÃO EDUCATIVA:
+        O DocumentConverter só carrega os modelos de layout/OCR/tabelas na
+        primeira conversão. Chamando warmup() na inicialização do worker,
+        a primeira requisição real não paga esse custo. São aquecidos os
+        dois pipelines do perfil (com e sem camada de texto).
+
+        Args:
+            profile: Perfil cujos pipelines serão aquecidos
+        """
+        from docling.datamodel.base_models import InputFormat
+
+        for has_text_layer in (False, True):
+            converter = self.get_converter(*self.resolve_options(profile, has_text_layer))
+            if hasattr(converter, "initialize_pipeline"):
+                converter.initialize_pipeline(InputFormat.PDF)
+
+        logger.info(f"Pipeline docling aquecido (perfil {profile})")
+
+    def convert_document(
+        self,
+        file_path: Path,
+        content: Optional[Tuple[str, bytes]] = None,
+        do_ocr: bool = DO_OCR,
+        do_table_structure: bool = DO_TABLE_STRUCTURE
+    ) -> Any:
+        """
+        Converte documento com o docling, reutilizando conversões anteriores.
+
+        EXPLICAÇÃO EDUCATIVA:
+        A chave combina o hash do conteúdo com as opções do converter e a
+        versão do docling. O mesmo arquivo convertido com as mesmas opções
+        volta do store sem rodar layout/OCR de novo.
+
+        Args:
+            file_path: Caminho do arquivo (PDF ou imagem)
+            content: Tupla (nome, bytes) opcional com versão corrigida
+            do_ocr: Habilitar OCR
+            do_table_structure: Detectar estrutura de tabelas
+
+        Returns:
+            DoclingDocument convertido
+
+        Raises:
+            FileNotFoundError: Se arquivo não existir
+        """
+        if content is not None:
+            name, data = content
+            content_hash = hashlib.sha256(data).hexdigest()
+            size = len(data)
+        else:
+            if not file_path.exists():
+                raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+            content_hash = compute_file_hash(file_path)
+            size = file_path.stat().st_size
+
+        with get_tracer().span(
+            "docling.convert",
+            bytes=size,
+            do_ocr=do_ocr,
+            do_table_structure=do_table_structure
+        ) as span:
+            key = self.store.make_key(content_hash, {
+                "docling_version": _docling_version(),
+                "do_ocr": do_ocr,
+                "do_table_structure": do_table_structure,
+            })
+
+            document = self.store.get(key)
+            span.set_attribute("cache_hit", document is not None)
+            if document is not None:
+                logger.debug(f"Conversão reutilizada: {file_path.name}")
+                span.set_attribute("pages", len(getattr(document, "pages", None) or {}))
+                return document
+
+            # Converter documento (do disco ou dos bytes em memória)
+            if content is not None:
+                from docling.datamodel.base_models import DocumentStream
+
+                source = DocumentStream(name=name, stream=io.BytesIO(data))
+            else:
+                source = str(file_path)
+
+            document = self.get_converter(do_ocr, do_table_structure).convert(source).document
+            span.set_attribute("pages", len(getattr(document, "pages", None) or {}))
+            self.store.put(key, document)
+
+        return document
+
+    def detect_paragraphs(
+        self,
+        file_path: Path,
+        content: Optional[Tuple[str, bytes]] = None,
+        do_ocr: bool = DO_OCR,
+        do_table_structure: bool = DO_TABLE_STRUCTURE
+    ) -> List[Paragraph]:
         """
         Detecta e extrai parágrafos de um documento.
 
         EXPLICAÇÃO EDUCATIVA:
         Processo de detecção:
-        1. Converter documento usando docling
+        1. Converter documento usando docling (ou reutilizar conversão)
         2. Extrair elementos do tipo "text" (parágrafos)
         3. Para cada parágrafo:
            - Extrair texto
@@ -102,6 +311,11 @@ class DoclingWrapper:
 
         Args:
             file_path: Caminho do arquivo (PDF ou imagem)
+            content: Tupla (nome, bytes) com versão já corrigida em memória
+                (ver DocumentContext.docling_content). Se fornecida, é
+                convertida no lugar do arquivo, sem gravar nada em disco.
+            do_ocr: Habilitar OCR (dispensável se o PDF tem camada de texto)
+            do_table_structure: Detectar estrutura de tabelas
 
         Returns:
             Lista de parágrafos detectados
@@ -110,14 +324,26 @@ class DoclingWrapper:
             RuntimeError: Se conversão falhar
             FileNotFoundError: Se arquivo não existir
         """
-        if not file_path.exists():
+        if content is None and not file_path.exists():
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
         logger.info(f"Detectando parágrafos em: {file_path.name}")
 
+        with get_tracer().span("docling.detect_paragraphs", file=file_path.name) as span:
+            paragraphs = self._detect_paragraphs(file_path, content, do_ocr, do_table_structure)
+            span.set_attribute("paragraphs", len(paragraphs))
+        return paragraphs
+
+    def _detect_paragraphs(
+        self,
+        file_path: Path,
+        content: Optional[Tuple[str, bytes]],
+        do_ocr: bool,
+        do_table_structure: bool
+    ) -> List[Paragraph]:
+        """Converte o documento e extrai os parágrafos (ver detect_paragraphs)."""
         try:
-            # Converter documento
-            result = self.converter.convert(str(file_path))
+            document = self.convert_document(file_path, content, do_ocr, do_table_structure)
 
             # Extrair parágrafos
             paragraphs = []
@@ -127,7 +353,7 @@ class DoclingWrapper:
             # EXPLICAÇÃO: Na API atual do docling (>=1.0.0), precisamos usar
             # iterate_items() que retorna tuplas (item_key, item_value)
             # onde item_key contém os atributos label, text, prov, etc.
-            for item_key, item_value in result.document.iterate_items():
+            for item_key, item_value in document.iterate_items():
                 # Filtrar apenas elementos de texto (parágrafos)
                 # item_key.label é um enum DocItemLabel
                 if hasattr(item_key, 'label') and str(item_key.label.value) == "text":
@@ -147,11 +373,13 @@ class DoclingWrapper:
                     words = text.split()
                     word_count = len(words)
 
-                    # Extrair bounding box se disponível
+                    # Extrair bounding box e página se disponíveis
                     bbox = None
+                    page = None
                     if hasattr(item_key, 'prov') and len(item_key.prov) > 0:
                         # Pegar primeira provenance (localização)
                         prov = item_key.prov[0]
+                        page = getattr(prov, 'page_no', None)
                         if hasattr(prov, 'bbox'):
                             # Converter para nosso modelo BoundingBox
                             bbox = BoundingBox(
@@ -167,6 +395,7 @@ class DoclingWrapper:
                         text=text,
                         word_count=word_count,
                         bbox=bbox,
+                        page=page,
                         confidence=1.0  # Docling não fornece confidence
                     )
 
@@ -181,25 +410,40 @@ class DoclingWrapper:
             logger.error(f"Erro ao detectar parágrafos: {e}", exc_info=True)
             raise RuntimeError(f"Erro na detecção de parágrafos: {str(e)}")
 
-    def extract_full_text(self, file_path: Path) -> str:
+    def extract_full_text(
+        self,
+        file_path: Path,
+        do_ocr: bool = DO_OCR,
+        do_table_structure: bool = DO_TABLE_STRUCTURE
+    ) -> str:
         """
         Extrai todo o texto do documento.
 
         EXPLICAÇÃO EDUCATIVA:
         Método auxiliar que retorna todo o texto do documento
         como uma string única. Útil para análises que não precisam
-        da estrutura de parágrafos separados.
+        da estrutura de parágrafos separados. Reutiliza a conversão
+        feita por detect_paragraphs (ver convert_document).
 
         Args:
             file_path: Caminho do arquivo
+            do_ocr: Habilitar OCR
+            do_table_structure: Detectar estrutura de tabelas
 
         Returns:
             Texto completo do documento
         """
-        paragraphs = self.detect_paragraphs(file_path)
+        paragraphs = self.detect_paragraphs(
+            file_path, do_ocr=do_ocr, do_table_structure=do_table_structure
+        )
         return "\n\n".join(p.text for p in paragraphs)
 
-    def get_document_stats(self, file_path: Path) -> dict:
+    def get_document_stats(
+        self,
+        file_path: Path,
+        do_ocr: bool = DO_OCR,
+        do_table_structure: bool = DO_TABLE_STRUCTURE
+    ) -> dict:
         """
         Obtém estatísticas básicas do documento.
 
@@ -210,13 +454,19 @@ class DoclingWrapper:
         - Tamanho médio dos parágrafos
         - Parágrafos vazios ou muito curtos
 
+        Também reutiliza a conversão já armazenada.
+
         Args:
             file_path: Caminho do arquivo
+            do_ocr: Habilitar OCR
+            do_table_structure: Detectar estrutura de tabelas
 
         Returns:
             Dicionário com estatísticas
         """
-        paragraphs = self.detect_paragraphs(file_path)
+        paragraphs = self.detect_paragraphs(
+            file_path, do_ocr=do_ocr, do_table_structure=do_table_structure
+        )
 
         if not paragraphs:
             return {
@@ -236,3 +486,66 @@ class DoclingWrapper:
             "min_words": min(word_counts),
             "max_words": max(word_counts)
         }
+
+
+# ============================================================================
+# Funções para workers do ProcessPool (app.core.executor)
+# ============================================================================
+
+# EXPLICAÇÃO EDUCATIVA:
+# Cada processo do pool tem sua própria memória. Guardamos aqui um
+# DoclingWrapper por processo, criado uma única vez pelo initializer,
+# para que as conversões seguintes reutilizem os modelos já carregados.
+_worker_wrapper: Optional[DoclingWrapper] = None
+
+
+def init_docling_worker(
+    profile: str = "accurate",
+    store_memory_items: int = 8,
+    store_db_path: Optional[str] = None,
+    store_disk_max_bytes: int = 500 * 1024 * 1024
+) -> None:
+    """
+    Initializer de processo: cria e aquece o DoclingWrapper do worker.
+
+    Passado como `process_initializer` para o CPUExecutor.
+
+    Args:
+        profile: Perfil cujos pipelines são aquecidos
+        store_memory_items: Conversões mantidas em memória no worker
+        store_db_path: SQLite compartilhado entre workers (None = só memória)
+        store_disk_max_bytes: Limite do armazenamento em disco
+    """
+    global _worker_wrapper
+    if _worker_wrapper is None:
+        _worker_wrapper = DoclingWrapper(store=build_conversion_store(
+            memory_items=store_memory_items,
+            db_path=store_db_path,
+            disk_max_bytes=store_disk_max_bytes
+        ))
+        _worker_wrapper.warmup(profile)
+
+
+def detect_paragraphs_in_worker(
+    file_path: Path,
+    content: Optional[Tuple[str, bytes]] = None,
+    do_ocr: bool = DoclingWrapper.DO_OCR,
+    do_table_structure: bool = DoclingWrapper.DO_TABLE_STRUCTURE
+) -> List[Paragraph]:
+    """
+    Detecta parágrafos usando o DoclingWrapper do processo atual.
+
+    Função de nível de módulo para poder ser enviada ao ProcessPool.
+
+    Args:
+        file_path: Caminho do arquivo (PDF ou imagem)
+        content: Tupla (nome, bytes) opcional com versão corrigida
+        do_ocr: Habilitar OCR
+        do_table_structure: Detectar estrutura de tabelas
+
+    Returns:
+        Lista de parágrafos detectados
+    """
+    if _worker_wrapper is None:
+        init_docling_worker()
+    return _worker_wrapper.detect_paragraphs(file_path, content, do_ocr, do_table_structure)
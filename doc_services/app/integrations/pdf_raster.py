@@ -0,0 +1,260 @@
+"""
+Rasterização rápida das primeiras páginas de PDFs para o UC1.
+
+EXPLICAÇÃO EDUCATIVA:
+O classificador local (SimpleDocumentClassifier) trabalha sobre pixels e
+lê o arquivo com cv2.imread, que não abre PDFs: todo PDF caía em
+"other" (features None). Converter o PDF inteiro (docling, pdf2image +
+poppler em subprocesso) custaria segundos só para o UC1.
+
+Aqui o PDF é aberto com o pdfium (pypdfium2, no próprio processo, sem
+subprocessos) e apenas as primeiras PDF_RASTER_PAGES páginas são
+renderizadas, em tons de cinza e DPI baixo. O dataset RVL-CDIP, em que
+as regras do classificador foram calibradas, tem ~1000 px de altura,
+o que corresponde a ~100 DPI numa página Carta/A4.
+
+O raster é guardado no TieredCache (PNG/TIFF sem perdas) pelo hash do
+arquivo + DPI + páginas: reenviar o mesmo PDF não renderiza de novo.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from PIL import Image, ImageSequence
+
+from app.core.cache import TieredCache, compute_file_hash
+from app.core.executor import CPUExecutor
+from app.core.tracing import get_tracer
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - pypdfium2 está em requirements.txt
+    pdfium = None
+
+logger = logging.getLogger(__name__)
+
+# EXPLICAÇÃO: o pdfium não é thread-safe. O docling também usa pypdfium2
+# no mesmo processo (backend de PDF), então compartilhamos o lock dele.
+# Resolvido na primeira renderização: importar docling.utils no import
+# deste módulo puxaria o pacote docling para o cold start da API.
+_pdfium_lock = None
+_pdfium_lock_guard = threading.Lock()
+
+
+def _get_pdfium_lock():
+    global _pdfium_lock
+    with _pdfium_lock_guard:
+        if _pdfium_lock is None:
+            try:
+                from docling.utils.locks import pypdfium2_lock as lock
+            except Exception:
+                lock = threading.Lock()
+            _pdfium_lock = lock
+        return _pdfium_lock
+
+
+def is_pdf(file_path: Path) -> bool:
+    """True se o arquivo tem extensão de PDF."""
+    return file_path.suffix.lower() == ".pdf"
+
+
+# Caminho do PDF ou arquivo aberto (upload ainda não gravado em disco)
+PdfSource = Union[Path, BinaryIO]
+
+
+def _source_name(source: PdfSource) -> str:
+    """Nome do PDF para os logs."""
+    if isinstance(source, Path):
+        return source.name
+    return str(getattr(source, "name", "upload"))
+
+
+def _hash_source(source: PdfSource, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 do PDF (arquivos abertos são lidos do início e rebobinados)."""
+    if isinstance(source, Path):
+        return compute_file_hash(source)
+    digest = hashlib.sha256()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def render_pdf_pages(file_path: PdfSource, dpi: int = 100, max_pages: int = 1) -> List[Image.Image]:
+    """
+    Renderiza as primeiras páginas de um PDF em tons de cinza.
+
+    Args:
+        file_path: Caminho do PDF ou arquivo aberto (o pdfium lê por seek/read)
+        dpi: Resolução do raster (72 = 1 px por ponto PDF)
+        max_pages: Número máximo de páginas renderizadas
+
+    Returns:
+        Páginas como imagens PIL modo "L"
+
+    Raises:
+        RuntimeError: Se pypdfium2 não estiver instalado
+    """
+    if pdfium is None:
+        raise RuntimeError("pypdfium2 não instalado: rasterização de PDF indisponível")
+
+    pages = []
+    with _get_pdfium_lock():
+        pdf = pdfium.PdfDocument(str(file_path) if isinstance(file_path, Path) else file_path)
+        try:
+            for index in range(min(max_pages, len(pdf))):
+                page = pdf[index]
+                try:
+                    bitmap = page.render(scale=dpi / 72, grayscale=True)
+                    pages.append(bitmap.to_pil().convert("L"))
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+
+    return pages
+
+
+def _encode_pages(pages: List[Image.Image]) -> bytes:
+    """Codifica o raster sem perdas: PNG para uma página, TIFF para várias."""
+    buffer = io.BytesIO()
+    if len(pages) > 1:
+        pages[0].save(buffer, format="TIFF", save_all=True, append_images=pages[1:], compression="tiff_deflate")
+    else:
+        pages[0].save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _decode_pages(data: bytes) -> List[Image.Image]:
+    """Decodifica o raster gravado por _encode_pages."""
+    with Image.open(io.BytesIO(data)) as image:
+        return [frame.copy() for frame in ImageSequence.Iterator(image)]
+
+
+class PdfRasterizer:
+    """
+    Rasterizador das primeiras páginas de PDFs, com cache por hash.
+
+    Atributos:
+        dpi: Resolução do raster
+        max_pages: Páginas renderizadas por documento
+        cache: TieredCache opcional dos rasters (chave: hash + DPI + páginas)
+        executor: Executor CPU opcional (etapa "RASTER")
+    """
+
+    def __init__(
+        self,
+        dpi: int = 100,
+        max_pages: int = 1,
+        cache: Optional[TieredCache] = None,
+        executor: Optional[CPUExecutor] = None
+    ):
+        """
+        Inicializa o rasterizador.
+
+        Args:
+            dpi: Resolução do raster (72-150 basta para o classificador)
+            max_pages: Páginas renderizadas por documento (>= 1)
+            cache: Cache dos rasters (None = sempre renderiza)
+            executor: Executor CPU para renderizar fora do event loop
+        """
+        if max_pages < 1:
+            raise ValueError("max_pages deve ser >= 1")
+
+        self.dpi = dpi
+        self.max_pages = max_pages
+        self.cache = cache
+        self.executor = executor
+
+        self._stats = {"rendered": 0, "cache_hits": 0, "errors": 0}
+
+        logger.info(
+            f"PdfRasterizer inicializado: {dpi} DPI, {max_pages} página(s), "
+            f"pdfium={'disponível' if pdfium is not None else 'indisponível'}"
+        )
+
+    @property
+    def available(self) -> bool:
+        """True se o pdfium está instalado."""
+        return pdfium is not None
+
+    def get_config(self) -> Dict[str, Any]:
+        """Configuração que altera o raster (entra na versão do UC1)."""
+        return {"dpi": self.dpi, "pages": self.max_pages}
+
+    def _cache_key(self, file_hash: str) -> str:
+        return hashlib.sha256(f"{file_hash}:{self.dpi}:{self.max_pages}".encode()).hexdigest()
+
+    def rasterize_sync(self, file_path: PdfSource, file_hash: Optional[str] = None) -> List[Image.Image]:
+        """
+        Retorna o raster das primeiras páginas (do cache ou renderizado).
+
+        Args:
+            file_path: Caminho do PDF ou arquivo aberto
+            file_hash: SHA-256 do arquivo, se já calculado
+
+        Returns:
+            Páginas em tons de cinza (lista vazia se o PDF não puder ser lido)
+        """
+        return self._rasterize(file_path, file_hash)[0]
+
+    def _rasterize(self, file_path: PdfSource, file_hash: Optional[str]) -> Tuple[List[Image.Image], bool]:
+        """Raster das primeiras páginas e se veio do cache."""
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(file_hash or _hash_source(file_path))
+            data = self.cache.get(key)
+            if data is not None:
+                try:
+                    pages = _decode_pages(data)
+                    self._stats["cache_hits"] += 1
+                    return pages, True
+                except Exception as e:
+                    logger.warning(f"Raster em cache inválido para {_source_name(file_path)}: {e}")
+
+        try:
+            pages = render_pdf_pages(file_path, self.dpi, self.max_pages)
+        except Exception as e:
+            # PDF corrompido ou protegido: UC1 segue sem raster (como antes)
+            self._stats["errors"] += 1
+            logger.warning(f"Falha ao rasterizar {_source_name(file_path)}: {e}")
+            return [], False
+
+        self._stats["rendered"] += 1
+        if key is not None and pages:
+            self.cache.set(key, _encode_pages(pages))
+
+        return pages, False
+
+    async def rasterize(self, file_path: PdfSource, file_hash: Optional[str] = None) -> List[Image.Image]:
+        """
+        Versão assíncrona de rasterize_sync (roda no executor, se houver).
+
+        EXPLICAÇÃO EDUCATIVA:
+        O pdfium libera o GIL enquanto renderiza; uma thread basta para
+        tirar o trabalho do event loop.
+
+        Args:
+            file_path: Caminho do PDF ou arquivo aberto
+            file_hash: SHA-256 do arquivo, se já calculado
+
+        Returns:
+            Páginas em tons de cinza (lista vazia se o PDF não puder ser lido)
+        """
+        with get_tracer().span("pdf.rasterize", dpi=self.dpi, max_pages=self.max_pages) as span:
+            if self.executor is not None:
+                pages, cache_hit = await self.executor.run_in_thread("RASTER", self._rasterize, file_path, file_hash)
+            else:
+                pages, cache_hit = self._rasterize(file_path, file_hash)
+            span.set_attributes(pages=len(pages), cache_hit=cache_hit)
+
+        return pages
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de renderizações, acertos de cache e falhas."""
+        return {**self.get_config(), **self._stats}
@@ -0,0 +1,111 @@
+"""
+Divisão de PDFs em faixas de páginas (shards) para o UC2.
+
+EXPLICAÇÃO EDUCATIVA:
+O docling converte um documento inteiro em uma única chamada, em um único
+núcleo: um PDF de 40 páginas leva o tempo de 40 páginas em sequência.
+
+Dividindo o PDF em faixas de páginas (ex.: 1-10, 11-20, ...), cada faixa
+vira um PDF pequeno convertido em um processo diferente do ProcessPool.
+Depois, as listas de parágrafos são unidas em ordem:
+- index é renumerado sequencialmente no documento inteiro
+- page é deslocado para a numeração do documento original
+- bbox não muda (as coordenadas já são relativas à página)
+"""
+
+import io
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from app.models import Paragraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PdfShard:
+    """
+    Faixa de páginas de um PDF.
+
+    Atributos:
+        first_page: Primeira página da faixa no documento original (1 = primeira)
+        page_count: Número de páginas na faixa
+        name: Nome usado na conversão (ex.: artigo_p11-20.pdf)
+        data: Bytes do PDF contendo apenas essas páginas
+    """
+
+    first_page: int
+    page_count: int
+    name: str
+    data: bytes
+
+
+def split_pdf_pages(file_path: Path, pages_per_shard: int) -> List[PdfShard]:
+    """
+    Divide um PDF em faixas de até pages_per_shard páginas.
+
+    Args:
+        file_path: Caminho do PDF
+        pages_per_shard: Máximo de páginas por faixa
+
+    Returns:
+        Lista de faixas em ordem, ou lista vazia se o documento cabe em
+        uma única faixa (não vale a pena dividir)
+    """
+    reader = PdfReader(str(file_path))
+    if reader.is_encrypted:
+        reader.decrypt("")
+
+    total_pages = len(reader.pages)
+    if pages_per_shard <= 0 or total_pages <= pages_per_shard:
+        return []
+
+    shards = []
+    for start in range(0, total_pages, pages_per_shard):
+        end = min(start + pages_per_shard, total_pages)
+
+        writer = PdfWriter()
+        for page_index in range(start, end):
+            writer.add_page(reader.pages[page_index])
+
+        buffer = io.BytesIO()
+        writer.write(buffer)
+
+        shards.append(PdfShard(
+            first_page=start + 1,
+            page_count=end - start,
+            name=f"{file_path.stem}_p{start + 1}-{end}.pdf",
+            data=buffer.getvalue()
+        ))
+
+    logger.info(f"{file_path.name}: {total_pages} páginas divididas em {len(shards)} faixas")
+
+    return shards
+
+
+def merge_shard_paragraphs(results: Sequence[Tuple[PdfShard, List[Paragraph]]]) -> List[Paragraph]:
+    """
+    Une os parágrafos das faixas com índices e páginas globais.
+
+    Args:
+        results: Pares (faixa, parágrafos da faixa), na ordem das páginas
+
+    Returns:
+        Lista única de parágrafos, com index sequencial e page relativo
+        ao documento original
+    """
+    merged = []
+
+    for shard, paragraphs in results:
+        for paragraph in paragraphs:
+            page = paragraph.page if paragraph.page is not None else 1
+            merged.append(paragraph.model_copy(update={
+                "index": len(merged),
+                "page": page + shard.first_page - 1,
+            }))
+
+    return merged
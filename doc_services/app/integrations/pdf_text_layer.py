@@ -0,0 +1,93 @@
+"""
+Pré-análise da camada de texto de PDFs.
+
+EXPLICAÇÃO EDUCATIVA:
+PDFs "nascidos digitais" (exportados do LaTeX/Word) já trazem o texto
+embutido; OCR neles é trabalho desperdiçado. PDFs escaneados só têm
+imagens e precisam de OCR.
+
+A pré-análise abre o PDF com PyPDF2 (sem renderizar nada) e, para cada
+página, verifica:
+1. Se a página declara fontes (/Font nos recursos) - sem fontes não há texto
+2. Se o texto extraído tem um mínimo de caracteres (descarta páginas com
+   apenas números de página ou cabeçalhos)
+
+O resultado decide se o docling precisa do pipeline com OCR.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from PyPDF2 import PdfReader
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextLayerScan:
+    """
+    Resultado da pré-análise de um PDF.
+
+    Atributos:
+        pages_with_text: Para cada página, se há camada de texto utilizável
+    """
+
+    pages_with_text: List[bool] = field(default_factory=list)
+
+    @property
+    def page_count(self) -> int:
+        """Número de páginas analisadas."""
+        return len(self.pages_with_text)
+
+    @property
+    def has_full_text_layer(self) -> bool:
+        """True se todas as páginas têm texto (nenhuma precisa de OCR)."""
+        return self.page_count > 0 and all(self.pages_with_text)
+
+
+def _page_has_text(page, min_chars: int) -> bool:
+    """Verifica se uma página tem camada de texto utilizável."""
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+
+    resources = resources.get_object()
+    if "/Font" not in resources:
+        return False
+
+    text = page.extract_text() or ""
+    return len(text.strip()) >= min_chars
+
+
+def scan_pdf_text_layer(file_path: Path, min_chars_per_page: int = 50) -> Optional[TextLayerScan]:
+    """
+    Verifica quais páginas de um PDF têm camada de texto.
+
+    Args:
+        file_path: Caminho do PDF
+        min_chars_per_page: Mínimo de caracteres para considerar a página com texto
+
+    Returns:
+        TextLayerScan, ou None se o PDF não puder ser lido (nesse caso o
+        chamador deve assumir que OCR é necessário)
+    """
+    try:
+        reader = PdfReader(str(file_path))
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        scan = TextLayerScan(
+            pages_with_text=[_page_has_text(page, min_chars_per_page) for page in reader.pages]
+        )
+
+    except Exception as e:
+        logger.warning(f"Pré-análise de texto falhou para {file_path.name}: {e}")
+        return None
+
+    logger.debug(
+        f"{file_path.name}: {sum(scan.pages_with_text)}/{scan.page_count} páginas com texto"
+    )
+
+    return scan
@@ -5,15 +5,21 @@ Esta API fornece endpoints para classificar documentos em tipos específicos
 usando modelos de machine learning e opcionalmente LLMs.
 """
 
+import asyncio
 import time
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.config import settings
+from app.core import metrics
+from app.core.tracing import get_tracer
+from app.core.admission import AdmissionRejectedError, admission_http_exception, admission_slot
+from app.core.uploads import SpooledUpload, UploadSizeLimitMiddleware
 from app.models.schemas import (
     ClassificationResponse,
     HealthResponse,
@@ -28,6 +34,9 @@ from app.models.schemas import (
 # Timestamp de início da aplicação
 START_TIME = time.time()
 
+# Tarefa do aquecimento (referência mantida para não ser coletada)
+_warmup_task: Optional[asyncio.Task] = None
+
 app = FastAPI(
     title="Document Classification API",
     description="""
@@ -81,6 +90,27 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests por 1 hora
 )
 
+# Limite de tamanho do corpo antes do parsing multipart
+# EXPLICAÇÃO EDUCATIVA:
+# Uploads acima do limite recebem 413 assim que o Content-Length (ou os
+# bytes recebidos) passam de MAX_FILE_SIZE_MB, sem ler/gravar o resto.
+# A folga de 1 MB cobre os campos do formulário e os delimitadores multipart.
+# O lote (/classify/batch) tem limite por item, aplicado ao processar cada arquivo.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_bytes=(settings.MAX_FILE_SIZE_MB + 1) * 1024 * 1024,
+    paths=("/classify", "/api/v1/analyze", "/api/v1/classify", "/api/v1/jobs"),
+)
+
+
+# Métricas Prometheus
+# EXPLICAÇÃO EDUCATIVA:
+# Adicionado por último, o middleware de métricas é o mais externo: mede
+# também as respostas 413 do limite de upload. /metrics soma os valores
+# de todos os workers quando PROMETHEUS_MULTIPROC_DIR está definido.
+if settings.ENABLE_METRICS:
+    metrics.setup_metrics(app)
+
 
 # ============================================================================
 # Incluir Routers - SPEC.MD (UC1-UC4)
@@ -115,7 +145,8 @@ async def root():
         "version": "1.0.0",
         "status": "running",
         "documentation": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
 
 
@@ -136,10 +167,12 @@ async def health_check():
     - Disponibilidade dos modelos
     - Disponibilidade do serviço LLM
     """
+    from app.api.dependencies import get_warmup_state
+
     uptime = time.time() - START_TIME
 
-    # TODO: Implementar checagem real dos serviços
-    models_loaded = True  # Placeholder
+    # Liveness: responde mesmo durante o aquecimento (prontidão fica no /ready)
+    models_loaded = get_warmup_state().ready
     llm_available = True  # Placeholder
 
     # Determinar status
@@ -160,6 +193,32 @@ async def health_check():
     )
 
 
+@app.get(
+    "/ready",
+    tags=["Health"],
+    summary="Readiness check",
+    description="200 apenas depois do aquecimento do pipeline; 503 enquanto aquece ou se falhou",
+    responses={503: {"description": "Aquecimento em andamento ou com falha"}}
+)
+async def readiness_check():
+    """
+    Verifica se o worker já pode receber tráfego.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Separado do /health (liveness): o orquestrador de containers reinicia
+    processos que falham no liveness, mas apenas tira do balanceamento os
+    que falham no readiness. Um worker aquecendo os modelos está vivo,
+    só não está pronto.
+    """
+    from app.api.dependencies import get_warmup_state
+
+    state = get_warmup_state()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if state.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=state.to_dict()
+    )
+
+
 @app.post(
     "/classify",
     response_model=ClassificationResponse,
@@ -188,6 +247,10 @@ async def health_check():
             "description": "Erro interno do servidor",
             "model": ErrorResponse,
         },
+        503: {
+            "description": "Servidor sobrecarregado (tentar após Retry-After)",
+            "model": ErrorResponse,
+        },
     }
 )
 async def classify_document(
@@ -199,6 +262,10 @@ async def classify_document(
         default=False,
         description="Usar LLM para análise adicional"
     ),
+    cascade: bool = Form(
+        default=False,
+        description="Classificador local primeiro; LLM apenas se a confiança for baixa"
+    ),
     include_alternatives: bool = Form(
         default=True,
         description="Incluir top 3 alternativas"
@@ -251,6 +318,8 @@ async def classify_document(
     **Argumentos**:
     - **file**: Arquivo do documento (PDF, PNG, JPG, TIFF)
     - **use_llm**: Se True, usa LLM para análise complementar
+    - **cascade**: Se True, usa o classificador local e escala para o LLM
+      apenas quando a confiança fica abaixo de CASCADE_CONFIDENCE_THRESHOLD
     - **include_alternatives**: Se True, retorna top 3 alternativas
     - **extract_metadata**: Se True, extrai metadados detalhados
     - **confidence_threshold**: Threshold mínimo de confiança (0.0 - 1.0)
@@ -261,229 +330,41 @@ async def classify_document(
     - **alternatives**: Top 3 tipos alternativos
     - **document_metadata**: Metadados do documento
     - **llm_metadata**: Metadados do LLM (se usado)
+    - **cascade_metadata**: Decisão da cascata e economia estimada (se cascade=true)
     """
 
     request_id = f"req_{uuid.uuid4().hex[:16]}"
     start_time = time.time()
 
     try:
-        # Validar formato do arquivo
-        content_type = file.content_type
-        filename = file.filename
-
-        # EXPLICAÇÃO EDUCATIVA:
-        # Alguns clientes (curl, browsers) enviam TIFF como 'application/octet-stream'.
-        # Vamos detectar o formato pela extensão do arquivo como fallback.
-        file_ext = filename.lower().split('.')[-1] if filename else ''
-
-        # Mapear extensão para content-type correto
-        ext_to_mime = {
-            'pdf': 'application/pdf',
-            'png': 'image/png',
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'tif': 'image/tiff',
-            'tiff': 'image/tiff'
-        }
-
-        # Se content_type for genérico, usar extensão
-        if content_type in ['application/octet-stream', None] and file_ext in ext_to_mime:
-            content_type = ext_to_mime[file_ext]
-
-        # Validar formato
-        supported_formats = ['application/pdf', 'image/png', 'image/jpeg', 'image/tiff', 'image/tif']
-
-        if content_type not in supported_formats:
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail=f"Formato não suportado: {content_type}. Use: PDF, PNG, JPG, TIFF"
-            )
-
-        # Ler conteúdo do arquivo
-        file_content = await file.read()
-        file_size = len(file_content)
+        from app.api.dependencies import get_admission_controller
+        from app.core.uploads import open_upload
 
-        # Validar tamanho (máximo 50MB)
-        MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Arquivo muito grande: {file_size} bytes (máximo: {MAX_FILE_SIZE})"
-            )
-
-        # Classificação com LLM
-        processing_time = (time.time() - start_time) * 1000  # ms
-
-        from app.models.schemas import (
-            DocumentType,
-            ClassificationScore,
-            DocumentMetadata,
-            FileFormat,
-        )
-
-        predicted_type = None
-        probability = 0.0
-        confidence_level = "low"
-        alternatives_list = []
-        llm_metadata_result = None
+        admission = get_admission_controller()
+        if admission is not None:
+            admission.check_queue("classify")
 
         # EXPLICAÇÃO EDUCATIVA:
-        # A API Anthropic (Claude) só aceita imagens nos formatos:
-        # JPEG, PNG, GIF, WebP. TIFF não é suportado.
-        # Se o usuário tentar usar LLM com TIFF, retornamos erro claro.
-        if use_llm and content_type in ['image/tiff', 'image/tif']:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=(
-                    "Formato TIFF não é suportado com análise LLM. "
-                    "A API Anthropic aceita apenas: JPEG, PNG, GIF, WebP. "
-                    "Tente usar use_llm=false ou converter para JPEG/PNG."
-                )
+        # Não usamos `await file.read()`: o tipo é detectado pelos primeiros
+        # bytes e o conteúdo continua no arquivo temporário do upload.
+        upload = await open_upload(file, settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+
+        async with admission_slot(
+            admission, upload.file, upload.content_type, upload.size, "classify"
+        ):
+            return await classify_content(
+                upload=upload,
+                use_llm=use_llm,
+                include_alternatives=include_alternatives,
+                cascade=cascade,
+                request_id=request_id,
+                start_time=start_time
             )
 
-        # Se use_llm=True, usar Anthropic para classificação
-        if use_llm:
-            import base64
-            from app.core.config import settings
-            from app.services.llm_anthropic import create_anthropic_service
-            from app.services.llm_base import LLMServiceError
-
-            # Verificar se API key está configurada
-            if not settings.ANTHROPIC_API_KEY:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="ANTHROPIC_API_KEY não configurada. Configure no arquivo .env"
-                )
-
-            try:
-                # Criar service Anthropic
-                llm_service = create_anthropic_service(
-                    api_key=settings.ANTHROPIC_API_KEY,
-                    model=settings.ANTHROPIC_MODEL
-                )
-
-                # Lista de todos os tipos disponíveis
-                available_types = [t.value for t in DocumentType]
-
-                # Preparar dados da imagem para análise visual
-                image_data = None
-                if content_type.startswith('image/'):
-                    # Converter imagem para base64
-                    base64_data = base64.b64encode(file_content).decode('utf-8')
-                    image_data = {
-                        "base64_data": base64_data,
-                        "mime_type": content_type
-                    }
-
-                # Classificar usando LLM (com análise visual se for imagem)
-                llm_result = await llm_service.classify_document(
-                    document_name=filename,
-                    available_types=available_types,
-                    features=None,  # TODO: Adicionar features quando layout analyzer estiver pronto
-                    image_data=image_data  # Passar imagem para análise visual
-                )
-
-                # Extrair resultados
-                predicted_type = DocumentType(llm_result["predicted_type"])
-                probability = float(llm_result.get("confidence", 0.5))
-                llm_metadata_result = llm_result["llm_metadata"]
-
-                # Determinar nível de confiança
-                if probability >= 0.8:
-                    confidence_level = "high"
-                elif probability >= 0.5:
-                    confidence_level = "medium"
-                else:
-                    confidence_level = "low"
-
-                # Gerar alternativas (mock por enquanto, pois LLM retorna apenas 1 predição)
-                # TODO: Melhorar para retornar top-K do LLM ou combinar com heurísticas
-                if include_alternatives:
-                    # Criar alternativas fictícias com probabilidades menores
-                    remaining_prob = 1.0 - probability
-                    alt_types = [t for t in DocumentType if t != predicted_type][:3]
-
-                    for i, alt_type in enumerate(alt_types):
-                        alt_prob = remaining_prob * (0.5 ** (i + 1))
-                        alt_conf = "low"
-                        alternatives_list.append(
-                            ClassificationScore(
-                                document_type=alt_type,
-                                probability=alt_prob,
-                                confidence=alt_conf
-                            )
-                        )
-
-            except LLMServiceError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Erro ao classificar com LLM: {str(e)}"
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Erro inesperado na classificação LLM: {str(e)}"
-                )
-        else:
-            # Classificação sem LLM (mock)
-            # TODO: Implementar classificador heurístico
-            predicted_type = DocumentType.SCIENTIFIC_PUBLICATION
-            probability = 0.75
-            confidence_level = "medium"
-
-            if include_alternatives:
-                alternatives_list = [
-                    ClassificationScore(
-                        document_type=DocumentType.SCIENTIFIC_REPORT,
-                        probability=0.15,
-                        confidence="low"
-                    ),
-                    ClassificationScore(
-                        document_type=DocumentType.PRESENTATION,
-                        probability=0.07,
-                        confidence="low"
-                    ),
-                    ClassificationScore(
-                        document_type=DocumentType.SPECIFICATION,
-                        probability=0.03,
-                        confidence="low"
-                    ),
-                ]
-
-        # Determinar formato do arquivo
-        file_format = FileFormat.PDF
-        if content_type == "image/png":
-            file_format = FileFormat.PNG
-        elif content_type in ["image/jpeg", "image/jpg"]:
-            file_format = FileFormat.JPG
-        elif content_type in ["image/tiff", "image/tif"]:
-            file_format = FileFormat.TIFF
-
-        # Montar resposta
-        response = ClassificationResponse(
-            predicted_type=predicted_type,
-            probability=probability,
-            confidence=confidence_level,
-            alternatives=alternatives_list,
-            document_metadata=DocumentMetadata(
-                file_name=filename,
-                file_format=file_format,
-                file_size_bytes=file_size,
-                file_size_human=format_file_size(file_size),
-                mime_type=content_type,
-                num_pages=None,  # TODO: Extrair de PDF quando implementado
-                processing_time_ms=processing_time,
-            ),
-            llm_metadata=llm_metadata_result,
-            request_id=request_id,
-            timestamp=datetime.utcnow(),
-            api_version="1.0.0"
-        )
-
-        return response
-
     except HTTPException:
         raise
+    except AdmissionRejectedError as e:
+        raise admission_http_exception(e)
     except Exception as e:
         # Log do erro (em produção, usar logging adequado)
         print(f"Erro ao processar documento: {str(e)}")
@@ -498,18 +379,121 @@ async def classify_document(
     "/classify/batch",
     tags=["Classification"],
     summary="Classificar múltiplos documentos",
-    description="Classifica múltiplos documentos em lote",
-    status_code=status.HTTP_501_NOT_IMPLEMENTED
+    description="Classifica múltiplos documentos (ou um .zip/.tar) e retorna NDJSON em streaming",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": (
+                "Uma linha JSON por documento (ClassificationResponse ou erro do item), "
+                "na ordem de conclusão, seguida de uma linha de resumo"
+            ),
+            "content": {"application/x-ndjson": {}},
+        },
+        400: {
+            "description": "Lote vazio, grande demais ou arquivo compactado inválido",
+            "model": ErrorResponse,
+        },
+    }
 )
-async def classify_batch():
+async def classify_batch(
+    files: List[UploadFile] = File(
+        ...,
+        description="Arquivos dos documentos (PDF, imagens, .zip ou .tar)"
+    ),
+    use_llm: bool = Form(
+        default=False,
+        description="Usar LLM para análise adicional"
+    ),
+    cascade: bool = Form(
+        default=False,
+        description="Classificador local primeiro; LLM apenas se a confiança for baixa"
+    ),
+    include_alternatives: bool = Form(
+        default=True,
+        description="Incluir top 3 alternativas"
+    ),
+    max_concurrency: Optional[int] = Form(
+        default=None,
+        ge=1,
+        le=64,
+        description="Máximo de documentos classificados em paralelo"
+    )
+):
     """
-    Endpoint para classificação em lote.
+    Classifica documentos em lote.
+
+    **Funcionamento**:
+    1. Recebe vários arquivos e/ou arquivos .zip/.tar (expandidos)
+    2. Classifica em paralelo, com limite de concorrência
+    3. Envia cada resultado assim que termina (NDJSON)
+    4. Erros de um item não interrompem o lote
+    5. Última linha: resumo com throughput e latências p50/p95
+
+    **Exemplo de uso**:
+    ```python
+    import json
+    import requests
 
-    TODO: Implementar processamento em lote de documentos.
+    files = [('files', open(p, 'rb')) for p in ['a.pdf', 'b.png']]
+    with requests.post('http://localhost:8000/classify/batch',
+                       files=files, data={'max_concurrency': 4},
+                       stream=True) as response:
+        for line in response.iter_lines():
+            print(json.loads(line))
+    ```
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Classificação em lote não implementada ainda"
+    from app.services.batch_classification import items_from_upload, spool_items, stream_batch
+
+    concurrency = max_concurrency or settings.BATCH_MAX_CONCURRENCY
+
+    # Montar itens (arquivos compactados são expandidos)
+    items = []
+    for upload in files:
+        try:
+            items.extend(items_from_upload(len(items), upload.filename, upload))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhum documento encontrado no lote"
+        )
+
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Lote com {len(items)} documentos (máximo: {settings.BATCH_MAX_ITEMS})"
+        )
+
+    # EXPLICAÇÃO: o corpo é enviado depois que o endpoint retorna, quando
+    # o FastAPI já fechou os UploadFile. Cada item é copiado agora (em
+    # blocos, com limite de tamanho, fora do event loop); stream_batch
+    # fecha as cópias ao terminar.
+    await asyncio.to_thread(
+        spool_items,
+        items,
+        settings.MAX_FILE_SIZE_MB * 1024 * 1024,
+        settings.UPLOAD_SPOOL_MEMORY_MB * 1024 * 1024
+    )
+
+    async def classify_item(item, upload) -> str:
+        response = await classify_content(
+            upload=upload,
+            use_llm=use_llm,
+            include_alternatives=include_alternatives,
+            cascade=cascade
+        )
+        return response.model_dump_json()
+
+    def map_error(exc: Exception) -> dict:
+        if isinstance(exc, HTTPException):
+            return {"status_code": exc.status_code, "message": exc.detail}
+        return {"status_code": status.HTTP_500_INTERNAL_SERVER_ERROR, "message": str(exc)}
+
+    return StreamingResponse(
+        stream_batch(items, classify_item, concurrency, map_error),
+        media_type="application/x-ndjson"
     )
 
 
@@ -543,6 +527,63 @@ async def list_models():
     }
 
 
+@app.get(
+    "/llm/stats",
+    tags=["Models"],
+    summary="Estatísticas do cliente LLM",
+    description="Chamadas, novas tentativas (por status) e fila do limitador de concorrência/taxa"
+)
+async def llm_stats():
+    """
+    Retorna estatísticas do service LLM compartilhado.
+    """
+    from app.api.dependencies import get_image_preprocessor, get_llm_service
+
+    llm_service = get_llm_service()
+    if llm_service is None:
+        return {"enabled": False}
+
+    stats = {"enabled": True, **llm_service.get_stats()}
+    preprocessor = get_image_preprocessor()
+    if preprocessor is not None:
+        stats["image_preprocessing"] = preprocessor.get_stats()
+    return stats
+
+
+@app.get(
+    "/cascade/stats",
+    tags=["Models"],
+    summary="Estatísticas da cascata local -> LLM",
+    description="Taxa de escalonamento para o LLM, motivos e latência/custo economizados"
+)
+async def cascade_stats():
+    """
+    Retorna estatísticas agregadas da classificação em cascata.
+    """
+    from app.api.dependencies import get_cascade_classifier
+
+    return get_cascade_classifier().get_stats()
+
+
+@app.get(
+    "/llm/cache/stats",
+    tags=["Models"],
+    summary="Estatísticas do cache do LLM",
+    description="Hits, misses e custo/latência economizados pelo cache de classificações do LLM"
+)
+async def llm_cache_stats():
+    """
+    Retorna estatísticas do cache de respostas do LLM.
+    """
+    from app.api.dependencies import get_llm_response_cache
+
+    cache = get_llm_response_cache()
+    if cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **cache.get_stats()}
+
+
 @app.get(
     "/document-types",
     tags=["Information"],
@@ -591,6 +632,258 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} TB"
 
 
+async def classify_content(
+    upload: SpooledUpload,
+    use_llm: bool = False,
+    include_alternatives: bool = True,
+    cascade: bool = False,
+    request_id: Optional[str] = None,
+    start_time: Optional[float] = None
+) -> ClassificationResponse:
+    """
+    Classifica o conteúdo de um documento já validado.
+
+    Compartilhado por `/classify` e `/classify/batch`.
+
+    **Argumentos**:
+        upload: Arquivo validado (tipo detectado e tamanho dentro do limite)
+        use_llm: Se True, usa LLM para classificação
+        include_alternatives: Se True, retorna top 3 alternativas
+        cascade: Se True, classificador local primeiro e LLM só na dúvida
+        request_id: ID da requisição (gerado se não informado)
+        start_time: Início da requisição (time.time())
+
+    **Retorna**:
+        ClassificationResponse
+
+    **Raises**:
+        HTTPException: Em erros de validação ou do LLM
+    """
+    if request_id is None:
+        request_id = f"req_{uuid.uuid4().hex[:16]}"
+    if start_time is None:
+        start_time = time.time()
+
+    filename = upload.filename
+    content_type = upload.content_type
+    file_size = upload.size
+
+    # Classificação com LLM
+    processing_time = (time.time() - start_time) * 1000  # ms
+
+    from app.models.schemas import (
+        DocumentType,
+        ClassificationScore,
+        DocumentMetadata,
+        FileFormat,
+    )
+
+    predicted_type = None
+    probability = 0.0
+    confidence_level = "low"
+    alternatives_list = []
+    llm_metadata_result = None
+    cascade_metadata = None
+
+    # Classificação com LLM (use_llm=True) ou em cascata (cascade=True)
+    if use_llm or cascade:
+        from app.api.dependencies import (
+            get_cascade_classifier,
+            get_image_preprocessor,
+            get_llm_service
+        )
+        from app.services.llm_base import LLMServiceError
+        from app.services.llm_image import SUPPORTED_MIME_TYPES
+
+        # Service compartilhado do processo (pool de conexões + limitador)
+        llm_service = get_llm_service()
+
+        # Verificar se API key está configurada
+        if llm_service is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="ANTHROPIC_API_KEY não configurada. Configure no arquivo .env"
+            )
+
+        async def classify_with_llm() -> dict:
+            """Prepara a imagem e classifica com o LLM."""
+            # Lista de todos os tipos disponíveis
+            available_types = [t.value for t in DocumentType]
+
+            # Preparar dados da imagem para análise visual
+            # EXPLICAÇÃO EDUCATIVA:
+            # A API Anthropic só aceita JPEG, PNG, GIF e WebP e reduz imagens
+            # grandes no servidor. O pré-processador converte TIFF e reduz/
+            # recodifica a imagem antes do envio (menos bytes e tokens).
+            image_data = None
+            image_report = None
+            if content_type.startswith('image/'):
+                preprocessor = get_image_preprocessor()
+                if preprocessor is not None:
+                    try:
+                        with get_tracer().span("llm.image_preprocess", bytes=file_size) as span:
+                            prepared = await asyncio.to_thread(
+                                preprocessor.prepare, upload.file, content_type, file_size
+                            )
+                            span.set_attributes(encoded_bytes=prepared.encoded_bytes, pages=prepared.pages)
+                    except ValueError as e:
+                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+                    image_data = prepared.to_image_data()
+                    image_report = prepared.report()
+                elif content_type in SUPPORTED_MIME_TYPES:
+                    # Converter imagem para base64 (lida em blocos do arquivo)
+                    image_data = {
+                        "base64_data": upload.to_base64(),
+                        "mime_type": content_type
+                    }
+                else:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=(
+                            f"Formato {content_type} não é suportado com análise LLM sem "
+                            "pré-processamento (LLM_IMAGE_PREPROCESS=false). "
+                            "A API Anthropic aceita apenas: JPEG, PNG, GIF, WebP."
+                        )
+                    )
+
+            # Classificar usando LLM (com análise visual se for imagem)
+            llm_result = await llm_service.classify_document(
+                document_name=filename,
+                available_types=available_types,
+                features=None,  # TODO: Adicionar features quando layout analyzer estiver pronto
+                image_data=image_data  # Passar imagem para análise visual
+            )
+
+            if image_report is not None:
+                llm_result["llm_metadata"].additional_metadata = {
+                    **(llm_result["llm_metadata"].additional_metadata or {}),
+                    "image_preprocessing": image_report
+                }
+            return llm_result
+
+        try:
+            # EXPLICAÇÃO EDUCATIVA:
+            # Na cascata, o classificador local responde primeiro (ms, sem
+            # custo) e o LLM só é chamado quando a confiança local é baixa
+            # ou o rótulo é "other".
+            with get_tracer().span(
+                "classify",
+                request_id=request_id,
+                bytes=file_size,
+                content_type=content_type,
+                cascade=cascade
+            ) as span:
+                if cascade:
+                    outcome = await get_cascade_classifier().classify(upload, escalate=classify_with_llm)
+                    cascade_metadata = outcome.metadata
+                    result = outcome.llm_result or outcome.local_result
+                else:
+                    result = await classify_with_llm()
+                span.set_attribute("predicted_type", result["predicted_type"])
+
+            # Extrair resultados
+            predicted_type = DocumentType(result["predicted_type"])
+            probability = float(result.get("confidence", 0.5))
+            llm_metadata_result = result.get("llm_metadata")
+
+            # Determinar nível de confiança
+            if probability >= 0.8:
+                confidence_level = "high"
+            elif probability >= 0.5:
+                confidence_level = "medium"
+            else:
+                confidence_level = "low"
+
+            # Gerar alternativas (mock por enquanto, pois LLM retorna apenas 1 predição)
+            # TODO: Melhorar para retornar top-K do LLM ou combinar com heurísticas
+            if include_alternatives:
+                # Criar alternativas fictícias com probabilidades menores
+                remaining_prob = 1.0 - probability
+                alt_types = [t for t in DocumentType if t != predicted_type][:3]
+
+                for i, alt_type in enumerate(alt_types):
+                    alt_prob = remaining_prob * (0.5 ** (i + 1))
+                    alt_conf = "low"
+                    alternatives_list.append(
+                        ClassificationScore(
+                            document_type=alt_type,
+                            probability=alt_prob,
+                            confidence=alt_conf
+                        )
+                    )
+
+        except HTTPException:
+            raise
+        except LLMServiceError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao classificar com LLM: {str(e)}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro inesperado na classificação LLM: {str(e)}"
+            )
+    else:
+        # Classificação sem LLM (mock)
+        # TODO: Implementar classificador heurístico
+        predicted_type = DocumentType.SCIENTIFIC_PUBLICATION
+        probability = 0.75
+        confidence_level = "medium"
+
+        if include_alternatives:
+            alternatives_list = [
+                ClassificationScore(
+                    document_type=DocumentType.SCIENTIFIC_REPORT,
+                    probability=0.15,
+                    confidence="low"
+                ),
+                ClassificationScore(
+                    document_type=DocumentType.PRESENTATION,
+                    probability=0.07,
+                    confidence="low"
+                ),
+                ClassificationScore(
+                    document_type=DocumentType.SPECIFICATION,
+                    probability=0.03,
+                    confidence="low"
+                ),
+            ]
+
+    # Determinar formato do arquivo
+    file_format = FileFormat.PDF
+    if content_type == "image/png":
+        file_format = FileFormat.PNG
+    elif content_type in ["image/jpeg", "image/jpg"]:
+        file_format = FileFormat.JPG
+    elif content_type in ["image/tiff", "image/tif"]:
+        file_format = FileFormat.TIFF
+
+    # Montar resposta
+    response = ClassificationResponse(
+        predicted_type=predicted_type,
+        probability=probability,
+        confidence=confidence_level,
+        alternatives=alternatives_list,
+        document_metadata=DocumentMetadata(
+            file_name=filename,
+            file_format=file_format,
+            file_size_bytes=file_size,
+            file_size_human=format_file_size(file_size),
+            mime_type=content_type,
+            num_pages=None,  # TODO: Extrair de PDF quando implementado
+            processing_time_ms=processing_time,
+        ),
+        llm_metadata=llm_metadata_result,
+        cascade_metadata=cascade_metadata,
+        request_id=request_id,
+        timestamp=datetime.utcnow(),
+        api_version="1.0.0"
+    )
+
+    return response
+
+
 def get_document_type_description(doc_type) -> str:
     """
     Retorna descrição de um tipo de documento.
@@ -655,9 +948,11 @@ async def http_exception_handler(request, exc):
     if 'timestamp' in response_dict and isinstance(response_dict['timestamp'], datetime):
         response_dict['timestamp'] = response_dict['timestamp'].isoformat()
 
+    # Cabeçalhos da exceção (ex.: Retry-After no 503 do controle de admissão)
     return JSONResponse(
         status_code=exc.status_code,
-        content=response_dict
+        content=response_dict,
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -707,9 +1002,28 @@ async def startup_event():
     print(f"Versão: 1.0.0")
     print(f"Documentação: http://localhost:8000/docs")
     print(f"Health Check: http://localhost:8000/health")
+    print(f"Readiness: http://localhost:8000/ready")
     print("=" * 80)
 
-    # TODO: Carregar modelos
+    # Workers de jobs assíncronos (retomam jobs pendentes na fila)
+    if settings.JOB_WORKERS > 0:
+        try:
+            from app.api.dependencies import get_job_workers
+            await get_job_workers().start()
+        except Exception as e:
+            print(f"[WARNING] Não foi possível iniciar workers de jobs: {e}")
+
+    # Aquecimento em segundo plano: a porta abre já e o /ready responde
+    # 200 quando o documento sintético tiver passado por todas as etapas
+    if settings.WARMUP_ENABLED:
+        from app.api.dependencies import get_orchestrator, get_warmup_state
+        from app.services.warmup import run_warmup
+
+        global _warmup_task
+        _warmup_task = asyncio.create_task(
+            run_warmup(get_orchestrator(), get_warmup_state(), settings.WARMUP_TIMEOUT_SECONDS)
+        )
+
     # TODO: Inicializar conexão com LLM
     # TODO: Verificar dependências
 
@@ -721,7 +1035,47 @@ async def shutdown_event():
     print("Document Classification API - Encerrando")
     print("=" * 80)
 
-    # TODO: Liberar recursos
+    # Aquecimento ainda em andamento não deve segurar o encerramento
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+
+    # Fechar pool de conexões do cliente LLM (apenas se foi criado)
+    try:
+        from app.api.dependencies import get_llm_service
+        if get_llm_service.cache_info().currsize and get_llm_service() is not None:
+            await get_llm_service().close()
+    except Exception as e:
+        print(f"[WARNING] Erro ao encerrar cliente LLM: {e}")
+
+    # Parar workers de jobs (jobs em andamento são retomados no próximo start)
+    try:
+        from app.api.dependencies import get_job_workers
+        if get_job_workers.cache_info().currsize:
+            workers = get_job_workers()
+            await workers.stop()
+            workers.queue.close()
+    except Exception as e:
+        print(f"[WARNING] Erro ao encerrar workers de jobs: {e}")
+
+    # Gravar o snapshot de termos do bucket atual
+    try:
+        from app.api.dependencies import get_orchestrator
+        if get_orchestrator.cache_info().currsize and get_orchestrator().term_stats is not None:
+            get_orchestrator().term_stats.close()
+    except Exception as e:
+        print(f"[WARNING] Erro ao gravar estatísticas de termos: {e}")
+
+    # Encerrar executor CPU (apenas se foi criado)
+    try:
+        from app.api.dependencies import get_cpu_executor
+        if get_cpu_executor.cache_info().currsize:
+            get_cpu_executor().shutdown(wait=False)
+    except Exception as e:
+        print(f"[WARNING] Erro ao encerrar executor CPU: {e}")
+
+    # Gauges "live" deste worker deixam de ser somados no /metrics
+    metrics.mark_process_dead()
+
     # TODO: Fechar conexões
     # TODO: Salvar estado se necessário
 
@@ -729,6 +1083,9 @@ async def shutdown_event():
 if __name__ == "__main__":
     import uvicorn
 
+    # Métricas de uma execução anterior não devem ser somadas às atuais
+    metrics.prepare_multiprocess_dir()
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -0,0 +1,85 @@
+"""
+Executável do model host (processo único com os modelos do docling).
+
+EXPLICAÇÃO EDUCATIVA:
+Rodar ao lado dos workers da API, com o mesmo MODEL_HOST_SOCKET:
+
+    python -m app.model_host &
+    MODEL_HOST_SOCKET=/tmp/doc_services/model_host.sock uvicorn app.main:app --workers 8
+
+O host cria MODEL_HOST_WORKERS processos, cada um com o docling aquecido
+(init_docling_worker) antes de aceitar conexões, e atende as tarefas
+de UC2 de todos os workers da API (ver app.core.model_host).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from app.api.dependencies import docling_worker_initializer
+from app.core.config import settings
+from app.core.model_host import ModelHost
+
+logger = logging.getLogger(__name__)
+
+
+def build_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Cria o ProcessPool do host e aquece todos os processos.
+
+    EXPLICAÇÃO EDUCATIVA:
+    O ProcessPoolExecutor só cria processos quando recebe tarefas. Uma
+    tarefa trivial por processo força a criação (e o initializer, que
+    carrega os modelos) antes da primeira requisição real.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=docling_worker_initializer()
+    )
+    wait([pool.submit(os.getpid) for _ in range(workers)])
+    return pool
+
+
+async def serve() -> None:
+    """Sobe o host e atende até receber SIGINT/SIGTERM."""
+    workers = settings.MODEL_HOST_WORKERS
+    logger.info(f"Model host: carregando modelos em {workers} processos...")
+    pool = build_pool(workers)
+
+    host = ModelHost(
+        socket_path=settings.MODEL_HOST_SOCKET,
+        pool=pool,
+        max_queue_depth=settings.MODEL_HOST_MAX_QUEUE_DEPTH,
+        pool_factory=lambda: build_pool(workers)
+    )
+
+    task = asyncio.ensure_future(host.serve_forever())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        host.pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("Model host encerrado")
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s %(levelname)s [model_host] %(message)s"
+    )
+    if not settings.MODEL_HOST_SOCKET:
+        raise SystemExit("Defina MODEL_HOST_SOCKET (ex.: /tmp/doc_services/model_host.sock)")
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
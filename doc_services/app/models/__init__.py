@@ -21,7 +21,7 @@ Podemos fazer:
 from .document import Document, DocumentFormat
 
 # Modelos de parágrafo
-from .paragraph import Paragraph, BoundingBox
+from .paragraph import Paragraph, BoundingBox, DoclingProfile
 
 # Modelos de resultado de análise
 from .analysis_result import (
@@ -31,6 +31,9 @@ from .analysis_result import (
     WordFrequency
 )
 
+# Modelos de jobs assíncronos
+from .job import JobStatus, StageStatus, JobInfo
+
 # Modelos de relatório de conformidade
 from .compliance_report import ComplianceReportData
 
@@ -42,6 +45,7 @@ from .schemas import (
     ClassificationScore,
     DocumentMetadata,
     LLMMetadata,
+    CascadeMetadata,
     ClassificationResponse,
     ClassificationRequest,
     ErrorDetail,
@@ -67,6 +71,7 @@ __all__ = [
     # Parágrafo
     "Paragraph",
     "BoundingBox",
+    "DoclingProfile",
 
     # Análise
     "AnalysisResult",
@@ -74,6 +79,11 @@ __all__ = [
     "ComplianceResult",
     "WordFrequency",
 
+    # Jobs
+    "JobStatus",
+    "StageStatus",
+    "JobInfo",
+
     # Relatório
     "ComplianceReportData",
 
@@ -84,6 +94,7 @@ __all__ = [
     "ClassificationScore",
     "DocumentMetadata",
     "LLMMetadata",
+    "CascadeMetadata",
     "ClassificationResponse",
     "ClassificationRequest",
     "ErrorDetail",
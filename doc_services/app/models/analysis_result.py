@@ -228,6 +228,10 @@ class AnalysisResult(BaseModel):
         compliance_report_markdown: Relatório formatado em Markdown (UC4)
         analyzed_at: Timestamp da análise
         processing_time_ms: Tempo total de processamento
+        cache_hit: True se o resultado veio do cache de análises
+        near_duplicate_of: SHA-256 do documento anterior cujo resultado foi
+            reaproveitado (mesmo artigo reescaneado/reexportado)
+        near_duplicate_distance: Distância (bits) entre os hashes perceptuais
     """
 
     document_id: str = Field(
@@ -285,6 +289,22 @@ class AnalysisResult(BaseModel):
         ge=0.0
     )
 
+    cache_hit: bool = Field(
+        default=False,
+        description="Indica se o resultado foi servido pelo cache de análises"
+    )
+
+    near_duplicate_of: Optional[str] = Field(
+        default=None,
+        description="SHA-256 do documento quase idêntico cujo resultado foi reaproveitado"
+    )
+
+    near_duplicate_distance: Optional[int] = Field(
+        default=None,
+        description="Distância de Hamming entre os hashes perceptuais da primeira página",
+        ge=0
+    )
+
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
@@ -318,7 +338,10 @@ class AnalysisResult(BaseModel):
                 },
                 "compliance_report_markdown": "# Relatório de Conformidade...",
                 "analyzed_at": "2025-10-25T14:30:00",
-                "processing_time_ms": 3452.5
+                "processing_time_ms": 3452.5,
+                "cache_hit": False,
+                "near_duplicate_of": None,
+                "near_duplicate_distance": None
             }
         }
     )
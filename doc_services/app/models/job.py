@@ -0,0 +1,81 @@
+"""
+Modelos de dados para jobs assíncronos de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+Uma análise com OCR pode levar dezenas de segundos. Em vez de manter a
+conexão HTTP aberta, o cliente cria um job (POST /api/v1/jobs), recebe
+um ID imediatamente e consulta o status (GET /api/v1/jobs/{id}) até o
+resultado ficar pronto.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from .analysis_result import AnalysisResult
+
+
+class JobStatus(str, Enum):
+    """
+    Estados possíveis de um job.
+
+    EXPLICAÇÃO EDUCATIVA:
+    queued → running → succeeded
+                     ↘ queued (nova tentativa após falha temporária)
+                     ↘ failed (tentativas esgotadas ou documento inválido)
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class StageStatus(str, Enum):
+    """Estado de uma etapa do pipeline dentro de um job."""
+
+    RUNNING = "running"
+    DONE = "done"
+
+
+class JobInfo(BaseModel):
+    """
+    Status de um job de análise.
+
+    Atributos:
+        job_id: Identificador do job
+        status: Estado atual
+        filename: Nome original do arquivo
+        attempts: Tentativas já iniciadas
+        max_attempts: Máximo de tentativas
+        progress: Estado de cada etapa (STEP0, RASTER, NEARDUP, UC1..UC4)
+        result: Resultado final (apenas em succeeded)
+        error: Mensagem do último erro
+        created_at: Criação do job
+        updated_at: Última atualização
+        expires_at: Quando o resultado deixa de estar disponível
+    """
+
+    job_id: str = Field(..., description="Identificador do job")
+    status: JobStatus = Field(..., description="Estado atual do job")
+    filename: str = Field(..., description="Nome original do arquivo")
+    attempts: int = Field(default=0, ge=0, description="Tentativas já iniciadas")
+    max_attempts: int = Field(..., ge=1, description="Máximo de tentativas")
+    progress: Dict[str, StageStatus] = Field(
+        default_factory=dict,
+        description="Estado de cada etapa do pipeline",
+        examples=[{"STEP0": "done", "UC1": "done", "UC2": "running"}]
+    )
+    result: Optional[AnalysisResult] = Field(
+        default=None,
+        description="Resultado da análise (quando status = succeeded)"
+    )
+    error: Optional[str] = Field(default=None, description="Mensagem do último erro")
+    created_at: datetime = Field(..., description="Criação do job")
+    updated_at: datetime = Field(..., description="Última atualização")
+    expires_at: Optional[datetime] = Field(
+        default=None,
+        description="Após esta data o job e o resultado são removidos"
+    )
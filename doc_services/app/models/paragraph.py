@@ -13,10 +13,26 @@ O DocLayout-YOLO detecta elementos visuais, e cada parágrafo tem:
 - Metadados adicionais
 """
 
+from enum import Enum
 from typing import Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
 
+class DoclingProfile(str, Enum):
+    """
+    Perfis de conversão do docling (UC2).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Trocam precisão por latência:
+    - fast: sem estrutura de tabelas; OCR só em páginas sem camada de texto
+    - balanced: com tabelas; OCR só em páginas sem camada de texto
+    - accurate: com tabelas e OCR sempre (comportamento original)
+    """
+    FAST = "fast"
+    BALANCED = "balanced"
+    ACCURATE = "accurate"
+
+
 class BoundingBox(BaseModel):
     """
     Coordenadas de uma caixa delimitadora (bounding box).
@@ -91,6 +107,7 @@ class Paragraph(BaseModel):
     - text: conteúdo textual extraído
     - word_count: número de palavras (útil para análise UC3)
     - bbox: localização visual no documento (opcional)
+    - page: página onde o parágrafo começa (a bbox é relativa a ela)
     - confidence: confiança da detecção pelo modelo
 
     Atributos:
@@ -98,6 +115,7 @@ class Paragraph(BaseModel):
         text: Texto completo do parágrafo
         word_count: Número de palavras no parágrafo
         bbox: Coordenadas da caixa delimitadora (opcional)
+        page: Número da página (começando em 1), se conhecido
         confidence: Nível de confiança da detecção (0.0 a 1.0)
     """
 
@@ -130,6 +148,13 @@ class Paragraph(BaseModel):
         description="Coordenadas da caixa delimitadora do parágrafo no documento"
     )
 
+    page: Optional[int] = Field(
+        None,
+        description="Página do documento em que o parágrafo está (começando em 1)",
+        ge=1,
+        examples=[1, 2, 10]
+    )
+
     confidence: Optional[float] = Field(
         None,
         description="Nível de confiança da detecção (0.0 a 1.0)",
@@ -327,6 +327,60 @@ class LLMMetadata(BaseModel):
     )
 
 
+class CascadeMetadata(BaseModel):
+    """
+    Metadados da classificação em cascata (local primeiro, LLM na dúvida).
+
+    Indica se a requisição foi escalada para o LLM, por quê, e quanto foi
+    economizado quando o classificador local bastou.
+    """
+
+    escalated: bool = Field(
+        ...,
+        description="True se a predição final veio do LLM"
+    )
+
+    reason: str = Field(
+        ...,
+        description="Motivo da decisão (confident, low_confidence, label_other, unsupported_format, local_error)"
+    )
+
+    threshold: float = Field(
+        ...,
+        ge=0.0,
+        le=1.0,
+        description="Confiança mínima para aceitar a predição local"
+    )
+
+    local_prediction: Optional[str] = Field(
+        None,
+        description="Rótulo do classificador local (None se não executado)"
+    )
+
+    local_confidence: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Confiança do classificador local"
+    )
+
+    local_latency_ms: float = Field(
+        ...,
+        ge=0,
+        description="Latência do estágio local em milissegundos"
+    )
+
+    saved_latency_ms: Optional[float] = Field(
+        None,
+        description="Latência média do LLM evitada (None se escalado ou sem histórico)"
+    )
+
+    saved_cost_usd: Optional[Decimal] = Field(
+        None,
+        description="Custo médio do LLM evitado em USD (None se escalado ou sem histórico)"
+    )
+
+
 class ClassificationResponse(BaseModel):
     """
     Resposta completa da API de classificação.
@@ -371,6 +425,11 @@ class ClassificationResponse(BaseModel):
         description="Metadados do serviço LLM (se aplicável)"
     )
 
+    cascade_metadata: Optional[CascadeMetadata] = Field(
+        None,
+        description="Metadados da cascata local -> LLM (se cascade=true)"
+    )
+
     # Informações gerais
     request_id: str = Field(
         ...,
@@ -0,0 +1,187 @@
+"""
+Reprocessa UC3/UC4 do acervo inteiro a partir dos parágrafos armazenados.
+
+EXPLICAÇÃO EDUCATIVA:
+Depois de mudar ComplianceService.MIN_WORDS/EXPECTED_PARAGRAPHS ou as
+stopwords do TextAnalysisService, não é preciso reenviar os documentos:
+
+    python -m app.rescore --workers 8 --output rescore.jsonl
+
+Os parágrafos (UC2) gravados no StageStore na versão atual são lidos em
+páginas e distribuídos num ProcessPool (UC3 é Python puro, limitado pelo
+GIL; processos usam todos os núcleos). O UC3 recalculado é gravado de
+volta, então a próxima análise ou reanálise do documento já o encontra.
+A saída JSONL tem uma linha por documento com o novo veredito de
+conformidade.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, TextIO, Tuple
+
+from app.services.compliance_service import ComplianceService
+from app.services.orchestrator import PARAGRAPH_LIST, DocumentAnalysisOrchestrator
+from app.services.text_analysis_service import TextAnalysisService
+
+logger = logging.getLogger(__name__)
+
+# Serviços de cada processo do pool (recebidos uma vez no initializer)
+_worker_services: Optional[Tuple[TextAnalysisService, ComplianceService, int]] = None
+
+
+def _init_worker(
+    text_analysis_service: TextAnalysisService,
+    compliance_service: ComplianceService,
+    top_n: int
+) -> None:
+    """Guarda os serviços do orquestrador no processo do pool."""
+    global _worker_services
+    _worker_services = (text_analysis_service, compliance_service, top_n)
+
+
+def rescore_document(paragraphs_json: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Recalcula UC3 e UC4 de um documento.
+
+    Args:
+        paragraphs_json: Parágrafos (UC2) serializados
+
+    Returns:
+        (UC3 serializado, resumo de conformidade)
+    """
+    text_analysis_service, compliance_service, top_n = _worker_services
+
+    paragraphs = PARAGRAPH_LIST.validate_json(paragraphs_json)
+    text_analysis = text_analysis_service.analyze_text(paragraphs=paragraphs, top_n=top_n)
+    compliance = compliance_service.validate_compliance(
+        word_count=text_analysis.total_words,
+        paragraph_count=len(paragraphs)
+    )
+
+    return text_analysis.model_dump_json(), {
+        "is_compliant": compliance.is_compliant,
+        "word_count": compliance.word_count,
+        "paragraph_count": compliance.paragraph_count,
+        "word_difference": compliance.word_difference,
+        "paragraph_difference": compliance.paragraph_difference,
+    }
+
+
+def rescore_corpus(
+    orchestrator: DocumentAnalysisOrchestrator,
+    profile: Optional[str] = None,
+    workers: Optional[int] = None,
+    output: Optional[TextIO] = None
+) -> Dict[str, Any]:
+    """
+    Recalcula UC3/UC4 de todos os documentos com UC2 na versão atual.
+
+    EXPLICAÇÃO EDUCATIVA:
+    No máximo 4 documentos por processo ficam pendentes: o acervo é lido
+    aos poucos do SQLite em vez de carregar todos os parágrafos na memória.
+
+    Args:
+        orchestrator: Orquestrador com stage_store (fornece serviços e versões)
+        profile: Perfil docling da análise original (variante do UC2)
+        workers: Processos do pool (None = todos os núcleos; 0 = no próprio processo)
+        output: Arquivo texto para o relatório JSONL (opcional)
+
+    Returns:
+        Totais: documentos, conformes, não conformes, erros e duração
+    """
+    store = orchestrator.stage_store
+    if store is None:
+        raise RuntimeError("Armazenamento de etapas desabilitado (STAGE_STORE_ENABLED=false)")
+
+    variant = profile or ""
+    versions = orchestrator.stage_versions
+    initargs = (
+        orchestrator.text_analysis_service,
+        orchestrator.compliance_service,
+        orchestrator.TOP_N_WORDS
+    )
+    totals = {"documents": 0, "compliant": 0, "non_compliant": 0, "errors": 0}
+    start = time.perf_counter()
+
+    def record(file_hash: str, filename: str, outcome: Tuple[str, Dict[str, Any]]) -> None:
+        text_analysis_json, summary = outcome
+        store.put(file_hash, "UC3", variant, versions["UC3"], text_analysis_json)
+        totals["documents"] += 1
+        totals["compliant" if summary["is_compliant"] else "non_compliant"] += 1
+        if output is not None:
+            output.write(json.dumps({"file_hash": file_hash, "filename": filename, **summary}) + "\n")
+
+    documents = store.iter_stage("UC2", variant, versions["UC2"])
+
+    if workers == 0:
+        _init_worker(*initargs)
+        for file_hash, filename, payload in documents:
+            try:
+                record(file_hash, filename, rescore_document(payload))
+            except Exception as e:
+                totals["errors"] += 1
+                logger.warning(f"Falha ao reprocessar {filename}: {e}")
+    else:
+        workers = workers or os.cpu_count() or 1
+        pending: Dict[Future, Tuple[str, str]] = {}
+
+        def drain(done: Set[Future]) -> None:
+            for future in done:
+                file_hash, filename = pending.pop(future)
+                try:
+                    record(file_hash, filename, future.result())
+                except Exception as e:
+                    totals["errors"] += 1
+                    logger.warning(f"Falha ao reprocessar {filename}: {e}")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            for file_hash, filename, payload in documents:
+                if len(pending) >= workers * 4:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    drain(done)
+                pending[pool.submit(rescore_document, payload)] = (file_hash, filename)
+            drain(set(pending))
+
+    totals["duration_seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Reprocessamento concluído: {totals['documents']} documentos "
+        f"({totals['compliant']} conformes, {totals['errors']} erros) "
+        f"em {totals['duration_seconds']}s"
+    )
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recalcula UC3/UC4 do acervo a partir dos parágrafos armazenados"
+    )
+    parser.add_argument("--profile", default=None, help="Perfil docling da análise original")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument("--output", type=Path, default=None, help="Relatório JSONL por documento")
+    args = parser.parse_args()
+
+    from app.api.dependencies import get_orchestrator
+    from app.core.config import settings
+
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s %(levelname)s [rescore] %(message)s"
+    )
+
+    orchestrator = get_orchestrator()
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            totals = rescore_corpus(orchestrator, args.profile, args.workers, output)
+    else:
+        totals = rescore_corpus(orchestrator, args.profile, args.workers)
+
+    print(json.dumps(totals, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,14 @@ Service Layer contém a lógica de negócio da aplicação:
 - Orchestrator: coordena todos os UCs
 
 Também inclui serviços LLM existentes para outros casos de uso.
+
+Importação adiada: o SDK da Anthropic leva ~0,7 s para importar e só é
+usado com use_llm/cascade. AnthropicService e create_anthropic_service
+são resolvidos no primeiro acesso (__getattr__ do módulo, PEP 562).
 """
 
+import importlib
+
 # Serviços LLM (existentes)
 from app.services.llm_base import (
     BaseLLMService,
@@ -25,17 +31,21 @@ from app.services.llm_base import (
     LLMTimeoutError,
 )
 
-from app.services.llm_anthropic import (
-    AnthropicService,
-    create_anthropic_service,
-)
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_image import ImagePreprocessor, PreparedImage
 
 # Novos serviços para análise de documentos científicos
 from .classification_service import ClassificationService
 from .paragraph_service import ParagraphDetectionService
 from .text_analysis_service import TextAnalysisService
 from .compliance_service import ComplianceService
-from .orchestrator import DocumentAnalysisOrchestrator, InvalidDocumentError
+from .result_cache import AnalysisResultCache
+from .orchestrator import DocumentAnalysisOrchestrator, InvalidDocumentError, StageDataMissingError
+from .job_worker import JobWorkerPool
+from .cascade_classifier import CascadeClassifier, CascadeOutcome
+from .term_stats import TermStatsAggregator
+from .near_duplicates import NearDuplicateIndex, NearDuplicateMatch
+from .warmup import WarmupState, run_warmup
 
 __all__ = [
     # Base LLM
@@ -49,11 +59,38 @@ __all__ = [
     # Anthropic
     "AnthropicService",
     "create_anthropic_service",
+    "LLMResponseCache",
+    "ImagePreprocessor",
+    "PreparedImage",
     # Análise de documentos científicos
     "ClassificationService",
     "ParagraphDetectionService",
     "TextAnalysisService",
     "ComplianceService",
+    "AnalysisResultCache",
     "DocumentAnalysisOrchestrator",
     "InvalidDocumentError",
+    "StageDataMissingError",
+    "JobWorkerPool",
+    "CascadeClassifier",
+    "CascadeOutcome",
+    "TermStatsAggregator",
+    "NearDuplicateIndex",
+    "NearDuplicateMatch",
+    "WarmupState",
+    "run_warmup",
 ]
+
+# Exportações importadas só no primeiro acesso: nome -> módulo
+_LAZY_EXPORTS = {
+    "AnthropicService": "app.services.llm_anthropic",
+    "create_anthropic_service": "app.services.llm_anthropic",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,322 @@
+"""
+Classificação em lote com concorrência limitada e streaming NDJSON.
+
+EXPLICAÇÃO EDUCATIVA:
+Jobs de ingestão que fazem milhares de chamadas `/classify` pagam, em cada
+uma, o overhead de conexão e de multipart. O endpoint `/classify/batch`
+recebe vários arquivos (ou um .zip/.tar) em uma única requisição e:
+
+1. Classifica os itens em paralelo, limitado por um asyncio.Semaphore
+   (evita disparar centenas de chamadas ao LLM de uma só vez)
+2. Envia cada resultado assim que fica pronto, uma linha JSON por item
+   (NDJSON = newline-delimited JSON), sem esperar o lote inteiro
+3. Erros de um item viram uma linha de erro; o lote continua
+4. Ao final, envia uma linha de resumo com throughput e latências p50/p95
+
+O corpo da resposta é enviado depois que o endpoint retorna, e o FastAPI
+fecha os UploadFile do formulário nesse momento. Por isso cada item (e
+cada membro de .zip/.tar) é copiado para um arquivo temporário próprio
+antes da resposta (spool_items); o gerador fecha esses arquivos ao terminar.
+"""
+
+import asyncio
+import json
+import logging
+import tarfile
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional
+
+from app.core.uploads import SpooledUpload, spool_fileobj
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """
+    Item de um lote a classificar.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Montar a lista só lê o índice dos arquivos compactados. O conteúdo é
+    copiado em blocos por spool_items (loader → arquivo temporário, com
+    limite de tamanho), ainda dentro do endpoint. Arquivos pequenos ficam
+    em memória e os grandes vão para disco, então um lote grande não é
+    carregado inteiro na memória. O tipo é detectado pelo conteúdo, não
+    pelo nome.
+
+    Atributos:
+        index: Posição do item no lote
+        filename: Nome do arquivo
+        loader: Função que abre o conteúdo original para leitura
+        upload: Cópia temporária do conteúdo (preenchida por spool_items)
+        error: Falha ao copiar o item (ex.: 413/415), reportada na linha dele
+    """
+
+    index: int
+    filename: str
+    loader: Callable[[], BinaryIO]
+    upload: Optional[SpooledUpload] = None
+    error: Optional[Exception] = None
+
+    def close(self) -> None:
+        """Libera a cópia temporária."""
+        if self.upload is not None:
+            self.upload.close()
+
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+def is_archive(filename: Optional[str]) -> bool:
+    """Verifica se o nome do arquivo indica um .zip ou .tar."""
+    return bool(filename) and filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _is_hidden(name: str) -> bool:
+    """Ignora entradas ocultas (ex: __MACOSX/, .DS_Store)."""
+    return any(part.startswith((".", "__MACOSX")) for part in PurePosixPath(name).parts)
+
+
+class _LockedReader:
+    """
+    Leitor que serializa read() com um lock.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Os membros de um .tar compartilham o mesmo arquivo subjacente e cada
+    leitura faz seek + read nele. Com itens lidos em threads diferentes,
+    o lock evita que uma leitura mova a posição de outra.
+    (ZipFile já faz esse controle internamente.)
+    """
+
+    def __init__(self, fileobj: BinaryIO, lock: threading.Lock):
+        self._fileobj = fileobj
+        self._lock = lock
+
+    def read(self, size: int = -1) -> bytes:
+        with self._lock:
+            return self._fileobj.read(size)
+
+
+def expand_archive(filename: str, fileobj, start_index: int = 0) -> List[BatchItem]:
+    """
+    Converte um arquivo .zip/.tar em itens de lote.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Lemos apenas o índice do arquivo compactado aqui; cada membro é aberto
+    pelo loader e descompactado em streaming por spool_items.
+
+    Args:
+        filename: Nome do arquivo compactado
+        fileobj: Objeto de arquivo com suporte a seek
+        start_index: Índice inicial dos itens gerados
+
+    Returns:
+        Lista de BatchItem (um por arquivo regular)
+
+    Raises:
+        ValueError: Se o arquivo compactado for inválido
+    """
+    items: List[BatchItem] = []
+    lower = filename.lower()
+
+    try:
+        if lower.endswith(".zip"):
+            archive = zipfile.ZipFile(fileobj)
+            members = [m for m in archive.infolist() if not m.is_dir() and not _is_hidden(m.filename)]
+
+            for member in members:
+                def load(member=member) -> BinaryIO:
+                    return archive.open(member)
+
+                items.append(BatchItem(
+                    index=start_index + len(items),
+                    filename=PurePosixPath(member.filename).name,
+                    loader=load
+                ))
+        else:
+            archive = tarfile.open(fileobj=fileobj, mode="r:*")
+            members = [m for m in archive.getmembers() if m.isfile() and not _is_hidden(m.name)]
+            lock = threading.Lock()
+
+            for member in members:
+                def load(member=member) -> BinaryIO:
+                    return _LockedReader(archive.extractfile(member), lock)
+
+                items.append(BatchItem(
+                    index=start_index + len(items),
+                    filename=PurePosixPath(member.name).name,
+                    loader=load
+                ))
+
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ValueError(f"Arquivo compactado inválido '{filename}': {str(e)}")
+
+    return items
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Calcula percentil com interpolação linear.
+
+    Args:
+        values: Lista de valores
+        p: Percentil entre 0 e 100
+
+    Returns:
+        Valor do percentil (0.0 se lista vazia)
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def spool_items(items: List[BatchItem], max_bytes: int, memory_bytes: int) -> None:
+    """
+    Copia o conteúdo de cada item para um arquivo temporário próprio.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Roda antes do endpoint retornar, enquanto os UploadFile ainda estão
+    abertos (use asyncio.to_thread: a leitura e a descompactação são
+    bloqueantes). Erros de um item (tamanho, tipo, membro corrompido)
+    ficam em item.error e viram a linha de erro dele no streaming.
+
+    Args:
+        items: Itens do lote (loader aberto)
+        max_bytes: Tamanho máximo de cada item
+        memory_bytes: Acima deste tamanho a cópia vai para disco
+    """
+    for item in items:
+        try:
+            item.upload = spool_fileobj(item.loader(), item.filename, max_bytes, memory_bytes)
+        except Exception as e:
+            item.error = e
+
+
+async def stream_batch(
+    items: List[BatchItem],
+    classify_item: Callable[[BatchItem, SpooledUpload], Awaitable[str]],
+    max_concurrency: int,
+    error_mapper: Callable[[Exception], Dict],
+) -> AsyncIterator[str]:
+    """
+    Classifica itens em paralelo e produz linhas NDJSON conforme terminam.
+
+    EXPLICAÇÃO EDUCATIVA:
+    asyncio.as_completed devolve as tarefas na ordem em que terminam,
+    não na ordem de submissão. O semáforo limita quantas estão ativas.
+    Ao terminar (ou se o cliente desconectar), as cópias temporárias dos
+    itens são fechadas.
+
+    Args:
+        items: Itens do lote, já copiados por spool_items
+        classify_item: Corrotina (item, upload) -> linha JSON do resultado
+        max_concurrency: Máximo de itens classificados simultaneamente
+        error_mapper: Converte exceção em dict com status_code/message
+
+    Yields:
+        Linhas NDJSON (terminadas em \\n); a última é o resumo do lote
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batch_start = time.perf_counter()
+
+    async def run(item: BatchItem):
+        async with semaphore:
+            item_start = time.perf_counter()
+            try:
+                if item.error is not None:
+                    raise item.error
+                line = await classify_item(item, item.upload)
+                return True, line, (time.perf_counter() - item_start) * 1000
+            except Exception as e:
+                error = {
+                    "error": True,
+                    "index": item.index,
+                    "file_name": item.filename,
+                    **error_mapper(e),
+                }
+                return False, json.dumps(error, ensure_ascii=False), (time.perf_counter() - item_start) * 1000
+
+    tasks = [asyncio.create_task(run(item)) for item in items]
+    latencies: List[float] = []
+    succeeded = 0
+    failed = 0
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            ok, line, latency_ms = await next_done
+            latencies.append(latency_ms)
+            if ok:
+                succeeded += 1
+            else:
+                failed += 1
+            yield line + "\n"
+    finally:
+        # Cliente desconectou: cancelar o que ainda não terminou e esperar
+        # antes de fechar os arquivos que as tarefas ainda podem estar lendo
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for item in items:
+            item.close()
+
+    elapsed_s = time.perf_counter() - batch_start
+
+    summary = {
+        "summary": {
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": failed,
+            "max_concurrency": max_concurrency,
+            "elapsed_seconds": round(elapsed_s, 4),
+            "throughput_docs_per_second": round(len(items) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "max": round(max(latencies), 2) if latencies else 0.0,
+            },
+        }
+    }
+
+    logger.info(
+        f"Lote concluído: {succeeded}/{len(items)} ok em {elapsed_s:.2f}s"
+    )
+
+    yield json.dumps(summary) + "\n"
+
+
+def items_from_upload(index: int, filename: str, upload) -> List[BatchItem]:
+    """
+    Cria itens de lote a partir de um UploadFile do FastAPI.
+
+    Arquivos compactados são expandidos; os demais viram um único item.
+
+    O conteúdo só é lido em spool_items, que deve rodar antes do endpoint
+    retornar (o FastAPI fecha o UploadFile depois disso).
+
+    Args:
+        index: Índice do primeiro item gerado
+        filename: Nome do arquivo enviado
+        upload: UploadFile (usa upload.file, com suporte a seek)
+
+    Returns:
+        Lista de BatchItem
+    """
+    if is_archive(filename):
+        return expand_archive(filename, upload.file, start_index=index)
+
+    def load() -> BinaryIO:
+        upload.file.seek(0)
+        return upload.file
+
+    return [BatchItem(index=index, filename=filename, loader=load)]
+
@@ -0,0 +1,288 @@
+"""
+Classificação em cascata: classificador local primeiro, LLM só na dúvida.
+
+EXPLICAÇÃO EDUCATIVA:
+O SimpleDocumentClassifier (regras sobre features de imagem) responde
+em milissegundos e sem custo, e acerta bem os casos fáceis (emails e
+artigos científicos). O LLM acerta mais categorias, mas custa segundos e
+tokens.
+
+A cascata roda o classificador local e só escala para o LLM quando:
+- a confiança local fica abaixo do threshold
+- o rótulo local é "other" (o classificador local não sabe dizer qual)
+  ou qualquer rótulo fora de DocumentType, que o /classify não consegue
+  devolver (mesmo se CASCADE_ESCALATE_LABELS não o listar)
+- o documento não é imagem nem PDF rasterizável (sem pdfium, o
+  classificador local não lê PDFs)
+- o classificador local falha
+
+PDFs têm a primeira página renderizada pelo mesmo PdfRasterizer do UC1
+(direto do upload, sem gravar em disco) e são classificados como imagens.
+
+Para as requisições resolvidas localmente, a economia é estimada pela
+média de latência e custo das chamadas ao LLM já observadas (chamadas
+servidas pelo cache do LLM não entram na média).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.document_context import DocumentContext
+from app.core.uploads import SpooledUpload
+from app.integrations import ClassificationAPIClient
+from app.integrations.pdf_raster import PdfRasterizer
+from app.models.schemas import CascadeMetadata, DocumentType
+
+logger = logging.getLogger(__name__)
+
+# Rótulos que o /classify sabe devolver (DocumentType)
+_RESPONSE_LABELS = frozenset(item.value for item in DocumentType)
+
+
+def _decode_first_page(upload: SpooledUpload) -> DocumentContext:
+    """Decodifica a primeira página do upload (orientação EXIF aplicada)."""
+    upload.file.seek(0)
+    with Image.open(upload.file) as image:
+        page = ImageOps.exif_transpose(image)
+        page.load()
+    return DocumentContext(file_path=Path(upload.filename), pages=[page])
+
+
+def _is_pdf_upload(upload: SpooledUpload) -> bool:
+    """True se o upload é um PDF."""
+    return upload.content_type == "application/pdf"
+
+
+@dataclass
+class CascadeOutcome:
+    """Resultado da cascata: predição local e, se escalado, do LLM."""
+
+    local_result: Optional[Dict[str, Any]]
+    llm_result: Optional[Dict[str, Any]]
+    metadata: CascadeMetadata
+
+
+class CascadeClassifier:
+    """
+    Classificador local com escalonamento para o LLM.
+
+    Atributos:
+        local_client: Cliente do classificador local (modo LOCAL)
+        threshold: Confiança mínima para aceitar a predição local
+        escalate_labels: Rótulos locais que sempre escalam
+        pdf_rasterizer: Rasterizador da primeira página de PDFs (None =
+            PDFs sempre escalam)
+    """
+
+    def __init__(
+        self,
+        local_client: ClassificationAPIClient,
+        threshold: float = 0.8,
+        escalate_labels: Iterable[str] = ("other",),
+        pdf_rasterizer: Optional[PdfRasterizer] = None
+    ):
+        """
+        Inicializa a cascata.
+
+        Args:
+            local_client: ClassificationAPIClient com use_api=False
+            threshold: Confiança mínima (0.0-1.0) para não escalar
+            escalate_labels: Rótulos que escalam independente da confiança
+            pdf_rasterizer: Rasterizador de PDFs (o mesmo do UC1)
+        """
+        self.local_client = local_client
+        self.threshold = threshold
+        self.escalate_labels = set(escalate_labels)
+        self.pdf_rasterizer = pdf_rasterizer
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "escalated": 0,
+            "reasons": {},
+            "local_latency_ms_total": 0.0,
+            "saved_latency_ms": 0.0,
+            "saved_cost_usd": Decimal("0"),
+        }
+        # Médias das chamadas reais ao LLM (base da economia estimada)
+        self._llm_calls = 0
+        self._llm_latency_ms_total = 0.0
+        self._llm_cost_usd_total = Decimal("0")
+
+        logger.info(
+            f"CascadeClassifier: threshold={threshold}, "
+            f"escalar rótulos={sorted(self.escalate_labels)}"
+        )
+
+    def decide(self, label: str, confidence: float) -> Tuple[bool, str]:
+        """
+        Decide se a predição local deve ser escalada.
+
+        Args:
+            label: Rótulo do classificador local
+            confidence: Confiança local (0.0-1.0)
+
+        Returns:
+            Tupla (escalar, motivo)
+        """
+        if label in self.escalate_labels or label not in _RESPONSE_LABELS:
+            return True, f"label_{label}"
+        if confidence < self.threshold:
+            return True, "low_confidence"
+        return False, "confident"
+
+    def _supports(self, upload: SpooledUpload) -> bool:
+        """True se o classificador local consegue ler o upload."""
+        if upload.content_type.startswith("image/"):
+            return True
+        return _is_pdf_upload(upload) and self.pdf_rasterizer is not None and self.pdf_rasterizer.available
+
+    async def _first_page(self, upload: SpooledUpload) -> DocumentContext:
+        """
+        Decodifica (imagem) ou renderiza (PDF) a primeira página do upload.
+
+        Raises:
+            ValueError: Se o PDF não puder ser renderizado
+        """
+        if not _is_pdf_upload(upload):
+            return await asyncio.to_thread(_decode_first_page, upload)
+
+        raster = await self.pdf_rasterizer.rasterize(upload.file)
+        if not raster:
+            raise ValueError("PDF sem páginas renderizáveis")
+        return DocumentContext(file_path=Path(upload.filename), raster=raster)
+
+    async def classify(
+        self,
+        upload: SpooledUpload,
+        escalate: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> CascadeOutcome:
+        """
+        Classifica um upload pela cascata.
+
+        Args:
+            upload: Arquivo validado
+            escalate: Corrotina que classifica com o LLM (resultado de
+                AnthropicService.classify_document)
+
+        Returns:
+            CascadeOutcome com as predições e os metadados da cascata
+        """
+        start = time.perf_counter()
+        local_result = None
+
+        if self._supports(upload):
+            try:
+                context = await self._first_page(upload)
+                local_result = await self.local_client.classify_page(context)
+                should_escalate, reason = self.decide(
+                    local_result["predicted_type"], local_result["confidence"]
+                )
+            except Exception as e:
+                logger.warning(f"Classificador local falhou, escalando para o LLM: {e}")
+                local_result = None
+                should_escalate, reason = True, "local_error"
+        else:
+            should_escalate, reason = True, "unsupported_format"
+
+        local_latency_ms = (time.perf_counter() - start) * 1000
+
+        llm_result = None
+        saved_latency_ms = None
+        saved_cost_usd = None
+
+        if should_escalate:
+            llm_result = await escalate()
+            self._observe_llm(llm_result["llm_metadata"])
+        else:
+            saved_latency_ms, saved_cost_usd = self._expected_llm_savings()
+
+        self._record(should_escalate, reason, local_latency_ms, saved_latency_ms, saved_cost_usd)
+
+        metadata = CascadeMetadata(
+            escalated=should_escalate,
+            reason=reason,
+            threshold=self.threshold,
+            local_prediction=local_result["predicted_type"] if local_result else None,
+            local_confidence=local_result["confidence"] if local_result else None,
+            local_latency_ms=local_latency_ms,
+            saved_latency_ms=saved_latency_ms,
+            saved_cost_usd=saved_cost_usd
+        )
+
+        logger.info(
+            f"Cascata: {'LLM' if should_escalate else 'local'} ({reason}), "
+            f"local={metadata.local_prediction} {metadata.local_confidence}"
+        )
+
+        return CascadeOutcome(local_result=local_result, llm_result=llm_result, metadata=metadata)
+
+    def _observe_llm(self, llm_metadata) -> None:
+        """Acumula latência/custo de chamadas reais ao LLM."""
+        if llm_metadata.cache_hit:
+            return
+        with self._lock:
+            self._llm_calls += 1
+            self._llm_latency_ms_total += llm_metadata.latency_ms
+            self._llm_cost_usd_total += llm_metadata.total_cost_usd
+
+    def _expected_llm_savings(self) -> Tuple[Optional[float], Optional[Decimal]]:
+        """Latência e custo médios do LLM (None antes da primeira chamada)."""
+        with self._lock:
+            if not self._llm_calls:
+                return None, None
+            return (
+                self._llm_latency_ms_total / self._llm_calls,
+                self._llm_cost_usd_total / self._llm_calls
+            )
+
+    def _record(
+        self,
+        escalated: bool,
+        reason: str,
+        local_latency_ms: float,
+        saved_latency_ms: Optional[float],
+        saved_cost_usd: Optional[Decimal]
+    ) -> None:
+        """Atualiza os contadores agregados."""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["escalated"] += int(escalated)
+            self._stats["reasons"][reason] = self._stats["reasons"].get(reason, 0) + 1
+            self._stats["local_latency_ms_total"] += local_latency_ms
+            self._stats["saved_latency_ms"] += saved_latency_ms or 0.0
+            self._stats["saved_cost_usd"] += saved_cost_usd or Decimal("0")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna taxa de escalonamento e economia acumulada.
+
+        Returns:
+            Contadores, motivos e latência/custo economizados
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["reasons"] = dict(self._stats["reasons"])
+            llm_calls = self._llm_calls
+
+        requests = stats["requests"]
+        return {
+            "threshold": self.threshold,
+            "requests": requests,
+            "escalated": stats["escalated"],
+            "resolved_locally": requests - stats["escalated"],
+            "escalation_rate": stats["escalated"] / requests if requests else 0.0,
+            "reasons": stats["reasons"],
+            "local_latency_ms_avg": stats["local_latency_ms_total"] / requests if requests else 0.0,
+            "llm_calls_observed": llm_calls,
+            "saved_latency_ms": stats["saved_latency_ms"],
+            "saved_cost_usd": float(stats["saved_cost_usd"]),
+        }
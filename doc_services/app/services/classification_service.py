@@ -16,9 +16,12 @@ Este é o primeiro passo do pipeline de análise.
 
 import logging
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 from app.integrations import ClassificationAPIClient
+from app.integrations.pdf_raster import PdfRasterizer
+from app.core.document_context import DocumentContext
+from app.core.executor import CPUExecutor, ExecutorSaturatedError
 
 logger = logging.getLogger(__name__)
 
@@ -38,11 +41,16 @@ class ClassificationService:
     com a API externa de classificação.
     """
 
+    # Versão do classificador (altere ao mudar regras/thresholds)
+    CLASSIFIER_VERSION = "simple-heuristic-1.0"
+
     def __init__(
         self,
         api_url: str = None,
         api_key: str = None,
-        use_api: bool = False
+        use_api: bool = False,
+        executor: Optional[CPUExecutor] = None,
+        pdf_rasterizer: Optional[PdfRasterizer] = None
     ):
         """
         Inicializa serviço de classificação.
@@ -51,17 +59,23 @@ class ClassificationService:
             api_url: URL da API de classificação
             api_key: Chave de autenticação
             use_api: Se True, usa API HTTP; se False, usa classificador local
+            executor: Executor CPU opcional para o classificador local
+            pdf_rasterizer: Rasterizador das primeiras páginas de PDFs
+                (classificador local)
         """
         self.client = ClassificationAPIClient(
             api_url=api_url,
             api_key=api_key,
-            use_api=use_api
+            use_api=use_api,
+            executor=executor,
+            pdf_rasterizer=pdf_rasterizer
         )
         logger.info("ClassificationService inicializado")
 
     async def is_scientific_paper(
         self,
-        file_path: Path
+        file_path: Path,
+        context: Optional[DocumentContext] = None
     ) -> Tuple[bool, float]:
         """
         Verifica se documento é um artigo científico.
@@ -78,6 +92,7 @@ class ClassificationService:
 
         Args:
             file_path: Caminho do arquivo a classificar
+            context: Documento já decodificado (evita reler o arquivo)
 
         Returns:
             Tupla (is_scientific, confidence)
@@ -91,7 +106,7 @@ class ClassificationService:
 
         try:
             # Chamar API de classificação
-            result = await self.client.classify_document(file_path)
+            result = await self.client.classify_document(file_path, context=context)
 
             is_scientific = result["is_scientific_paper"]
             confidence = result.get("confidence", 0.0)
@@ -103,10 +118,24 @@ class ClassificationService:
 
             return is_scientific, confidence
 
+        except ExecutorSaturatedError:
+            raise
+
         except Exception as e:
             logger.error(f"Erro na classificação: {e}")
             raise RuntimeError(f"Falha na classificação do documento: {str(e)}")
 
+    def get_config(self) -> dict:
+        """Retorna configuração do UC1 (usada em chaves de cache)."""
+        rasterizer = self.client.pdf_rasterizer
+        return {
+            "classifier_version": self.CLASSIFIER_VERSION,
+            "use_api": self.client.use_api,
+            "api_url": self.client.api_url,
+            # DPI/páginas mudam o que o classificador vê nos PDFs
+            "pdf_raster": rasterizer.get_config() if rasterizer is not None else None,
+        }
+
     async def close(self):
         """Libera recursos do cliente."""
         await self.client.close()
@@ -87,6 +87,20 @@ class ComplianceService:
 
         return self._template
 
+    def get_config(self) -> dict:
+        """
+        Retorna configuração do UC4 (usada em chaves de cache).
+
+        Inclui o conteúdo do template: editar o template invalida
+        relatórios em cache.
+        """
+        template = self._load_template()
+        return {
+            "min_words": self.MIN_WORDS,
+            "expected_paragraphs": self.EXPECTED_PARAGRAPHS,
+            "template": template.template,
+        }
+
     def validate_compliance(
         self,
         word_count: int,
@@ -0,0 +1,328 @@
+"""
+Workers de jobs assíncronos de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+`/api/v1/analyze` mantém a conexão HTTP aberta durante toda a análise;
+com OCR em PDFs longos isso passa do timeout do load balancer.
+
+Com jobs:
+1. POST /api/v1/jobs grava o arquivo, enfileira o job e responde na hora
+2. Workers em segundo plano (tarefas asyncio) retiram jobs da fila
+   persistente (JobQueue) e executam o DocumentAnalysisOrchestrator
+3. O progresso por etapa é gravado na fila a cada mudança e, durante
+   etapas longas, reenviado periodicamente como heartbeat
+4. GET /api/v1/jobs/{id} lê status, progresso e resultado
+
+Falhas temporárias são repetidas com atraso exponencial; documentos
+inválidos (UC1 rejeitou) falham de imediato, sem nova tentativa.
+Resultados expiram após um TTL e são removidos junto com o arquivo.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.job_queue import Job, JobQueue
+from app.models import AnalysisResult, JobInfo, JobStatus
+from app.services.orchestrator import DocumentAnalysisOrchestrator, InvalidDocumentError
+
+logger = logging.getLogger(__name__)
+
+
+def _to_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    """Converte epoch em datetime (ou None)."""
+    return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+
+class JobWorkerPool:
+    """
+    Pool de workers que executa jobs de análise.
+
+    Atributos:
+        queue: Fila persistente de jobs
+        orchestrator: Orquestrador usado para cada job
+        workers: Número de jobs processados em paralelo neste processo
+        max_attempts: Tentativas por job
+        result_ttl_seconds: Tempo que status/resultado ficam disponíveis
+        retry_backoff_seconds: Atraso base entre tentativas (dobra a cada uma)
+        poll_interval_seconds: Intervalo de consulta à fila quando ociosa
+        heartbeat_interval_seconds: Intervalo máximo entre gravações de
+            progresso de um job em execução
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        orchestrator: DocumentAnalysisOrchestrator,
+        workers: int = 2,
+        max_attempts: int = 3,
+        result_ttl_seconds: float = 86400,
+        retry_backoff_seconds: float = 5.0,
+        poll_interval_seconds: float = 1.0,
+        heartbeat_interval_seconds: Optional[float] = None
+    ):
+        """
+        Inicializa o pool (os workers só rodam após start()).
+
+        Args:
+            queue: Fila persistente de jobs
+            orchestrator: Orquestrador de análise
+            workers: Número de workers
+            max_attempts: Tentativas por job
+            result_ttl_seconds: TTL de status/resultado após concluir
+            retry_backoff_seconds: Atraso base entre tentativas
+            poll_interval_seconds: Intervalo de consulta à fila
+            heartbeat_interval_seconds: Intervalo do heartbeat (padrão: um
+                terço do stale_after_seconds da fila)
+        """
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.result_ttl_seconds = result_ttl_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.heartbeat_interval_seconds = (
+            heartbeat_interval_seconds
+            if heartbeat_interval_seconds is not None
+            else queue.stale_after_seconds / 3
+        )
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        logger.info(f"JobWorkerPool inicializado: {workers} workers")
+
+    def submit(self, file_path: Path, filename: str) -> JobInfo:
+        """
+        Enfileira um job de análise.
+
+        Síncrono (grava no SQLite): as rotas chamam via asyncio.to_thread.
+        Por isso o worker ocioso é acordado com call_soon_threadsafe.
+
+        Args:
+            file_path: Arquivo já gravado em disco (removido ao final do job)
+            filename: Nome original do arquivo
+
+        Returns:
+            JobInfo com status queued
+        """
+        job = self.queue.enqueue(file_path, filename, max_attempts=self.max_attempts)
+
+        # Acorda um worker ocioso deste processo sem esperar o polling
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+        logger.info(f"Job {job.id} enfileirado ({filename})")
+
+        return self.to_info(job)
+
+    def get(self, job_id: str) -> Optional[JobInfo]:
+        """
+        Busca status de um job.
+
+        Síncrono (lê o resultado do SQLite e o valida): chamar via
+        asyncio.to_thread em código async.
+
+        Returns:
+            JobInfo ou None se não existir ou tiver expirado
+        """
+        job = self.queue.get(job_id)
+        return self.to_info(job) if job is not None else None
+
+    @staticmethod
+    def to_info(job: Job) -> JobInfo:
+        """Converte registro da fila no modelo da API."""
+        return JobInfo(
+            job_id=job.id,
+            status=JobStatus(job.status),
+            filename=job.filename,
+            attempts=job.attempts,
+            max_attempts=job.max_attempts,
+            progress=job.progress,
+            result=AnalysisResult.model_validate_json(job.result) if job.result else None,
+            error=job.error,
+            created_at=_to_datetime(job.created_at),
+            updated_at=_to_datetime(job.updated_at),
+            expires_at=_to_datetime(job.expires_at),
+        )
+
+    async def start(self) -> None:
+        """Inicia os workers e a limpeza periódica de jobs expirados."""
+        if self._tasks:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(i)) for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+
+        logger.info(f"{self.workers} workers de jobs iniciados")
+
+    async def stop(self) -> None:
+        """
+        Para os workers.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Jobs interrompidos ficam como "running" na fila e são retomados
+        por outro worker quando o heartbeat expirar (ver JobQueue).
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        self._loop = None
+
+        logger.info("Workers de jobs encerrados")
+
+    async def _worker_loop(self, worker_id: int) -> None:
+        """Retira jobs da fila e os executa até ser cancelado."""
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.result_ttl_seconds)
+            except Exception as e:
+                logger.error(f"[worker {worker_id}] Erro ao consultar fila: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job, worker_id)
+
+    async def _write_progress(
+        self,
+        job: Job,
+        progress: Dict[str, str],
+        changed: asyncio.Event,
+        finished: asyncio.Event
+    ) -> None:
+        """
+        Grava o progresso de um job em execução até ele terminar.
+
+        EXPLICAÇÃO EDUCATIVA:
+        - As gravações SQLite rodam em thread, fora do event loop
+        - Grava a cada mudança de etapa e, sem mudanças, a cada
+          heartbeat_interval_seconds: um UC2 longo (OCR) continua com
+          heartbeat e não é tomado como abandonado por outro worker
+        - Uma única tarefa grava, então as gravações não saem de ordem
+        """
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=self.heartbeat_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            changed.clear()
+
+            try:
+                await asyncio.to_thread(self.queue.update_progress, job.id, dict(progress))
+            except Exception as e:
+                logger.warning(f"Não foi possível gravar progresso do job {job.id}: {e}")
+
+            if finished.is_set():
+                return
+
+    async def _run_job(self, job: Job, worker_id: int) -> None:
+        """
+        Executa um job e registra o desfecho na fila.
+
+        Args:
+            job: Job reservado
+            worker_id: Identificação do worker (logs)
+        """
+        logger.info(f"[worker {worker_id}] Job {job.id}: tentativa {job.attempts}/{job.max_attempts}")
+
+        progress: Dict[str, str] = {}
+        changed = asyncio.Event()
+        finished = asyncio.Event()
+
+        def on_progress(stage: str, status: str) -> None:
+            progress[stage] = status
+            changed.set()
+
+        writer = asyncio.create_task(self._write_progress(job, progress, changed, finished))
+
+        async def flush_progress() -> None:
+            """Última gravação do progresso antes de registrar o desfecho."""
+            finished.set()
+            changed.set()
+            await writer
+
+        try:
+            result = await self.orchestrator.analyze_document(
+                Path(job.file_path),
+                document_id=job.id,
+                original_filename=job.filename,
+                progress_callback=on_progress
+            )
+
+        except InvalidDocumentError as e:
+            # Rejeição do UC1 não muda com novas tentativas
+            await flush_progress()
+            await asyncio.to_thread(self.queue.fail, job.id, str(e), self.result_ttl_seconds)
+            self._remove_file(job)
+            logger.info(f"Job {job.id} rejeitado: {e}")
+            return
+
+        except Exception as e:
+            await flush_progress()
+            if job.attempts < job.max_attempts:
+                delay = self.retry_backoff_seconds * (2 ** (job.attempts - 1))
+                await asyncio.to_thread(self.queue.retry, job.id, str(e), delay)
+                logger.warning(f"Job {job.id} falhou ({e}); nova tentativa em {delay:.0f}s")
+            else:
+                await asyncio.to_thread(self.queue.fail, job.id, str(e), self.result_ttl_seconds)
+                self._remove_file(job)
+                logger.error(f"Job {job.id} falhou definitivamente: {e}")
+            return
+
+        except BaseException:
+            # stop(): sem heartbeat final, o job é retomado quando expirar
+            writer.cancel()
+            raise
+
+        await flush_progress()
+        await asyncio.to_thread(
+            self.queue.complete, job.id, result.model_dump_json(), self.result_ttl_seconds
+        )
+        self._remove_file(job)
+        logger.info(f"Job {job.id} concluído em {result.processing_time_ms:.0f}ms")
+
+    async def _purge_loop(self) -> None:
+        """Remove periodicamente jobs expirados e seus arquivos."""
+        interval = max(min(self.result_ttl_seconds / 2, 300.0), self.poll_interval_seconds)
+
+        while True:
+            try:
+                for job in await asyncio.to_thread(self.queue.purge_expired):
+                    self._remove_file(job)
+            except Exception as e:
+                logger.error(f"Erro ao remover jobs expirados: {e}")
+
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _remove_file(job: Job) -> None:
+        """Remove o arquivo de entrada do job, se ainda existir."""
+        try:
+            Path(job.file_path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Não foi possível remover arquivo do job {job.id}: {e}")
+
+    def get_stats(self) -> dict:
+        """Retorna número de workers e de jobs por status."""
+        return {
+            "workers": self.workers,
+            "started": bool(self._tasks),
+            "jobs": self.queue.counts(),
+        }
@@ -2,16 +2,34 @@
 Service para integração com Anthropic Claude.
 
 Implementa comunicação com a API da Anthropic usando SDK oficial.
+
+EXPLICAÇÃO EDUCATIVA:
+O service é criado uma vez por processo (ver get_llm_service): o cliente
+HTTP mantém um pool de conexões reutilizadas (sem novo handshake TLS por
+requisição) e o LLMRateLimiter limita chamadas simultâneas e a taxa por
+minuto. Erros transientes (429/5xx/conexão) são repetidos com backoff
+exponencial com jitter.
 """
 
 import json
+import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import asyncio
 
-from anthropic import AsyncAnthropic, APIError, APITimeoutError
+from anthropic import (
+    AsyncAnthropic,
+    APIConnectionError,
+    APIError,
+    APIStatusError,
+    APITimeoutError
+)
 import httpx
 
+from app.core import metrics
+from app.core.rate_limit import LLMRateLimiter, backoff_delay
+from app.core.tracing import get_tracer
+
 from app.services.llm_base import (
     BaseLLMService,
     LLMRequest,
@@ -21,6 +39,12 @@ from app.services.llm_base import (
     LLMTimeoutError
 )
 from app.models.schemas import LLMProvider
+from app.services.llm_cache import LLMResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Estimativa de tokens de uma imagem (~1.15 megapixels, limite da API)
+IMAGE_TOKEN_ESTIMATE = 1600
 
 
 class AnthropicService(BaseLLMService):
@@ -43,7 +67,13 @@ class AnthropicService(BaseLLMService):
         input_price_per_1m: float = 1.00,
         output_price_per_1m: float = 5.00,
         max_retries: int = 3,
-        timeout: int = 30
+        timeout: int = 30,
+        response_cache: Optional[LLMResponseCache] = None,
+        limiter: Optional[LLMRateLimiter] = None,
+        base_url: Optional[str] = None,
+        max_connections: int = 20,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0
     ):
         """
         Inicializa o service Anthropic.
@@ -55,6 +85,12 @@ class AnthropicService(BaseLLMService):
             output_price_per_1m: Preço por 1M tokens de saída
             max_retries: Máximo de tentativas em caso de erro
             timeout: Timeout em segundos
+            response_cache: Cache de classificações (None = sempre chama a API)
+            limiter: Limitador de concorrência/taxa (None = sem limite local)
+            base_url: URL alternativa da API (ex.: servidor falso de carga)
+            max_connections: Tamanho do pool de conexões HTTP
+            backoff_base_seconds: Espera base entre tentativas
+            backoff_max_seconds: Espera máxima entre tentativas
         """
         super().__init__(
             api_key=api_key,
@@ -66,13 +102,31 @@ class AnthropicService(BaseLLMService):
             timeout=timeout
         )
 
-        # Criar cliente assíncrono
+        self.response_cache = response_cache
+        self.limiter = limiter
+        self.base_url = base_url
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        # Cliente assíncrono com pool de conexões reutilizáveis. As novas
+        # tentativas ficam a cargo de generate() (max_retries=0 no SDK) para
+        # passarem pelo limitador e serem contabilizadas.
         self.client = AsyncAnthropic(
             api_key=api_key,
+            base_url=base_url,
             timeout=httpx.Timeout(timeout, connect=10.0),
-            max_retries=max_retries
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                )
+            )
         )
 
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "retries_by_status": {}}
+
     async def generate(self, request: LLMRequest, image_data: Optional[Dict[str, Any]] = None) -> LLMResponse:
         """
         Gera resposta usando Anthropic Claude.
@@ -95,9 +149,11 @@ class AnthropicService(BaseLLMService):
             - Suporta análise de imagens (vision)
             - Temperatura 0.0 para respostas determinísticas
             - Rastreamento de tokens para cálculo de custo
-            - Retry automático em caso de erros transientes
+            - Retry com backoff exponencial + jitter em 429/5xx/conexão
+            - Cada tentativa passa pelo limitador (concorrência, RPM, TPM)
         """
         request_timestamp = datetime.utcnow()
+        self._stats["requests"] += 1
 
         try:
             # Preparar conteúdo da mensagem
@@ -129,14 +185,20 @@ class AnthropicService(BaseLLMService):
                 }
             ]
 
-            # Fazer requisição à API
-            response = await self.client.messages.create(
+            # Fazer requisição à API (com novas tentativas)
+            estimated_tokens = self.estimate_tokens(request, image_data)
+            with get_tracer().span(
+                "anthropic.messages",
                 model=self.model,
-                max_tokens=request.max_tokens,
-                temperature=request.temperature,
-                system=request.system_prompt or self.create_system_prompt(),
-                messages=messages
-            )
+                estimated_tokens=estimated_tokens,
+                image_bytes=len(image_data["base64_data"]) * 3 // 4 if image_data else 0
+            ) as span:
+                response = await self._create_with_retries(request, messages, estimated_tokens=estimated_tokens)
+                span.set_attributes(
+                    input_tokens=response.usage.input_tokens,
+                    output_tokens=response.usage.output_tokens,
+                    stop_reason=response.stop_reason
+                )
 
             response_timestamp = datetime.utcnow()
 
@@ -162,11 +224,15 @@ class AnthropicService(BaseLLMService):
             )
 
         except APITimeoutError as e:
+            self._stats["failures"] += 1
+            metrics.LLM_CALLS.labels(provider=self.provider.value, outcome="error").inc()
             raise LLMTimeoutError(
                 f"Timeout ao chamar Anthropic API: {str(e)}"
             ) from e
 
         except APIError as e:
+            self._stats["failures"] += 1
+            metrics.LLM_CALLS.labels(provider=self.provider.value, outcome="error").inc()
             raise LLMAPIError(
                 f"Erro na API Anthropic: {str(e)}"
             ) from e
@@ -176,9 +242,136 @@ class AnthropicService(BaseLLMService):
                 f"Erro ao processar resposta Anthropic: {str(e)}"
             ) from e
 
+    async def _create_with_retries(
+        self,
+        request: LLMRequest,
+        messages: List[Dict[str, Any]],
+        estimated_tokens: int
+    ) -> Any:
+        """
+        Chama a Messages API repetindo erros transientes.
+
+        Argumentos:
+            request: Parâmetros da requisição
+            messages: Mensagens já montadas
+            estimated_tokens: Reserva no limite de tokens/minuto
+
+        Retorna:
+            Resposta do SDK
+
+        Raises:
+            APIError: Erro não transiente ou tentativas esgotadas
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._create_once(request, messages, estimated_tokens)
+            except (APIStatusError, APIConnectionError) as e:
+                status_code = getattr(e, "status_code", None)
+                retryable = status_code is None or status_code == 429 or status_code >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise
+
+                delay = backoff_delay(
+                    attempt,
+                    base_seconds=self.backoff_base_seconds,
+                    max_seconds=self.backoff_max_seconds,
+                    retry_after=self._retry_after(e)
+                )
+                label = str(status_code or "connection")
+                self._stats["retries"] += 1
+                self._stats["retries_by_status"][label] = self._stats["retries_by_status"].get(label, 0) + 1
+                metrics.LLM_RETRIES.labels(provider=self.provider.value, status=label).inc()
+                logger.warning(
+                    f"Anthropic {label}: nova tentativa {attempt + 1}/{self.max_retries} em {delay:.2f}s"
+                )
+
+                with get_tracer().span("anthropic.backoff", status=label, attempt=attempt + 1, delay_s=round(delay, 3)):
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _create_once(
+        self,
+        request: LLMRequest,
+        messages: List[Dict[str, Any]],
+        estimated_tokens: int
+    ) -> Any:
+        """Uma chamada à API, dentro de uma vaga do limitador (se houver)."""
+        kwargs = dict(
+            model=self.model,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature,
+            system=request.system_prompt or self.create_system_prompt(),
+            messages=messages
+        )
+
+        if self.limiter is None:
+            return await self.client.messages.create(**kwargs)
+
+        async with self.limiter.slot(estimated_tokens) as reservation:
+            response = await self.client.messages.create(**kwargs)
+            reservation["actual_tokens"] = response.usage.input_tokens + response.usage.output_tokens
+            return response
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Lê o cabeçalho Retry-After (segundos) da resposta de erro."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def estimate_tokens(request: LLMRequest, image_data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Estima tokens de uma chamada antes de enviá-la.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Aproximação de ~4 caracteres por token para texto, um valor fixo
+        por imagem e max_tokens de saída. O limitador corrige a reserva com
+        o consumo real informado em response.usage.
+
+        Argumentos:
+            request: Requisição
+            image_data: Imagem enviada, se houver
+
+        Retorna:
+            Número estimado de tokens
+        """
+        text_chars = len(request.prompt) + len(request.system_prompt or "")
+        image_tokens = IMAGE_TOKEN_ESTIMATE if image_data else 0
+        return text_chars // 4 + image_tokens + request.max_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de chamadas, novas tentativas e fila.
+
+        Retorna:
+            Dicionário com requests, retries, failures e estado do limitador
+        """
+        stats = {
+            "model": self.model,
+            "base_url": self.base_url,
+            "requests": self._stats["requests"],
+            "retries": self._stats["retries"],
+            "failures": self._stats["failures"],
+            "retries_by_status": dict(self._stats["retries_by_status"]),
+        }
+        if self.limiter is not None:
+            stats["limiter"] = self.limiter.get_stats()
+        return stats
+
+    async def close(self) -> None:
+        """Fecha o pool de conexões HTTP."""
+        await self.client.close()
+
     def _get_endpoint_url(self) -> str:
         """Retorna URL do endpoint da API Anthropic."""
-        return "https://api.anthropic.com/v1/messages"
+        base_url = (self.base_url or "https://api.anthropic.com").rstrip("/")
+        return f"{base_url}/v1/messages"
 
     def create_classification_prompt_with_image(
         self,
@@ -281,7 +474,52 @@ Analise a imagem e responda:"""
             4. Parse da resposta JSON
             5. Validação do tipo retornado
             6. Cálculo de custos e metadados
+
+            Com response_cache, uma classificação já vista (mesma imagem,
+            prompt, modelo e tipos) é devolvida sem chamar a API, com
+            cache_hit=True e custo zero.
         """
+        with get_tracer().span("llm.classify", provider=self.provider.value, image=bool(image_data)) as span:
+            result = await self._classify_document(document_name, available_types, features, image_data)
+            span.set_attributes(
+                predicted_type=result["predicted_type"],
+                confidence=result["confidence"],
+                cache_hit=result["llm_metadata"].cache_hit
+            )
+        return result
+
+    async def _classify_document(
+        self,
+        document_name: str,
+        available_types: list,
+        features: Optional[Dict[str, Any]],
+        image_data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Consulta o cache ou chama o modelo (ver classify_document)."""
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = LLMResponseCache.make_key(
+                model=self.model,
+                prompt_version=self.PROMPT_TEMPLATE_VERSION,
+                available_types=available_types,
+                image_base64=image_data["base64_data"] if image_data else None,
+                document_name=document_name,
+                features=features
+            )
+            lookup_start = datetime.now()
+            entry = self.response_cache.get(cache_key)
+            if entry is not None:
+                return {
+                    "predicted_type": entry["predicted_type"],
+                    "confidence": entry["confidence"],
+                    "reasoning": entry["reasoning"],
+                    "llm_metadata": self.create_cached_llm_metadata(
+                        entry,
+                        request_timestamp=lookup_start,
+                        response_timestamp=datetime.now()
+                    )
+                }
+
         # Criar prompt (adaptado se há imagem)
         if image_data:
             prompt = self.create_classification_prompt_with_image(
@@ -339,8 +577,6 @@ Analise a imagem e responda:"""
             # Adicionar metadados
             result["llm_metadata"] = self.create_llm_metadata(llm_response)
 
-            return result
-
         except json.JSONDecodeError as e:
             raise LLMResponseError(
                 f"Resposta LLM não é JSON válido: {llm_response.content[:200]}"
@@ -351,6 +587,12 @@ Analise a imagem e responda:"""
                 f"Erro ao processar classificação: {str(e)}"
             ) from e
 
+        # Apenas respostas válidas entram no cache
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result)
+
+        return result
+
 
 # Factory function para facilitar criação
 def create_anthropic_service(
@@ -10,6 +10,7 @@ from datetime import datetime
 from decimal import Decimal
 from dataclasses import dataclass
 
+from app.core import metrics
 from app.models.schemas import LLMMetadata, DocumentType, LLMProvider
 
 
@@ -45,6 +46,10 @@ class BaseLLMService(ABC):
     e implementar os métodos abstratos.
     """
 
+    # Versão do template de prompt: incrementar ao alterar os prompts
+    # invalida as respostas guardadas no cache de classificações
+    PROMPT_TEMPLATE_VERSION = "1"
+
     def __init__(
         self,
         api_key: str,
@@ -124,6 +129,14 @@ class BaseLLMService(ABC):
             response.response_timestamp - response.request_timestamp
         ).total_seconds() * 1000
 
+        metrics.record_llm_usage(
+            provider=self.provider.value,
+            model=response.model,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            cost_usd=float(costs["total_cost_usd"])
+        )
+
         return LLMMetadata(
             provider=self.provider,
             model_name=response.model,
@@ -142,6 +155,54 @@ class BaseLLMService(ABC):
             additional_metadata=response.metadata
         )
 
+    def create_cached_llm_metadata(
+        self,
+        entry: Dict[str, Any],
+        request_timestamp: datetime,
+        response_timestamp: datetime
+    ) -> LLMMetadata:
+        """
+        Cria metadados para uma resposta servida pelo cache.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Um hit não consome tokens: custo incremental é zero e a latência é
+        apenas a da consulta ao cache. Os valores da chamada original vão
+        em additional_metadata como economia obtida.
+
+        Argumentos:
+            entry: Entrada do LLMResponseCache
+            request_timestamp: Início da consulta ao cache
+            response_timestamp: Fim da consulta ao cache
+
+        Retorna:
+            Objeto LLMMetadata com cache_hit=True
+        """
+        latency_ms = (response_timestamp - request_timestamp).total_seconds() * 1000
+        metrics.LLM_CALLS.labels(provider=self.provider.value, outcome="cache_hit").inc()
+
+        return LLMMetadata(
+            provider=self.provider,
+            model_name=entry.get("model", self.model),
+            model_version=None,
+            endpoint=self._get_endpoint_url(),
+            input_tokens=0,
+            output_tokens=0,
+            total_tokens=0,
+            input_cost_usd=Decimal("0"),
+            output_cost_usd=Decimal("0"),
+            total_cost_usd=Decimal("0"),
+            request_timestamp=request_timestamp,
+            response_timestamp=response_timestamp,
+            latency_ms=latency_ms,
+            cache_hit=True,
+            additional_metadata={
+                "saved_latency_ms": entry.get("latency_ms"),
+                "saved_cost_usd": entry.get("total_cost_usd"),
+                "saved_tokens": entry.get("input_tokens", 0) + entry.get("output_tokens", 0),
+                "cached_at": entry.get("cached_at"),
+            }
+        )
+
     @abstractmethod
     def _get_endpoint_url(self) -> str:
         """Retorna URL do endpoint da API."""
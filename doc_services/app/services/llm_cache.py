@@ -0,0 +1,159 @@
+"""
+Cache de respostas de classificação do LLM.
+
+EXPLICAÇÃO EDUCATIVA:
+Com temperatura 0.0, a mesma imagem enviada com o mesmo prompt ao mesmo
+modelo produz a mesma classificação. Repetir a chamada só custa latência
+(segundos) e tokens (dinheiro).
+
+A chave combina tudo que pode mudar a resposta:
+- hash da imagem (ou, sem imagem, o nome do arquivo, que é a principal
+  informação do prompt textual)
+- features enviadas no prompt
+- versão do template de prompt (PROMPT_TEMPLATE_VERSION)
+- modelo
+- lista de tipos disponíveis
+
+O nome do arquivo não entra na chave quando há imagem: o prompt visual
+instrui o modelo a não se basear nele, então a mesma imagem com outro
+nome reutiliza a resposta.
+
+Armazenamento: TieredCache (LRU em memória + SQLite opcional), com TTL
+e remoção por tamanho.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache de classificações do LLM.
+
+    Atributos:
+        cache: Armazenamento em dois níveis (com TTL)
+    """
+
+    def __init__(self, cache: TieredCache):
+        """
+        Inicializa o cache.
+
+        Args:
+            cache: Instância de TieredCache (TTL e limites já configurados)
+        """
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._saved = {"latency_ms": 0.0, "cost_usd": 0.0, "tokens": 0}
+
+        logger.info("LLMResponseCache inicializado")
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt_version: str,
+        available_types: List[str],
+        image_base64: Optional[str] = None,
+        document_name: Optional[str] = None,
+        features: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Monta a chave de uma classificação.
+
+        Args:
+            model: Modelo do LLM
+            prompt_version: Versão do template de prompt
+            available_types: Tipos que o LLM pode escolher
+            image_base64: Imagem enviada (base64), se houver
+            document_name: Nome do arquivo (usado só sem imagem)
+            features: Features enviadas no prompt
+
+        Returns:
+            Chave hexadecimal
+        """
+        if image_base64 is not None:
+            content = {"image_sha256": hashlib.sha256(image_base64.encode("ascii")).hexdigest()}
+        else:
+            content = {"document_name": document_name}
+
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt_version": prompt_version,
+                "available_types": sorted(available_types),
+                "features": features,
+                **content,
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca classificação em cache.
+
+        Args:
+            key: Chave (ver make_key)
+
+        Returns:
+            Entrada salva por set() ou None se ausente/expirada
+        """
+        payload = self.cache.get(key)
+        if payload is None:
+            return None
+
+        try:
+            entry = json.loads(payload)
+        except ValueError as e:
+            logger.warning(f"Entrada de cache LLM inválida descartada: {e}")
+            self.cache.delete(key)
+            return None
+
+        with self._lock:
+            self._saved["latency_ms"] += entry.get("latency_ms", 0.0)
+            self._saved["cost_usd"] += float(entry.get("total_cost_usd", 0))
+            self._saved["tokens"] += entry.get("input_tokens", 0) + entry.get("output_tokens", 0)
+
+        return entry
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Armazena classificação.
+
+        Args:
+            key: Chave (ver make_key)
+            result: Resultado de classify_document (com llm_metadata)
+        """
+        metadata = result["llm_metadata"]
+        entry = {
+            "predicted_type": result["predicted_type"],
+            "confidence": result.get("confidence"),
+            "reasoning": result.get("reasoning"),
+            "model": metadata.model_name,
+            "input_tokens": metadata.input_tokens,
+            "output_tokens": metadata.output_tokens,
+            "total_cost_usd": str(metadata.total_cost_usd),
+            "latency_ms": metadata.latency_ms,
+            "cached_at": time.time(),
+        }
+        self.cache.set(key, json.dumps(entry).encode("utf-8"))
+
+    def get_stats(self) -> dict:
+        """Retorna hits/misses e latência, custo e tokens economizados."""
+        with self._lock:
+            saved = dict(self._saved)
+
+        return {
+            **self.cache.get_stats(),
+            "saved_latency_ms": saved["latency_ms"],
+            "saved_cost_usd": saved["cost_usd"],
+            "saved_tokens": saved["tokens"],
+        }
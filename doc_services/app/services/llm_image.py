@@ -0,0 +1,259 @@
+"""
+Pré-processamento de imagens antes da análise visual do LLM.
+
+EXPLICAÇÃO EDUCATIVA:
+A API da Anthropic cobra imagens por área: aproximadamente
+largura x altura / 750 tokens. Imagens acima de ~1.15 megapixels (ou com
+lado maior que 1568 px) são reduzidas pelo próprio servidor, mas só
+DEPOIS do upload: um scan de 600 DPI trafega megabytes em base64 para
+ser descartado em seguida.
+
+Este módulo prepara a imagem no cliente:
+1. Converte formatos não aceitos pela API (TIFF, inclusive multipágina,
+   do qual usa a primeira página) para PNG/JPEG
+2. Reduz para um lado maior configurável (e nunca acima do limite de
+   pixels da API)
+3. Codifica em PNG e em JPEG e envia a menor das duas (PNG costuma
+   ganhar em scans bitonais; JPEG em fotos e tons de cinza)
+
+Imagens já pequenas e em formato aceito seguem sem alteração.
+"""
+
+import base64
+import io
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Formatos aceitos pela API de visão
+SUPPORTED_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+# Limites de redimensionamento do servidor (documentação da API de visão)
+API_MAX_LONG_EDGE = 1568
+API_MAX_PIXELS = 1_150_000
+PIXELS_PER_TOKEN = 750
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """
+    Estima tokens cobrados por uma imagem.
+
+    Aplica o redimensionamento que o servidor faria antes de cobrar, para
+    que a comparação original x enviada não superestime a economia.
+
+    Argumentos:
+        width: Largura em pixels
+        height: Altura em pixels
+
+    Retorna:
+        Tokens estimados
+    """
+    width, height = _fit(width, height, API_MAX_LONG_EDGE, API_MAX_PIXELS)
+    return math.ceil(width * height / PIXELS_PER_TOKEN)
+
+
+def _fit(width: int, height: int, max_long_edge: int, max_pixels: int) -> Tuple[int, int]:
+    """Dimensões reduzidas (proporcionais) para caber nos dois limites."""
+    scale = min(
+        1.0,
+        max_long_edge / max(width, height),
+        math.sqrt(max_pixels / (width * height))
+    )
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+@dataclass
+class PreparedImage:
+    """Imagem pronta para a API, com o relatório de economia."""
+
+    base64_data: str
+    mime_type: str
+    width: int
+    height: int
+    pages: int
+    original_mime_type: str
+    original_bytes: int
+    encoded_bytes: int
+    original_tokens: int
+    estimated_tokens: int
+    transformed: bool
+
+    def to_image_data(self) -> Dict[str, str]:
+        """Formato esperado por AnthropicService.classify_document."""
+        return {"base64_data": self.base64_data, "mime_type": self.mime_type}
+
+    def report(self) -> Dict[str, Any]:
+        """Resumo do pré-processamento (bytes e tokens economizados)."""
+        return {
+            "original_mime_type": self.original_mime_type,
+            "mime_type": self.mime_type,
+            "width": self.width,
+            "height": self.height,
+            "pages": self.pages,
+            "transformed": self.transformed,
+            "original_bytes": self.original_bytes,
+            "encoded_bytes": self.encoded_bytes,
+            "bytes_saved": self.original_bytes - self.encoded_bytes,
+            "original_tokens": self.original_tokens,
+            "estimated_tokens": self.estimated_tokens,
+            "tokens_saved": self.original_tokens - self.estimated_tokens,
+        }
+
+
+class ImagePreprocessor:
+    """
+    Converte, reduz e recodifica imagens para a API de visão.
+
+    Atributos:
+        max_long_edge: Lado maior máximo enviado (px)
+        jpeg_quality: Qualidade da codificação JPEG candidata
+    """
+
+    def __init__(self, max_long_edge: int = 1024, jpeg_quality: int = 85):
+        """
+        Inicializa o pré-processador.
+
+        Argumentos:
+            max_long_edge: Lado maior máximo (limitado ao da API, 1568 px)
+            jpeg_quality: Qualidade JPEG (1-95)
+        """
+        self.max_long_edge = min(max_long_edge, API_MAX_LONG_EDGE)
+        self.jpeg_quality = jpeg_quality
+
+        self._lock = threading.Lock()
+        self._stats = {"images": 0, "transformed": 0, "bytes_saved": 0, "tokens_saved": 0}
+
+    def prepare(self, source: BinaryIO, mime_type: str, size: int) -> PreparedImage:
+        """
+        Prepara uma imagem para envio.
+
+        Argumentos:
+            source: Arquivo da imagem (lido a partir do início)
+            mime_type: Tipo detectado do arquivo
+            size: Tamanho original em bytes
+
+        Retorna:
+            PreparedImage com base64 e relatório
+
+        Raises:
+            ValueError: Arquivo não é uma imagem legível
+        """
+        source.seek(0)
+        try:
+            image = Image.open(source)
+            pages = getattr(image, "n_frames", 1)
+            original_width, original_height = image.size
+            target = _fit(original_width, original_height, self.max_long_edge, API_MAX_PIXELS)
+
+            if mime_type in SUPPORTED_MIME_TYPES and target == image.size:
+                prepared = self._passthrough(source, mime_type, size, image.size, pages)
+            else:
+                prepared = self._transform(image, mime_type, size, target, pages)
+        except (UnidentifiedImageError, OSError) as e:
+            raise ValueError(f"Imagem inválida para análise visual: {e}") from e
+
+        with self._lock:
+            self._stats["images"] += 1
+            self._stats["transformed"] += int(prepared.transformed)
+            self._stats["bytes_saved"] += prepared.original_bytes - prepared.encoded_bytes
+            self._stats["tokens_saved"] += prepared.original_tokens - prepared.estimated_tokens
+
+        logger.debug(f"Imagem para LLM: {prepared.report()}")
+        return prepared
+
+    def _passthrough(
+        self,
+        source: BinaryIO,
+        mime_type: str,
+        size: int,
+        dimensions: Tuple[int, int],
+        pages: int
+    ) -> PreparedImage:
+        """Imagem já adequada: envia os bytes originais."""
+        source.seek(0)
+        tokens = estimate_image_tokens(*dimensions)
+        return PreparedImage(
+            base64_data=base64.b64encode(source.read()).decode("ascii"),
+            mime_type=mime_type,
+            width=dimensions[0],
+            height=dimensions[1],
+            pages=pages,
+            original_mime_type=mime_type,
+            original_bytes=size,
+            encoded_bytes=size,
+            original_tokens=tokens,
+            estimated_tokens=tokens,
+            transformed=False
+        )
+
+    def _transform(
+        self,
+        image: Image.Image,
+        mime_type: str,
+        size: int,
+        target: Tuple[int, int],
+        pages: int
+    ) -> PreparedImage:
+        """Reduz a primeira página e escolhe a menor codificação."""
+        original_tokens = estimate_image_tokens(*image.size)
+
+        # JPEG: o decoder reduz por 1/2, 1/4 ou 1/8 durante a leitura
+        image.seek(0)
+        image.draft(image.mode, target)
+        image = self._normalize_mode(image)
+        if image.size != target:
+            image = image.resize(target, Image.LANCZOS)
+
+        candidates = [self._encode(image, "PNG"), self._encode(image, "JPEG")]
+        encoded, encoded_mime = min(candidates, key=lambda candidate: len(candidate[0]))
+
+        return PreparedImage(
+            base64_data=base64.b64encode(encoded).decode("ascii"),
+            mime_type=encoded_mime,
+            width=image.width,
+            height=image.height,
+            pages=pages,
+            original_mime_type=mime_type,
+            original_bytes=size,
+            encoded_bytes=len(encoded),
+            original_tokens=original_tokens,
+            estimated_tokens=estimate_image_tokens(image.width, image.height),
+            transformed=True
+        )
+
+    @staticmethod
+    def _normalize_mode(image: Image.Image) -> Image.Image:
+        """Converte para L ou RGB (transparência sobre fundo branco)."""
+        if image.mode in ("L", "RGB"):
+            return image
+        if image.mode == "1":
+            # Bitonal -> tons de cinza para redução com antialiasing
+            return image.convert("L")
+        if image.mode in ("RGBA", "LA", "P", "PA") or "transparency" in image.info:
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB")
+
+    def _encode(self, image: Image.Image, fmt: str) -> Tuple[bytes, str]:
+        """Codifica a imagem em PNG ou JPEG."""
+        buffer = io.BytesIO()
+        if fmt == "JPEG":
+            image.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+            return buffer.getvalue(), "image/jpeg"
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), "image/png"
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna imagens processadas e bytes/tokens economizados."""
+        with self._lock:
+            return dict(self._stats)
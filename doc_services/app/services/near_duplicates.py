@@ -0,0 +1,187 @@
+"""
+Índice de quase-duplicatas pela primeira página (hash perceptual).
+
+EXPLICAÇÃO EDUCATIVA:
+Boa parte dos uploads são o mesmo artigo escaneado de novo ou
+reexportado: os bytes mudam e o cache por SHA-256 erra. Cada documento
+analisado com sucesso tem o dHash de 256 bits da primeira página (raster
+do STEP0/RASTER) gravado aqui. Antes do docling, o orquestrador procura
+um documento anterior a no máximo NEAR_DUPLICATE_RADIUS bits e reaproveita
+o resultado dele.
+
+Persistência e vários workers:
+- Os hashes ficam em SQLite (CACHE_DIR/near_duplicates.sqlite3)
+- Cada processo mantém o índice em memória (MultiIndexHash) e, antes de
+  cada consulta, lê só as linhas novas (rowid > último lido): hashes
+  gravados por outros workers aparecem sem recarregar tudo
+
+O raio é um compromisso: grande demais e um artigo diferente no mesmo
+template recebe o resultado de outro; pequeno demais e reescaneamentos
+com ruído não são reconhecidos. O resultado reaproveitado informa o
+documento de origem e a distância (near_duplicate_of/near_duplicate_distance).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Set
+
+from PIL import Image
+
+from app.core.perceptual_hash import MultiIndexHash, dhash
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NearDuplicateMatch:
+    """Documento anterior parecido: hash do arquivo e distância (bits)."""
+
+    file_hash: str
+    distance: int
+
+
+class NearDuplicateIndex:
+    """
+    Hashes perceptuais dos documentos analisados, com busca por raio.
+
+    Atributos:
+        db_path: Arquivo SQLite
+        radius: Distância máxima (bits) para considerar quase-duplicata
+        hash_size: Lado da grade do dHash (hash de hash_size² bits)
+    """
+
+    # Blocos do multi-index hashing (256 bits → blocos de 32 bits)
+    CHUNKS = 8
+
+    def __init__(self, db_path: Path, radius: int = 20, hash_size: int = 16):
+        """
+        Inicializa o índice e carrega os hashes gravados.
+
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+            radius: Distância máxima em bits
+            hash_size: Lado da grade do dHash
+        """
+        self.db_path = Path(db_path)
+        self.radius = radius
+        self.hash_size = hash_size
+        self.bits = hash_size * hash_size
+
+        self._lock = threading.Lock()
+        self._index: MultiIndexHash[str] = MultiIndexHash(bits=self.bits, chunks=self.CHUNKS, radius=radius)
+        self._known: Set[str] = set()
+        self._last_rowid = 0
+        self._lookups = 0
+        self._matches = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # check_same_thread=False: a conexão é protegida por self._lock
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            check_same_thread=False,
+            isolation_level=None  # autocommit
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS perceptual_hashes (
+                file_hash TEXT NOT NULL,
+                bits INTEGER NOT NULL,
+                phash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (file_hash, bits)
+            )
+            """
+        )
+
+        with self._lock:
+            self._sync()
+
+        logger.info(
+            f"NearDuplicateIndex inicializado: {self.db_path}, {len(self._index)} documentos, "
+            f"raio={radius}/{self.bits} bits"
+        )
+
+    def _sync(self) -> None:
+        """Carrega hashes gravados desde a última leitura (chamar com o lock)."""
+        rows = self._conn.execute(
+            "SELECT rowid, file_hash, phash FROM perceptual_hashes "
+            "WHERE rowid > ? AND bits = ? ORDER BY rowid",
+            (self._last_rowid, self.bits)
+        ).fetchall()
+        if not rows:
+            return
+
+        self._last_rowid = rows[-1][0]
+        new = [(file_hash, phash) for _, file_hash, phash in rows if file_hash not in self._known]
+        self._known.update(file_hash for file_hash, _ in new)
+        self._index.add_many(
+            [int(phash, 16) for _, phash in new],
+            [file_hash for file_hash, _ in new]
+        )
+
+    def hash_image(self, image: Image.Image) -> int:
+        """dHash da primeira página."""
+        return dhash(image, self.hash_size)
+
+    def find(self, phash: int, exclude: Optional[str] = None) -> Optional[NearDuplicateMatch]:
+        """
+        Busca o documento anterior mais parecido dentro do raio.
+
+        Args:
+            phash: Hash perceptual do documento atual
+            exclude: Hash do próprio arquivo (não é quase-duplicata de si mesmo)
+
+        Returns:
+            NearDuplicateMatch mais próximo, ou None
+        """
+        with self._lock:
+            self._sync()
+            self._lookups += 1
+            for file_hash, distance in self._index.search(phash):
+                if file_hash != exclude:
+                    self._matches += 1
+                    return NearDuplicateMatch(file_hash=file_hash, distance=distance)
+        return None
+
+    def add(self, file_hash: str, phash: int) -> None:
+        """
+        Registra o hash perceptual de um documento analisado.
+
+        Args:
+            file_hash: SHA-256 do arquivo
+            phash: Hash perceptual da primeira página
+        """
+        with self._lock:
+            if file_hash in self._known:
+                return
+            self._conn.execute(
+                "INSERT OR IGNORE INTO perceptual_hashes (file_hash, bits, phash, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (file_hash, self.bits, format(phash, "x"), time.time())
+            )
+            self._sync()
+
+    def get_stats(self) -> dict:
+        """Retorna tamanho do índice e taxa de quase-duplicatas encontradas."""
+        with self._lock:
+            return {
+                "documents": len(self._index),
+                "radius": self.radius,
+                "bits": self.bits,
+                "lookups": self._lookups,
+                "matches": self._matches,
+                "match_rate": round(self._matches / self._lookups, 4) if self._lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """Fecha a conexão SQLite."""
+        with self._lock:
+            self._conn.close()
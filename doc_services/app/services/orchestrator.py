@@ -19,23 +19,51 @@ UC1 → UC2 → UC3 → UC4
 
 Se UC1 falhar (não é científico), pipeline para.
 Demais UCs executam em sequência.
+
+Modo especulativo (opcional): UC2 inicia junto com UC1 e é descartado
+se UC1 rejeitar o documento (ver SpeculationStats).
+
+Resultados por etapa (opcional): UC1, UC2 e UC3 são gravados no
+StageStore com a versão de cada etapa; uma nova análise do mesmo arquivo
+só recalcula as etapas cuja versão mudou (ver get_stage_versions).
+
+Quase-duplicatas (opcional): reescaneamentos e reexportações de um artigo
+já analisado são reconhecidos pelo hash perceptual da primeira página
+(NearDuplicateIndex) e reaproveitam o resultado anterior sem rodar o docling.
 """
 
+import asyncio
+import json
 import logging
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import uuid
 
-from app.models import AnalysisResult
+from pydantic import TypeAdapter
+
+from app.models import AnalysisResult, Paragraph, TextAnalysis
 from app.services.classification_service import ClassificationService
 from app.services.paragraph_service import ParagraphDetectionService
 from app.services.text_analysis_service import TextAnalysisService
 from app.services.compliance_service import ComplianceService
-from app.services.image_preprocessor import ImagePreprocessor
+from app.services.result_cache import AnalysisResultCache
+from app.services.term_stats import TermStatsAggregator
+from app.services.near_duplicates import NearDuplicateIndex, NearDuplicateMatch
+from app.core import metrics
+from app.core.tracing import get_tracer
+from app.core.executor import CPUExecutor, ExecutorSaturatedError
+from app.core.cache import TieredCache, compute_file_hash, compute_fingerprint
+from app.core.document_context import DocumentContext
+from app.core.stage_store import StageStore
+from app.integrations.pdf_raster import PdfRasterizer, is_pdf, render_pdf_pages
 
 logger = logging.getLogger(__name__)
 
+# Serialização da lista de parágrafos (UC2) no StageStore
+PARAGRAPH_LIST = TypeAdapter(List[Paragraph])
+
 
 class InvalidDocumentError(Exception):
     """
@@ -50,6 +78,70 @@ class InvalidDocumentError(Exception):
     pass
 
 
+class StageDataMissingError(Exception):
+    """
+    Reanálise sem o arquivo original não é possível.
+
+    EXPLICAÇÃO EDUCATIVA:
+    UC3/UC4 podem ser refeitos a partir dos parágrafos armazenados, mas se
+    a versão do UC1 ou do UC2 mudou (ex.: novo perfil do docling), é
+    preciso reenviar o arquivo.
+
+    Atributos:
+        stages: Etapas ausentes ou desatualizadas
+    """
+
+    def __init__(self, message: str, stages: List[str]):
+        super().__init__(message)
+        self.stages = stages
+
+
+@dataclass
+class SpeculationStats:
+    """
+    Estatísticas do modo especulativo (UC2 em paralelo com UC1).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Especular só compensa se a maioria dos documentos passa no UC1.
+    - wasted_work_ratio: fração do tempo de UC2 especulativo gasto em
+      documentos rejeitados (trabalho jogado fora)
+    - overlap_saved_ms: latência economizada nos documentos aceitos
+      (UC1 e UC2 sobrepostos em vez de em sequência)
+
+    Atributos:
+        speculated: Análises que iniciaram UC2 especulativo
+        used: UC2 aproveitado (UC1 aprovou)
+        discarded: UC2 descartado (UC1 rejeitou ou falhou)
+        cancelled: Descartados ainda em andamento (cancelados)
+        used_uc2_ms: Tempo total de UC2 aproveitado
+        wasted_uc2_ms: Tempo total de UC2 descartado
+        overlap_saved_ms: Tempo total economizado pela sobreposição
+    """
+
+    speculated: int = 0
+    used: int = 0
+    discarded: int = 0
+    cancelled: int = 0
+    used_uc2_ms: float = 0.0
+    wasted_uc2_ms: float = 0.0
+    overlap_saved_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Converte estatísticas para dicionário serializável."""
+        total_uc2_ms = self.used_uc2_ms + self.wasted_uc2_ms
+        return {
+            "speculated": self.speculated,
+            "used": self.used,
+            "discarded": self.discarded,
+            "cancelled": self.cancelled,
+            "discard_rate": self.discarded / self.speculated if self.speculated else 0.0,
+            "used_uc2_ms": self.used_uc2_ms,
+            "wasted_uc2_ms": self.wasted_uc2_ms,
+            "wasted_work_ratio": self.wasted_uc2_ms / total_uc2_ms if total_uc2_ms else 0.0,
+            "overlap_saved_ms": self.overlap_saved_ms,
+        }
+
+
 class DocumentAnalysisOrchestrator:
     """
     Orquestrador de análise de documentos.
@@ -75,12 +167,22 @@ class DocumentAnalysisOrchestrator:
     Coordena todos os serviços e agrega resultados.
     """
 
+    # Número de palavras mais frequentes retornadas no UC3
+    TOP_N_WORDS = 10
+
     def __init__(
         self,
         classification_service: ClassificationService,
         paragraph_service: ParagraphDetectionService,
         text_analysis_service: TextAnalysisService,
-        compliance_service: ComplianceService
+        compliance_service: ComplianceService,
+        executor: Optional[CPUExecutor] = None,
+        result_cache_backend: Optional[TieredCache] = None,
+        speculative_uc2: bool = False,
+        stage_store: Optional[StageStore] = None,
+        term_stats: Optional[TermStatsAggregator] = None,
+        pdf_rasterizer: Optional[PdfRasterizer] = None,
+        near_duplicates: Optional[NearDuplicateIndex] = None
     ):
         """
         Inicializa orchestrator com serviços.
@@ -97,20 +199,301 @@ class DocumentAnalysisOrchestrator:
             paragraph_service: Serviço de detecção de parágrafos (UC2)
             text_analysis_service: Serviço de análise textual (UC3)
             compliance_service: Serviço de conformidade (UC4)
+            executor: Executor CPU opcional. Quando fornecido, a
+                decodificação (STEP 0) roda fora do event loop; UC1 e
+                UC2 usam o executor recebido pelos respectivos serviços.
+            result_cache_backend: Armazenamento opcional para o cache de
+                resultados. A chave inclui o fingerprint da configuração
+                de todos os serviços (ver get_pipeline_config).
+            speculative_uc2: Se True, inicia UC2 junto com UC1 e descarta
+                o resultado se UC1 rejeitar o documento.
+            stage_store: Armazenamento opcional dos resultados de UC1, UC2
+                e UC3 por hash do arquivo e versão da etapa.
+            term_stats: Agregador opcional dos termos mais frequentes do
+                acervo (recebe as frequências de cada análise concluída).
+            pdf_rasterizer: Rasterizador opcional das primeiras páginas de
+                PDFs para o UC1 local (etapa RASTER). Só faz sentido com o
+                classificador local; no modo API o arquivo é enviado inteiro.
+            near_duplicates: Índice opcional de hashes perceptuais da
+                primeira página. Documento dentro do raio de um anterior
+                reaproveita o resultado (cache de resultados) ou as etapas
+                armazenadas dele.
         """
         self.classification_service = classification_service
         self.paragraph_service = paragraph_service
         self.text_analysis_service = text_analysis_service
         self.compliance_service = compliance_service
-        self.image_preprocessor = ImagePreprocessor()
+        self.executor = executor
+        self.speculative_uc2 = speculative_uc2
+        self.speculation_stats = SpeculationStats()
+        self.stage_store = stage_store
+        self.term_stats = term_stats
+        self.pdf_rasterizer = pdf_rasterizer
+        self.near_duplicates = near_duplicates
+        self.stage_versions = self.get_stage_versions()
+
+        self.result_cache = None
+        if result_cache_backend is not None:
+            self.result_cache = AnalysisResultCache(
+                cache=result_cache_backend,
+                config_fingerprint=compute_fingerprint(self.get_pipeline_config())
+            )
 
         logger.info("DocumentAnalysisOrchestrator inicializado")
 
+    def get_pipeline_config(self) -> dict:
+        """
+        Retorna configuração completa do pipeline UC1→UC4.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Reúne tudo que pode alterar o resultado final: versão do
+        classificador, opções do docling, stopwords, regras de
+        conformidade e template. Serve de base para o fingerprint
+        do cache de resultados.
+        """
+        return {
+            "uc1": self.classification_service.get_config(),
+            "uc2": self.paragraph_service.get_config(),
+            "uc3": {**self.text_analysis_service.get_config(), "top_n": self.TOP_N_WORDS},
+            "uc4": self.compliance_service.get_config(),
+        }
+
+    def get_stage_versions(self) -> Dict[str, str]:
+        """
+        Retorna a versão atual de cada etapa persistida.
+
+        EXPLICAÇÃO EDUCATIVA:
+        A versão é o fingerprint da configuração da etapa. UC3 consome os
+        parágrafos do UC2, então sua versão inclui a do UC2: mudar o
+        docling invalida UC2 e UC3; mudar as stopwords invalida só o UC3.
+        UC4 não é persistido (validar e gerar o relatório custa microssegundos).
+        """
+        config = self.get_pipeline_config()
+        uc2_version = compute_fingerprint(config["uc2"])
+        return {
+            "UC1": compute_fingerprint(config["uc1"]),
+            "UC2": uc2_version,
+            "UC3": compute_fingerprint({"uc3": config["uc3"], "uc2": uc2_version}),
+        }
+
+    @staticmethod
+    def _stage_variant(stage: str, profile: Optional[str]) -> str:
+        """UC1 não depende do perfil docling; UC2 e UC3 sim."""
+        return "" if stage == "UC1" else (profile or "")
+
+    async def _load_stages(self, file_hash: str, profile: Optional[str]) -> Dict[str, Any]:
+        """
+        Carrega do StageStore as etapas gravadas na versão atual.
+
+        EXPLICAÇÃO: leitura no SQLite e desserialização (o UC2 pode ter
+        milhares de parágrafos) rodam em thread, fora do event loop.
+
+        Returns:
+            Ver _read_stages
+        """
+        if self.stage_store is None:
+            return {}
+        return await asyncio.to_thread(self._read_stages, file_hash, profile)
+
+    def _read_stages(self, file_hash: str, profile: Optional[str]) -> Dict[str, Any]:
+        """
+        Lê as etapas do StageStore (síncrono; usar via _load_stages).
+
+        Returns:
+            {"UC1": (is_scientific, confidence), "UC2": [Paragraph],
+            "UC3": TextAnalysis}, apenas com as etapas encontradas
+        """
+        stored: Dict[str, Any] = {}
+        if self.stage_store is None:
+            return stored
+
+        for stage in ("UC1", "UC2", "UC3"):
+            try:
+                payload = self.stage_store.get(
+                    file_hash, stage, self._stage_variant(stage, profile), self.stage_versions[stage]
+                )
+                if payload is None:
+                    continue
+                if stage == "UC1":
+                    verdict = json.loads(payload)
+                    stored[stage] = (verdict["is_scientific"], verdict["confidence"])
+                elif stage == "UC2":
+                    stored[stage] = PARAGRAPH_LIST.validate_json(payload)
+                else:
+                    stored[stage] = TextAnalysis.model_validate_json(payload)
+            except Exception as e:
+                # Entrada corrompida ou de schema antigo: etapa é recalculada
+                logger.warning(f"Resultado armazenado de {stage} ignorado: {e}")
+
+        return stored
+
+    async def _save_stage(
+        self,
+        file_hash: Optional[str],
+        stage: str,
+        profile: Optional[str],
+        value: Any,
+        filename: str
+    ) -> None:
+        """Grava resultado de uma etapa em thread (falha no armazenamento não invalida a análise)."""
+        if self.stage_store is None or file_hash is None:
+            return
+        await asyncio.to_thread(self._write_stage, file_hash, stage, profile, value, filename)
+
+    def _write_stage(
+        self,
+        file_hash: str,
+        stage: str,
+        profile: Optional[str],
+        value: Any,
+        filename: str
+    ) -> None:
+        """Serializa e grava uma etapa (síncrono; usar via _save_stage)."""
+        try:
+            if stage == "UC1":
+                payload = json.dumps({"is_scientific": value[0], "confidence": value[1]})
+            elif stage == "UC2":
+                payload = PARAGRAPH_LIST.dump_json(value).decode("utf-8")
+            else:
+                payload = value.model_dump_json()
+
+            self.stage_store.put(
+                file_hash,
+                stage,
+                self._stage_variant(stage, profile),
+                self.stage_versions[stage],
+                payload,
+                filename=filename
+            )
+        except Exception as e:
+            logger.warning(f"Não foi possível armazenar resultado de {stage}: {e}")
+
+    def _record_terms(self, text_analysis: TextAnalysis) -> None:
+        """Soma as frequências do documento ao agregador do acervo (se houver)."""
+        if self.term_stats is None:
+            return
+        try:
+            self.term_stats.add_document(text_analysis.word_frequencies)
+        except Exception as e:
+            logger.warning(f"Não foi possível agregar termos do documento: {e}")
+
+    async def _compute_file_hash(self, file_path: Path) -> str:
+        """Calcula SHA-256 do arquivo (fora do event loop se houver executor)."""
+        if self.executor is not None:
+            return await self.executor.run_in_thread("HASH", compute_file_hash, file_path)
+        return compute_file_hash(file_path)
+
+    def _result_from_cache(
+        self,
+        cached: AnalysisResult,
+        filename: str,
+        document_id: str,
+        start_time: float
+    ) -> AnalysisResult:
+        """
+        Adapta resultado em cache para a requisição atual.
+
+        EXPLICAÇÃO EDUCATIVA:
+        O conteúdo é o mesmo, mas nome do arquivo e ID podem mudar entre
+        uploads. O relatório markdown (UC4) é barato, então é regerado
+        para refletir o nome/ID atuais.
+        """
+        cached.filename = filename
+        cached.document_id = document_id
+        cached.compliance_report_markdown = self.compliance_service.generate_report(
+            filename=filename,
+            word_count=cached.text_analysis.total_words,
+            paragraph_count=len(cached.paragraphs),
+            document_id=document_id,
+            notes=None
+        )
+        cached.processing_time_ms = (time.time() - start_time) * 1000
+
+        logger.info(
+            f"Resultado servido do cache em {cached.processing_time_ms:.2f}ms"
+        )
+
+        return cached
+
+    async def _result_from_near_duplicate(
+        self,
+        cached: AnalysisResult,
+        match: NearDuplicateMatch,
+        file_hash: str,
+        profile: Optional[str],
+        filename: str,
+        document_id: str,
+        start_time: float
+    ) -> AnalysisResult:
+        """
+        Adapta o resultado de uma quase-duplicata para a requisição atual.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Além de nome/ID (ver _result_from_cache), o resultado informa de
+        qual documento veio e a distância, e é gravado também sob o hash
+        deste arquivo: o próximo envio dos mesmos bytes é um acerto exato.
+        """
+        result = self._result_from_cache(cached, filename, document_id, start_time)
+        result.near_duplicate_of = match.file_hash
+        result.near_duplicate_distance = match.distance
+
+        try:
+            await asyncio.to_thread(self.result_cache.set, file_hash, result, variant=profile or "")
+        except Exception as cache_error:
+            logger.warning(f"Não foi possível armazenar em cache: {cache_error}")
+
+        return result
+
+    async def _timed_uc2(
+        self,
+        file_path: Path,
+        context: DocumentContext,
+        profile: Optional[str] = None
+    ) -> Tuple[List[Paragraph], float]:
+        """Executa UC2 medindo a duração (ms), para o modo especulativo."""
+        start = time.perf_counter()
+        with get_tracer().span("UC2", speculative=True) as span:
+            paragraphs = await self.paragraph_service.detect_paragraphs_async(
+                file_path,
+                context=context,
+                profile=profile
+            )
+            span.set_attribute("paragraphs", len(paragraphs))
+        return paragraphs, (time.perf_counter() - start) * 1000
+
+    async def _discard_speculation(self, task: asyncio.Task, started_at: float) -> None:
+        """
+        Cancela/descarta UC2 especulativo após rejeição ou falha do UC1.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Se o UC2 ainda aguarda na fila do executor, o cancelamento evita
+        o trabalho. Se o docling já está rodando em um worker, ele não pode
+        ser interrompido: termina em segundo plano e o resultado é ignorado.
+        """
+        stats = self.speculation_stats
+        stats.discarded += 1
+
+        if task.done():
+            if not task.cancelled() and task.exception() is None:
+                stats.wasted_uc2_ms += task.result()[1]
+            return
+
+        stats.cancelled += 1
+        stats.wasted_uc2_ms += (time.perf_counter() - started_at) * 1000
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def get_speculation_stats(self) -> dict:
+        """Retorna estatísticas do modo especulativo."""
+        return {"enabled": self.speculative_uc2, **self.speculation_stats.to_dict()}
+
     async def analyze_document(
         self,
         file_path: Path,
         document_id: Optional[str] = None,
-        original_filename: Optional[str] = None
+        original_filename: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, str], None]] = None,
+        profile: Optional[str] = None
     ) -> AnalysisResult:
         """
         Executa análise completa de um documento.
@@ -133,6 +516,12 @@ class DocumentAnalysisOrchestrator:
             file_path: Caminho do arquivo a analisar
             document_id: ID opcional do documento
             original_filename: Nome original do arquivo (antes de salvar temporariamente)
+            progress_callback: Função opcional chamada como
+                callback(etapa, "running" | "done") ao iniciar e concluir
+                cada etapa (CACHE, STEP0, RASTER, NEARDUP, UC1..UC4). Usada pelos jobs
+                assíncronos para reportar progresso.
+            profile: Perfil docling do UC2 (fast, balanced, accurate);
+                None usa o perfil padrão do serviço de parágrafos
 
         Returns:
             AnalysisResult com todos os resultados agregados
@@ -151,52 +540,211 @@ class DocumentAnalysisOrchestrator:
 
         logger.info(f"Iniciando análise de {filename} (ID: {document_id})")
 
-        # Variável para rastrear se criamos arquivo temporário corrigido
-        corrected_file_path = None
-        file_was_corrected = False
+        # Histogramas por etapa a partir dos mesmos eventos de progresso
+        stage_timer = metrics.StageTimer()
+        outcome = "error"
+
+        def report(stage: str, status: str) -> None:
+            stage_timer.mark(stage, status)
+            # Falha ao reportar progresso não deve interromper a análise
+            if progress_callback is not None:
+                try:
+                    progress_callback(stage, status)
+                except Exception as callback_error:
+                    logger.warning(f"Erro ao reportar progresso ({stage}): {callback_error}")
+
+        file_hash = None
+        metrics.ANALYSIS_IN_FLIGHT.inc()
+
+        # Span raiz do trace: etapas, docling, classificador e executor viram filhos
+        tracer = get_tracer()
+        trace_span = tracer.start_span(
+            "analysis",
+            document_id=document_id,
+            filename=filename,
+            bytes=file_path.stat().st_size if file_path.exists() else None,
+            profile=profile
+        )
 
         try:
             # ================================================================
-            # STEP 0: PRÉ-PROCESSAMENTO DE IMAGEM
+            # CACHE: conteúdo já analisado com a mesma configuração?
             # ================================================================
+            if self.result_cache is not None or self.stage_store is not None or self.near_duplicates is not None:
+                file_hash = await self._compute_file_hash(file_path)
+
+            # EXPLICAÇÃO: leitura/gravação no cache (SQLite, resultados de
+            # vários MB) e a desserialização rodam em thread, fora do event loop
+            if self.result_cache is not None:
+                cached = await asyncio.to_thread(self.result_cache.get, file_hash, variant=profile or "")
+                if cached is not None:
+                    report("CACHE", "done")
+                    outcome = "cached"
+                    return self._result_from_cache(cached, filename, document_id, start_time)
+
             # EXPLICAÇÃO EDUCATIVA:
-            # Antes de processar, verificamos se é uma imagem (não PDF)
-            # e corrigimos a orientação se necessário.
-            # Problema: Imagens escaneadas podem estar rotacionadas (0°, 90°, 180°, 270°)
-            # causando OCR ilegível. Corrigimos automaticamente usando EXIF.
+            # Etapas gravadas na versão atual são reaproveitadas: se só as
+            # regras de UC3/UC4 mudaram, o docling (UC2) não roda de novo.
+            stored = await self._load_stages(file_hash, profile) if file_hash is not None else {}
+            if stored:
+                logger.info(f"Etapas reaproveitadas do armazenamento: {', '.join(stored)}")
 
-            image_extensions = {'.png', '.jpg', '.jpeg', '.tif', '.tiff'}
-            if file_path.suffix.lower() in image_extensions:
-                logger.info("[STEP 0] Verificando orientação da imagem...")
+            # Quase-duplicatas só interessam se o docling (UC2) ainda vai rodar
+            lookup_near_duplicate = self.near_duplicates is not None and "UC2" not in stored
 
-                corrected_file_path, file_was_corrected = self.image_preprocessor.correct_orientation(
-                    file_path
-                )
+            # ================================================================
+            # STEP 0: DECODIFICAÇÃO E PRÉ-PROCESSAMENTO
+            # ================================================================
+            # EXPLICAÇÃO EDUCATIVA:
+            # O arquivo é lido e decodificado uma única vez. Imagens
+            # escaneadas podem estar rotacionadas (0°, 90°, 180°, 270°),
+            # o que deixa o OCR ilegível; a orientação EXIF é aplicada em
+            # memória. UC1 e UC2 consomem o mesmo DocumentContext, sem
+            # reler o arquivo nem gravar cópias corrigidas em disco.
+            # Com UC1 e UC2 armazenados, o arquivo nem é decodificado.
+            context = None
+            if "UC1" not in stored or "UC2" not in stored:
+                logger.info("[STEP 0] Decodificando documento...")
+                report("STEP0", "running")
+
+                with tracer.span("STEP0") as span:
+                    if self.executor is not None:
+                        context = await self.executor.run_in_thread("STEP0", DocumentContext.load, file_path)
+                    else:
+                        context = DocumentContext.load(file_path)
+                    span.set_attributes(pages=len(context.pages), rotated=context.was_rotated, is_image=context.is_image)
+
+                if context.was_rotated:
+                    logger.info("[STEP 0] Imagem corrigida! Usando versão com orientação ajustada")
+                elif not context.is_image:
+                    logger.info("[STEP 0] PDF detectado - pular pré-processamento de imagem")
+
+                report("STEP0", "done")
+
+            # ================================================================
+            # RASTER: PRIMEIRAS PÁGINAS DO PDF PARA O UC1
+            # ================================================================
+            # EXPLICAÇÃO EDUCATIVA:
+            # O classificador trabalha sobre pixels. Em vez de converter o
+            # PDF inteiro, o pdfium renderiza só as primeiras páginas em DPI
+            # baixo (dezenas de ms; reenvios vêm do cache por hash). O UC2
+            # continua lendo o PDF original.
+            if (
+                self.pdf_rasterizer is not None
+                and context is not None
+                and not context.is_image
+                and ("UC1" not in stored or lookup_near_duplicate)
+                and is_pdf(file_path)
+            ):
+                report("RASTER", "running")
+                with tracer.span("RASTER") as span:
+                    context.raster = await self.pdf_rasterizer.rasterize(file_path, file_hash)
+                    span.set_attributes(pages=len(context.raster))
+                report("RASTER", "done")
+
+            # ================================================================
+            # NEARDUP: MESMO ARTIGO EM OUTRO ARQUIVO?
+            # ================================================================
+            # EXPLICAÇÃO EDUCATIVA:
+            # Reescaneamentos e reexportações têm outro SHA-256, mas a
+            # primeira página é quase igual. Com um documento anterior no
+            # raio, o resultado dele é servido (cache de resultados) ou
+            # UC1-UC3 vêm do armazenamento de etapas dele, sem docling.
+            phash = None
+            near_match = None
+            if lookup_near_duplicate and context is not None and context.first_page is not None:
+                report("NEARDUP", "running")
+                with tracer.span("NEARDUP") as span:
+                    # Redução da página (LANCZOS) fora do event loop se houver executor
+                    if self.executor is not None:
+                        phash = await self.executor.run_in_thread(
+                            "NEARDUP", self.near_duplicates.hash_image, context.first_page
+                        )
+                    else:
+                        phash = self.near_duplicates.hash_image(context.first_page)
+                    # Leitura do SQLite (hashes novos de outros workers) em thread
+                    near_match = await asyncio.to_thread(self.near_duplicates.find, phash, exclude=file_hash)
+                    span.set_attributes(
+                        match=near_match.file_hash if near_match else None,
+                        distance=near_match.distance if near_match else None
+                    )
+                report("NEARDUP", "done")
 
-                if file_was_corrected:
+            if near_match is not None:
+                cached = None
+                if self.result_cache is not None:
+                    cached = await asyncio.to_thread(
+                        self.result_cache.get, near_match.file_hash, variant=profile or ""
+                    )
+
+                if cached is not None:
+                    outcome = "near_duplicate"
+                    logger.info(
+                        f"Quase-duplicata de {near_match.file_hash[:12]} "
+                        f"({near_match.distance} bits): resultado reaproveitado"
+                    )
+                    return await self._result_from_near_duplicate(
+                        cached, near_match, file_hash, profile, filename, document_id, start_time
+                    )
+
+                matched = await self._load_stages(near_match.file_hash, profile)
+                if matched:
                     logger.info(
-                        f"[STEP 0] Imagem corrigida! Usando versão com orientação ajustada"
+                        f"Quase-duplicata de {near_match.file_hash[:12]} ({near_match.distance} bits): "
+                        f"etapas reaproveitadas: {', '.join(matched)}"
                     )
-                    # Usar arquivo corrigido no resto do pipeline
-                    processing_file = corrected_file_path
+                    for stage, value in matched.items():
+                        stored.setdefault(stage, value)
                 else:
-                    logger.info("[STEP 0] Imagem já está na orientação correta")
-                    processing_file = file_path
-            else:
-                # PDF não precisa de correção de orientação
-                logger.info("[STEP 0] PDF detectado - pular pré-processamento de imagem")
-                processing_file = file_path
+                    near_match = None  # nada a reaproveitar: análise completa
+
+            # ================================================================
+            # UC2 ESPECULATIVO (opcional)
+            # ================================================================
+            # EXPLICAÇÃO EDUCATIVA:
+            # UC2 (docling + OCR) domina a latência e a maioria dos
+            # documentos passa no UC1. No modo especulativo, UC2 começa
+            # junto com UC1; se UC1 rejeitar, UC2 é cancelado/descartado.
+            # A tarefa só é criada aqui, logo antes do UC1, que é o único
+            # await protegido pelo descarte: criada antes de RASTER/NEARDUP,
+            # uma falha ou cancelamento nessas etapas a deixaria órfã.
+            speculative_task = None
+            speculation_start = time.perf_counter()
+            if self.speculative_uc2 and "UC1" not in stored and "UC2" not in stored:
+                self.speculation_stats.speculated += 1
+                speculative_task = asyncio.create_task(self._timed_uc2(file_path, context, profile))
+                report("UC2", "running")
 
             # ================================================================
             # UC1: CLASSIFICAÇÃO
             # ================================================================
-            logger.info("[UC1] Classificando documento...")
+            uc1_ms = 0.0
+            if "UC1" in stored:
+                is_scientific, confidence = stored["UC1"]
+            else:
+                logger.info("[UC1] Classificando documento...")
+                report("UC1", "running")
 
-            is_scientific, confidence = await self.classification_service.is_scientific_paper(
-                file_path
-            )
+                uc1_start = time.perf_counter()
+                try:
+                    with tracer.span("UC1") as span:
+                        is_scientific, confidence = await self.classification_service.is_scientific_paper(
+                            file_path,
+                            context=context
+                        )
+                        span.set_attributes(is_scientific=is_scientific, confidence=confidence)
+                except BaseException:
+                    if speculative_task is not None:
+                        await self._discard_speculation(speculative_task, speculation_start)
+                    raise
+
+                uc1_ms = (time.perf_counter() - uc1_start) * 1000
+                await self._save_stage(file_hash, "UC1", profile, (is_scientific, confidence), filename)
 
             if not is_scientific:
+                if speculative_task is not None:
+                    await self._discard_speculation(speculative_task, speculation_start)
+
                 logger.warning(
                     f"Documento rejeitado: não é artigo científico "
                     f"(confiança: {confidence:.2%})"
@@ -207,56 +755,91 @@ class DocumentAnalysisOrchestrator:
                 )
 
             logger.info(f"[UC1] Documento aprovado como artigo científico")
+            report("UC1", "done")
 
             # ================================================================
             # UC2: DETECÇÃO DE PARÁGRAFOS
             # ================================================================
             logger.info("[UC2] Detectando parágrafos...")
+            report("UC2", "running")
+
+            # EXPLICAÇÃO: versão async delega o docling ao executor CPU,
+            # mantendo o event loop livre para outras requisições. Se a
+            # imagem foi corrigida, o docling recebe a versão em memória.
+            if "UC2" in stored:
+                paragraphs = stored["UC2"]
+            elif speculative_task is not None:
+                paragraphs, uc2_ms = await speculative_task
+                self.speculation_stats.used += 1
+                self.speculation_stats.used_uc2_ms += uc2_ms
+                self.speculation_stats.overlap_saved_ms += min(uc1_ms, uc2_ms)
+            else:
+                with tracer.span("UC2", speculative=False) as span:
+                    paragraphs = await self.paragraph_service.detect_paragraphs_async(
+                        file_path,
+                        context=context,
+                        profile=profile
+                    )
+                    span.set_attribute("paragraphs", len(paragraphs))
 
-            # IMPORTANTE: Usar processing_file (pode ser versão corrigida)
-            paragraphs = self.paragraph_service.detect_paragraphs(processing_file)
+            if "UC2" not in stored:
+                await self._save_stage(file_hash, "UC2", profile, paragraphs, filename)
 
             logger.info(f"[UC2] Detectados {len(paragraphs)} parágrafos")
+            report("UC2", "done")
 
             # ================================================================
             # UC3: ANÁLISE TEXTUAL
             # ================================================================
             logger.info("[UC3] Analisando texto...")
+            report("UC3", "running")
 
-            text_analysis = self.text_analysis_service.analyze_text(
-                paragraphs=paragraphs,
-                top_n=10
-            )
+            if "UC3" in stored:
+                text_analysis = stored["UC3"]
+            else:
+                with tracer.span("UC3") as span:
+                    text_analysis = self.text_analysis_service.analyze_text(
+                        paragraphs=paragraphs,
+                        top_n=self.TOP_N_WORDS
+                    )
+                    span.set_attributes(words=text_analysis.total_words, unique_words=text_analysis.unique_words)
+
+                await self._save_stage(file_hash, "UC3", profile, text_analysis, filename)
 
             logger.info(
                 f"[UC3] Análise concluída: {text_analysis.total_words} palavras, "
                 f"{text_analysis.unique_words} únicas"
             )
+            report("UC3", "done")
 
             # ================================================================
             # UC4: RELATÓRIO DE CONFORMIDADE
             # ================================================================
             logger.info("[UC4] Gerando relatório de conformidade...")
+            report("UC4", "running")
 
-            # Validar conformidade
-            compliance = self.compliance_service.validate_compliance(
-                word_count=text_analysis.total_words,
-                paragraph_count=len(paragraphs)
-            )
+            with tracer.span("UC4") as span:
+                # Validar conformidade
+                compliance = self.compliance_service.validate_compliance(
+                    word_count=text_analysis.total_words,
+                    paragraph_count=len(paragraphs)
+                )
 
-            # Gerar relatório markdown
-            report_markdown = self.compliance_service.generate_report(
-                filename=filename,
-                word_count=text_analysis.total_words,
-                paragraph_count=len(paragraphs),
-                document_id=document_id,
-                notes=None
-            )
+                # Gerar relatório markdown
+                report_markdown = self.compliance_service.generate_report(
+                    filename=filename,
+                    word_count=text_analysis.total_words,
+                    paragraph_count=len(paragraphs),
+                    document_id=document_id,
+                    notes=None
+                )
+                span.set_attribute("compliant", compliance.is_compliant)
 
             logger.info(
                 f"[UC4] Relatório gerado - Status: "
                 f"{'CONFORME' if compliance.is_compliant else 'NÃO CONFORME'}"
             )
+            report("UC4", "done")
 
             # ================================================================
             # CONSOLIDAR RESULTADOS
@@ -272,36 +855,263 @@ class DocumentAnalysisOrchestrator:
                 text_analysis=text_analysis,
                 compliance=compliance,
                 compliance_report_markdown=report_markdown,
-                processing_time_ms=processing_time
+                processing_time_ms=processing_time,
+                near_duplicate_of=near_match.file_hash if near_match else None,
+                near_duplicate_distance=near_match.distance if near_match else None
             )
 
             logger.info(
                 f"Análise concluída com sucesso em {processing_time:.2f}ms"
             )
 
+            # Indexar a primeira página (só documentos analisados por completo)
+            if phash is not None and near_match is None:
+                try:
+                    await asyncio.to_thread(self.near_duplicates.add, file_hash, phash)
+                except Exception as index_error:
+                    logger.warning(f"Não foi possível indexar quase-duplicatas: {index_error}")
+
+            # Armazenar em cache (falha no cache não invalida a análise)
+            if self.result_cache is not None:
+                try:
+                    await asyncio.to_thread(self.result_cache.set, file_hash, result, variant=profile or "")
+                except Exception as cache_error:
+                    logger.warning(f"Não foi possível armazenar em cache: {cache_error}")
+
+            # Termos só entram no acervo quando o UC3 rodou nesta análise:
+            # acertos de cache, quase-duplicatas e UC3 armazenado são
+            # documentos já contados. add_document grava snapshots no
+            # SQLite de tempos em tempos: roda fora do event loop
+            if "UC3" not in stored and self.term_stats is not None:
+                await asyncio.to_thread(self._record_terms, text_analysis)
+
+            outcome = "success"
             return result
 
         except InvalidDocumentError:
             # Re-raise: documento inválido não é erro do sistema
+            outcome = "rejected"
+            raise
+
+        except ExecutorSaturatedError:
+            # Re-raise: sobrecarga temporária, a API responde 503
+            outcome = "saturated"
+            raise
+
+        except asyncio.CancelledError:
+            # Cliente desconectou ou job interrompido no shutdown
+            outcome = "cancelled"
             raise
 
         except Exception as e:
             logger.error(f"Erro durante análise: {e}", exc_info=True)
+            trace_span.record_error(e)
             raise RuntimeError(f"Falha na análise do documento: {str(e)}")
 
         finally:
-            # ================================================================
-            # LIMPEZA: Remover arquivo temporário corrigido
-            # ================================================================
-            # EXPLICAÇÃO EDUCATIVA:
-            # Se criamos uma versão corrigida da imagem, precisamos removê-la
-            # para não acumular arquivos temporários no sistema.
-            if file_was_corrected and corrected_file_path and corrected_file_path.exists():
-                try:
-                    corrected_file_path.unlink()
-                    logger.debug(f"Arquivo temporário corrigido removido: {corrected_file_path.name}")
-                except Exception as cleanup_error:
-                    logger.warning(f"Não foi possível remover arquivo temporário: {cleanup_error}")
+            trace_span.set_attribute("outcome", outcome)
+            tracer.end_span(trace_span)
+            stage_timer.abort(outcome)
+            metrics.ANALYSIS_IN_FLIGHT.dec()
+            metrics.record_analysis(outcome, time.time() - start_time)
+
+    async def reanalyze(
+        self,
+        file_hash: str,
+        profile: Optional[str] = None,
+        document_id: Optional[str] = None
+    ) -> AnalysisResult:
+        """
+        Refaz a análise de um documento já visto, sem o arquivo original.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Usa o veredito (UC1) e os parágrafos (UC2) armazenados; o UC3 só é
+        recalculado se sua versão mudou (stopwords, top_n) e o UC4 sempre
+        é refeito com as regras atuais de conformidade.
+
+        Args:
+            file_hash: SHA-256 do arquivo analisado anteriormente
+            profile: Perfil docling usado na análise original
+            document_id: ID opcional do documento
+
+        Returns:
+            AnalysisResult com as regras atuais
+
+        Raises:
+            LookupError: Documento nunca analisado (ou armazenamento desabilitado)
+            StageDataMissingError: UC1/UC2 ausentes ou de versão anterior
+            InvalidDocumentError: UC1 armazenado rejeitou o documento
+        """
+        start_time = time.time()
+
+        filename = None
+        if self.stage_store is not None:
+            filename = await asyncio.to_thread(self.stage_store.get_filename, file_hash)
+        if filename is None:
+            raise LookupError(f"Documento não encontrado no armazenamento de etapas: {file_hash}")
+
+        if document_id is None:
+            document_id = str(uuid.uuid4())
+
+        stored = await self._load_stages(file_hash, profile)
+        missing = [stage for stage in ("UC1", "UC2") if stage not in stored]
+        if missing:
+            raise StageDataMissingError(
+                f"Etapas {', '.join(missing)} desatualizadas ou ausentes para '{filename}'. "
+                f"Reenvie o arquivo em /api/v1/analyze.",
+                stages=missing
+            )
+
+        is_scientific, confidence = stored["UC1"]
+        if not is_scientific:
+            raise InvalidDocumentError(
+                f"Documento '{filename}' não é um artigo científico. "
+                f"Tipo detectado com confiança de {confidence:.2%}."
+            )
+
+        paragraphs = stored["UC2"]
+        text_analysis = stored.get("UC3")
+        if text_analysis is None:
+            logger.info(f"[UC3] Recalculando análise textual de {filename}")
+            text_analysis = self.text_analysis_service.analyze_text(
+                paragraphs=paragraphs,
+                top_n=self.TOP_N_WORDS
+            )
+            await self._save_stage(file_hash, "UC3", profile, text_analysis, filename)
+
+        compliance = self.compliance_service.validate_compliance(
+            word_count=text_analysis.total_words,
+            paragraph_count=len(paragraphs)
+        )
+        report_markdown = self.compliance_service.generate_report(
+            filename=filename,
+            word_count=text_analysis.total_words,
+            paragraph_count=len(paragraphs),
+            document_id=document_id,
+            notes=None
+        )
+
+        result = AnalysisResult(
+            document_id=document_id,
+            filename=filename,
+            is_scientific_paper=is_scientific,
+            classification_confidence=confidence,
+            paragraphs=paragraphs,
+            text_analysis=text_analysis,
+            compliance=compliance,
+            compliance_report_markdown=report_markdown,
+            processing_time_ms=(time.time() - start_time) * 1000
+        )
+
+        # O próximo upload do mesmo arquivo já encontra o resultado atualizado
+        if self.result_cache is not None:
+            try:
+                await asyncio.to_thread(self.result_cache.set, file_hash, result, variant=profile or "")
+            except Exception as cache_error:
+                logger.warning(f"Não foi possível armazenar em cache: {cache_error}")
+
+        logger.info(
+            f"Reanálise de {filename} concluída em {result.processing_time_ms:.2f}ms "
+            f"(UC3 {'reaproveitado' if 'UC3' in stored else 'recalculado'})"
+        )
+
+        return result
+
+    async def warmup(self, file_path: Path, profile: Optional[str] = None) -> Dict[str, float]:
+        """
+        Passa um documento sintético por todas as etapas, uma vez.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Cada etapa tem custos de primeira execução: subir os processos do
+        ProcessPool (com o docling aquecido pelo initializer), importar
+        OpenCV e o classificador, abrir o pdfium, compilar regex das
+        stopwords, carregar o template do relatório. Sem aquecimento, a
+        primeira requisição real paga tudo isso.
+
+        As etapas são chamadas diretamente, sem passar por
+        analyze_document: o veredito do UC1 não interrompe o aquecimento,
+        e nada é gravado no cache de resultados, no armazenamento de
+        etapas nem nas estatísticas de termos.
+
+        Args:
+            file_path: Documento sintético (PDF pequeno com texto)
+            profile: Perfil docling (padrão: perfil do serviço)
+
+        Returns:
+            Duração de cada etapa em ms (STEP0, RASTER, UC1..UC4)
+
+        Raises:
+            Exception: Falha de qualquer etapa (o serviço não está pronto)
+        """
+        timings: Dict[str, float] = {}
+        tracer = get_tracer()
+
+        def mark(stage: str, started: float) -> None:
+            timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+        with tracer.span("warmup", filename=file_path.name):
+            if self.executor is not None:
+                started = time.perf_counter()
+                processes = await self.executor.warmup_processes()
+                mark("PROCESSES", started)
+                logger.info(f"[WARMUP] {processes} processo(s) do executor prontos")
+
+            started = time.perf_counter()
+            if self.executor is not None:
+                context = await self.executor.run_in_thread("STEP0", DocumentContext.load, file_path)
+            else:
+                context = DocumentContext.load(file_path)
+            mark("STEP0", started)
+
+            if self.pdf_rasterizer is not None and is_pdf(file_path):
+                # Renderização direta: o raster sintético não vai para o cache
+                started = time.perf_counter()
+                args = (file_path, self.pdf_rasterizer.dpi, self.pdf_rasterizer.max_pages)
+                if self.executor is not None:
+                    context.raster = await self.executor.run_in_thread("RASTER", render_pdf_pages, *args)
+                else:
+                    context.raster = render_pdf_pages(*args)
+                mark("RASTER", started)
+
+            started = time.perf_counter()
+            await self.classification_service.is_scientific_paper(file_path, context=context)
+            mark("UC1", started)
+
+            started = time.perf_counter()
+            paragraphs = await self.paragraph_service.detect_paragraphs_async(
+                file_path,
+                context=context,
+                profile=profile
+            )
+            mark("UC2", started)
+
+            # Documento sem parágrafos detectados ainda deve exercitar UC3/UC4
+            if not paragraphs:
+                paragraphs = [Paragraph(index=0, text="warmup document paragraph", word_count=3)]
+
+            started = time.perf_counter()
+            text_analysis = self.text_analysis_service.analyze_text(
+                paragraphs=paragraphs,
+                top_n=self.TOP_N_WORDS
+            )
+            mark("UC3", started)
+
+            started = time.perf_counter()
+            self.compliance_service.validate_compliance(
+                word_count=text_analysis.total_words,
+                paragraph_count=len(paragraphs)
+            )
+            self.compliance_service.generate_report(
+                filename=file_path.name,
+                word_count=text_analysis.total_words,
+                paragraph_count=len(paragraphs),
+                document_id="warmup",
+                notes=None
+            )
+            mark("UC4", started)
+
+        logger.info(f"[WARMUP] Etapas aquecidas (ms): {timings}")
+        return timings
 
     async def close(self):
         """
@@ -12,16 +12,59 @@ Este serviço é responsável por:
 Esta é a segunda etapa do pipeline de análise.
 """
 
+import asyncio
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from app.models import Paragraph
-from app.integrations import DoclingWrapper
+from app.integrations import (
+    ConversionStore,
+    DoclingWrapper,
+    DOCLING_PROFILES,
+    detect_paragraphs_in_worker
+)
+from app.integrations.pdf_shards import PdfShard, merge_shard_paragraphs, split_pdf_pages
+from app.integrations.pdf_text_layer import scan_pdf_text_layer
+from app.core.document_context import DocumentContext
+from app.core.executor import CPUExecutor
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ProfileStats:
+    """
+    Contadores de latência de um perfil docling.
+
+    Atributos:
+        requests: Documentos processados
+        total_ms: Soma das durações (pré-análise + conversão)
+        max_ms: Maior duração
+        text_layer: Documentos convertidos sem OCR (camada de texto)
+        ocr: Documentos convertidos com OCR
+    """
+
+    requests: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    text_layer: int = 0
+    ocr: int = 0
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário com média calculada."""
+        return {
+            "requests": self.requests,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0.0,
+            "max_ms": self.max_ms,
+            "text_layer": self.text_layer,
+            "ocr": self.ocr,
+        }
+
+
 class ParagraphDetectionService:
     """
     Serviço de detecção de parágrafos.
@@ -42,12 +85,131 @@ class ParagraphDetectionService:
     - Preservar informações de posicionamento
     """
 
-    def __init__(self):
-        """Inicializa serviço de detecção de parágrafos."""
-        self.docling = DoclingWrapper()
-        logger.info("ParagraphDetectionService inicializado")
+    def __init__(
+        self,
+        executor: Optional[CPUExecutor] = None,
+        default_profile: str = "balanced",
+        text_layer_min_chars: int = 50,
+        shard_pages: int = 0,
+        conversion_store: Optional[ConversionStore] = None
+    ):
+        """
+        Inicializa serviço de detecção de parágrafos.
 
-    def detect_paragraphs(self, file_path: Path) -> List[Paragraph]:
+        Args:
+            executor: Executor CPU opcional. Se fornecido, a detecção
+                assíncrona roda fora do event loop.
+            default_profile: Perfil docling usado quando o chamador não
+                especifica um (fast, balanced, accurate)
+            text_layer_min_chars: Mínimo de caracteres extraídos para
+                considerar que uma página de PDF tem camada de texto
+            shard_pages: Máximo de páginas por faixa no modo paralelo por
+                páginas (0 desabilita). Só vale com executor em modo processo.
+            conversion_store: Armazenamento de conversões do DoclingWrapper
+                deste processo (com executor em modo processo, cada worker
+                tem o seu; ver init_docling_worker)
+        """
+        if default_profile not in DOCLING_PROFILES:
+            raise ValueError(f"Perfil docling desconhecido: {default_profile}")
+
+        self.executor = executor
+        self.default_profile = default_profile
+        self.text_layer_min_chars = text_layer_min_chars
+        self.shard_pages = shard_pages
+        self.conversion_store = conversion_store
+        self._docling: Optional[DoclingWrapper] = None
+        self._stats: Dict[str, ProfileStats] = {name: ProfileStats() for name in DOCLING_PROFILES}
+        self._stats_lock = threading.Lock()
+        logger.info(f"ParagraphDetectionService inicializado (perfil padrão: {default_profile})")
+
+    @property
+    def docling(self) -> DoclingWrapper:
+        """
+        DoclingWrapper do processo atual (lazy loading).
+
+        EXPLICAÇÃO EDUCATIVA:
+        Com o executor em modo processo, os modelos são carregados apenas
+        nos workers; o processo da API não precisa de uma cópia própria.
+        """
+        if self._docling is None:
+            self._docling = DoclingWrapper(store=self.conversion_store)
+        return self._docling
+
+    @staticmethod
+    def _is_pdf(file_path: Path, context: Optional[DocumentContext]) -> bool:
+        """Indica se o documento é PDF (pelo contexto ou pela extensão)."""
+        if context is not None:
+            return not context.is_image
+        return file_path.suffix.lower() == ".pdf"
+
+    def plan_conversion(
+        self,
+        file_path: Path,
+        context: Optional[DocumentContext] = None,
+        profile: Optional[str] = None
+    ) -> Tuple[str, bool, bool]:
+        """
+        Escolhe as opções do docling para um documento.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Nos perfis com OCR "auto", PDFs passam por uma pré-análise barata
+        (PyPDF2, sem renderizar páginas). Se todas as páginas têm camada de
+        texto, o docling usa o pipeline sem OCR. Imagens sempre usam OCR.
+        O docling converte o documento inteiro com um único pipeline, então
+        basta uma página sem texto para o documento ir para o OCR.
+
+        Args:
+            file_path: Caminho do arquivo
+            context: Documento já decodificado (indica se é imagem)
+            profile: Perfil docling (padrão: default_profile)
+
+        Returns:
+            Tupla (perfil, do_ocr, do_table_structure)
+
+        Raises:
+            ValueError: Se o perfil não existir
+        """
+        profile = profile or self.default_profile
+
+        has_text_layer = False
+        if self._is_pdf(file_path, context) and DOCLING_PROFILES.get(profile, {}).get("ocr") == "auto":
+            scan = scan_pdf_text_layer(file_path, self.text_layer_min_chars)
+            has_text_layer = scan is not None and scan.has_full_text_layer
+
+        do_ocr, do_table_structure = DoclingWrapper.resolve_options(profile, has_text_layer)
+
+        logger.debug(
+            f"{file_path.name}: perfil {profile}, ocr={do_ocr}, tabelas={do_table_structure}"
+        )
+
+        return profile, do_ocr, do_table_structure
+
+    def _record(self, profile: str, do_ocr: bool, elapsed_ms: float) -> None:
+        """Atualiza contadores de latência do perfil."""
+        with self._stats_lock:
+            stats = self._stats[profile]
+            stats.requests += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            if do_ocr:
+                stats.ocr += 1
+            else:
+                stats.text_layer += 1
+
+    def get_profile_stats(self) -> dict:
+        """Retorna contadores de latência por perfil docling."""
+        with self._stats_lock:
+            return {
+                "default_profile": self.default_profile,
+                "profiles": {name: stats.to_dict() for name, stats in self._stats.items()},
+            }
+
+    def detect_paragraphs(
+        self,
+        file_path: Path,
+        context: Optional[DocumentContext] = None,
+        profile: Optional[str] = None
+    ) -> List[Paragraph]:
         """
         Detecta e extrai parágrafos de um documento.
 
@@ -66,18 +228,27 @@ class ParagraphDetectionService:
 
         Args:
             file_path: Caminho do arquivo (PDF ou imagem)
+            context: Documento já decodificado. Se a orientação foi
+                corrigida, o docling recebe a versão corrigida em memória.
+            profile: Perfil docling (padrão: default_profile)
 
         Returns:
             Lista de objetos Paragraph detectados
 
         Raises:
+            ValueError: Se o perfil não existir
             RuntimeError: Se detecção falhar
         """
         logger.info(f"Detectando parágrafos em: {file_path.name}")
 
+        start = time.perf_counter()
+        profile, do_ocr, do_table_structure = self.plan_conversion(file_path, context, profile)
+
         try:
             # Usar docling para detectar parágrafos
-            paragraphs = self.docling.detect_paragraphs(file_path)
+            content = context.docling_content() if context is not None else None
+            paragraphs = self.docling.detect_paragraphs(file_path, content, do_ocr, do_table_structure)
+            self._record(profile, do_ocr, (time.perf_counter() - start) * 1000)
 
             logger.info(f"Detectados {len(paragraphs)} parágrafos")
 
@@ -96,6 +267,129 @@ class ParagraphDetectionService:
             logger.error(f"Erro na detecção de parágrafos: {e}")
             raise RuntimeError(f"Falha na detecção de parágrafos: {str(e)}")
 
+    async def detect_paragraphs_async(
+        self,
+        file_path: Path,
+        context: Optional[DocumentContext] = None,
+        profile: Optional[str] = None
+    ) -> List[Paragraph]:
+        """
+        Detecta parágrafos sem bloquear o event loop.
+
+        EXPLICAÇÃO EDUCATIVA:
+        - Executor em modo processo: o docling roda em um worker do
+          ProcessPool que já tem o converter aquecido. PDFs com mais de
+          shard_pages páginas são divididos em faixas convertidas em
+          paralelo (ver _detect_sharded).
+        - Executor em modo thread: roda detect_paragraphs() em uma thread.
+        - Sem executor: comportamento síncrono original.
+
+        Args:
+            file_path: Caminho do arquivo (PDF ou imagem)
+            context: Documento já decodificado (ver detect_paragraphs)
+            profile: Perfil docling (padrão: default_profile)
+
+        Returns:
+            Lista de objetos Paragraph detectados
+
+        Raises:
+            ValueError: Se o perfil não existir
+            ExecutorSaturatedError: Se a fila do executor estiver cheia
+            RuntimeError: Se detecção falhar
+        """
+        if self.executor is None:
+            return self.detect_paragraphs(file_path, context, profile)
+
+        # Erros do docling já chegam como RuntimeError (ver DoclingWrapper)
+        if self.executor.use_processes:
+            # EXPLICAÇÃO: a pré-análise roda em thread no processo da API;
+            # o worker recebe apenas as opções escolhidas e, quando houve
+            # rotação, os bytes já codificados (nunca o contexto com arrays)
+            start = time.perf_counter()
+            profile, do_ocr, do_table_structure = await self.executor.run_in_thread(
+                "UC2_SCAN", self.plan_conversion, file_path, context, profile
+            )
+            content = context.docling_content() if context is not None else None
+
+            shards: List[PdfShard] = []
+            if self.shard_pages > 0 and content is None and self._is_pdf(file_path, context):
+                shards = await self.executor.run_in_thread(
+                    "UC2_SPLIT", split_pdf_pages, file_path, self.shard_pages
+                )
+
+            if shards:
+                paragraphs = await self._detect_sharded(shards, do_ocr, do_table_structure)
+            else:
+                paragraphs = await self.executor.run_in_process(
+                    "UC2", detect_paragraphs_in_worker, file_path, content, do_ocr, do_table_structure
+                )
+            self._record(profile, do_ocr, (time.perf_counter() - start) * 1000)
+        else:
+            paragraphs = await self.executor.run_in_thread(
+                "UC2", self.detect_paragraphs, file_path, context, profile
+            )
+
+        logger.info(f"Detectados {len(paragraphs)} parágrafos")
+
+        return paragraphs
+
+    async def _detect_sharded(
+        self,
+        shards: List[PdfShard],
+        do_ocr: bool,
+        do_table_structure: bool
+    ) -> List[Paragraph]:
+        """
+        Converte as faixas de páginas em paralelo e une os parágrafos.
+
+        EXPLICAÇÃO EDUCATIVA:
+        Cada faixa é uma tarefa separada no ProcessPool, então até
+        CPU_PROCESS_WORKERS faixas são convertidas ao mesmo tempo. Um
+        semáforo do tamanho do pool limita as faixas submetidas: submeter
+        todas de uma vez estouraria CPU_MAX_QUEUE_DEPTH (503) em PDFs
+        longos mesmo com o servidor ocioso, e as faixas além do número de
+        workers só esperariam na fila. Se uma faixa falhar (ou o executor
+        estiver saturado), as demais são canceladas: um resultado parcial
+        teria parágrafos faltando.
+
+        Args:
+            shards: Faixas geradas por split_pdf_pages
+            do_ocr: Habilitar OCR
+            do_table_structure: Detectar estrutura de tabelas
+
+        Returns:
+            Parágrafos do documento inteiro, com index e page globais
+        """
+        in_flight = asyncio.Semaphore(max(1, self.executor.process_workers))
+
+        async def convert(shard: PdfShard) -> List[Paragraph]:
+            async with in_flight:
+                return await self.executor.run_in_process(
+                    "UC2", detect_paragraphs_in_worker,
+                    Path(shard.name), (shard.name, shard.data), do_ocr, do_table_structure
+                )
+
+        tasks = [asyncio.ensure_future(convert(shard)) for shard in shards]
+
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return merge_shard_paragraphs(list(zip(shards, results)))
+
+    def get_config(self) -> dict:
+        """Retorna configuração do UC2 (usada em chaves de cache)."""
+        return {
+            **DoclingWrapper.get_pipeline_config(),
+            "default_profile": self.default_profile,
+            "text_layer_min_chars": self.text_layer_min_chars,
+            "shard_pages": self.shard_pages,
+        }
+
     def get_paragraph_count(self, file_path: Path) -> int:
         """
         Retorna apenas a contagem de parágrafos.
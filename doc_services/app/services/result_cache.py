@@ -0,0 +1,107 @@
+"""
+Cache de resultados de análise (UC1→UC4).
+
+EXPLICAÇÃO EDUCATIVA:
+Uploads repetidos do mesmo PDF não precisam passar novamente pelo
+pipeline completo. A chave do cache combina:
+- SHA-256 dos bytes do arquivo (mesmo conteúdo = mesma chave)
+- Fingerprint da configuração do pipeline (opções do docling,
+  regras de conformidade, versão do classificador, stopwords...)
+
+Se qualquer configuração mudar, o fingerprint muda e os resultados
+antigos simplesmente deixam de ser encontrados.
+
+O armazenamento usa TieredCache (LRU em memória + SQLite em disco),
+compartilhado entre os workers uvicorn do mesmo host.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from app.core.cache import TieredCache
+from app.models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisResultCache:
+    """
+    Cache de AnalysisResult endereçado por conteúdo.
+
+    Atributos:
+        cache: Armazenamento em dois níveis
+        config_fingerprint: Hash da configuração do pipeline
+    """
+
+    def __init__(self, cache: TieredCache, config_fingerprint: str):
+        """
+        Inicializa cache de resultados.
+
+        Args:
+            cache: Instância de TieredCache
+            config_fingerprint: Hash da configuração do pipeline
+        """
+        self.cache = cache
+        self.config_fingerprint = config_fingerprint
+        logger.info(f"AnalysisResultCache inicializado (config={config_fingerprint[:12]})")
+
+    def make_key(self, file_hash: str, variant: str = "") -> str:
+        """
+        Monta chave combinando hash do arquivo e da configuração.
+
+        Args:
+            file_hash: SHA-256 dos bytes do arquivo
+            variant: Opções escolhidas por requisição (ex.: perfil docling)
+
+        Returns:
+            Chave do cache
+        """
+        key = f"{file_hash}:{self.config_fingerprint}"
+        if variant:
+            key = f"{key}:{variant}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, file_hash: str, variant: str = "") -> Optional[AnalysisResult]:
+        """
+        Busca resultado em cache.
+
+        Args:
+            file_hash: SHA-256 dos bytes do arquivo
+            variant: Opções escolhidas por requisição (ver make_key)
+
+        Returns:
+            AnalysisResult com cache_hit=True, ou None se ausente
+        """
+        key = self.make_key(file_hash, variant)
+        payload = self.cache.get(key)
+        if payload is None:
+            return None
+
+        try:
+            result = AnalysisResult.model_validate_json(payload)
+        except Exception as e:
+            # Entrada corrompida ou de schema antigo: descartar
+            logger.warning(f"Entrada de cache inválida descartada: {e}")
+            self.cache.delete(key)
+            return None
+
+        result.cache_hit = True
+        return result
+
+    def set(self, file_hash: str, result: AnalysisResult, variant: str = "") -> None:
+        """
+        Armazena resultado em cache.
+
+        Args:
+            file_hash: SHA-256 dos bytes do arquivo
+            result: Resultado da análise
+            variant: Opções escolhidas por requisição (ver make_key)
+        """
+        payload = result.model_dump_json().encode("utf-8")
+        self.cache.set(self.make_key(file_hash, variant), payload)
+        logger.debug(f"Resultado armazenado em cache ({len(payload)} bytes)")
+
+    def get_stats(self) -> dict:
+        """Retorna estatísticas do cache."""
+        return self.cache.get_stats()
@@ -0,0 +1,255 @@
+"""
+Termos mais frequentes do acervo por janela de tempo.
+
+EXPLICAÇÃO EDUCATIVA:
+Cada análise concluída em que o UC3 rodou contribui com as frequências
+do documento (sem stopwords) para um resumo Space-Saving do intervalo de
+tempo atual (bucket, ex.: 1 hora). Reenvios servidos pelo cache
+(resultado, etapas ou quase-duplicata) não contam de novo. Memória por
+processo: um resumo de no máximo TERM_STATS_CAPACITY termos, independente
+do número de documentos.
+
+Persistência:
+- Cada processo grava periodicamente um snapshot do bucket atual em
+  SQLite (chave: início do bucket + identificador do processo)
+- Buckets encerrados ficam só no disco; snapshots antigos são apagados
+  após TERM_STATS_RETENTION_DAYS
+
+Consulta: os snapshots dos buckets na janela (de todos os processos, e o
+estado ainda não gravado deste processo) são combinados com merge. A
+granularidade da janela é o tamanho do bucket.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.heavy_hitters import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+
+class TermStatsAggregator:
+    """
+    Agregador de termos frequentes com snapshots em SQLite.
+
+    Atributos:
+        db_path: Arquivo SQLite dos snapshots
+        capacity: Termos monitorados por bucket
+        bucket_seconds: Duração de cada bucket
+        flush_seconds: Intervalo mínimo entre gravações do bucket atual
+        retention_seconds: Snapshots mais antigos são apagados
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        capacity: int = 1000,
+        bucket_seconds: int = 3600,
+        flush_seconds: float = 30.0,
+        retention_seconds: float = 90 * 86400,
+        stopwords: Iterable[str] = ()
+    ):
+        """
+        Inicializa o agregador.
+
+        Args:
+            db_path: Arquivo SQLite (criado se não existir)
+            capacity: Termos monitorados por bucket (erro <= palavras / capacity)
+            bucket_seconds: Granularidade das janelas de consulta
+            flush_seconds: Intervalo mínimo entre snapshots do bucket atual
+            retention_seconds: Idade máxima dos snapshots
+            stopwords: Palavras ignoradas (mesmas do UC3)
+        """
+        self.db_path = Path(db_path)
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.flush_seconds = flush_seconds
+        self.retention_seconds = retention_seconds
+        self.stopwords = frozenset(stopwords)
+
+        # Identifica este processo nos snapshots (pid se repete após reinício)
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._bucket_start: Optional[float] = None
+        self._summary = SpaceSaving(capacity)
+        self._documents = 0
+        self._dirty = False
+        self._last_flush = time.time()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # check_same_thread=False: a conexão é protegida por self._lock
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=5.0,
+            check_same_thread=False,
+            isolation_level=None  # autocommit
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS term_snapshots (
+                bucket_start REAL NOT NULL,
+                writer TEXT NOT NULL,
+                documents INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (bucket_start, writer)
+            )
+            """
+        )
+
+        logger.info(
+            f"TermStatsAggregator inicializado: {self.db_path}, capacidade={capacity}, "
+            f"bucket={bucket_seconds}s"
+        )
+
+    def _bucket_of(self, timestamp: float) -> float:
+        return timestamp - timestamp % self.bucket_seconds
+
+    def add_document(self, word_frequencies: Dict[str, int], timestamp: Optional[float] = None) -> None:
+        """
+        Soma as frequências de um documento analisado.
+
+        Síncrono (grava snapshots no SQLite): em código async, chame via
+        asyncio.to_thread.
+
+        Args:
+            word_frequencies: Frequências do documento (TextAnalysis.word_frequencies)
+            timestamp: Momento da análise (padrão: agora)
+        """
+        now = time.time() if timestamp is None else timestamp
+        bucket = self._bucket_of(now)
+
+        with self._lock:
+            if self._bucket_start != bucket:
+                # Novo intervalo: gravar o anterior e recomeçar
+                if self._dirty:
+                    self._write_snapshot()
+                self._bucket_start = bucket
+                self._summary = SpaceSaving(self.capacity)
+                self._documents = 0
+
+            for term, count in word_frequencies.items():
+                if count > 0 and term not in self.stopwords:
+                    self._summary.update(term, count)
+            self._documents += 1
+            self._dirty = True
+
+            if time.time() - self._last_flush >= self.flush_seconds:
+                self._write_snapshot()
+
+    def flush(self) -> None:
+        """Grava o bucket atual (chamado no shutdown)."""
+        with self._lock:
+            if self._dirty:
+                self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """Grava o bucket atual e apaga snapshots expirados (com o lock adquirido)."""
+        now = time.time()
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO term_snapshots "
+                "(bucket_start, writer, documents, summary, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._bucket_start,
+                    self.writer_id,
+                    self._documents,
+                    json.dumps(self._summary.to_dict()),
+                    now
+                )
+            )
+            self._conn.execute(
+                "DELETE FROM term_snapshots WHERE bucket_start < ?",
+                (now - self.retention_seconds,)
+            )
+            self._dirty = False
+        except sqlite3.Error as e:
+            # Falha ao gravar não interrompe a análise; nova tentativa no próximo documento
+            logger.warning(f"Não foi possível gravar snapshot de termos: {e}")
+        self._last_flush = now
+
+    def top_terms(
+        self,
+        n: int = 20,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Termos mais frequentes na janela [since, until].
+
+        Args:
+            n: Número de termos
+            since: Início da janela (epoch; padrão: sem limite)
+            until: Fim da janela (epoch; padrão: agora)
+
+        Returns:
+            Janela efetiva (alinhada aos buckets), documentos, palavras,
+            termos com contagem e erro máximo, e se os N termos são com
+            certeza os N mais frequentes (pelo limite de erro)
+        """
+        until = time.time() if until is None else until
+        first_bucket = self._bucket_of(since) if since is not None else 0.0
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT bucket_start, writer, documents, summary FROM term_snapshots "
+                "WHERE bucket_start >= ? AND bucket_start <= ?",
+                (first_bucket, until)
+            ).fetchall()
+
+            # Estado ainda não gravado deste processo substitui o próprio snapshot
+            current = None
+            if self._bucket_start is not None and first_bucket <= self._bucket_start <= until:
+                current = (self._bucket_start, self._documents, SpaceSaving.from_dict(self._summary.to_dict()))
+
+        summaries = []
+        documents = 0
+        for bucket_start, writer, docs, payload in rows:
+            if current is not None and writer == self.writer_id and bucket_start == current[0]:
+                continue
+            summaries.append(SpaceSaving.from_dict(json.loads(payload)))
+            documents += docs
+        if current is not None:
+            summaries.append(current[2])
+            documents += current[1]
+
+        merged = SpaceSaving.merge_all(summaries, capacity=self.capacity)
+        top = merged.top(n + 1)
+        terms = [
+            {"word": term, "count": count, "error": error, "min_count": count - error}
+            for term, count, error in top[:n]
+        ]
+
+        # EXPLICAÇÃO: o top-N é exato se o menor limite inferior entre os N
+        # supera a maior contagem possível de qualquer termo de fora
+        outside = max(top[n][1] if len(top) > n else 0, merged.min_count())
+        guaranteed = bool(terms) and min(t["min_count"] for t in terms) >= outside
+
+        return {
+            "since": first_bucket if since is not None else None,
+            "until": until,
+            "bucket_seconds": self.bucket_seconds,
+            "documents": documents,
+            "total_words": merged.total,
+            "max_error": merged.total // merged.capacity if merged.capacity else 0,
+            "guaranteed_top": guaranteed,
+            "terms": terms,
+        }
+
+    def close(self) -> None:
+        """Grava o bucket atual e fecha a conexão."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -18,7 +18,7 @@ Usamos apenas Python stdlib (Counter, regex, str.split).
 import logging
 import re
 from collections import Counter
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 from app.models import Paragraph, TextAnalysis, WordFrequency
 
@@ -87,6 +87,14 @@ class TextAnalysisService:
 
         logger.info("TextAnalysisService inicializado com filtro de stopwords")
 
+    def get_config(self) -> dict:
+        """Retorna configuração do UC3 (usada em chaves de cache)."""
+        return {
+            "punctuation_pattern": self.punctuation_pattern.pattern,
+            "min_word_length": 2,
+            "stopwords": sorted(self.stopwords),
+        }
+
     def analyze_text(
         self,
         paragraphs: List[Paragraph],
@@ -99,14 +107,12 @@ class TextAnalysisService:
         Este é o método principal do UC3.
 
         Fluxo de análise:
-        1. Extrair texto de todos os parágrafos
-        2. Concatenar em texto único
-        3. Limpar e normalizar:
+        1. Percorrer os parágrafos um a um (gerador, sem concatenar)
+        2. Limpar e normalizar cada parágrafo:
            - Remover pontuação
            - Converter para minúsculas
-           - Normalizar espaços
-        4. Tokenizar (split por espaços)
-        5. Contar palavras com Counter
+        3. Tokenizar (split por espaços)
+        4. Contar palavras com Counter
         6. Calcular estatísticas:
            - Total de palavras
            - Vocabulário (palavras únicas)
@@ -130,23 +136,14 @@ class TextAnalysisService:
 
         logger.info(f"Analisando texto de {len(paragraphs)} parágrafos")
 
-        # Etapa 1: Extrair e concatenar texto
-        full_text = self._extract_full_text(paragraphs)
-
-        # Etapa 2: Limpar e normalizar texto
-        cleaned_text = self._clean_text(full_text)
-
-        # Etapa 3: Tokenizar (separar em palavras)
-        words = self._tokenize(cleaned_text)
-
-        # Etapa 4: Contar palavras
-        word_frequencies = self._count_words(words)
+        # Etapas 1-4: Tokenizar parágrafo a parágrafo e contar
+        word_frequencies = self.count_words(paragraphs)
 
         # Etapa 5: Obter top N palavras
         top_words = self._get_top_words(word_frequencies, top_n)
 
         # Etapa 6: Calcular estatísticas
-        total_words = len(words)
+        total_words = sum(word_frequencies.values())
         unique_words = len(word_frequencies)
 
         logger.info(
@@ -158,115 +155,76 @@ class TextAnalysisService:
         return TextAnalysis(
             total_words=total_words,
             unique_words=unique_words,
-            word_frequencies=word_frequencies,
+            word_frequencies=dict(word_frequencies),
             top_words=top_words
         )
 
-    def _extract_full_text(self, paragraphs: List[Paragraph]) -> str:
+    def iter_words(self, paragraphs: Iterable[Paragraph]) -> Iterator[str]:
         """
-        Extrai e concatena texto de todos os parágrafos.
+        Gera as palavras de cada parágrafo, em ordem.
 
         EXPLICAÇÃO EDUCATIVA:
-        Usa list comprehension + join:
-        - List comprehension: [p.text for p in paragraphs]
-        - join: une strings com separador
-
-        Separamos parágrafos com "\n\n" para preservar estrutura.
-
-        Args:
-            paragraphs: Lista de parágrafos
-
-        Returns:
-            Texto completo concatenado
-        """
-        texts = [p.text for p in paragraphs]
-        return "\n\n".join(texts)
+        Antes o texto de todos os parágrafos era concatenado numa única
+        string, limpo, reunido com join e separado de novo: três cópias do
+        documento inteiro em memória. O gerador processa um parágrafo por
+        vez e entrega as palavras a quem consome (ex.: Counter), sem
+        montar o texto completo.
 
-    def _clean_text(self, text: str) -> str:
-        """
-        Limpa e normaliza texto.
+        O resultado é o mesmo da versão concatenada: os parágrafos eram
+        unidos por "\n\n", que o split() já tratava como separador.
 
-        EXPLICAÇÃO EDUCATIVA:
-        Passos de limpeza:
+        Passos por parágrafo:
         1. Remover pontuação (regex)
         2. Converter para minúsculas
-        3. Normalizar espaços múltiplos
-
-        Exemplo:
-        "Olá! Como vai?" → "ola como vai"
+        3. Split por espaços
+        4. Filtrar palavras muito curtas (< 2 caracteres)
 
         Args:
-            text: Texto a limpar
+            paragraphs: Parágrafos (lista ou qualquer iterável)
 
-        Returns:
-            Texto limpo e normalizado
+        Yields:
+            Palavras normalizadas
         """
-        # Remover pontuação
-        text = self.punctuation_pattern.sub(' ', text)
-
-        # Converter para minúsculas
-        text = text.lower()
-
-        # Normalizar espaços (substituir múltiplos por único)
-        text = ' '.join(text.split())
-
-        return text
-
-    def _tokenize(self, text: str) -> List[str]:
+        for paragraph in paragraphs:
+            cleaned = self.punctuation_pattern.sub(' ', paragraph.text).lower()
+            for word in cleaned.split():
+                # EXPLICAÇÃO: Evita contar "a", "e", "o" que não são informativos
+                if len(word) >= 2:
+                    yield word
+
+    def count_words(self, paragraphs: Iterable[Paragraph]) -> Counter:
         """
-        Tokeniza texto em palavras.
+        Conta frequência de cada palavra de um documento.
 
         EXPLICAÇÃO EDUCATIVA:
-        Tokenização básica:
-        - Split por espaços
-        - Filtrar palavras vazias
-        - Filtrar palavras muito curtas (< 2 caracteres)
-
-        Para análise mais sofisticada, poderia usar:
-        - NLTK tokenizer
-        - spaCy
-        - Remoção de stopwords
-
-        Mas UC3 exige programação básica.
+        Counter consome o gerador iter_words diretamente. Contagens de
+        documentos diferentes podem ser somadas (counter.update(outro)),
+        o que permite agregar o acervo documento a documento
+        (ver app.services.term_stats).
 
         Args:
-            text: Texto limpo
+            paragraphs: Parágrafos do documento
 
         Returns:
-            Lista de palavras (tokens)
+            Counter {palavra: frequência}, na ordem da primeira ocorrência
         """
-        # Split por espaços
-        words = text.split()
-
-        # Filtrar palavras muito curtas (< 2 caracteres)
-        # EXPLICAÇÃO: Evita contar "a", "e", "o" que não são informativos
-        words = [w for w in words if len(w) >= 2]
-
-        return words
+        return Counter(self.iter_words(paragraphs))
 
-    def _count_words(self, words: List[str]) -> Dict[str, int]:
+    def content_terms(self, word_frequencies: Dict[str, int]) -> Dict[str, int]:
         """
-        Conta frequência de cada palavra.
-
-        EXPLICAÇÃO EDUCATIVA:
-        Usa Counter do módulo collections:
-        - Counter([lista]) cria dicionário de contagens
-        - Exemplo: Counter(['a', 'b', 'a']) → {'a': 2, 'b': 1}
-        - Muito eficiente para contagem
-
-        Converte para dict normal para serialização JSON.
+        Remove stopwords de um dicionário de frequências.
 
         Args:
-            words: Lista de palavras
+            word_frequencies: Frequências de um documento (com stopwords)
 
         Returns:
-            Dicionário {palavra: frequência}
+            Frequências apenas dos termos de conteúdo
         """
-        # Contar com Counter
-        counter = Counter(words)
-
-        # Converter para dict normal
-        return dict(counter)
+        return {
+            word: count
+            for word, count in word_frequencies.items()
+            if word.lower() not in self.stopwords
+        }
 
     def _get_top_words(
         self,
@@ -300,11 +258,7 @@ class TextAnalysisService:
         # Filtrar stopwords do dicionário de frequências
         # EXPLICAÇÃO: Dict comprehension que mantém apenas palavras
         # que NÃO estão na lista de stopwords
-        filtered_frequencies = {
-            word: count
-            for word, count in word_frequencies.items()
-            if word.lower() not in self.stopwords
-        }
+        filtered_frequencies = self.content_terms(word_frequencies)
 
         # Criar Counter a partir do dict filtrado
         counter = Counter(filtered_frequencies)
@@ -0,0 +1,159 @@
+"""
+Aquecimento do pipeline na inicialização e estado de prontidão (/ready).
+
+EXPLICAÇÃO EDUCATIVA:
+Liveness e readiness respondem perguntas diferentes:
+- /health (liveness): o processo está de pé? Responde logo após o start,
+  para o orquestrador de containers não reiniciar um worker que só está
+  carregando modelos.
+- /ready (readiness): o worker já atende no tempo normal? Só responde 200
+  depois que um documento sintético pequeno passou por todas as etapas
+  (STEP0, RASTER, UC1..UC4) e os processos do executor subiram com o
+  docling carregado. Até lá, o balanceador não manda tráfego.
+
+O aquecimento roda em segundo plano no startup: a porta abre na hora e
+o worker entra no balanceamento quando estiver quente.
+"""
+
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Texto do documento sintético (parágrafos curtos em inglês, como os artigos)
+WARMUP_TEXT = (
+    "Abstract. This synthetic document warms up the analysis pipeline.",
+    "We evaluate the method on a small dataset and report the results.",
+    "The proposed approach improves accuracy while reducing latency.",
+)
+
+
+def build_warmup_pdf() -> bytes:
+    """
+    Monta um PDF de uma página com camada de texto (Helvetica).
+
+    EXPLICAÇÃO EDUCATIVA:
+    Escrito à mão (poucos objetos PDF) para não depender de geradores de
+    PDF nem do diretório benchmarks/, que não vai para a imagem Docker.
+
+    Returns:
+        Bytes do PDF
+    """
+    lines = ["BT /F1 11 Tf 14 TL 72 740 Td"]
+    for paragraph in WARMUP_TEXT:
+        lines.append(f"({paragraph}) Tj T* T*")
+    lines.append("ET")
+    stream = "\n".join(lines).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream",
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    return bytes(pdf)
+
+
+class WarmupState:
+    """
+    Estado do aquecimento do processo.
+
+    Atributos:
+        status: "pending", "running", "ready", "failed" ou "disabled"
+        stages_ms: Duração de cada etapa no aquecimento
+        error: Mensagem da falha (status "failed")
+    """
+
+    def __init__(self):
+        self.status = "pending"
+        self.stages_ms: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """True se o processo pode receber tráfego."""
+        return self.status in ("ready", "disabled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializável (corpo do /ready)."""
+        duration = None
+        if self.started_at is not None:
+            duration = round(((self.finished_at or time.time()) - self.started_at) * 1000, 2)
+
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "duration_ms": duration,
+            "stages_ms": self.stages_ms,
+            "error": self.error,
+        }
+
+
+async def run_warmup(
+    orchestrator,
+    state: WarmupState,
+    timeout_seconds: float = 300.0,
+    profile: Optional[str] = None
+) -> None:
+    """
+    Aquece o pipeline com o documento sintético e atualiza o estado.
+
+    Falhas não derrubam o processo: o estado fica "failed" com a
+    mensagem, e o /ready continua respondendo 503.
+
+    Args:
+        orchestrator: DocumentAnalysisOrchestrator do processo
+        state: Estado compartilhado com o /ready
+        timeout_seconds: Tempo máximo do aquecimento
+        profile: Perfil docling (padrão: perfil do serviço)
+    """
+    state.status = "running"
+    state.started_at = time.time()
+    logger.info("[WARMUP] Aquecendo pipeline com documento sintético...")
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="warmup_") as directory:
+            path = Path(directory) / "warmup.pdf"
+            path.write_bytes(build_warmup_pdf())
+
+            state.stages_ms = await asyncio.wait_for(
+                orchestrator.warmup(path, profile=profile),
+                timeout=timeout_seconds
+            )
+
+        state.status = "ready"
+        logger.info(f"[WARMUP] Pronto em {(time.time() - state.started_at) * 1000:.0f}ms")
+
+    except asyncio.TimeoutError:
+        state.status = "failed"
+        state.error = f"Aquecimento excedeu {timeout_seconds}s"
+        logger.error(f"[WARMUP] {state.error}")
+
+    except Exception as e:
+        state.status = "failed"
+        state.error = str(e)
+        logger.error(f"[WARMUP] Falha no aquecimento: {e}")
+
+    finally:
+        state.finished_at = time.time()
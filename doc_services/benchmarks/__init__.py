@@ -0,0 +1,16 @@
+"""
+Benchmarks de desempenho do pipeline de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+Scripts executados manualmente (não fazem parte da suíte de testes)
+para medir o efeito de otimizações em documentos sintéticos. Rodar a
+partir de doc_services/, por exemplo:
+
+    python -m benchmarks.bench_page_sharding --pages 1 10 50
+    python -m benchmarks.bench_serialization --pages 50
+
+Teste de carga ponta a ponta (corpus sintético + relatório JSON):
+
+    python -m benchmarks.corpus --out bench_corpus
+    python -m benchmarks.load_test --corpus bench_corpus --concurrency 8
+"""
@@ -0,0 +1,146 @@
+"""
+Benchmark: cliente LLM por requisição vs. singleton com pool e limitador.
+
+EXPLICAÇÃO EDUCATIVA:
+Dispara --requests classificações simultâneas contra o servidor falso
+(benchmarks/fake_llm_server.py, iniciado em thread se --base-url não for
+informado) em dois modos:
+1. por requisição: um AnthropicService novo a cada chamada (sem limite)
+2. singleton: um único service com pool de conexões e LLMRateLimiter
+
+Compara latência (p50/p95), falhas, novas tentativas, conexões TCP
+abertas e concorrência máxima vista pelo servidor.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.bench_llm_client --requests 200 --max-in-flight 16 --server-rpm 600
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import threading
+import time
+
+import httpx
+
+from app.core.rate_limit import LLMRateLimiter
+from app.services import LLMServiceError, create_anthropic_service
+
+from benchmarks.fake_llm_server import create_app
+
+TYPES = ["scientific_article", "invoice", "letter", "contract"]
+
+
+def _start_server(port: int, latency_ms: float, rpm: int, error_rate: float) -> str:
+    """Inicia o servidor falso em uma thread e retorna sua URL."""
+    import uvicorn
+
+    app = create_app(latency_ms=latency_ms, jitter_ms=latency_ms / 4, requests_per_minute=rpm, error_rate=error_rate)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def _server_stats(base_url: str, reset: bool = False) -> dict:
+    """Lê (ou zera) os contadores do servidor falso."""
+    async with httpx.AsyncClient() as client:
+        if reset:
+            return (await client.delete(f"{base_url}/stats")).json()
+        return (await client.get(f"{base_url}/stats")).json()
+
+
+async def _run_mode(name: str, base_url: str, requests: int, make_service, shared) -> None:
+    """Executa uma rodada e imprime os resultados."""
+    await _server_stats(base_url, reset=True)
+    latencies = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        service = shared or make_service()
+        image = {"base64_data": base64.b64encode(os.urandom(256)).decode("ascii"), "mime_type": "image/png"}
+        start = time.perf_counter()
+        try:
+            await service.classify_document(f"doc_{i}.png", TYPES, image_data=image)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except LLMServiceError:
+            failures += 1
+        finally:
+            if shared is None:
+                await service.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    server = await _server_stats(base_url)
+    latencies.sort()
+    p50 = statistics.median(latencies) if latencies else 0.0
+    p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+
+    print(f"\n[{name}] {requests} requisições em {elapsed:.1f}s")
+    print(f"  sucesso={len(latencies)} falhas={failures} p50={p50:.0f}ms p95={p95:.0f}ms")
+    print(
+        f"  servidor: 429={server['rate_limited']} "
+        f"conexões={server['connections']} "
+        f"concorrência máx={server['max_in_flight']}"
+    )
+    if shared is not None:
+        stats = shared.get_stats()
+        limiter = stats["limiter"]
+        print(
+            f"  cliente: retries={stats['retries']} {stats['retries_by_status']} "
+            f"espera fila média={limiter['queue_wait_ms_avg']:.0f}ms máx={limiter['queue_wait_ms_max']:.0f}ms"
+        )
+
+
+async def run(args) -> None:
+    """Executa os dois modos em sequência."""
+    base_url = args.base_url or _start_server(args.port, args.latency_ms, args.server_rpm, args.error_rate)
+
+    def make_service(**kwargs):
+        return create_anthropic_service(api_key="fake", base_url=base_url, max_retries=args.retries, **kwargs)
+
+    await _run_mode("por requisição", base_url, args.requests, make_service, shared=None)
+
+    pooled = make_service(
+        limiter=LLMRateLimiter(
+            max_in_flight=args.max_in_flight,
+            requests_per_minute=args.client_rpm,
+            tokens_per_minute=args.client_tpm
+        ),
+        max_connections=args.max_in_flight,
+        backoff_base_seconds=args.backoff_base
+    )
+    try:
+        await _run_mode("singleton", base_url, args.requests, None, shared=pooled)
+    finally:
+        await pooled.close()
+
+
+def main() -> None:
+    """Ponto de entrada (argumentos de linha de comando)."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="Servidor já em execução (padrão: inicia um local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--server-rpm", type=int, default=0, help="Limite simulado da conta")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--client-rpm", type=int, default=0)
+    parser.add_argument("--client-tpm", type=int, default=0)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff-base", type=float, default=0.5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: UC2 em chamada única vs. dividido em faixas de páginas.
+
+EXPLICAÇÃO EDUCATIVA:
+Para cada tamanho de documento, o mesmo PDF sintético é convertido:
+1. Em uma única chamada ao docling (shard_pages=0)
+2. Dividido em faixas de até --shard-pages páginas, em paralelo
+
+Os dois modos usam o mesmo CPUExecutor (mesmos processos, já aquecidos),
+então a diferença medida é apenas o paralelismo entre páginas. Também
+verifica se os dois modos encontram o mesmo número de parágrafos.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.bench_page_sharding --pages 1 10 50 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from app.core.executor import CPUExecutor
+from app.integrations import init_docling_worker
+from app.services import ParagraphDetectionService
+
+from benchmarks.synthetic_pdf import build_text_pdf
+
+
+async def _measure(service: ParagraphDetectionService, pdf_path: Path, repeat: int):
+    """Retorna (mediana em ms, número de parágrafos)."""
+    timings = []
+    paragraphs = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paragraphs = await service.detect_paragraphs_async(pdf_path)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings), len(paragraphs)
+
+
+async def run(pages_list, shard_pages: int, workers: int, repeat: int, profile: str) -> None:
+    """Executa o benchmark e imprime a tabela de resultados."""
+    executor = CPUExecutor(
+        process_workers=workers,
+        thread_workers=2,
+        max_queue_depth=max(16, 2 * workers),
+        use_processes=True,
+        process_initializer=partial(init_docling_worker, profile)
+    )
+
+    single = ParagraphDetectionService(executor=executor, default_profile=profile, shard_pages=0)
+    sharded = ParagraphDetectionService(
+        executor=executor,
+        default_profile=profile,
+        shard_pages=shard_pages
+    )
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Aquecer todos os processos antes de medir
+            warmup_path = Path(tmp_dir) / "warmup.pdf"
+            warmup_path.write_bytes(build_text_pdf(workers * shard_pages))
+            await sharded.detect_paragraphs_async(warmup_path)
+
+            print(f"perfil={profile} workers={workers} shard_pages={shard_pages} repeat={repeat}")
+            print(f"{'páginas':>8} {'único (ms)':>12} {'faixas (ms)':>12} {'speedup':>8} {'parágrafos':>12}")
+
+            for pages in pages_list:
+                pdf_path = Path(tmp_dir) / f"doc_{pages}.pdf"
+                pdf_path.write_bytes(build_text_pdf(pages))
+
+                single_ms, single_count = await _measure(single, pdf_path, repeat)
+                sharded_ms, sharded_count = await _measure(sharded, pdf_path, repeat)
+
+                counts = f"{single_count}" if single_count == sharded_count else f"{single_count}≠{sharded_count}"
+                print(
+                    f"{pages:>8} {single_ms:>12.0f} {sharded_ms:>12.0f} "
+                    f"{single_ms / sharded_ms:>7.2f}x {counts:>12}"
+                )
+    finally:
+        executor.shutdown(wait=True)
+
+
+def main() -> None:
+    """Ponto de entrada (argumentos de linha de comando)."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--shard-pages", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", default="balanced", choices=["fast", "balanced", "accurate"])
+    args = parser.parse_args()
+
+    asyncio.run(run(args.pages, args.shard_pages, args.workers, args.repeat, args.profile))
+
+
+if __name__ == "__main__":
+    main()
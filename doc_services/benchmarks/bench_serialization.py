@@ -0,0 +1,143 @@
+"""
+Benchmark: serialização do AnalysisResult de um artigo longo.
+
+EXPLICAÇÃO EDUCATIVA:
+Monta o resultado de um artigo sintético de --pages páginas (parágrafos
+com bbox, vocabulário realista e relatório do UC4, usando os próprios
+serviços UC3/UC4) e compara:
+1. Caminho padrão do FastAPI: jsonable_encoder + json.dumps
+2. FastJSONResponse: model_dump + orjson
+3. Projeções (?fields= / ?exclude=) comuns
+
+Para cada variante: tempo mediano de serialização, tamanho do corpo e
+tamanho comprimido com gzip e brotli (se instalado).
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.bench_serialization --pages 50
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import FastJSONResponse, brotli, project
+from app.models import AnalysisResult, BoundingBox, Paragraph
+from app.services import ComplianceService, TextAnalysisService
+
+VARIANTS = [
+    ("completo (padrão FastAPI)", None, None),
+    ("completo (orjson)", None, None),
+    ("exclude=paragraphs.text", None, "paragraphs.text"),
+    ("exclude=paragraphs,word_frequencies", None, "paragraphs,word_frequencies"),
+    ("fields=summary,compliance,top_words", "summary,compliance,top_words", None),
+]
+
+
+def _vocabulary(rng: random.Random, size: int) -> list:
+    """Palavras sintéticas (sílabas aleatórias) com frequência tipo Zipf."""
+    syllables = ["ca", "de", "ti", "mo", "ra", "se", "lu", "no", "pe", "vi", "ção", "dos", "tra", "men"]
+    return ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def build_result(pages: int, paragraphs_per_page: int = 8, words_per_paragraph: int = 120) -> AnalysisResult:
+    """Resultado de análise de um artigo sintético de `pages` páginas."""
+    rng = random.Random(42)
+    vocabulary = _vocabulary(rng, 6000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    paragraphs = []
+    for page in range(pages):
+        for slot in range(paragraphs_per_page):
+            words = rng.choices(vocabulary, weights=weights, k=words_per_paragraph)
+            y = 72 + slot * 85
+            paragraphs.append(Paragraph(
+                index=len(paragraphs),
+                text=" ".join(words) + ".",
+                word_count=len(words),
+                bbox=BoundingBox(x1=72.0, y1=y, x2=540.0, y2=y + 80.0),
+                page=page + 1,
+                confidence=0.97
+            ))
+
+    text_analysis = TextAnalysisService().analyze_text(paragraphs)
+    compliance_service = ComplianceService(
+        template_path=Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+    )
+    compliance = compliance_service.validate_compliance(text_analysis.total_words, len(paragraphs))
+    report = compliance_service.generate_report("artigo_longo.pdf", text_analysis.total_words, len(paragraphs))
+
+    return AnalysisResult(
+        document_id=str(uuid.uuid4()),
+        filename="artigo_longo.pdf",
+        is_scientific_paper=True,
+        classification_confidence=0.94,
+        paragraphs=paragraphs,
+        text_analysis=text_analysis,
+        compliance=compliance,
+        compliance_report_markdown=report,
+        analyzed_at=datetime.now(),
+        processing_time_ms=41234.5
+    )
+
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(pages: int, repeat: int) -> None:
+    """Executa o benchmark e imprime a tabela de resultados."""
+    result = build_result(pages)
+    print(
+        f"Artigo sintético: {pages} páginas, {len(result.paragraphs)} parágrafos, "
+        f"{result.text_analysis.total_words} palavras, {result.text_analysis.unique_words} únicas\n"
+    )
+    header = f"{'variante':40} {'tempo ms':>9} {'bytes':>11} {'gzip':>10} {'br':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for index, (name, fields, exclude) in enumerate(VARIANTS):
+        if index == 0:
+            # Mesmo caminho do FastAPI com response_model + JSONResponse
+            def serialize():
+                return json.dumps(
+                    jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8")
+        else:
+            def serialize(fields=fields, exclude=exclude):
+                return FastJSONResponse(project(result, fields, exclude)).body
+
+        elapsed = _median_ms(serialize, repeat)
+        body = serialize()
+        gzip_size = len(gzip.compress(body, compresslevel=6))
+        br_size = len(brotli.compress(body, quality=4)) if brotli is not None else None
+
+        print(
+            f"{name:40} {elapsed:9.2f} {len(body):11,} {gzip_size:10,} "
+            f"{br_size if br_size is not None else '-':>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de serialização do AnalysisResult")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Corpus sintético para os testes de carga.
+
+EXPLICAÇÃO EDUCATIVA:
+O custo do pipeline depende muito do tipo de documento:
+- PDF com camada de texto: docling extrai o texto sem OCR
+- PDF escaneado (só imagens): OCR em todas as páginas
+- TIFF/PNG escaneados: decodificação no STEP0, UC1 sobre pixels e OCR;
+  o custo cresce com o DPI (300 DPI tem 4x os pixels de 150 DPI)
+
+Este módulo gera os três tipos com número de páginas e DPI controlados,
+com texto legível (fonte escalável do Pillow) e uma leve inclinação
+para imitar o scanner. Os arquivos são gravados em disco com um
+manifest.json descrevendo cada documento.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.corpus --out bench_corpus --pages 1 5 --dpi 150 300
+"""
+
+import argparse
+import io
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from benchmarks.synthetic_pdf import LOREM, build_text_pdf
+
+# Carta americana (mesmo MediaBox de synthetic_pdf)
+PAGE_WIDTH_IN = 8.5
+PAGE_HEIGHT_IN = 11.0
+
+
+@dataclass
+class CorpusDocument:
+    """Documento do corpus e suas características."""
+
+    name: str
+    path: str
+    content_type: str
+    kind: str  # text_pdf, scanned_pdf, tiff, png
+    pages: int
+    dpi: Optional[int] = None
+    size_bytes: int = 0
+
+
+def render_page(page_number: int, dpi: int, paragraphs: int = 5, skew_degrees: float = 0.6) -> Image.Image:
+    """
+    Renderiza uma página "escaneada" em tons de cinza.
+
+    Args:
+        page_number: Número exibido no cabeçalho
+        dpi: Resolução (define tamanho da página e da fonte)
+        paragraphs: Parágrafos de texto
+        skew_degrees: Inclinação simulada do scanner
+
+    Returns:
+        Página em modo L
+    """
+    width, height = int(PAGE_WIDTH_IN * dpi), int(PAGE_HEIGHT_IN * dpi)
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+
+    # Fonte de 11 pt na resolução da página
+    font = ImageFont.load_default(size=max(8, round(11 / 72 * dpi)))
+    line_height = round(14 / 72 * dpi)
+    margin = dpi  # 1 polegada
+    y = margin
+
+    draw.text((margin, y), f"Pagina {page_number}", fill=0, font=font)
+    y += 2 * line_height
+    for paragraph in range(paragraphs):
+        for line in range(4):
+            if y > height - margin:
+                break
+            draw.text((margin, y), f"{paragraph + 1}.{line + 1} {LOREM}", fill=0, font=font)
+            y += line_height
+        y += line_height
+
+    if skew_degrees:
+        page = page.rotate(skew_degrees, resample=Image.BILINEAR, fillcolor=255)
+    return page
+
+
+def build_scanned_pdf(pages: int, dpi: int) -> bytes:
+    """PDF sem camada de texto: cada página é uma imagem."""
+    images = [render_page(i + 1, dpi) for i in range(pages)]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:], resolution=dpi)
+    return buffer.getvalue()
+
+
+def build_tiff(pages: int, dpi: int) -> bytes:
+    """TIFF multipágina bitonal (CCITT group 4, como scanners de documentos)."""
+    images = [render_page(i + 1, dpi).point(lambda v: 255 if v > 128 else 0).convert("1") for i in range(pages)]
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer,
+        format="TIFF",
+        save_all=True,
+        append_images=images[1:],
+        compression="group4",
+        dpi=(dpi, dpi)
+    )
+    return buffer.getvalue()
+
+
+def build_png(dpi: int) -> bytes:
+    """PNG de uma página em tons de cinza."""
+    buffer = io.BytesIO()
+    render_page(1, dpi).save(buffer, format="PNG", dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def build_corpus(out_dir: Path, pages: Iterable[int] = (1, 5), dpis: Iterable[int] = (150, 300)) -> List[CorpusDocument]:
+    """
+    Gera o corpus completo e grava manifest.json.
+
+    Para cada quantidade de páginas: PDF com texto; para cada DPI também
+    PDF escaneado e TIFF. PNG (uma página) é gerado uma vez por DPI.
+
+    Args:
+        out_dir: Diretório de saída
+        pages: Quantidades de páginas
+        dpis: Resoluções das versões escaneadas
+
+    Returns:
+        Documentos gerados
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    documents: List[CorpusDocument] = []
+
+    def add(name: str, data: bytes, content_type: str, kind: str, page_count: int, dpi: Optional[int] = None):
+        path = out_dir / name
+        path.write_bytes(data)
+        documents.append(CorpusDocument(
+            name=name,
+            path=str(path),
+            content_type=content_type,
+            kind=kind,
+            pages=page_count,
+            dpi=dpi,
+            size_bytes=len(data)
+        ))
+
+    dpis = list(dpis)
+    for page_count in pages:
+        add(f"text_{page_count}p.pdf", build_text_pdf(page_count), "application/pdf", "text_pdf", page_count)
+        for dpi in dpis:
+            add(f"scanned_{page_count}p_{dpi}dpi.pdf", build_scanned_pdf(page_count, dpi),
+                "application/pdf", "scanned_pdf", page_count, dpi)
+            add(f"scanned_{page_count}p_{dpi}dpi.tiff", build_tiff(page_count, dpi),
+                "image/tiff", "tiff", page_count, dpi)
+    for dpi in dpis:
+        add(f"scanned_{dpi}dpi.png", build_png(dpi), "image/png", "png", 1, dpi)
+
+    (out_dir / "manifest.json").write_text(json.dumps([asdict(d) for d in documents], indent=2))
+    return documents
+
+
+def load_corpus(out_dir: Path) -> List[CorpusDocument]:
+    """Lê o manifest.json de um corpus já gerado."""
+    manifest = json.loads((out_dir / "manifest.json").read_text())
+    return [CorpusDocument(**entry) for entry in manifest]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera o corpus sintético dos testes de carga")
+    parser.add_argument("--out", type=Path, default=Path("bench_corpus"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--dpi", type=int, nargs="+", default=[150, 300])
+    args = parser.parse_args()
+
+    for document in build_corpus(args.out, args.pages, args.dpi):
+        print(f"{document.name:32} {document.kind:12} {document.pages:3}p {document.size_bytes / 1024:10.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Servidor falso da Messages API da Anthropic para testes de carga.
+
+EXPLICAÇÃO EDUCATIVA:
+Responde POST /v1/messages no mesmo formato da API real, escolhendo o
+primeiro tipo listado no prompt como classificação. Permite simular:
+- latência da API (--latency-ms, --jitter-ms)
+- limite de requisições por minuto da conta (responde 429 + Retry-After)
+- falhas transientes (--error-rate, responde 529 "overloaded")
+
+GET /stats mostra requisições, 429s, concorrência máxima e conexões TCP
+distintas (portas de origem), para verificar reutilização de conexões;
+DELETE /stats zera os contadores entre rodadas.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.fake_llm_server --port 8765 --rpm 120
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(
+    latency_ms: float = 800.0,
+    jitter_ms: float = 200.0,
+    requests_per_minute: int = 0,
+    error_rate: float = 0.0
+) -> FastAPI:
+    """
+    Cria a aplicação do servidor falso.
+
+    Args:
+        latency_ms: Latência média simulada por chamada
+        jitter_ms: Variação aleatória da latência (+/-)
+        requests_per_minute: Limite simulado da conta (0 = sem limite)
+        error_rate: Fração de chamadas que falham com 529
+
+    Returns:
+        Aplicação FastAPI
+    """
+    app = FastAPI(title="Fake Anthropic Messages API")
+
+    window = deque()
+    stats = {}
+
+    def reset_stats() -> None:
+        window.clear()
+        stats.update(
+            requests=0,
+            rate_limited=0,
+            errors=0,
+            in_flight=0,
+            max_in_flight=0,
+            connections=set()
+        )
+
+    reset_stats()
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if request.client is not None:
+            stats["connections"].add((request.client.host, request.client.port))
+
+        now = time.monotonic()
+        if requests_per_minute > 0:
+            while window and now - window[0] > 60:
+                window.popleft()
+            if len(window) >= requests_per_minute:
+                stats["rate_limited"] += 1
+                retry_after = max(1, int(60 - (now - window[0])))
+                return JSONResponse(
+                    status_code=429,
+                    headers={"retry-after": str(retry_after)},
+                    content={"type": "error", "error": {"type": "rate_limit_error", "message": "limite"}}
+                )
+            window.append(now)
+
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=529,
+                content={"type": "error", "error": {"type": "overloaded_error", "message": "sobrecarga"}}
+            )
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+
+        prompt = json.dumps(body.get("messages", []), ensure_ascii=False)
+        match = re.search(r"\\n  - ([a-z_]+)", prompt)
+        predicted = match.group(1) if match else "unknown"
+
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{
+                "type": "text",
+                "text": json.dumps({
+                    "predicted_type": predicted,
+                    "confidence": 0.9,
+                    "reasoning": "resposta do servidor falso"
+                })
+            }],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 40},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "connections": len(stats["connections"])}
+
+    @app.delete("/stats")
+    async def delete_stats():
+        reset_stats()
+        return {"reset": True}
+
+    return app
+
+
+def main() -> None:
+    """Ponto de entrada (argumentos de linha de comando)."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.rpm, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
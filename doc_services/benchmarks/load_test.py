@@ -0,0 +1,587 @@
+"""
+Teste de carga ponta a ponta da API (in-process ou HTTP real).
+
+EXPLICAÇÃO EDUCATIVA:
+Os testes unitários validam cada serviço isoladamente; este harness mede
+a vazão da aplicação inteira sob concorrência, com os documentos do
+corpus sintético (benchmarks/corpus.py).
+
+Dois modos de transporte:
+1. asgi (padrão): a aplicação FastAPI roda no próprio processo
+   (httpx.ASGITransport, com startup/shutdown). Sem rede: mede o custo
+   do pipeline e permite medir recursos do próprio processo
+2. http (--base-url): servidor real (uvicorn com N workers), inclusive
+   remoto. --server-pid mede CPU/RSS do servidor via /proc (Linux)
+
+Relatório:
+- por endpoint: vazão, erros e latência p50/p95/p99
+- por etapa (STEP0, UC1-UC4) e espera na fila do executor: percentis
+  calculados dos histogramas do /metrics (diferença antes/depois)
+- recursos: pico de RSS e uso de CPU da árvore de processos (workers do
+  ProcessPool incluídos)
+
+Com --output o resultado vai para JSON; --compare mostra a variação em
+relação a uma execução anterior.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.corpus --out bench_corpus
+    python -m benchmarks.load_test --corpus bench_corpus --endpoints analyze classify \\
+        --concurrency 8 --requests 200 --output run.json
+    python -m benchmarks.load_test --base-url http://localhost:8000 --server-pid 1234 \\
+        --corpus bench_corpus --duration 60 --compare run.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import resource
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.corpus import CorpusDocument, build_corpus, load_corpus
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    """Endpoint exercitado pelo teste de carga."""
+
+    method: str
+    path: str
+    upload: bool = True
+    form: Dict[str, str] = field(default_factory=dict)
+
+
+ENDPOINTS: Dict[str, EndpointSpec] = {
+    "analyze": EndpointSpec("POST", "/api/v1/analyze"),
+    "uc1": EndpointSpec("POST", "/api/v1/classify"),
+    "classify": EndpointSpec("POST", "/classify", form={"use_llm": "false"}),
+    "llm": EndpointSpec("POST", "/classify", form={"use_llm": "true"}),
+    "cascade": EndpointSpec("POST", "/classify", form={"cascade": "true"}),
+    "health": EndpointSpec("GET", "/health", upload=False),
+}
+
+
+@dataclass
+class Sample:
+    """Resultado de uma requisição."""
+
+    endpoint: str
+    kind: str
+    status: int
+    latency_ms: float
+
+
+# ============================================================================
+# Estatística
+# ============================================================================
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentil com interpolação linear (q em 0-1)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def histogram_quantile(buckets: List[Tuple[float, float]], q: float) -> Optional[float]:
+    """
+    Quantil de um histograma Prometheus (mesma interpolação do PromQL).
+
+    Args:
+        buckets: Pares (limite superior, contagem acumulada), ordenados
+        q: Quantil (0-1)
+
+    Returns:
+        Valor estimado em segundos (None sem observações)
+    """
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    previous_bound, previous_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (rank - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 e média (ms)."""
+    summary = {f"p{int(q * 100)}_ms": percentile(latencies, q) for q in PERCENTILES}
+    summary["mean_ms"] = sum(latencies) / len(latencies) if latencies else None
+    return summary
+
+
+# ============================================================================
+# Métricas do servidor (/metrics)
+# ============================================================================
+
+async def scrape_histograms(client: httpx.AsyncClient, namespace: str) -> Dict[str, Dict[str, Dict[float, float]]]:
+    """
+    Lê os histogramas por etapa do /metrics.
+
+    Returns:
+        {"stage": {etapa: {le: contagem}}, "queue_wait": {etapa: {le: contagem}}}
+        (somando os desfechos); vazio se /metrics não estiver disponível
+    """
+    from prometheus_client.parser import text_string_to_metric_families
+
+    histograms = {"stage": defaultdict(lambda: defaultdict(float)), "queue_wait": defaultdict(lambda: defaultdict(float))}
+    names = {
+        f"{namespace}_stage_duration_seconds_bucket": "stage",
+        f"{namespace}_executor_queue_wait_seconds_bucket": "queue_wait",
+    }
+
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return {}
+    if response.status_code != 200:
+        return {}
+
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            target = names.get(sample.name)
+            if target is not None:
+                le = float(sample.labels["le"])
+                histograms[target][sample.labels["stage"]][le] += sample.value
+
+    return histograms
+
+
+def stage_report(before: Dict, after: Dict) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """Percentis por etapa das observações feitas durante o teste."""
+    report: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+    for kind in ("stage", "queue_wait"):
+        for stage, buckets in after.get(kind, {}).items():
+            previous = before.get(kind, {}).get(stage, {})
+            delta = sorted((le, count - previous.get(le, 0.0)) for le, count in buckets.items())
+            total = delta[-1][1] if delta else 0
+            if total <= 0:
+                continue
+            entry = {"count": total}
+            for q in PERCENTILES:
+                value = histogram_quantile(delta, q)
+                entry[f"p{int(q * 100)}_ms"] = value * 1000 if value is not None else None
+            report.setdefault(kind, {})[stage] = entry
+    return report
+
+
+# ============================================================================
+# Recursos (CPU e RSS da árvore de processos)
+# ============================================================================
+
+class ProcessTreeSampler:
+    """
+    Amostra CPU e memória de um processo e seus descendentes via /proc.
+
+    EXPLICAÇÃO EDUCATIVA:
+    Os workers do ProcessPool (docling) e do uvicorn são processos
+    filhos; medir só o processo principal esconderia a maior parte do
+    custo. A cada intervalo somamos o RSS de toda a árvore (pico) e o
+    tempo de CPU (utime + stime, incluindo filhos já encerrados).
+    """
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        self.pid = pid
+        self.interval = interval
+        self.available = Path(f"/proc/{pid}/stat").exists()
+        self.peak_rss_bytes = 0
+        self._cpu_start = 0.0
+        self._cpu_last = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = resource.getpagesize()
+
+    def _tree(self) -> List[int]:
+        pids, pending = [], [self.pid]
+        while pending:
+            pid = pending.pop()
+            pids.append(pid)
+            for task in Path(f"/proc/{pid}/task").glob("*"):
+                try:
+                    pending.extend(int(child) for child in (task / "children").read_text().split())
+                except OSError:
+                    pass
+        return pids
+
+    def _read(self) -> Tuple[float, int]:
+        cpu, rss = 0.0, 0
+        for pid in self._tree():
+            try:
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            # utime, stime, cutime, cstime (campos 14-17); rss em páginas (campo 24)
+            cpu += sum(int(value) for value in fields[11:15]) / self._ticks
+            rss += int(fields[21]) * self._page_size
+        return cpu, rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        cpu, rss = self._read()
+        self._cpu_last = max(self._cpu_last, cpu)
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+    def start(self) -> None:
+        if not self.available:
+            return
+        self._cpu_start, self.peak_rss_bytes = self._read()
+        self._cpu_last = self._cpu_start
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        """Encerra a amostragem e retorna CPU consumida e pico de RSS."""
+        if not self.available:
+            return {"cpu_seconds": None, "peak_rss_mb": None}
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return {
+            "cpu_seconds": self._cpu_last - self._cpu_start,
+            "peak_rss_mb": self.peak_rss_bytes / (1024 * 1024),
+        }
+
+
+def _rusage_resources(before: Tuple[float, float]) -> Dict[str, Optional[float]]:
+    """Alternativa sem /proc: getrusage do próprio processo (modo asgi)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+    # ru_maxrss: KB no Linux, bytes no macOS
+    scale = 1 if platform.system() == "Darwin" else 1024
+    return {
+        "cpu_seconds": cpu - before[0],
+        "peak_rss_mb": max(usage.ru_maxrss, children.ru_maxrss) * scale / (1024 * 1024),
+    }
+
+
+# ============================================================================
+# Execução
+# ============================================================================
+
+@asynccontextmanager
+async def asgi_lifespan(app):
+    """Executa startup/shutdown da aplicação ASGI (protocolo lifespan)."""
+    receive_queue: asyncio.Queue = asyncio.Queue()
+    send_queue: asyncio.Queue = asyncio.Queue()
+    await receive_queue.put({"type": "lifespan.startup"})
+
+    task = asyncio.create_task(app(
+        {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}},
+        receive_queue.get,
+        send_queue.put
+    ))
+    message = await send_queue.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"Falha no startup da aplicação: {message}")
+    try:
+        yield
+    finally:
+        await receive_queue.put({"type": "lifespan.shutdown"})
+        await send_queue.get()
+        await task
+
+
+def build_plan(endpoints: Iterable[str], documents: List[CorpusDocument]) -> List[Tuple[str, Optional[CorpusDocument]]]:
+    """Combinações (endpoint, documento) percorridas em rodízio."""
+    plan = []
+    for name in endpoints:
+        if ENDPOINTS[name].upload:
+            plan.extend((name, document) for document in documents)
+        else:
+            plan.append((name, None))
+    return plan
+
+
+async def _send(client: httpx.AsyncClient, name: str, document: Optional[CorpusDocument], payloads: Dict[str, bytes]) -> Sample:
+    """Envia uma requisição e mede a latência."""
+    spec = ENDPOINTS[name]
+    kwargs: Dict[str, Any] = {}
+    if document is not None:
+        kwargs["files"] = {"file": (document.name, payloads[document.name], document.content_type)}
+        kwargs["data"] = spec.form
+
+    start = time.perf_counter()
+    try:
+        response = await client.request(spec.method, spec.path, **kwargs)
+        status_code = response.status_code
+    except httpx.HTTPError:
+        status_code = 0  # Falha de conexão/timeout
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    return Sample(endpoint=name, kind=document.kind if document else "-", status=status_code, latency_ms=latency_ms)
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    plan: List[Tuple[str, Optional[CorpusDocument]]],
+    concurrency: int,
+    total_requests: Optional[int],
+    duration: Optional[float]
+) -> Tuple[List[Sample], float]:
+    """
+    Dispara as requisições com concorrência fixa.
+
+    Args:
+        client: Cliente httpx (ASGI ou HTTP)
+        plan: Combinações percorridas em rodízio
+        concurrency: Requisições simultâneas
+        total_requests: Total de requisições (se duration não for dado)
+        duration: Duração do teste em segundos
+
+    Returns:
+        Tupla (amostras, duração real em segundos)
+    """
+    payloads = {
+        document.name: Path(document.path).read_bytes()
+        for _, document in plan if document is not None
+    }
+    cycle = itertools.cycle(plan)
+    samples: List[Sample] = []
+    issued = 0
+    start = time.perf_counter()
+
+    def next_item():
+        nonlocal issued
+        if duration is not None:
+            if time.perf_counter() - start >= duration:
+                return None
+        elif issued >= total_requests:
+            return None
+        issued += 1
+        return next(cycle)
+
+    async def worker():
+        while True:
+            item = next_item()
+            if item is None:
+                return
+            samples.append(await _send(client, *item, payloads))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def build_report(samples: List[Sample], elapsed: float, resources: Dict, stages: Dict, config: Dict) -> Dict[str, Any]:
+    """Consolida amostras, etapas e recursos no relatório JSON."""
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    endpoints = {}
+    for name, items in by_endpoint.items():
+        ok = [s.latency_ms for s in items if 200 <= s.status < 300]
+        statuses: Dict[str, int] = defaultdict(int)
+        by_kind: Dict[str, List[float]] = defaultdict(list)
+        for s in items:
+            statuses[str(s.status)] += 1
+            if 200 <= s.status < 300:
+                by_kind[s.kind].append(s.latency_ms)
+        endpoints[name] = {
+            "requests": len(items),
+            "errors": len(items) - len(ok),
+            "status_codes": dict(statuses),
+            "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+            **summarize_latencies(ok),
+            "by_kind": {kind: summarize_latencies(values) for kind, values in by_kind.items()},
+        }
+
+    cpu_seconds = resources.get("cpu_seconds")
+    cpu_count = os.cpu_count() or 1
+    resources = {
+        **resources,
+        "cpu_cores_used": cpu_seconds / elapsed if cpu_seconds is not None and elapsed else None,
+        "cpu_utilisation": cpu_seconds / (elapsed * cpu_count) if cpu_seconds is not None and elapsed else None,
+        "cpu_count": cpu_count,
+    }
+
+    return {
+        "config": config,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "elapsed_seconds": elapsed,
+        "total_requests": len(samples),
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "endpoints": endpoints,
+        "stages": stages,
+        "resources": resources,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Prepara corpus e cliente, executa o teste e monta o relatório."""
+    corpus_dir = Path(args.corpus)
+    if (corpus_dir / "manifest.json").exists():
+        documents = load_corpus(corpus_dir)
+    else:
+        documents = build_corpus(corpus_dir)
+    if args.kinds:
+        documents = [d for d in documents if d.kind in args.kinds]
+
+    plan = build_plan(args.endpoints, documents)
+    total_requests = None if args.duration else args.requests
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            sampler = ProcessTreeSampler(args.server_pid) if args.server_pid else None
+            return await _measure(client, plan, args, total_requests, sampler, rusage_start=None)
+
+    from app.main import app
+
+    async with asgi_lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            # Aquecimento: carrega modelos antes de medir (primeira requisição de cada combinação)
+            payloads = {d.name: Path(d.path).read_bytes() for d in documents}
+            for item in plan[:args.warmup]:
+                await _send(client, *item, payloads)
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            rusage_start = (usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime, 0.0)
+            return await _measure(client, plan, args, total_requests, ProcessTreeSampler(os.getpid()), rusage_start)
+
+
+async def _measure(client, plan, args, total_requests, sampler, rusage_start) -> Dict[str, Any]:
+    """Mede uma execução: /metrics antes/depois, recursos e amostras."""
+    before = await scrape_histograms(client, args.metrics_namespace)
+    if sampler is not None:
+        sampler.start()
+
+    samples, elapsed = await drive(client, plan, args.concurrency, total_requests, args.duration)
+
+    if sampler is not None and sampler.available:
+        resources = sampler.stop()
+    elif rusage_start is not None:
+        resources = _rusage_resources(rusage_start)
+    else:
+        resources = {"cpu_seconds": None, "peak_rss_mb": None}
+
+    after = await scrape_histograms(client, args.metrics_namespace)
+
+    config = {
+        "mode": "http" if args.base_url else "asgi",
+        "base_url": args.base_url,
+        "endpoints": args.endpoints,
+        "kinds": args.kinds,
+        "concurrency": args.concurrency,
+        "requests": total_requests,
+        "duration": args.duration,
+        "documents": len({d.name for _, d in plan if d is not None}),
+    }
+    return build_report(samples, elapsed, resources, stage_report(before, after), config)
+
+
+# ============================================================================
+# Saída
+# ============================================================================
+
+def _fmt(value: Optional[float], digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Imprime o relatório em tabelas."""
+    print(f"\n{report['total_requests']} requisições em {report['elapsed_seconds']:.1f}s "
+          f"({report['throughput_rps']:.2f} req/s, modo {report['config']['mode']}, "
+          f"concorrência {report['config']['concurrency']})\n")
+
+    print(f"{'endpoint':10} {'req':>6} {'erros':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, entry in report["endpoints"].items():
+        print(f"{name:10} {entry['requests']:6} {entry['errors']:6} {entry['throughput_rps']:8.2f} "
+              f"{_fmt(entry['p50_ms']):>9} {_fmt(entry['p95_ms']):>9} {_fmt(entry['p99_ms']):>9}")
+
+    for kind, title in (("stage", "etapa"), ("queue_wait", "fila")):
+        entries = report["stages"].get(kind)
+        if not entries:
+            continue
+        print(f"\n{title:10} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stage, entry in sorted(entries.items()):
+            print(f"{stage:10} {entry['count']:6.0f} {_fmt(entry['p50_ms']):>9} "
+                  f"{_fmt(entry['p95_ms']):>9} {_fmt(entry['p99_ms']):>9}")
+
+    resources = report["resources"]
+    print(f"\nCPU: {_fmt(resources['cpu_seconds'])}s "
+          f"({_fmt(resources['cpu_cores_used'], 2)} núcleos, "
+          f"{_fmt(resources['cpu_utilisation'] * 100 if resources['cpu_utilisation'] is not None else None)}% "
+          f"de {resources['cpu_count']}) | pico RSS: {_fmt(resources['peak_rss_mb'])} MB")
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Variação (%) de vazão e latência em relação a uma execução anterior."""
+    def delta(new, old) -> str:
+        if new is None or not old:
+            return "-"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"\nComparação com {baseline.get('started_at', 'execução anterior')}:")
+    print(f"{'endpoint':10} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, entry in report["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if old is None:
+            continue
+        print(f"{name:10} {delta(entry['throughput_rps'], old['throughput_rps']):>9} "
+              f"{delta(entry['p50_ms'], old['p50_ms']):>9} {delta(entry['p95_ms'], old['p95_ms']):>9} "
+              f"{delta(entry['p99_ms'], old['p99_ms']):>9}")
+    for stage, entry in report["stages"].get("stage", {}).items():
+        old = baseline.get("stages", {}).get("stage", {}).get(stage)
+        if old is not None:
+            print(f"{stage:10} {'':>9} {delta(entry['p50_ms'], old['p50_ms']):>9} "
+                  f"{delta(entry['p95_ms'], old['p95_ms']):>9} {delta(entry['p99_ms'], old['p99_ms']):>9}")
+
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Teste de carga ponta a ponta da API")
+    parser.add_argument("--corpus", default="bench_corpus", help="Diretório do corpus (gerado se ausente)")
+    parser.add_argument("--endpoints", nargs="+", default=["analyze"], choices=sorted(ENDPOINTS))
+    parser.add_argument("--kinds", nargs="+", choices=["text_pdf", "scanned_pdf", "tiff", "png"])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="Total de requisições")
+    parser.add_argument("--duration", type=float, help="Duração em segundos (substitui --requests)")
+    parser.add_argument("--warmup", type=int, default=1, help="Requisições de aquecimento (modo asgi)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--base-url", help="Servidor HTTP real (omitido = in-process via ASGI)")
+    parser.add_argument("--server-pid", type=int, help="PID do servidor para medir CPU/RSS (modo http)")
+    parser.add_argument("--metrics-namespace", default=settings.PROMETHEUS_NAMESPACE)
+    parser.add_argument("--output", help="Grava o relatório em JSON")
+    parser.add_argument("--compare", help="Relatório JSON anterior para comparação")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.compare:
+        print_comparison(report, json.loads(Path(args.compare).read_text()))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nRelatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Mostra os traces mais lentos gravados pelo tracing (JSONL).
+
+EXPLICAÇÃO EDUCATIVA:
+O Tracer grava os traces lentos, com erro ou amostrados em
+TRACING_EXPORT_PATH. Este script agrupa os spans por trace, ordena pela
+duração do span raiz e imprime cada trace como árvore, com duração e
+atributos (páginas, bytes, parágrafos, tokens) de cada etapa.
+
+Uso (a partir de doc_services/):
+    python -m benchmarks.slow_traces logs/traces.jsonl --top 5
+"""
+
+import argparse
+from typing import Any, Dict, List
+
+from app.core.tracing import format_trace, load_traces
+
+
+def root_duration(spans: List[Dict[str, Any]]) -> float:
+    """Duração do span raiz do trace (0 se ausente)."""
+    roots = [span["duration_ms"] for span in spans if span["parent_id"] is None]
+    return roots[0] if roots else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mostra os traces mais lentos de um arquivo JSONL")
+    parser.add_argument("path", nargs="?", default="logs/traces.jsonl")
+    parser.add_argument("--top", type=int, default=5, help="Quantidade de traces")
+    args = parser.parse_args()
+
+    traces = sorted(load_traces(args.path).items(), key=lambda item: root_duration(item[1]), reverse=True)
+    for trace_id, spans in traces[:args.top]:
+        print(f"trace {trace_id} ({spans[0].get('sampling', '')})")
+        print(format_trace(spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Geração de PDFs sintéticos para benchmarks.
+
+EXPLICAÇÃO EDUCATIVA:
+Os benchmarks precisam de documentos com número de páginas controlado.
+Geramos PDFs "nascidos digitais" (texto em fonte Helvetica, sem
+dependências extras) com alguns parágrafos por página.
+"""
+
+from typing import List
+
+LOREM = (
+    "Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua"
+)
+
+
+def _page_stream(page_number: int, paragraphs_per_page: int) -> bytes:
+    """Conteúdo de uma página: parágrafos separados por linhas em branco."""
+    lines: List[str] = ["BT /F1 11 Tf 14 TL 72 740 Td"]
+
+    for paragraph in range(paragraphs_per_page):
+        lines.append(f"(Pagina {page_number} paragrafo {paragraph + 1}.) Tj T*")
+        for _ in range(4):
+            lines.append(f"({LOREM}) Tj T*")
+        lines.append("T*")
+
+    lines.append("ET")
+    return "\n".join(lines).encode("latin-1")
+
+
+def build_text_pdf(pages: int, paragraphs_per_page: int = 5) -> bytes:
+    """
+    Monta um PDF com camada de texto.
+
+    Args:
+        pages: Número de páginas
+        paragraphs_per_page: Parágrafos em cada página
+
+    Returns:
+        Bytes do PDF
+    """
+    # Objetos: 1 catálogo, 2 árvore de páginas, 3 fonte, depois (página, conteúdo) por página
+    page_ids = [4 + 2 * i for i in range(pages)]
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    for i, page_id in enumerate(page_ids):
+        stream = _page_stream(i + 1, paragraphs_per_page)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    return output
@@ -0,0 +1,144 @@
+"""
+Testes para o controle de admissão.
+
+EXPLICAÇÃO EDUCATIVA:
+O "trabalho" admitido é simulado com eventos asyncio: cada requisição
+segura o orçamento até o teste liberar, o que torna a ordem de admissão
+determinística.
+"""
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+from PyPDF2 import PdfWriter
+
+from app.core.admission import AdmissionController, AdmissionRejectedError, estimate_pages
+
+
+async def _hold(controller: AdmissionController, cost: float, release: asyncio.Event, log: list, name: str):
+    async with controller.admit(cost, "analyze"):
+        log.append(name)
+        await release.wait()
+
+
+class TestAdmissionController:
+    """Testes do orçamento, fila FIFO e recusas."""
+
+    def test_waiters_are_admitted_in_arrival_order(self):
+        """Com o orçamento ocupado, os próximos esperam e entram na ordem de chegada."""
+        controller = AdmissionController(budget=10, max_wait_seconds=5)
+
+        async def scenario():
+            log = []
+            first, rest = asyncio.Event(), asyncio.Event()
+            big = asyncio.ensure_future(_hold(controller, 8, first, log, "grande"))
+            await asyncio.sleep(0)
+            waiting = [
+                asyncio.ensure_future(_hold(controller, cost, rest, log, name))
+                for cost, name in ((5, "médio"), (1, "pequeno"))
+            ]
+            await asyncio.sleep(0.01)
+            # "pequeno" caberia, mas não ultrapassa "médio" na fila
+            assert log == ["grande"]
+            assert controller.get_stats()["queued"] == 2
+
+            first.set()
+            await asyncio.sleep(0.01)
+            assert log == ["grande", "médio", "pequeno"]
+            rest.set()
+            await asyncio.gather(big, *waiting)
+
+        asyncio.run(scenario())
+
+        stats = controller.get_stats()
+        assert stats["admitted"] == 3
+        assert stats["waited"] == 2
+        assert stats["in_use"] == 0
+
+    def test_timeout_and_full_queue_are_rejected_with_retry_after(self):
+        """Espera esgotada e fila cheia geram AdmissionRejectedError com Retry-After."""
+        controller = AdmissionController(budget=1, max_wait_seconds=0.05, max_queue=1)
+
+        async def scenario():
+            release = asyncio.Event()
+            holder = asyncio.ensure_future(_hold(controller, 1, release, [], "a"))
+            await asyncio.sleep(0)
+
+            waiter = asyncio.ensure_future(_hold(controller, 1, release, [], "b"))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejectedError) as full:
+                controller.check_queue("analyze")
+
+            with pytest.raises(AdmissionRejectedError) as timeout:
+                await waiter
+
+            release.set()
+            await holder
+            return full.value, timeout.value
+
+        full, timeout = asyncio.run(scenario())
+
+        assert full.reason == "queue_full"
+        assert timeout.reason == "timeout"
+        assert 1 <= timeout.retry_after <= 60
+        assert controller.get_stats()["rejected"] == {"queue_full": 1, "timeout": 1}
+
+    def test_cancelled_waiter_does_not_leak_budget(self):
+        """Cliente que desiste na fila não consome orçamento nem bloqueia os seguintes."""
+        controller = AdmissionController(budget=2, max_wait_seconds=5)
+
+        async def scenario():
+            log = []
+            release = asyncio.Event()
+            holder = asyncio.ensure_future(_hold(controller, 2, release, log, "a"))
+            await asyncio.sleep(0)
+            cancelled = asyncio.ensure_future(_hold(controller, 2, release, log, "b"))
+            after = asyncio.ensure_future(_hold(controller, 1, release, log, "c"))
+            await asyncio.sleep(0.01)
+
+            cancelled.cancel()
+            release.set()
+            await asyncio.gather(holder, after)
+            return log
+
+        assert asyncio.run(scenario()) == ["a", "c"]
+        assert controller.get_stats()["in_use"] == 0
+
+    def test_oversized_document_runs_alone(self):
+        """Documento mais caro que o orçamento é limitado ao orçamento, não recusado."""
+        controller = AdmissionController(budget=5, max_wait_seconds=0)
+
+        async def scenario():
+            async with controller.admit(500, "analyze"):
+                return controller.get_stats()["in_use"]
+
+        assert asyncio.run(scenario()) == 5
+
+
+class TestEstimatePages:
+    """Testes da estimativa de páginas."""
+
+    def test_pdf_and_tiff_page_counts(self, tmp_path):
+        """PDF conta páginas; TIFF conta quadros; arquivo aberto volta ao início."""
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=612, height=792)
+        pdf_path = tmp_path / "doc.pdf"
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+
+        tiff = io.BytesIO()
+        frames = [Image.new("L", (20, 20), color) for color in (0, 128)]
+        frames[0].save(tiff, format="TIFF", save_all=True, append_images=frames[1:])
+        tiff.seek(0)
+
+        assert estimate_pages(pdf_path, "application/pdf") == 3
+        assert estimate_pages(tiff, "image/tiff") == 2
+        assert tiff.tell() == 0
+
+    def test_unreadable_document_counts_as_one_page(self):
+        """Falha na leitura não impede a admissão: conta como uma página."""
+        assert estimate_pages(io.BytesIO(b"%PDF-quebrado"), "application/pdf") == 1
+        assert estimate_pages(io.BytesIO(b"\x89PNG"), "image/png") == 1
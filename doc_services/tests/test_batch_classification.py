@@ -0,0 +1,177 @@
+"""
+Testes para classificação em lote (/classify/batch).
+
+EXPLICAÇÃO EDUCATIVA:
+Testa a expansão de arquivos compactados, o cálculo de percentis, o
+streaming NDJSON (erros por item e linha de resumo) e o endpoint completo:
+o corpo é enviado depois que o FastAPI fecha os UploadFile.
+"""
+
+import asyncio
+import io
+import json
+import zipfile
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.uploads import SpooledUpload
+from app.services.batch_classification import (
+    BatchItem,
+    expand_archive,
+    percentile,
+    spool_items,
+    stream_batch,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def _item(index: int, content: bytes) -> BatchItem:
+    """Cria item de lote já copiado, com conteúdo fixo."""
+    return BatchItem(
+        index=index,
+        filename=f"doc{index}.png",
+        loader=lambda: io.BytesIO(content),
+        upload=SpooledUpload(f"doc{index}.png", "image/png", len(content), io.BytesIO(content))
+    )
+
+
+class TestBatchClassification:
+    """Testes para o serviço de lote."""
+
+    def test_percentile(self):
+        """Percentis com interpolação linear."""
+        values = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+        assert percentile(values, 50) == 30.0
+        assert percentile(values, 100) == 50.0
+        assert percentile([], 95) == 0.0
+
+    def test_expand_zip_skips_hidden_entries(self):
+        """Arquivos ocultos e diretórios são ignorados."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("docs/a.pdf", b"%PDF-1.4")
+            archive.writestr("__MACOSX/docs/._a.pdf", b"lixo")
+            archive.writestr(".DS_Store", b"lixo")
+        buffer.seek(0)
+
+        items = expand_archive("lote.zip", buffer)
+
+        assert [item.filename for item in items] == ["a.pdf"]
+        assert items[0].loader().read() == b"%PDF-1.4"
+
+    def test_invalid_archive(self):
+        """Arquivo compactado corrompido gera ValueError."""
+        with pytest.raises(ValueError):
+            expand_archive("lote.zip", io.BytesIO(b"nao e zip"))
+
+    def test_stream_item_errors_do_not_fail_batch(self):
+        """Erro em um item vira linha de erro e o lote continua."""
+        async def classify(item, upload):
+            if upload.read_bytes() == b"ruim":
+                raise ValueError("conteúdo inválido")
+            return json.dumps({"file_name": item.filename})
+
+        async def collect():
+            items = [_item(0, b"bom"), _item(1, b"ruim"), _item(2, b"bom")]
+            lines = []
+            async for line in stream_batch(
+                items, classify, max_concurrency=2,
+                error_mapper=lambda e: {"status_code": 500, "message": str(e)}
+            ):
+                lines.append(json.loads(line))
+            return lines
+
+        lines = asyncio.run(collect())
+
+        errors = [line for line in lines if line.get("error")]
+        summary = lines[-1]["summary"]
+
+        assert len(lines) == 4
+        assert errors[0]["index"] == 1
+        assert summary["succeeded"] == 2
+        assert summary["failed"] == 1
+        assert "p95" in summary["latency_ms"]
+
+    def test_stream_respects_concurrency_limit(self):
+        """No máximo max_concurrency itens rodam ao mesmo tempo."""
+        active = 0
+        peak = 0
+
+        async def classify(item, upload):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return "{}"
+
+        async def consume():
+            items = [_item(i, b"x") for i in range(10)]
+            async for _ in stream_batch(items, classify, 3, lambda e: {}):
+                pass
+
+        asyncio.run(consume())
+
+        assert peak == 3
+
+    def test_spool_errors_are_reported_per_item(self):
+        """Item de tipo desconhecido vira linha de erro; as cópias são fechadas no fim."""
+        items = [
+            BatchItem(index=0, filename="a.png", loader=lambda: io.BytesIO(PNG + b"a")),
+            BatchItem(index=1, filename="b.txt", loader=lambda: io.BytesIO(b"texto")),
+        ]
+        spool_items(items, max_bytes=1024, memory_bytes=1024)
+
+        async def classify(item, upload):
+            return json.dumps({"content": upload.read_bytes().decode("latin-1")})
+
+        async def collect():
+            return [json.loads(line) async for line in stream_batch(
+                items, classify, 2, lambda e: {"status_code": getattr(e, "status_code", 500)}
+            )]
+
+        lines = asyncio.run(collect())
+
+        assert items[1].error is not None and items[1].upload is None
+        assert {"error": True, "index": 1, "file_name": "b.txt", "status_code": 415} in lines
+        assert items[0].upload.file.closed
+
+
+class TestBatchEndpoint:
+    """Testes do endpoint /classify/batch pela aplicação completa."""
+
+    def test_items_are_readable_while_streaming(self, monkeypatch):
+        """Arquivos e membros de .zip ainda são legíveis quando o corpo é enviado."""
+        from app import main
+
+        async def fake_classify_content(upload, **kwargs):
+            await asyncio.sleep(0)
+            return SimpleNamespace(model_dump_json=lambda: json.dumps(
+                {"file_name": upload.filename, "content": upload.read_bytes().decode("latin-1")}
+            ))
+
+        monkeypatch.setattr(main, "classify_content", fake_classify_content)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("docs/b.png", PNG + b"b")
+        files = [
+            ("files", ("a.png", PNG + b"a", "image/png")),
+            ("files", ("lote.zip", archive.getvalue(), "application/zip")),
+        ]
+
+        async def post():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/classify/batch", files=files)
+
+        response = asyncio.run(post())
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.status_code == 200
+        assert sorted(line["content"] for line in lines[:-1]) == ["\x89PNG\r\n\x1a\na", "\x89PNG\r\n\x1a\nb"]
+        assert lines[-1]["summary"]["failed"] == 0
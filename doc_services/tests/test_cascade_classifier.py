@@ -0,0 +1,195 @@
+"""
+Testes para a classificação em cascata (local primeiro, LLM na dúvida).
+
+EXPLICAÇÃO EDUCATIVA:
+O classificador local é substituído por um cliente falso com resposta
+fixa e o LLM por uma corrotina que devolve metadados com latência e
+custo conhecidos, para verificar a decisão de escalar e a economia.
+"""
+
+import asyncio
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from PIL import Image
+
+from app.core.uploads import SpooledUpload
+from app.integrations.pdf_raster import PdfRasterizer
+from app.models import LLMMetadata, LLMProvider
+from app.services import CascadeClassifier
+
+
+class FakeLocalClient:
+    """Classificador local falso com rótulo/confiança fixos."""
+
+    def __init__(self, label="email", confidence=0.95, error=None):
+        self.label = label
+        self.confidence = confidence
+        self.error = error
+        self.calls = 0
+
+    async def classify_page(self, context):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        assert context.gray is not None
+        return {"predicted_type": self.label, "confidence": self.confidence}
+
+
+class FakeLLM:
+    """Corrotina de escalonamento com 2 s e US$ 0,002 por chamada."""
+
+    def __init__(self, cache_hit=False):
+        self.calls = 0
+        self.cache_hit = cache_hit
+
+    async def __call__(self):
+        self.calls += 1
+        start = datetime.now()
+        metadata = LLMMetadata(
+            provider=LLMProvider.ANTHROPIC,
+            model_name="claude-3-5-haiku-20241022",
+            endpoint="https://api.anthropic.com/v1/messages",
+            input_tokens=1500,
+            output_tokens=100,
+            total_tokens=1600,
+            input_cost_usd=Decimal("0.0015"),
+            output_cost_usd=Decimal("0.0005"),
+            total_cost_usd=Decimal("0.002"),
+            request_timestamp=start,
+            response_timestamp=start + timedelta(seconds=2),
+            latency_ms=2000.0,
+            cache_hit=self.cache_hit
+        )
+        return {"predicted_type": "invoice", "confidence": 0.9, "llm_metadata": metadata}
+
+
+def _upload(content_type="image/png", valid_pdf=False):
+    """Upload em memória com uma página em branco."""
+    buffer = io.BytesIO()
+    if content_type == "application/pdf" and valid_pdf:
+        Image.new("L", (200, 260), "white").save(buffer, format="PDF", resolution=72)
+    elif content_type == "application/pdf":
+        buffer.write(b"%PDF-1.4")
+    else:
+        Image.new("L", (200, 260), "white").save(buffer, format="PNG")
+    buffer.seek(0)
+    return SpooledUpload(filename="doc.png", content_type=content_type, size=len(buffer.getvalue()), file=buffer)
+
+
+def _run(cascade, upload, llm):
+    return asyncio.run(cascade.classify(upload, escalate=llm))
+
+
+class TestCascadeClassifier:
+    """Testes para CascadeClassifier."""
+
+    def test_confident_local_prediction_skips_llm(self):
+        """Confiança acima do threshold resolve localmente."""
+        llm = FakeLLM()
+        cascade = CascadeClassifier(FakeLocalClient("email", 0.95), threshold=0.8)
+
+        outcome = _run(cascade, _upload(), llm)
+
+        assert llm.calls == 0
+        assert outcome.llm_result is None
+        assert outcome.local_result["predicted_type"] == "email"
+        assert not outcome.metadata.escalated
+        assert outcome.metadata.reason == "confident"
+        # Sem histórico do LLM ainda não há estimativa de economia
+        assert outcome.metadata.saved_latency_ms is None
+
+    @pytest.mark.parametrize("label, confidence, reason", [
+        ("scientific_publication", 0.7, "low_confidence"),
+        ("other", 0.99, "label_other"),
+    ])
+    def test_uncertain_prediction_escalates(self, label, confidence, reason):
+        """Confiança baixa ou rótulo "other" escalam para o LLM."""
+        llm = FakeLLM()
+        cascade = CascadeClassifier(FakeLocalClient(label, confidence), threshold=0.8)
+
+        outcome = _run(cascade, _upload(), llm)
+
+        assert llm.calls == 1
+        assert outcome.llm_result["predicted_type"] == "invoice"
+        assert outcome.metadata.escalated
+        assert outcome.metadata.reason == reason
+        assert outcome.metadata.local_prediction == label
+
+    def test_label_outside_document_type_always_escalates(self):
+        """"other" escala mesmo fora de escalate_labels (não é um DocumentType)."""
+        llm = FakeLLM()
+        cascade = CascadeClassifier(FakeLocalClient("other", 0.99), threshold=0.8, escalate_labels=("email",))
+
+        outcome = _run(cascade, _upload(), llm)
+
+        assert llm.calls == 1
+        assert outcome.metadata.escalated
+        assert outcome.metadata.reason == "label_other"
+        assert cascade.decide("invoice", 0.99) == (False, "confident")
+
+    def test_non_image_and_local_errors_escalate(self):
+        """PDF sem rasterizador e falha do classificador local vão direto para o LLM."""
+        llm = FakeLLM()
+        local = FakeLocalClient()
+
+        pdf = _run(CascadeClassifier(local), _upload("application/pdf"), llm)
+        broken = _run(CascadeClassifier(FakeLocalClient(error=RuntimeError("falha"))), _upload(), llm)
+
+        assert local.calls == 0
+        assert pdf.metadata.reason == "unsupported_format"
+        assert broken.metadata.reason == "local_error"
+        assert llm.calls == 2
+
+    def test_confident_pdf_is_classified_locally(self):
+        """Com rasterizador, o PDF é renderizado e resolvido sem o LLM."""
+        llm = FakeLLM()
+        local = FakeLocalClient("email", 0.95)
+        rasterizer = PdfRasterizer(dpi=72)
+        cascade = CascadeClassifier(local, threshold=0.8, pdf_rasterizer=rasterizer)
+
+        upload = _upload("application/pdf", valid_pdf=True)
+        outcome = _run(cascade, upload, llm)
+
+        assert local.calls == 1
+        assert llm.calls == 0
+        assert not outcome.metadata.escalated
+        assert outcome.metadata.reason == "confident"
+        assert outcome.local_result["predicted_type"] == "email"
+        assert rasterizer.get_stats()["rendered"] == 1
+        # O upload continua legível para um eventual envio ao LLM
+        assert upload.read_bytes().startswith(b"%PDF")
+
+    def test_unreadable_pdf_escalates_as_local_error(self):
+        """PDF que o pdfium não abre vai para o LLM."""
+        llm = FakeLLM()
+        local = FakeLocalClient()
+        cascade = CascadeClassifier(local, pdf_rasterizer=PdfRasterizer(dpi=72))
+
+        outcome = _run(cascade, _upload("application/pdf"), llm)
+
+        assert local.calls == 0
+        assert llm.calls == 1
+        assert outcome.metadata.reason == "local_error"
+
+    def test_savings_use_observed_llm_average(self):
+        """Economia estimada = média das chamadas reais ao LLM."""
+        local = FakeLocalClient("email", 0.5)
+        cascade = CascadeClassifier(local, threshold=0.8)
+
+        _run(cascade, _upload(), FakeLLM())
+        _run(cascade, _upload(), FakeLLM(cache_hit=True))  # Hit do cache não entra na média
+        local.confidence = 0.95
+        outcome = _run(cascade, _upload(), FakeLLM())
+
+        assert outcome.metadata.saved_latency_ms == pytest.approx(2000.0)
+        assert outcome.metadata.saved_cost_usd == Decimal("0.002")
+
+        stats = cascade.get_stats()
+        assert stats["requests"] == 3
+        assert stats["escalated"] == 2
+        assert stats["escalation_rate"] == pytest.approx(2 / 3)
+        assert stats["llm_calls_observed"] == 1
+        assert stats["saved_cost_usd"] == pytest.approx(0.002)
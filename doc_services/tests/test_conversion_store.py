@@ -0,0 +1,110 @@
+"""
+Testes para o armazenamento de conversões do docling.
+
+EXPLICAÇÃO EDUCATIVA:
+O converter do docling é substituído por um falso que conta chamadas;
+parágrafos, texto completo e estatísticas do mesmo arquivo devem sair de
+uma única conversão. O tier de disco é testado com um modelo Pydantic
+no lugar do DoclingDocument.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import TieredCache
+from app.integrations import ConversionStore, DoclingWrapper
+
+
+class FakeDocument(BaseModel):
+    """Documento falso serializável (no lugar do DoclingDocument)."""
+
+    texts: list = []
+
+    def iterate_items(self):
+        for text in self.texts:
+            item = SimpleNamespace(label=SimpleNamespace(value="text"), text=text, prov=[])
+            yield item, 0
+
+
+class CountingConverter:
+    """Converter falso que conta conversões."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def convert(self, source):
+        self.calls += 1
+        return SimpleNamespace(document=FakeDocument(texts=["primeiro parágrafo", "segundo"]))
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """Arquivo de entrada (o conteúdo só importa para o hash)."""
+    path = tmp_path / "artigo.pdf"
+    path.write_bytes(b"%PDF-1.4 conteudo")
+    return path
+
+
+class TestConversionStore:
+    """Testes para ConversionStore."""
+
+    def test_memory_lru_evicts_oldest(self):
+        """LRU mantém apenas os documentos mais recentes."""
+        store = ConversionStore(memory_max_items=2)
+        store.put("a", FakeDocument())
+        store.put("b", FakeDocument())
+        store.get("a")
+        store.put("c", FakeDocument())
+
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        assert store.get("c") is not None
+
+    def test_disk_roundtrip(self, tmp_path):
+        """Documento persistido volta do disco em outro store (outro processo)."""
+        def make_store():
+            disk = TieredCache(db_path=tmp_path / "docs.sqlite3", memory_max_items=0)
+            return ConversionStore(disk_cache=disk, loads=FakeDocument.model_validate_json)
+
+        make_store().put("chave", FakeDocument(texts=["abc"]))
+        store = make_store()
+
+        assert store.get("chave").texts == ["abc"]
+        assert store.get_stats()["disk_hits"] == 1
+
+    def test_key_depends_on_options(self):
+        """Opções diferentes do converter geram chaves diferentes."""
+        assert ConversionStore.make_key("hash", {"do_ocr": True}) != \
+            ConversionStore.make_key("hash", {"do_ocr": False})
+
+
+class TestDoclingWrapperReuse:
+    """Testes para reutilização de conversões no DoclingWrapper."""
+
+    def test_derived_views_share_one_conversion(self, pdf_path):
+        """Parágrafos, texto e estatísticas usam a mesma conversão."""
+        wrapper = DoclingWrapper(store=ConversionStore())
+        converter = CountingConverter()
+        wrapper.get_converter = lambda do_ocr, do_table_structure: converter
+
+        paragraphs = wrapper.detect_paragraphs(pdf_path)
+        text = wrapper.extract_full_text(pdf_path)
+        stats = wrapper.get_document_stats(pdf_path)
+
+        assert converter.calls == 1
+        assert len(paragraphs) == 2
+        assert text == "primeiro parágrafo\n\nsegundo"
+        assert stats["num_paragraphs"] == 2
+
+    def test_different_options_convert_again(self, pdf_path):
+        """Mesma entrada com outras opções é convertida de novo."""
+        wrapper = DoclingWrapper(store=ConversionStore())
+        converter = CountingConverter()
+        wrapper.get_converter = lambda do_ocr, do_table_structure: converter
+
+        wrapper.detect_paragraphs(pdf_path, do_ocr=True)
+        wrapper.detect_paragraphs(pdf_path, do_ocr=False)
+
+        assert converter.calls == 2
@@ -0,0 +1,74 @@
+"""
+Testes para o DocumentContext (decodificação única por requisição).
+
+EXPLICAÇÃO EDUCATIVA:
+Testa a correção de orientação EXIF em memória, os derivados em tons
+de cinza/binário e a re-codificação para o docling apenas quando houve
+rotação.
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+from app.core.document_context import EXIF_ORIENTATION_TAG, DocumentContext
+
+
+def _save_image(path, orientation=None):
+    """Grava JPEG 40x20 (metade esquerda preta) com orientação EXIF opcional."""
+    image = Image.new("RGB", (40, 20), "white")
+    image.paste((0, 0, 0), (0, 0, 20, 20))
+
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION_TAG] = orientation
+
+    image.save(path, format="JPEG", exif=exif.tobytes())
+    return path
+
+
+class TestDocumentContext:
+    """Testes para o contexto de documento."""
+
+    def test_pdf_has_no_raster(self, tmp_path):
+        """PDFs não são decodificados no STEP 0."""
+        pdf = tmp_path / "artigo.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+
+        context = DocumentContext.load(pdf)
+
+        assert not context.is_image
+        assert context.gray is None
+        assert context.docling_content() is None
+
+    def test_upright_image_uses_original_file(self, tmp_path):
+        """Sem rotação, o docling lê o arquivo original."""
+        context = DocumentContext.load(_save_image(tmp_path / "doc.jpg"))
+
+        assert context.is_image
+        assert not context.was_rotated
+        assert context.gray.shape == (20, 40)
+        assert context.docling_content() is None
+
+    def test_exif_rotation_applied_in_memory(self, tmp_path):
+        """Orientação EXIF 6 (90°) é aplicada sem gravar arquivos."""
+        path = _save_image(tmp_path / "doc.jpg", orientation=6)
+
+        context = DocumentContext.load(path)
+        name, data = context.docling_content()
+
+        assert context.was_rotated
+        assert context.gray.shape == (40, 20)
+        assert name == "doc.png"
+        assert Image.open(io.BytesIO(data)).size == (20, 40)
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_binary_is_cached(self, tmp_path):
+        """Imagem binária é calculada uma vez e reaproveitada."""
+        context = DocumentContext.load(_save_image(tmp_path / "doc.jpg"))
+
+        binary = context.binary
+
+        assert binary is context.binary
+        assert set(np.unique(binary)) <= {0, 255}
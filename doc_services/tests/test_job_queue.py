@@ -0,0 +1,278 @@
+"""
+Testes para a fila persistente de jobs e os workers de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+A fila é testada diretamente (reserva, nova tentativa, expiração) e o
+pool de workers é executado com serviços falsos de UC1/UC2, verificando
+progresso por etapa, resultado final e tratamento de falhas.
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core.job_queue import JobQueue
+from app.models import JobStatus, StageStatus
+from app.services import JobWorkerPool
+
+from tests.test_orchestrator import (
+    FakeClassificationService,
+    FakeParagraphService,
+    _orchestrator,
+)
+
+
+class FlakyParagraphService(FakeParagraphService):
+    """UC2 falso que falha nas primeiras chamadas."""
+
+    def __init__(self, failures: int):
+        super().__init__(delay=0.01)
+        self.failures = failures
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("falha temporária")
+        return await super().detect_paragraphs_async(file_path, context, profile)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Fila em SQLite temporário."""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", stale_after_seconds=60)
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """PDF mínimo (STEP 0 não decodifica PDFs)."""
+    path = tmp_path / "artigo.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+class TestJobQueue:
+    """Testes para JobQueue."""
+
+    def test_claim_marks_running_once(self, queue, pdf_path):
+        """Um job enfileirado é reservado uma única vez."""
+        job = queue.enqueue(pdf_path, "artigo.pdf")
+
+        claimed = queue.claim()
+
+        assert claimed.id == job.id
+        assert claimed.status == "running"
+        assert claimed.attempts == 1
+        assert queue.claim() is None
+
+    def test_retry_respects_delay(self, queue, pdf_path):
+        """Job devolvido à fila só volta a ser elegível após o atraso."""
+        job = queue.enqueue(pdf_path, "artigo.pdf")
+        queue.claim()
+
+        queue.retry(job.id, "erro", delay_seconds=60)
+        assert queue.claim() is None
+
+        queue.retry(job.id, "erro", delay_seconds=0)
+        assert queue.claim().attempts == 2
+
+    def test_stale_running_job_is_reclaimed(self, tmp_path, pdf_path):
+        """Job "running" sem heartbeat volta a ser reservado."""
+        queue = JobQueue(tmp_path / "jobs.sqlite3", stale_after_seconds=0)
+        job = queue.enqueue(pdf_path, "artigo.pdf")
+        queue.claim()
+        time.sleep(0.01)
+
+        reclaimed = queue.claim()
+        queue.close()
+
+        assert reclaimed.id == job.id
+        assert reclaimed.attempts == 2
+
+    def test_abandoned_job_without_attempts_left_fails(self, tmp_path, pdf_path):
+        """Job abandonado na última tentativa falha na reserva, sem nova execução."""
+        queue = JobQueue(tmp_path / "jobs.sqlite3", stale_after_seconds=0)
+        job = queue.enqueue(pdf_path, "artigo.pdf", max_attempts=1)
+        queue.claim()
+        time.sleep(0.01)
+
+        reclaimed = queue.claim(ttl_seconds=60)
+        failed = queue.get(job.id)
+        queue.close()
+
+        assert reclaimed is None
+        assert failed.status == "failed"
+        assert failed.attempts == 1
+        assert "interrompido" in failed.error
+        assert failed.expires_at is not None
+
+    def test_expired_job_is_hidden_and_purged(self, queue, pdf_path):
+        """Job expirado não é retornado e é removido pela limpeza."""
+        job = queue.enqueue(pdf_path, "artigo.pdf")
+        queue.claim()
+        queue.complete(job.id, "{}", ttl_seconds=0)
+
+        assert queue.get(job.id) is None
+        assert [purged.id for purged in queue.purge_expired()] == [job.id]
+        assert queue.counts() == {}
+
+
+class TestJobWorkerPool:
+    """Testes para JobWorkerPool com serviços falsos."""
+
+    async def _run_until_finished(self, pool: JobWorkerPool, job_id: str):
+        """Executa workers até o job terminar (sucesso ou falha)."""
+        await pool.start()
+        try:
+            for _ in range(200):
+                info = pool.get(job_id)
+                if info.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                    return info
+                await asyncio.sleep(0.01)
+            raise AssertionError("job não terminou")
+        finally:
+            await pool.stop()
+
+    def test_successful_job_reports_progress_and_result(self, queue, pdf_path):
+        """Job concluído tem todas as etapas "done" e o resultado final."""
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.01),
+                                     FakeParagraphService(delay=0.01))
+        pool = JobWorkerPool(queue, orchestrator, workers=1, poll_interval_seconds=0.01)
+
+        job = pool.submit(pdf_path, "artigo.pdf")
+        assert job.status == JobStatus.QUEUED
+
+        info = asyncio.run(self._run_until_finished(pool, job.job_id))
+
+        assert info.status == JobStatus.SUCCEEDED
+        assert info.result.filename == "artigo.pdf"
+        assert info.progress["UC4"] == StageStatus.DONE
+        assert info.expires_at is not None
+        assert not pdf_path.exists()
+
+    def test_transient_failure_is_retried(self, queue, pdf_path):
+        """Falha temporária é repetida até dar certo."""
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.01),
+                                     FlakyParagraphService(failures=1))
+        pool = JobWorkerPool(queue, orchestrator, workers=1,
+                             retry_backoff_seconds=0, poll_interval_seconds=0.01)
+
+        job = pool.submit(pdf_path, "artigo.pdf")
+        info = asyncio.run(self._run_until_finished(pool, job.job_id))
+
+        assert info.status == JobStatus.SUCCEEDED
+        assert info.attempts == 2
+
+    def test_invalid_document_fails_without_retry(self, queue, pdf_path):
+        """Documento rejeitado no UC1 falha na primeira tentativa."""
+        orchestrator = _orchestrator(FakeClassificationService(False, delay=0.01),
+                                     FakeParagraphService(delay=0.01))
+        pool = JobWorkerPool(queue, orchestrator, workers=1, poll_interval_seconds=0.01)
+
+        job = pool.submit(pdf_path, "artigo.pdf")
+        info = asyncio.run(self._run_until_finished(pool, job.job_id))
+
+        assert info.status == JobStatus.FAILED
+        assert info.attempts == 1
+        assert info.error
+
+    def test_long_stage_keeps_heartbeat(self, tmp_path, pdf_path):
+        """UC2 mais longo que stale_after_seconds não é reprocessado por outro worker."""
+        queue = JobQueue(tmp_path / "jobs.sqlite3", stale_after_seconds=0.15)
+        paragraphs = FakeParagraphService(delay=0.5)
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.01), paragraphs)
+        pool = JobWorkerPool(queue, orchestrator, workers=2, poll_interval_seconds=0.01)
+
+        job = pool.submit(pdf_path, "artigo.pdf")
+        info = asyncio.run(self._run_until_finished(pool, job.job_id))
+        queue.close()
+
+        assert info.status == JobStatus.SUCCEEDED
+        assert info.attempts == 1
+        assert paragraphs.started == 1
+
+    def test_submit_from_a_thread_wakes_idle_worker(self, queue, pdf_path):
+        """Job enfileirado fora do event loop (como nas rotas) acorda o worker sem polling."""
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.01),
+                                     FakeParagraphService(delay=0.01))
+        pool = JobWorkerPool(queue, orchestrator, workers=1, poll_interval_seconds=30)
+
+        async def scenario():
+            await pool.start()
+            try:
+                await asyncio.sleep(0.05)  # worker ocioso, esperando o wakeup
+                job = await asyncio.to_thread(pool.submit, pdf_path, "artigo.pdf")
+                for _ in range(100):
+                    info = pool.get(job.job_id)
+                    if info.status == JobStatus.SUCCEEDED:
+                        return info
+                    await asyncio.sleep(0.01)
+                raise AssertionError("worker não foi acordado")
+            finally:
+                await pool.stop()
+
+        assert asyncio.run(scenario()).attempts == 1
+
+
+class RecordingJobQueue(JobQueue):
+    """JobQueue que registra a thread de cada acesso feito pelas rotas."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+
+    def enqueue(self, *args, **kwargs):
+        self.threads.append(threading.current_thread())
+        return super().enqueue(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        self.threads.append(threading.current_thread())
+        return super().get(*args, **kwargs)
+
+    def counts(self):
+        self.threads.append(threading.current_thread())
+        return super().counts()
+
+
+class TestJobRoutes:
+    """Testes das rotas de jobs (router da API em uma aplicação mínima)."""
+
+    def test_routes_use_queue_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Criar, consultar e ver estatísticas de jobs não acessa o SQLite no event loop."""
+        from fastapi import FastAPI
+
+        from app.api.dependencies import get_job_workers
+        from app.api.routes import router
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "JOBS_DIR", str(tmp_path / "jobs"))
+        queue = RecordingJobQueue(tmp_path / "jobs.sqlite3")
+        pool = JobWorkerPool(queue, orchestrator=None, workers=1)  # workers não iniciados
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_job_workers] = lambda: pool
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                created = await client.post(
+                    "/api/v1/jobs", files={"file": ("artigo.pdf", b"%PDF-1.4", "application/pdf")}
+                )
+                status = await client.get(f"/api/v1/jobs/{created.json()['job_id']}")
+                stats = await client.get("/api/v1/jobs/stats")
+            return created, status, stats
+
+        try:
+            created, status, stats = asyncio.run(scenario())
+        finally:
+            queue.close()
+
+        assert created.status_code == 202
+        assert status.json()["status"] == "queued"
+        assert stats.json()["jobs"] == {"queued": 1}
+        assert len(queue.threads) == 3
+        assert threading.main_thread() not in queue.threads
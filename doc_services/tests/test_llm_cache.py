@@ -0,0 +1,131 @@
+"""
+Testes para o cache de classificações do LLM.
+
+EXPLICAÇÃO EDUCATIVA:
+A chamada à API é substituída por um generate() falso que conta
+chamadas e devolve JSON fixo; nenhuma requisição sai do processo.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.core.cache import TieredCache
+from app.services import AnthropicService, LLMResponseCache, LLMResponseError
+from app.services.llm_base import LLMResponse
+
+TYPES = ["scientific_article", "invoice", "letter"]
+IMAGE = {"base64_data": "aW1hZ2VtIGRlIHRlc3Rl", "mime_type": "image/png"}
+
+
+class FakeGenerate:
+    """generate() falso com latência simulada de 2 segundos."""
+
+    def __init__(self, content='{"predicted_type": "invoice", "confidence": 0.9, "reasoning": "tabela de itens"}'):
+        self.content = content
+        self.calls = 0
+
+    async def __call__(self, request, image_data=None):
+        self.calls += 1
+        start = datetime.now()
+        return LLMResponse(
+            content=self.content,
+            model="claude-3-5-haiku-20241022",
+            provider="anthropic",
+            input_tokens=1500,
+            output_tokens=80,
+            request_timestamp=start,
+            response_timestamp=start + timedelta(seconds=2)
+        )
+
+
+def _service(cache=None, generate=None):
+    """AnthropicService com generate() falso."""
+    service = AnthropicService(api_key="teste", response_cache=cache)
+    service.generate = generate or FakeGenerate()
+    return service
+
+
+def _classify(service, image_data=IMAGE, name="nota.png", types=TYPES):
+    return asyncio.run(service.classify_document(name, types, image_data=image_data))
+
+
+@pytest.fixture
+def cache():
+    """Cache apenas em memória."""
+    return LLMResponseCache(TieredCache(memory_max_items=16))
+
+
+class TestLLMResponseCache:
+    """Testes para o cache de respostas do AnthropicService."""
+
+    def test_hit_skips_api_and_reports_savings(self, cache):
+        """Segunda chamada com a mesma imagem não chama a API e custa zero."""
+        service = _service(cache)
+
+        first = _classify(service)
+        second = _classify(service, name="outro_nome.png")
+
+        assert service.generate.calls == 1
+        assert first["llm_metadata"].cache_hit is False
+        assert first["llm_metadata"].total_cost_usd > 0
+
+        metadata = second["llm_metadata"]
+        assert second["predicted_type"] == "invoice"
+        assert metadata.cache_hit is True
+        assert metadata.total_cost_usd == Decimal("0")
+        assert metadata.total_tokens == 0
+        assert metadata.latency_ms < 2000
+        assert metadata.additional_metadata["saved_latency_ms"] == pytest.approx(2000)
+
+        stats = cache.get_stats()
+        assert stats["memory_hits"] == 1
+        assert stats["saved_tokens"] == 1580
+
+    def test_key_changes_with_model_types_and_prompt_version(self):
+        """Modelo, tipos e versão do prompt fazem parte da chave."""
+        base = dict(model="m", prompt_version="1", available_types=TYPES, image_base64="abc")
+        key = LLMResponseCache.make_key(**base)
+
+        assert key == LLMResponseCache.make_key(**{**base, "available_types": list(reversed(TYPES))})
+        assert key != LLMResponseCache.make_key(**{**base, "model": "outro"})
+        assert key != LLMResponseCache.make_key(**{**base, "prompt_version": "2"})
+        assert key != LLMResponseCache.make_key(**{**base, "available_types": TYPES[:2]})
+        assert key != LLMResponseCache.make_key(**{**base, "image_base64": "xyz"})
+
+    def test_expired_entry_calls_api_again(self):
+        """Entrada com TTL vencido não é reutilizada."""
+        cache = LLMResponseCache(TieredCache(memory_max_items=16, ttl_seconds=0.05))
+        service = _service(cache)
+
+        _classify(service)
+        time.sleep(0.1)
+        result = _classify(service)
+
+        assert service.generate.calls == 2
+        assert result["llm_metadata"].cache_hit is False
+
+    def test_invalid_response_is_not_cached(self, cache):
+        """Resposta inválida gera erro e não entra no cache."""
+        service = _service(cache, FakeGenerate('{"predicted_type": "receita"}'))
+
+        for _ in range(2):
+            with pytest.raises(LLMResponseError):
+                _classify(service)
+
+        assert service.generate.calls == 2
+
+    def test_persistent_backend_survives_restart(self, tmp_path):
+        """Com SQLite, outro processo/instância reaproveita a resposta."""
+        def make_cache():
+            return LLMResponseCache(TieredCache(db_path=tmp_path / "llm.sqlite3", memory_max_items=0))
+
+        _classify(_service(make_cache()))
+        service = _service(make_cache())
+        result = _classify(service)
+
+        assert service.generate.calls == 0
+        assert result["llm_metadata"].cache_hit is True
@@ -0,0 +1,95 @@
+"""
+Testes para o pré-processamento de imagens enviadas ao LLM.
+
+EXPLICAÇÃO EDUCATIVA:
+As imagens são geradas em memória com Pillow (scan grande em tons de
+cinza, TIFF multipágina, PNG pequeno) e o resultado é decodificado de
+volta para conferir formato e dimensões.
+"""
+
+import base64
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services import ImagePreprocessor
+from app.services.llm_image import estimate_image_tokens
+
+
+def _page(width, height, mode="L"):
+    """Página com linhas de "texto" (retângulos escuros)."""
+    image = Image.new(mode, (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for y in range(height // 20, height - height // 20, max(1, height // 60)):
+        draw.rectangle([width // 10, y, width - width // 10, y + max(1, height // 200)], fill="black")
+    return image
+
+
+def _encode(image, fmt, **kwargs):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    buffer.seek(0)
+    return buffer
+
+
+def _decode(prepared):
+    return Image.open(io.BytesIO(base64.b64decode(prepared.base64_data)))
+
+
+class TestImagePreprocessor:
+    """Testes para ImagePreprocessor."""
+
+    def test_large_scan_is_downscaled(self):
+        """Scan de 300 DPI é reduzido ao lado maior configurado."""
+        source = _encode(_page(2480, 3508), "PNG")
+        size = len(source.getvalue())
+
+        prepared = ImagePreprocessor(max_long_edge=1024).prepare(source, "image/png", size)
+        report = prepared.report()
+
+        assert max(_decode(prepared).size) == 1024
+        assert prepared.transformed
+        assert report["bytes_saved"] > 0
+        assert report["tokens_saved"] > 0
+        assert report["estimated_tokens"] == estimate_image_tokens(prepared.width, prepared.height)
+
+    def test_multipage_tiff_becomes_supported_format(self):
+        """TIFF multipágina vira PNG/JPEG da primeira página."""
+        first, second = _page(1200, 1600, mode="1"), _page(1200, 1600, mode="1")
+        source = _encode(first, "TIFF", save_all=True, append_images=[second], compression="group4")
+
+        prepared = ImagePreprocessor().prepare(source, "image/tiff", len(source.getvalue()))
+
+        assert prepared.mime_type in ("image/png", "image/jpeg")
+        assert prepared.pages == 2
+        assert _decode(prepared).format in ("PNG", "JPEG")
+
+    def test_small_supported_image_passes_through(self):
+        """PNG pequeno segue com os bytes originais."""
+        source = _encode(_page(400, 300), "PNG")
+        original = source.getvalue()
+
+        prepared = ImagePreprocessor().prepare(source, "image/png", len(original))
+
+        assert not prepared.transformed
+        assert base64.b64decode(prepared.base64_data) == original
+
+    def test_transparency_is_flattened(self):
+        """Imagem com alfa é achatada sobre fundo branco (JPEG não tem alfa)."""
+        image = Image.new("RGBA", (3000, 2000), (0, 0, 0, 0))
+        source = _encode(image, "PNG")
+
+        prepared = ImagePreprocessor().prepare(source, "image/png", len(source.getvalue()))
+
+        assert _decode(prepared).convert("RGB").getpixel((10, 10)) == (255, 255, 255)
+
+    def test_invalid_image_raises_value_error(self):
+        """Arquivo que não é imagem gera ValueError."""
+        with pytest.raises(ValueError):
+            ImagePreprocessor().prepare(io.BytesIO(b"nao sou imagem"), "image/png", 14)
+
+    def test_token_estimate_applies_api_resize(self):
+        """Acima do limite da API, a estimativa é a da imagem já reduzida."""
+        assert estimate_image_tokens(750, 1000) == 1000
+        assert estimate_image_tokens(4960, 7016) == estimate_image_tokens(9920, 14032)
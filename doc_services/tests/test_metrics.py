@@ -0,0 +1,178 @@
+"""
+Testes para as métricas Prometheus.
+
+EXPLICAÇÃO EDUCATIVA:
+Os valores são lidos do registro padrão do prometheus_client e comparados
+antes/depois de cada cenário (o registro é global e acumula entre
+testes). A agregação multiprocesso roda dois interpretadores Python
+separados gravando no mesmo PROMETHEUS_MULTIPROC_DIR.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+
+from app.core import CPUExecutor, metrics
+from app.core.cache import TieredCache
+from app.services import InvalidDocumentError
+from tests.test_orchestrator import FakeClassificationService, FakeParagraphService, _orchestrator
+
+
+APP_ROOT = Path(__file__).parent.parent
+
+
+def _value(name, **labels):
+    """Valor atual de uma série (0.0 se ainda não existe)."""
+    return REGISTRY.get_sample_value(f"{metrics.NAMESPACE}_{name}", labels) or 0.0
+
+
+def _stage_count(stage, outcome):
+    return _value("stage_duration_seconds_count", stage=stage, outcome=outcome)
+
+
+class TestPipelineMetrics:
+    """Histogramas por etapa e desfechos das análises."""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        path = tmp_path / "artigo.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        return path
+
+    def test_stage_timer_uses_first_running_event(self):
+        """UC2 especulativo reportado duas vezes conta desde o primeiro início."""
+        before = _value("stage_duration_seconds_sum", stage="UC2", outcome="ok")
+        timer = metrics.StageTimer()
+
+        timer.mark("UC2", "running")
+        asyncio.run(asyncio.sleep(0.05))
+        timer.mark("UC2", "running")
+        timer.mark("UC2", "done")
+
+        assert _value("stage_duration_seconds_sum", stage="UC2", outcome="ok") - before >= 0.05
+
+    def test_successful_analysis_observes_every_stage(self, pdf_path):
+        """Análise aceita registra STEP0 e UC1-UC4 e o desfecho success."""
+        stages = ["STEP0", "UC1", "UC2", "UC3", "UC4"]
+        before = {stage: _stage_count(stage, "ok") for stage in stages}
+        success_before = _value("analysis_requests_total", outcome="success")
+
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.01), FakeParagraphService(delay=0.01))
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+
+        for stage in stages:
+            assert _stage_count(stage, "ok") == before[stage] + 1
+        assert _value("analysis_requests_total", outcome="success") == success_before + 1
+        assert _value("analysis_in_flight") == 0
+
+    def test_rejected_analysis_records_interrupted_stages(self, pdf_path):
+        """Rejeição no UC1 registra UC1 e o UC2 especulativo como rejected."""
+        uc1_before = _stage_count("UC1", "rejected")
+        uc2_before = _stage_count("UC2", "rejected")
+        rejected_before = _value("analysis_requests_total", outcome="rejected")
+
+        orchestrator = _orchestrator(FakeClassificationService(False), FakeParagraphService(delay=1.0))
+        with pytest.raises(InvalidDocumentError):
+            asyncio.run(orchestrator.analyze_document(pdf_path))
+
+        assert _stage_count("UC1", "rejected") == uc1_before + 1
+        assert _stage_count("UC2", "rejected") == uc2_before + 1
+        assert _value("analysis_requests_total", outcome="rejected") == rejected_before + 1
+
+
+class TestInfrastructureMetrics:
+    """Executor e caches."""
+
+    def test_executor_queue_depth_returns_to_zero(self):
+        """Gauge da fila sobe durante a tarefa e volta a zero ao terminar."""
+        executor = CPUExecutor(use_processes=False, thread_workers=1)
+        waits_before = _value("executor_queue_wait_seconds_count", stage="TESTE")
+        observed = []
+
+        def task():
+            observed.append(_value("executor_queue_depth", pool="thread"))
+
+        try:
+            asyncio.run(executor.run_in_thread("TESTE", task))
+        finally:
+            executor.shutdown()
+
+        assert observed == [1.0]
+        assert _value("executor_queue_depth", pool="thread") == 0
+        assert _value("executor_queue_wait_seconds_count", stage="TESTE") == waits_before + 1
+
+    def test_cancelled_running_task_records_run_time(self):
+        """Tarefa cancelada já em execução conta o tempo em cancelled_run_ms."""
+        executor = CPUExecutor(use_processes=False, thread_workers=1)
+        started = threading.Event()
+
+        def task():
+            started.set()
+            time.sleep(0.2)
+
+        async def submit_and_cancel():
+            pending = asyncio.create_task(executor.run_in_thread("CANCELADA", task))
+            await asyncio.to_thread(started.wait)
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+
+        try:
+            asyncio.run(submit_and_cancel())
+        finally:
+            executor.shutdown()  # Espera a tarefa terminar no worker
+
+        stats = executor.get_stats()["stages"]["CANCELADA"]
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 0
+        assert stats["cancelled_run_ms"] >= 150
+        assert executor.queue_depth()["thread"] == 0
+
+    def test_cache_lookups_by_result(self, tmp_path):
+        """Consultas ao TieredCache contam hit de memória, de disco e miss."""
+        cache = TieredCache(db_path=tmp_path / "cache.sqlite3", namespace="metricas_teste")
+        cache.set("a", b"1")
+        cache.get("a")
+        cache._memory.clear()
+        cache.get("a")
+        cache.get("b")
+
+        for result in ("memory_hit", "disk_hit", "miss"):
+            assert _value("cache_lookups_total", cache="metricas_teste", result=result) == 1
+
+
+class TestMultiprocessAggregation:
+    """Agregação entre processos (vários workers do uvicorn)."""
+
+    def test_counters_are_summed_across_processes(self, tmp_path):
+        """Dois processos gravando no mesmo diretório somam no coletor."""
+        script = (
+            "import sys\n"
+            "from app.core import metrics\n"
+            "metrics.record_analysis('success', 0.5)\n"
+            "metrics.ANALYSIS_IN_FLIGHT.inc()\n"
+            "if sys.argv[1] == 'shutdown':\n"
+            "    metrics.mark_process_dead()\n"
+        )
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": str(APP_ROOT)}
+        for mode in ("shutdown", "running"):
+            subprocess.run([sys.executable, "-c", script, mode], env=env, cwd=APP_ROOT, check=True)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+
+        assert registry.get_sample_value(
+            f"{metrics.NAMESPACE}_analysis_requests_total", {"outcome": "success"}
+        ) == 2
+        assert registry.get_sample_value(
+            f"{metrics.NAMESPACE}_analysis_duration_seconds_count", {"outcome": "success"}
+        ) == 2
+        # Gauge livesum: só o worker que não passou pelo shutdown é somado
+        assert registry.get_sample_value(f"{metrics.NAMESPACE}_analysis_in_flight") == 1
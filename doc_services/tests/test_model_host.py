@@ -0,0 +1,160 @@
+"""
+Testes para o model host compartilhado.
+
+EXPLICAÇÃO EDUCATIVA:
+O host roda num event loop em thread separada, com um ThreadPool no
+lugar do ProcessPool com docling; o CPUExecutor do teste se conecta a
+ele pelo socket Unix, como um worker uvicorn faria.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from app.core import CPUExecutor, ExecutorSaturatedError
+from app.core.model_host import ModelHost
+
+
+def host_pid() -> int:
+    """Função de nível de módulo executada no host."""
+    return os.getpid()
+
+
+def slow_double(value: int, delay: float) -> int:
+    time.sleep(delay)
+    return value * 2
+
+
+def failing_task() -> None:
+    raise ValueError("página ilegível")
+
+
+def crashing_task() -> None:
+    """Simula um worker morto pelo OOM killer."""
+    os._exit(1)
+
+
+def process_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+class _RunningHost:
+    """ModelHost em uma thread com event loop próprio."""
+
+    def __init__(self, socket_path: str, workers: int = 2, max_queue_depth: int = 64, pool_factory=None):
+        pool = pool_factory() if pool_factory else ThreadPoolExecutor(max_workers=workers)
+        self.host = ModelHost(
+            str(socket_path), pool, max_queue_depth=max_queue_depth, pool_factory=pool_factory
+        )
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.host.start(), self.loop).result(timeout=5)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.host.close(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.host.pool.shutdown(wait=False)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Caminhos de socket Unix têm limite de ~100 caracteres
+    path = f"/tmp/model_host_test_{os.getpid()}_{id(tmp_path)}.sock"
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+class TestModelHost:
+    """Testes de ponta a ponta CPUExecutor -> socket -> ModelHost."""
+
+    def test_tasks_run_in_host_and_share_one_connection(self, socket_path):
+        """Chamadas concorrentes voltam na ordem certa por uma única conexão."""
+        running = _RunningHost(socket_path)
+        executor = CPUExecutor(thread_workers=1, model_host_socket=socket_path)
+
+        async def scenario():
+            return await asyncio.gather(
+                *(executor.run_in_process("UC2", slow_double, i, 0.05 * (3 - i)) for i in range(3))
+            )
+
+        try:
+            assert asyncio.run(scenario()) == [0, 2, 4]
+            stats = executor.get_stats()
+        finally:
+            executor.shutdown()
+            running.stop()
+
+        assert stats["model_host"]["served"] == 3
+        assert stats["model_host"]["clients"] == 1
+        assert stats["stages"]["UC2"]["completed"] == 3
+
+    def test_worker_errors_and_saturation_propagate(self, socket_path):
+        """Exceções do host chegam ao chamador; host cheio gera ExecutorSaturatedError."""
+        running = _RunningHost(socket_path, workers=1, max_queue_depth=1)
+        executor = CPUExecutor(thread_workers=1, model_host_socket=socket_path)
+
+        async def scenario():
+            with pytest.raises(ValueError, match="página ilegível"):
+                await executor.run_in_process("UC2", failing_task)
+
+            busy = asyncio.ensure_future(executor.run_in_process("UC2", slow_double, 1, 0.2))
+            await asyncio.sleep(0.05)
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run_in_process("UC2", slow_double, 2, 0)
+            return await busy
+
+        try:
+            assert asyncio.run(scenario()) == 2
+        finally:
+            executor.shutdown()
+            running.stop()
+
+    def test_reconnects_after_host_restart(self, socket_path):
+        """Queda do host falha a chamada; após reiniciar, o executor reconecta."""
+        running = _RunningHost(socket_path)
+        executor = CPUExecutor(thread_workers=1, model_host_socket=socket_path)
+
+        try:
+            assert asyncio.run(executor.run_in_process("UC2", host_pid)) == os.getpid()
+            running.stop()
+            with pytest.raises(RuntimeError, match="Worker de processamento falhou"):
+                asyncio.run(executor.run_in_process("UC2", host_pid))
+
+            running = _RunningHost(socket_path)
+            assert asyncio.run(executor.run_in_process("UC2", host_pid)) == os.getpid()
+        finally:
+            executor.shutdown()
+            running.stop()
+
+    def test_pool_is_rebuilt_after_worker_crash(self, socket_path):
+        """Processo morto falha só a chamada dele; as seguintes usam um pool novo."""
+        running = _RunningHost(socket_path, pool_factory=process_pool)
+        executor = CPUExecutor(thread_workers=1, model_host_socket=socket_path)
+        others = [CPUExecutor(thread_workers=1, model_host_socket=socket_path) for _ in range(2)]
+
+        try:
+            with pytest.raises(RuntimeError, match="Processo do model host encerrado"):
+                asyncio.run(executor.run_in_process("UC2", crashing_task))
+
+            # A mesma conexão continua válida; clientes novos também são atendidos
+            assert asyncio.run(executor.run_in_process("UC2", slow_double, 2, 0)) == 4
+            for other in others:
+                assert asyncio.run(other.run_in_process("UC2", host_pid)) != os.getpid()
+            stats = running.host.get_stats()
+        finally:
+            for client in [executor, *others]:
+                client.shutdown()
+            running.stop()
+
+        assert stats["pool_restarts"] == 1
+        assert stats["pending"] == 0
+        assert stats["failed"] == 1
+        assert stats["served"] == 3
@@ -0,0 +1,225 @@
+"""
+Testes para a detecção de quase-duplicatas (dHash + multi-index hashing).
+
+EXPLICAÇÃO EDUCATIVA:
+As "páginas" são layouts sintéticos de artigo (título e duas colunas de
+blocos de texto) gerados com semente fixa. Um reescaneamento é simulado
+com rotação leve, desfoque, ruído e outra resolução: bytes diferentes,
+aparência quase igual.
+"""
+
+import asyncio
+import random
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.core.cache import TieredCache, compute_file_hash
+from app.core.perceptual_hash import MultiIndexHash, dhash, hamming_distance
+from app.core.stage_store import StageStore
+from app.models import Paragraph
+from app.services import (
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    NearDuplicateIndex,
+    TextAnalysisService,
+)
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+
+
+def _article_page(seed: int, size=(850, 1100)) -> Image.Image:
+    """Primeira página sintética: título e duas colunas de texto."""
+    rng = random.Random(seed)
+    page = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(page)
+    draw.rectangle((150, 80, 700, 110), fill=40)
+    for column in (0, 1):
+        y = 180
+        while y < 1000:
+            if rng.random() < 0.12:
+                y += 22  # quebra de parágrafo
+                continue
+            left = 80 + column * 390
+            for x in range(left, left + rng.randint(200, 360), 9):
+                if rng.random() < 0.85:
+                    draw.rectangle((x, y, x + 6, y + 8), fill=rng.randint(0, 90))
+            y += 16
+    return page
+
+
+def _rescan(page: Image.Image, seed: int) -> Image.Image:
+    """Mesma página escaneada de novo: rotação, desfoque, ruído e 140% do tamanho."""
+    rng = random.Random(seed)
+    page = page.rotate(rng.uniform(-1, 1), fillcolor=255, resample=Image.BILINEAR)
+    page = page.filter(ImageFilter.GaussianBlur(1))
+    noisy = np.asarray(page, dtype=np.float32) + np.random.default_rng(seed).normal(0, 12, page.size[::-1])
+    page = Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+    return page.resize((int(page.width * 1.4), int(page.height * 1.4)))
+
+
+class TestPerceptualHash:
+    """Testes do dHash e do índice multi-index."""
+
+    def test_rescan_is_close_and_other_article_is_far(self):
+        """Reescaneamento fica dentro do raio padrão; outro artigo no mesmo layout, não."""
+        original = dhash(_article_page(1))
+
+        assert hamming_distance(original, dhash(_rescan(_article_page(1), 7))) <= 20
+        assert hamming_distance(original, dhash(_article_page(2))) > 30
+
+    def test_search_matches_brute_force(self):
+        """Pigeonhole: nenhum vizinho dentro do raio é perdido."""
+        rng = random.Random(0)
+        values = [rng.getrandbits(256) for _ in range(500)]
+        # Vizinhos plantados a 1..20 bits dos primeiros hashes
+        for i in range(20):
+            neighbor = values[i]
+            for bit in rng.sample(range(256), i + 1):
+                neighbor ^= 1 << bit
+            values.append(neighbor)
+
+        index = MultiIndexHash(bits=256, chunks=8, radius=20)
+        index.add_many(values, list(range(len(values))))
+
+        for query in values[:20]:
+            expected = sorted(
+                (key, hamming_distance(query, value))
+                for key, value in enumerate(values)
+                if hamming_distance(query, value) <= 20
+            )
+            assert sorted(index.search(query)) == expected
+
+
+class TestNearDuplicateIndex:
+    """Testes do índice persistido."""
+
+    def test_other_worker_sees_new_hashes(self, tmp_path):
+        """Hash gravado por um processo aparece na próxima consulta do outro."""
+        worker_a = NearDuplicateIndex(tmp_path / "near.sqlite3")
+        worker_b = NearDuplicateIndex(tmp_path / "near.sqlite3")
+        phash = worker_a.hash_image(_article_page(1))
+
+        worker_a.add("a" * 64, phash)
+        match = worker_b.find(phash ^ 0b111)
+
+        assert (match.file_hash, match.distance) == ("a" * 64, 3)
+        assert worker_b.find(phash, exclude="a" * 64) is None
+        assert worker_b.get_stats()["documents"] == 1
+        worker_a.close()
+        worker_b.close()
+
+
+class AcceptingClassificationService:
+    """UC1 falso que aceita todos os documentos."""
+
+    def get_config(self) -> dict:
+        return {"classifier_version": "test"}
+
+    async def is_scientific_paper(self, file_path, context=None):
+        return True, 0.9
+
+
+class CountingParagraphService:
+    """UC2 falso que conta as execuções do docling."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_config(self) -> dict:
+        return {"docling": "test"}
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        self.calls += 1
+        return [Paragraph(index=0, text="resultados do experimento proposto", word_count=4)]
+
+
+def _orchestrator(tmp_path, uc2, result_cache=True, stage_store=False):
+    return DocumentAnalysisOrchestrator(
+        classification_service=AcceptingClassificationService(),
+        paragraph_service=uc2,
+        text_analysis_service=TextAnalysisService(),
+        compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+        result_cache_backend=TieredCache(
+            db_path=tmp_path / "results.sqlite3", namespace="analysis_result"
+        ) if result_cache else None,
+        stage_store=StageStore(tmp_path / "stages.sqlite3") if stage_store else None,
+        near_duplicates=NearDuplicateIndex(tmp_path / "near.sqlite3")
+    )
+
+
+class TestNearDuplicateReuse:
+    """Testes do reaproveitamento no orquestrador."""
+
+    def _save(self, tmp_path, name, page):
+        path = tmp_path / name
+        page.save(path)
+        return path
+
+    def test_rescan_reuses_cached_result(self, tmp_path):
+        """Reescaneamento recebe o resultado anterior sem docling; outro artigo não."""
+        original = self._save(tmp_path, "original.png", _article_page(1))
+        rescan = self._save(tmp_path, "rescan.png", _rescan(_article_page(1), 7))
+        other = self._save(tmp_path, "outro.png", _article_page(2))
+        uc2 = CountingParagraphService()
+        orchestrator = _orchestrator(tmp_path, uc2)
+        events = []
+
+        first = asyncio.run(orchestrator.analyze_document(original))
+        reused = asyncio.run(orchestrator.analyze_document(
+            rescan, progress_callback=lambda stage, status: events.append((stage, status))
+        ))
+
+        assert uc2.calls == 1
+        assert first.near_duplicate_of is None
+        assert reused.near_duplicate_of == compute_file_hash(original)
+        assert 0 < reused.near_duplicate_distance <= 20
+        assert reused.filename == "rescan.png"
+        assert ("NEARDUP", "done") in events and ("UC2", "running") not in events
+
+        # O reescaneamento passa a ser acerto exato do cache
+        again = asyncio.run(orchestrator.analyze_document(rescan))
+        assert again.cache_hit and again.near_duplicate_of == compute_file_hash(original)
+
+        different = asyncio.run(orchestrator.analyze_document(other))
+        assert uc2.calls == 2
+        assert different.near_duplicate_of is None
+
+    def test_rescan_reuses_stored_stages_without_result_cache(self, tmp_path):
+        """Sem cache de resultados, UC1-UC3 vêm das etapas armazenadas do original."""
+        original = self._save(tmp_path, "original.png", _article_page(3))
+        rescan = self._save(tmp_path, "rescan.png", _rescan(_article_page(3), 11))
+        uc2 = CountingParagraphService()
+        orchestrator = _orchestrator(tmp_path, uc2, result_cache=False, stage_store=True)
+
+        asyncio.run(orchestrator.analyze_document(original))
+        reused = asyncio.run(orchestrator.analyze_document(rescan))
+
+        assert uc2.calls == 1
+        assert not reused.cache_hit
+        assert reused.near_duplicate_of == compute_file_hash(original)
+        assert [p.text for p in reused.paragraphs] == ["resultados do experimento proposto"]
+
+    def test_index_is_used_off_the_event_loop(self, tmp_path):
+        """Consulta e gravação no índice (SQLite) não rodam na thread do event loop."""
+        threads = []
+
+        class RecordingIndex(NearDuplicateIndex):
+            def find(self, phash, exclude=None):
+                threads.append(threading.current_thread())
+                return super().find(phash, exclude)
+
+            def add(self, file_hash, phash):
+                threads.append(threading.current_thread())
+                super().add(file_hash, phash)
+
+        orchestrator = _orchestrator(tmp_path, CountingParagraphService())
+        orchestrator.near_duplicates = RecordingIndex(tmp_path / "near.sqlite3")
+
+        asyncio.run(orchestrator.analyze_document(self._save(tmp_path, "original.png", _article_page(4))))
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
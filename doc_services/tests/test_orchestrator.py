@@ -0,0 +1,155 @@
+"""
+Testes para o orquestrador (modo especulativo UC1/UC2).
+
+EXPLICAÇÃO EDUCATIVA:
+Usa serviços falsos para UC1/UC2 (sem classificador nem docling) e
+verifica que UC2 corre em paralelo com UC1, é cancelado quando UC1
+rejeita o documento e que as estatísticas de desperdício são registradas.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.models import Paragraph
+from app.services import (
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    InvalidDocumentError,
+    TextAnalysisService,
+)
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+
+
+class FakeClassificationService:
+    """UC1 falso com resultado e duração configuráveis."""
+
+    def __init__(self, is_scientific: bool, delay: float = 0.05):
+        self.is_scientific = is_scientific
+        self.delay = delay
+
+    def get_config(self) -> dict:
+        return {}
+
+    async def is_scientific_paper(self, file_path, context=None):
+        await asyncio.sleep(self.delay)
+        return self.is_scientific, 0.9
+
+    async def close(self):
+        pass
+
+
+class FakeParagraphService:
+    """UC2 falso que registra início e cancelamento."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    def get_config(self) -> dict:
+        return {}
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return [Paragraph(index=0, text="texto de teste", word_count=3)]
+
+
+class FakeRasterizer:
+    """RASTER falso com duração e falha configuráveis."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+
+    async def rasterize(self, file_path, file_hash):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return []
+
+
+def _orchestrator(classification, paragraphs) -> DocumentAnalysisOrchestrator:
+    """Cria orquestrador em modo especulativo com serviços falsos."""
+    return DocumentAnalysisOrchestrator(
+        classification_service=classification,
+        paragraph_service=paragraphs,
+        text_analysis_service=TextAnalysisService(),
+        compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+        speculative_uc2=True
+    )
+
+
+class TestSpeculativeOrchestrator:
+    """Testes para o UC2 especulativo."""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """PDF mínimo (STEP 0 não decodifica PDFs)."""
+        path = tmp_path / "artigo.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        return path
+
+    def test_accepted_document_overlaps_uc1_and_uc2(self, pdf_path):
+        """Documento aceito usa o UC2 que rodou em paralelo com UC1."""
+        paragraphs = FakeParagraphService(delay=0.1)
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.1), paragraphs)
+
+        result = asyncio.run(orchestrator.analyze_document(pdf_path))
+        stats = orchestrator.get_speculation_stats()
+
+        assert len(result.paragraphs) == 1
+        assert result.processing_time_ms < 180  # Sequencial levaria ~200ms
+        assert stats["used"] == 1
+        assert stats["wasted_work_ratio"] == 0.0
+        assert stats["overlap_saved_ms"] > 50
+
+    def test_rejected_document_cancels_uc2(self, pdf_path):
+        """Rejeição no UC1 cancela o UC2 ainda em andamento."""
+        paragraphs = FakeParagraphService(delay=1.0)
+        orchestrator = _orchestrator(FakeClassificationService(False), paragraphs)
+
+        with pytest.raises(InvalidDocumentError):
+            asyncio.run(orchestrator.analyze_document(pdf_path))
+
+        stats = orchestrator.get_speculation_stats()
+
+        assert paragraphs.started == 1
+        assert paragraphs.cancelled == 1
+        assert stats["discarded"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["wasted_work_ratio"] == 1.0
+
+    def test_raster_failure_leaves_no_speculative_uc2(self, pdf_path):
+        """Falha antes do UC1 (RASTER) não deixa UC2 especulativo órfão."""
+        paragraphs = FakeParagraphService(delay=1.0)
+        orchestrator = _orchestrator(FakeClassificationService(True), paragraphs)
+        orchestrator.pdf_rasterizer = FakeRasterizer(error=RuntimeError("pdfium falhou"))
+
+        async def scenario():
+            with pytest.raises(RuntimeError, match="pdfium falhou"):
+                await orchestrator.analyze_document(pdf_path)
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        assert asyncio.run(scenario()) == []
+        assert paragraphs.started == 0
+
+    def test_overlap_counts_only_uc1_time(self, pdf_path):
+        """O tempo do RASTER não entra no ganho de sobreposição do UC1."""
+        paragraphs = FakeParagraphService(delay=0.3)
+        orchestrator = _orchestrator(FakeClassificationService(True, delay=0.05), paragraphs)
+        orchestrator.pdf_rasterizer = FakeRasterizer(delay=0.2)
+
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+        stats = orchestrator.get_speculation_stats()
+
+        assert stats["used"] == 1
+        assert 40 < stats["overlap_saved_ms"] < 150
@@ -0,0 +1,262 @@
+"""
+Testes para a seleção de pipeline e o modo paralelo por páginas do docling (UC2).
+
+EXPLICAÇÃO EDUCATIVA:
+Gera PDFs mínimos em memória (um com camada de texto, outro só com
+página em branco) e verifica que a pré-análise escolhe o pipeline sem
+OCR apenas quando todas as páginas têm texto. O docling é substituído
+por um objeto falso que registra as opções recebidas.
+"""
+
+import asyncio
+import io
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+
+import app.services.paragraph_service as paragraph_module
+from app.core.executor import ExecutorSaturatedError
+from app.integrations.pdf_shards import merge_shard_paragraphs, split_pdf_pages
+from app.integrations.pdf_text_layer import scan_pdf_text_layer
+from app.models import Paragraph
+from app.services import ParagraphDetectionService
+
+
+def _text_pdf_bytes(text: str) -> bytes:
+    """Monta PDF de uma página com texto em fonte Helvetica."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    return output
+
+
+class FakeDocling:
+    """DoclingWrapper falso que registra as opções de cada conversão."""
+
+    def __init__(self):
+        self.calls = []
+
+    def detect_paragraphs(self, file_path, content=None, do_ocr=True, do_table_structure=True):
+        self.calls.append((do_ocr, do_table_structure))
+        return [Paragraph(index=0, text="texto", word_count=1)]
+
+
+class InlineExecutor:
+    """Executor falso em "modo processo" que roda tudo na hora."""
+
+    use_processes = True
+    process_workers = 2
+
+    def __init__(self):
+        self.process_calls = 0
+
+    async def run_in_thread(self, stage, fn, *args):
+        return fn(*args)
+
+    async def run_in_process(self, stage, fn, *args):
+        self.process_calls += 1
+        return fn(*args)
+
+
+class QueueLimitedExecutor(InlineExecutor):
+    """Executor falso com fila limitada, como o CPUExecutor (503 se cheia)."""
+
+    def __init__(self, max_queue_depth: int):
+        super().__init__()
+        self.max_queue_depth = max_queue_depth
+        self.pending = 0
+        self.peak = 0
+
+    async def run_in_process(self, stage, fn, *args):
+        if self.pending >= self.max_queue_depth:
+            raise ExecutorSaturatedError("Fila de processamento cheia")
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+        try:
+            await asyncio.sleep(0.001)
+            return await super().run_in_process(stage, fn, *args)
+        finally:
+            self.pending -= 1
+
+
+def _fake_worker(file_path, content=None, do_ocr=True, do_table_structure=True):
+    """Worker falso: um parágrafo por página da faixa recebida."""
+    reader = PdfReader(io.BytesIO(content[1]))
+    return [
+        Paragraph(index=i, text=f"{content[0]} pagina {i + 1}", word_count=3, page=i + 1)
+        for i in range(len(reader.pages))
+    ]
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+    """PDF com camada de texto."""
+    path = tmp_path / "digital.pdf"
+    path.write_bytes(_text_pdf_bytes("Texto embutido de um artigo cientifico " * 3))
+    return path
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """PDF sem camada de texto (página em branco, como um escaneado)."""
+    path = tmp_path / "escaneado.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class TestTextLayerScan:
+    """Testes para scan_pdf_text_layer."""
+
+    def test_detects_text_layer(self, text_pdf):
+        """PDF com texto embutido não precisa de OCR."""
+        scan = scan_pdf_text_layer(text_pdf)
+
+        assert scan.page_count == 1
+        assert scan.has_full_text_layer
+
+    def test_blank_page_has_no_text_layer(self, scanned_pdf):
+        """Página sem fontes é tratada como escaneada."""
+        assert not scan_pdf_text_layer(scanned_pdf).has_full_text_layer
+
+    def test_unreadable_pdf_returns_none(self, tmp_path):
+        """PDF inválido retorna None (o chamador assume OCR)."""
+        path = tmp_path / "quebrado.pdf"
+        path.write_bytes(b"%PDF-1.4 lixo")
+
+        assert scan_pdf_text_layer(path) is None
+
+
+class TestPipelineSelection:
+    """Testes para a escolha de perfil/pipeline do ParagraphDetectionService."""
+
+    @pytest.mark.parametrize("profile, expected", [
+        ("fast", (False, False)),
+        ("balanced", (False, True)),
+        ("accurate", (True, True)),
+    ])
+    def test_text_pdf_per_profile(self, text_pdf, profile, expected):
+        """PDF com texto pula OCR, exceto no perfil accurate."""
+        service = ParagraphDetectionService()
+
+        assert service.plan_conversion(text_pdf, profile=profile) == (profile, *expected)
+
+    def test_scanned_pdf_uses_ocr(self, scanned_pdf):
+        """PDF sem texto usa OCR mesmo no perfil fast."""
+        service = ParagraphDetectionService(default_profile="fast")
+
+        assert service.plan_conversion(scanned_pdf) == ("fast", True, False)
+
+    def test_unknown_profile_is_rejected(self, text_pdf):
+        """Perfil inexistente gera ValueError."""
+        with pytest.raises(ValueError):
+            ParagraphDetectionService(default_profile="turbo")
+
+        with pytest.raises(ValueError):
+            ParagraphDetectionService().plan_conversion(text_pdf, profile="turbo")
+
+    def test_stats_per_profile(self, text_pdf, scanned_pdf):
+        """Contadores separam documentos com e sem OCR por perfil."""
+        service = ParagraphDetectionService()
+        service._docling = FakeDocling()
+
+        service.detect_paragraphs(text_pdf)
+        service.detect_paragraphs(scanned_pdf)
+        service.detect_paragraphs(text_pdf, profile="accurate")
+
+        stats = service.get_profile_stats()["profiles"]
+
+        assert service._docling.calls == [(False, True), (True, True), (True, True)]
+        assert stats["balanced"]["requests"] == 2
+        assert stats["balanced"]["text_layer"] == 1
+        assert stats["balanced"]["ocr"] == 1
+        assert stats["accurate"]["ocr"] == 1
+        assert stats["fast"]["requests"] == 0
+
+
+@pytest.fixture
+def long_pdf(tmp_path, text_pdf):
+    """PDF com 25 páginas de texto."""
+    page = PdfReader(str(text_pdf)).pages[0]
+    writer = PdfWriter()
+    for _ in range(25):
+        writer.add_page(page)
+
+    path = tmp_path / "relatorio.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class TestPageSharding:
+    """Testes para o modo paralelo por páginas."""
+
+    def test_split_respects_max_pages(self, long_pdf):
+        """25 páginas com faixas de 10 geram 10 + 10 + 5."""
+        shards = split_pdf_pages(long_pdf, pages_per_shard=10)
+
+        assert [(s.first_page, s.page_count) for s in shards] == [(1, 10), (11, 10), (21, 5)]
+        assert len(PdfReader(io.BytesIO(shards[2].data)).pages) == 5
+
+    def test_small_document_is_not_split(self, text_pdf):
+        """Documento que cabe em uma faixa não é dividido."""
+        assert split_pdf_pages(text_pdf, pages_per_shard=10) == []
+
+    def test_merge_renumbers_index_and_page(self, long_pdf):
+        """Índices ficam sequenciais e páginas relativas ao documento."""
+        shards = split_pdf_pages(long_pdf, pages_per_shard=10)
+        results = [(shard, _fake_worker(None, (shard.name, shard.data))) for shard in shards]
+
+        merged = merge_shard_paragraphs(results)
+
+        assert [p.index for p in merged] == list(range(25))
+        assert [p.page for p in merged] == list(range(1, 26))
+
+    def test_service_converts_shards_in_parallel(self, long_pdf, monkeypatch):
+        """Com shard_pages, cada faixa vira uma tarefa do executor."""
+        monkeypatch.setattr(paragraph_module, "detect_paragraphs_in_worker", _fake_worker)
+        executor = InlineExecutor()
+        service = ParagraphDetectionService(executor=executor, shard_pages=10)
+
+        paragraphs = asyncio.run(service.detect_paragraphs_async(long_pdf))
+
+        assert executor.process_calls == 3
+        assert len(paragraphs) == 25
+        assert paragraphs[-1].index == 24
+        assert paragraphs[-1].page == 25
+
+    def test_more_shards_than_queue_depth(self, long_pdf, monkeypatch):
+        """25 faixas com fila de 4: só process_workers faixas ficam pendentes por vez."""
+        monkeypatch.setattr(paragraph_module, "detect_paragraphs_in_worker", _fake_worker)
+        executor = QueueLimitedExecutor(max_queue_depth=4)
+        service = ParagraphDetectionService(executor=executor, shard_pages=1)
+
+        paragraphs = asyncio.run(service.detect_paragraphs_async(long_pdf))
+
+        assert executor.process_calls == 25
+        assert executor.peak == executor.process_workers
+        assert [p.page for p in paragraphs] == list(range(1, 26))
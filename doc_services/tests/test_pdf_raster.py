@@ -0,0 +1,187 @@
+"""
+Testes para a rasterização das primeiras páginas de PDFs (etapa RASTER).
+
+EXPLICAÇÃO EDUCATIVA:
+PDFs de teste são gerados com o Pillow a 72 DPI (1 px = 1 ponto), então
+o tamanho esperado do raster é simplesmente tamanho * dpi / 72. Um
+classificador falso registra o que recebeu: cv2.imread (classify) não
+pode ser chamado para PDFs.
+"""
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.core.cache import TieredCache
+from app.integrations import ClassificationAPIClient, pdf_raster
+from app.integrations.pdf_raster import PdfRasterizer
+from app.models import Paragraph
+from app.services import ComplianceService, DocumentAnalysisOrchestrator, TextAnalysisService
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+
+
+def _make_pdf(path, pages=1, size=(200, 300)):
+    """Grava PDF com `pages` páginas de `size` pontos (faixa preta no topo)."""
+    images = []
+    for i in range(pages):
+        image = Image.new("L", size, 255)
+        image.paste(0, (0, 0, size[0], 20 + 10 * i))
+        images.append(image)
+    images[0].save(path, format="PDF", resolution=72, save_all=True, append_images=images[1:])
+    return path
+
+
+class FakeClassifier:
+    """Classificador local falso: 'científico' se a página tiver faixa larga."""
+
+    def __init__(self):
+        self.shapes = []
+
+    def classify(self, image_path):
+        raise AssertionError("PDF não deve ir para cv2.imread")
+
+    def classify_array(self, img, binary=None):
+        self.shapes.append(img.shape)
+        dark_rows = int((img < 128).all(axis=1).sum())
+        if dark_rows >= 30:
+            return "scientific_publication", 0.5 + dark_rows / 100, {"dark_rows": dark_rows}
+        return "other", 0.6, {"dark_rows": dark_rows}
+
+
+def _local_client(rasterizer):
+    client = ClassificationAPIClient(use_api=False, pdf_rasterizer=rasterizer)
+    client._local_classifier = FakeClassifier()
+    return client
+
+
+class TestPdfRasterizer:
+    """Testes do rasterizador."""
+
+    def test_renders_first_pages_at_dpi(self, tmp_path):
+        """Só as primeiras páginas são renderizadas, em tons de cinza e no DPI pedido."""
+        pdf = _make_pdf(tmp_path / "doc.pdf", pages=3)
+
+        pages = PdfRasterizer(dpi=144, max_pages=2).rasterize_sync(pdf)
+
+        assert len(pages) == 2
+        assert all(page.mode == "L" and page.size == (400, 600) for page in pages)
+        assert np.asarray(pages[0])[:30].mean() < 10  # faixa preta no topo
+
+    def test_cache_hit_skips_rendering(self, tmp_path, monkeypatch):
+        """Mesmo PDF (mesmo hash) vem do cache, sem pdfium."""
+        pdf = _make_pdf(tmp_path / "doc.pdf", pages=2)
+        cache = TieredCache(db_path=tmp_path / "raster.sqlite3", namespace="pdf_raster")
+
+        first = PdfRasterizer(dpi=72, max_pages=2, cache=cache).rasterize_sync(pdf)
+
+        calls = []
+        render = pdf_raster.render_pdf_pages
+        monkeypatch.setattr(pdf_raster, "render_pdf_pages", lambda *args: calls.append(args) or render(*args))
+
+        rasterizer = PdfRasterizer(dpi=72, max_pages=2, cache=cache)
+        second = rasterizer.rasterize_sync(pdf)
+
+        assert calls == []
+        assert rasterizer.get_stats()["cache_hits"] == 1
+        assert all(np.array_equal(np.asarray(a), np.asarray(b)) for a, b in zip(first, second))
+
+        # Outro DPI é outra entrada
+        PdfRasterizer(dpi=100, max_pages=2, cache=cache).rasterize_sync(pdf)
+        assert len(calls) == 1
+
+    def test_open_file_shares_cache_with_path(self, tmp_path):
+        """Upload ainda em memória usa a mesma entrada de cache do arquivo gravado."""
+        pdf = _make_pdf(tmp_path / "doc.pdf")
+        cache = TieredCache(db_path=tmp_path / "raster.sqlite3", namespace="pdf_raster")
+
+        with open(pdf, "rb") as f:
+            from_file = PdfRasterizer(dpi=72, cache=cache).rasterize_sync(f)
+
+        rasterizer = PdfRasterizer(dpi=72, cache=cache)
+        from_path = rasterizer.rasterize_sync(pdf)
+
+        assert rasterizer.get_stats()["cache_hits"] == 1
+        assert np.array_equal(np.asarray(from_file[0]), np.asarray(from_path[0]))
+
+    def test_unreadable_pdf_returns_empty(self, tmp_path):
+        """PDF corrompido não interrompe o UC1: raster vazio."""
+        pdf = tmp_path / "quebrado.pdf"
+        pdf.write_bytes(b"%PDF-1.4 lixo")
+
+        rasterizer = PdfRasterizer()
+
+        assert rasterizer.rasterize_sync(pdf) == []
+        assert rasterizer.get_stats()["errors"] == 1
+
+
+class TestLocalClassificationOfPdfs:
+    """Testes do classificador local com PDFs."""
+
+    def test_pdf_is_classified_from_raster(self, tmp_path):
+        """Sem DocumentContext (ex.: /api/v1/classify), o cliente rasteriza o PDF."""
+        pdf = _make_pdf(tmp_path / "doc.pdf")
+        client = _local_client(PdfRasterizer(dpi=72))
+
+        result = asyncio.run(client.classify_document(pdf))
+
+        assert client._local_classifier.shapes == [(300, 200)]
+        assert result["predicted_type"] == "other"
+
+    def test_scientific_page_wins_among_rasterized_pages(self, tmp_path):
+        """Com várias páginas, vale a página científica de maior confiança."""
+        pdf = _make_pdf(tmp_path / "doc.pdf", pages=3)  # faixas de 20, 30 e 40 px
+        client = _local_client(PdfRasterizer(dpi=72, max_pages=3))
+
+        result = asyncio.run(client.classify_document(pdf))
+
+        assert result["is_scientific_paper"]
+        assert result["features"] == {"dark_rows": 40}
+
+
+class RecordingClassificationService:
+    """UC1 falso que guarda o contexto recebido."""
+
+    def __init__(self):
+        self.context = None
+
+    def get_config(self) -> dict:
+        return {"classifier_version": "test"}
+
+    async def is_scientific_paper(self, file_path, context=None):
+        self.context = context
+        return True, 0.9
+
+
+class FakeParagraphService:
+    def get_config(self) -> dict:
+        return {"docling": "test"}
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        return [Paragraph(index=0, text="resultados do experimento", word_count=3)]
+
+
+class TestRasterStage:
+    """Testes da etapa RASTER no orquestrador."""
+
+    def test_raster_stage_reported_before_uc1(self, tmp_path):
+        """A etapa aparece no progresso e o UC1 recebe o raster no contexto."""
+        pdf = _make_pdf(tmp_path / "doc.pdf")
+        uc1 = RecordingClassificationService()
+        orchestrator = DocumentAnalysisOrchestrator(
+            classification_service=uc1,
+            paragraph_service=FakeParagraphService(),
+            text_analysis_service=TextAnalysisService(),
+            compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+            pdf_rasterizer=PdfRasterizer(dpi=36)
+        )
+        events = []
+
+        asyncio.run(orchestrator.analyze_document(pdf, progress_callback=lambda s, st: events.append((s, st))))
+
+        assert events.index(("RASTER", "done")) < events.index(("UC1", "running"))
+        assert not uc1.context.is_image
+        assert uc1.context.gray.shape == (150, 100)
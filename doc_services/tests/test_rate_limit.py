@@ -0,0 +1,155 @@
+"""
+Testes para o limitador de chamadas ao LLM e as novas tentativas.
+
+EXPLICAÇÃO EDUCATIVA:
+A API é substituída por uma função assíncrona falsa no lugar de
+client.messages.create; erros 429/5xx são objetos reais do SDK com
+respostas httpx montadas em memória.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import pytest
+
+from app.core.rate_limit import LLMRateLimiter, TokenBucket, backoff_delay
+from app.services import AnthropicService, LLMAPIError
+
+
+def _status_error(cls, status_code: int, retry_after=None):
+    """Cria erro do SDK com a resposta HTTP correspondente."""
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(
+        status_code,
+        headers=headers,
+        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    )
+    return cls("erro simulado", response=response, body=None)
+
+
+def _message():
+    """Resposta mínima da Messages API."""
+    return SimpleNamespace(
+        content=[SimpleNamespace(text='{"predicted_type": "invoice", "confidence": 0.9}')],
+        usage=SimpleNamespace(input_tokens=100, output_tokens=20),
+        model="claude-3-5-haiku-20241022",
+        stop_reason="end_turn",
+        id="msg_teste"
+    )
+
+
+class FakeMessages:
+    """client.messages falso: levanta os erros da fila e depois responde."""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return _message()
+
+
+def _service(messages, **kwargs):
+    service = AnthropicService(api_key="teste", backoff_base_seconds=0.0, **kwargs)
+    service.client.messages = messages
+    return service
+
+
+def _classify(service):
+    return service.classify_document("nota.png", ["invoice", "letter"])
+
+
+class TestRateLimiter:
+    """Testes para TokenBucket, LLMRateLimiter e backoff_delay."""
+
+    def test_bucket_waits_for_refill(self):
+        """Após esgotar a rajada, a próxima unidade espera a reposição."""
+        async def scenario():
+            bucket = TokenBucket(per_minute=600, capacity=2)  # 10 por segundo
+            start = time.perf_counter()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.perf_counter() - start
+
+        assert asyncio.run(scenario()) >= 0.08
+
+    def test_limiter_caps_in_flight(self):
+        """Nunca há mais chamadas simultâneas que max_in_flight."""
+        messages = FakeMessages(delay=0.02)
+
+        async def scenario():
+            service = _service(messages, limiter=LLMRateLimiter(max_in_flight=3))
+            await asyncio.gather(*(_classify(service) for _ in range(10)))
+            return service.get_stats()
+
+        stats = asyncio.run(scenario())
+
+        assert messages.max_in_flight == 3
+        assert stats["limiter"]["acquired"] == 10
+        assert stats["limiter"]["queue_wait_ms_max"] > 0
+
+    def test_backoff_is_jittered_and_bounded(self):
+        """Espera fica em [0, min(max, base * 2^n)] e respeita Retry-After."""
+        delays = [backoff_delay(5, base_seconds=1.0, max_seconds=4.0) for _ in range(200)]
+
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+        assert backoff_delay(0, base_seconds=0.1, retry_after=2.0) == 2.0
+
+
+class TestAnthropicRetries:
+    """Testes para as novas tentativas do AnthropicService."""
+
+    def test_retries_429_and_5xx(self):
+        """429 e 5xx são repetidos e contabilizados por status."""
+        messages = FakeMessages(errors=[
+            _status_error(anthropic.RateLimitError, 429, retry_after="0"),
+            _status_error(anthropic.InternalServerError, 503),
+        ])
+        service = _service(messages)
+
+        result = asyncio.run(_classify(service))
+        stats = service.get_stats()
+
+        assert result["predicted_type"] == "invoice"
+        assert messages.calls == 3
+        assert stats["retries"] == 2
+        assert stats["retries_by_status"] == {"429": 1, "503": 1}
+
+    def test_client_errors_are_not_retried(self):
+        """Erro 400 falha na hora, sem nova tentativa."""
+        messages = FakeMessages(errors=[_status_error(anthropic.BadRequestError, 400)])
+        service = _service(messages)
+
+        with pytest.raises(LLMAPIError):
+            asyncio.run(_classify(service))
+
+        assert messages.calls == 1
+        assert service.get_stats()["failures"] == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Tentativas esgotadas propagam o erro."""
+        errors = [_status_error(anthropic.RateLimitError, 429) for _ in range(5)]
+        messages = FakeMessages(errors=errors)
+        service = _service(messages, max_retries=2)
+
+        with pytest.raises(LLMAPIError):
+            asyncio.run(_classify(service))
+
+        assert messages.calls == 3
@@ -0,0 +1,152 @@
+"""
+Testes para projeção de campos, orjson e compressão das respostas.
+
+EXPLICAÇÃO EDUCATIVA:
+Usa um AnalysisResult pequeno montado à mão; a requisição é criada
+diretamente do escopo ASGI, só com o cabeçalho Accept-Encoding.
+"""
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+
+from app.core.responses import FastJSONResponse, build_selector, json_response, project
+from app.models import (
+    AnalysisResult,
+    BoundingBox,
+    ComplianceResult,
+    JobInfo,
+    JobStatus,
+    Paragraph,
+    TextAnalysis,
+    WordFrequency,
+)
+
+
+def _result(paragraphs: int = 3) -> AnalysisResult:
+    return AnalysisResult(
+        document_id="doc-1",
+        filename="artigo.pdf",
+        is_scientific_paper=True,
+        classification_confidence=0.9,
+        paragraphs=[
+            Paragraph(
+                index=i,
+                text="análise de dados " * 40,
+                word_count=120,
+                bbox=BoundingBox(x1=0, y1=i * 10, x2=100, y2=i * 10 + 8),
+                page=1
+            )
+            for i in range(paragraphs)
+        ],
+        text_analysis=TextAnalysis(
+            total_words=360,
+            unique_words=3,
+            word_frequencies={"análise": 120, "dados": 120},
+            top_words=[WordFrequency(word="análise", count=120)]
+        ),
+        compliance=ComplianceResult(
+            is_compliant=False,
+            words_compliant=False,
+            paragraphs_compliant=False,
+            word_count=360,
+            paragraph_count=paragraphs,
+            word_difference=-1640,
+            paragraph_difference=paragraphs - 8,
+            recommended_actions=["Adicionar palavras"]
+        ),
+        compliance_report_markdown="# Relatório",
+        analyzed_at=datetime(2025, 10, 25, 14, 30),
+        processing_time_ms=12.5
+    )
+
+
+def _request(accept_encoding: str = "") -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestProjection:
+    """Testes para ?fields= e ?exclude=."""
+
+    def test_fields_with_groups_and_nested_paths(self):
+        """Atalhos e caminhos pontuados selecionam só os campos pedidos."""
+        data = project(_result(), fields="summary,compliance.is_compliant,top_words")
+
+        assert set(data) == {
+            "document_id", "filename", "is_scientific_paper", "classification_confidence",
+            "analyzed_at", "processing_time_ms", "cache_hit", "compliance", "text_analysis",
+        }
+        assert data["compliance"] == {"is_compliant": False}
+        assert data["text_analysis"] == {"top_words": [{"word": "análise", "count": 120}]}
+
+    def test_exclude_applies_to_every_list_item(self):
+        """exclude=paragraphs.text remove o texto de todos os parágrafos."""
+        data = project(_result(), exclude="paragraphs.text,word_frequencies")
+
+        assert len(data["paragraphs"]) == 3
+        assert all("text" not in p and "bbox" in p for p in data["paragraphs"])
+        assert "word_frequencies" not in data["text_analysis"]
+        assert data["text_analysis"]["total_words"] == 360
+
+    def test_unknown_field_is_rejected(self):
+        """Campo inexistente (ou subcampo de escalar) gera 400."""
+        for paths in ("summary,inexistente", "filename.extensao", "paragraphs.texto"):
+            with pytest.raises(HTTPException) as exc_info:
+                build_selector(AnalysisResult, paths)
+            assert exc_info.value.status_code == 400
+
+    def test_job_projection_keeps_job_fields(self):
+        """Em JobInfo a seleção vale para o resultado; status continua presente."""
+        job = JobInfo(
+            job_id="job-1",
+            status=JobStatus.SUCCEEDED,
+            filename="artigo.pdf",
+            max_attempts=3,
+            created_at=datetime(2025, 10, 25),
+            updated_at=datetime(2025, 10, 25),
+            result=_result()
+        )
+
+        data = project(job, fields="summary", within="result")
+
+        assert data["job_id"] == "job-1"
+        assert data["status"] == JobStatus.SUCCEEDED
+        assert set(data["result"]) >= {"document_id", "cache_hit"}
+        assert "paragraphs" not in data["result"]
+
+
+class TestFastJSONResponse:
+    """Testes para serialização e compressão."""
+
+    def test_same_json_as_default_encoder(self):
+        """orjson produz o mesmo documento que o caminho padrão do FastAPI."""
+        result = _result()
+
+        fast = json.loads(FastJSONResponse(project(result)).body)
+
+        assert fast == jsonable_encoder(result)
+
+    def test_gzip_when_accepted(self):
+        """Resposta grande é comprimida quando o cliente aceita gzip."""
+        content = project(_result(paragraphs=20))
+
+        plain = json_response(_request(), content)
+        compressed = json_response(_request("gzip, deflate"), content)
+
+        assert "content-encoding" not in plain.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["vary"] == "Accept-Encoding"
+        assert int(compressed.headers["content-length"]) == len(compressed.body) < len(plain.body)
+        assert gzip.decompress(compressed.body) == plain.body
+
+    def test_small_responses_are_not_compressed(self):
+        """Abaixo de RESPONSE_COMPRESSION_MIN_BYTES o corpo vai sem compressão."""
+        response = json_response(_request("gzip"), project(_result(), fields="summary"))
+
+        assert "content-encoding" not in response.headers
@@ -0,0 +1,207 @@
+"""
+Testes para o cache de resultados de análise.
+
+EXPLICAÇÃO EDUCATIVA:
+Testa os dois níveis do TieredCache (memória e SQLite), a eviction
+por tamanho, o TTL e o round-trip de AnalysisResult com cache_hit.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.core.cache import TieredCache, compute_file_hash, compute_fingerprint
+from app.models import (
+    AnalysisResult,
+    ComplianceResult,
+    Paragraph,
+    TextAnalysis,
+    WordFrequency,
+)
+from app.services import (
+    AnalysisResultCache,
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    TextAnalysisService,
+)
+
+from tests.test_orchestrator import TEMPLATE_PATH, FakeClassificationService, FakeParagraphService
+
+
+class ThreadRecordingCache(TieredCache):
+    """TieredCache que registra em qual thread cada operação rodou."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def set(self, key, value):
+        self.threads.append(threading.current_thread())
+        super().set(key, value)
+
+
+class TestTieredCache:
+    """Testes para o cache em dois níveis."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Caminho do arquivo SQLite temporário."""
+        return tmp_path / "cache.sqlite3"
+
+    def test_memory_hit(self, db_path):
+        """Valor recém-gravado é servido pela memória."""
+        cache = TieredCache(db_path=db_path, memory_max_items=4)
+        cache.set("k", b"valor")
+
+        assert cache.get("k") == b"valor"
+        assert cache.get_stats()["memory_hits"] == 1
+
+    def test_disk_survives_new_instance(self, db_path):
+        """Tier de disco sobrevive a uma nova instância (reinício)."""
+        TieredCache(db_path=db_path).set("k", b"persistente")
+
+        cache = TieredCache(db_path=db_path)
+
+        assert cache.get("k") == b"persistente"
+        assert cache.get_stats()["disk_hits"] == 1
+
+    def test_disk_eviction_by_size(self, db_path):
+        """Entradas menos acessadas são removidas ao passar do limite."""
+        cache = TieredCache(db_path=db_path, memory_max_items=0, disk_max_bytes=250)
+
+        for i in range(5):
+            cache.set(f"k{i}", b"x" * 100)
+
+        stats = cache.get_stats()
+        assert stats["disk_bytes"] <= 250
+        assert cache.get("k4") == b"x" * 100
+        assert cache.get("k0") is None
+
+    def test_disk_total_tracks_writes_from_all_instances(self, db_path):
+        """Total em disco acompanha inserções, substituições e remoções de qualquer instância."""
+        # Arquivo de versão anterior (sem triggers), com uma entrada
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "CREATE TABLE cache_entries (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+            "value BLOB NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("INSERT INTO cache_entries VALUES ('default', 'antiga', x'00', 40, 0, 0)")
+        conn.commit()
+        conn.close()
+
+        first = TieredCache(db_path=db_path, memory_max_items=0, disk_max_bytes=10_000)
+        second = TieredCache(db_path=db_path, memory_max_items=0, disk_max_bytes=10_000)
+        first.set("a", b"x" * 100)
+        second.set("b", b"x" * 50)
+        second.set("a", b"x" * 10)  # substituição
+        first.delete("b")
+
+        assert first.get_stats()["disk_bytes"] == 40 + 10
+        assert second.get_stats()["disk_bytes"] == 40 + 10
+
+    def test_ttl_expiration(self, db_path):
+        """Entradas expiradas não são retornadas."""
+        cache = TieredCache(db_path=db_path, ttl_seconds=0.05)
+        cache.set("k", b"temporario")
+
+        time.sleep(0.1)
+
+        assert cache.get("k") is None
+
+    def test_fingerprint_ignores_key_order(self):
+        """Fingerprint não depende da ordem das chaves."""
+        assert compute_fingerprint({"a": 1, "b": 2}) == compute_fingerprint({"b": 2, "a": 1})
+        assert compute_fingerprint({"a": 1}) != compute_fingerprint({"a": 2})
+
+    def test_file_hash(self, tmp_path):
+        """Arquivos com mesmo conteúdo têm o mesmo hash."""
+        first = tmp_path / "a.pdf"
+        second = tmp_path / "b.pdf"
+        first.write_bytes(b"%PDF-1.4 conteudo")
+        second.write_bytes(b"%PDF-1.4 conteudo")
+
+        assert compute_file_hash(first) == compute_file_hash(second)
+
+
+class TestAnalysisResultCache:
+    """Testes para o cache de AnalysisResult."""
+
+    @pytest.fixture
+    def result(self):
+        """AnalysisResult mínimo para testes."""
+        return AnalysisResult(
+            document_id="doc-1",
+            filename="artigo.pdf",
+            is_scientific_paper=True,
+            classification_confidence=0.9,
+            paragraphs=[Paragraph(index=0, text="Texto de teste.", word_count=3)],
+            text_analysis=TextAnalysis(
+                total_words=3,
+                unique_words=3,
+                word_frequencies={"texto": 1, "de": 1, "teste": 1},
+                top_words=[WordFrequency(word="texto", count=1)]
+            ),
+            compliance=ComplianceResult(
+                is_compliant=False,
+                words_compliant=False,
+                paragraphs_compliant=False,
+                word_count=3,
+                paragraph_count=1,
+                word_difference=-1997,
+                paragraph_difference=-7,
+                recommended_actions=[]
+            ),
+            compliance_report_markdown="# Relatório",
+            processing_time_ms=1500.0
+        )
+
+    def test_round_trip_sets_cache_hit(self, tmp_path, result):
+        """Resultado recuperado do cache vem com cache_hit=True."""
+        cache = AnalysisResultCache(
+            cache=TieredCache(db_path=tmp_path / "c.sqlite3"),
+            config_fingerprint="cfg-1"
+        )
+        cache.set("hash-1", result)
+
+        cached = cache.get("hash-1")
+
+        assert cached is not None
+        assert cached.cache_hit is True
+        assert cached.paragraphs[0].text == "Texto de teste."
+
+    def test_config_change_misses(self, tmp_path, result):
+        """Mudança de configuração gera chave diferente (miss)."""
+        backend = TieredCache(db_path=tmp_path / "c.sqlite3")
+        AnalysisResultCache(cache=backend, config_fingerprint="cfg-1").set("hash-1", result)
+
+        other = AnalysisResultCache(cache=backend, config_fingerprint="cfg-2")
+
+        assert other.get("hash-1") is None
+
+    def test_orchestrator_uses_cache_off_the_event_loop(self, tmp_path):
+        """Consultas e gravações do orquestrador no cache não rodam na thread do event loop."""
+        pdf_path = tmp_path / "artigo.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        backend = ThreadRecordingCache(db_path=tmp_path / "c.sqlite3")
+        orchestrator = DocumentAnalysisOrchestrator(
+            classification_service=FakeClassificationService(True, delay=0),
+            paragraph_service=FakeParagraphService(delay=0),
+            text_analysis_service=TextAnalysisService(),
+            compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+            result_cache_backend=backend
+        )
+
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+        cached = asyncio.run(orchestrator.analyze_document(pdf_path))
+
+        assert cached.cache_hit
+        assert len(backend.threads) == 3  # miss, gravação, acerto
+        assert threading.main_thread() not in backend.threads
@@ -0,0 +1,214 @@
+"""
+Testes para a persistência por etapa, reanálise e reprocessamento do acervo.
+
+EXPLICAÇÃO EDUCATIVA:
+UC1/UC2 falsos contam quantas vezes rodaram; mudar a configuração de
+UC3/UC4 (stopwords, MIN_WORDS) não pode fazer o "docling" rodar de novo.
+"""
+
+import asyncio
+import io
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.core.cache import compute_file_hash
+from app.core.stage_store import StageStore
+from app.models import Paragraph
+from app.rescore import rescore_corpus
+from app.services import (
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    StageDataMissingError,
+    TextAnalysisService,
+)
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+
+
+class CountingClassificationService:
+    """UC1 falso que conta chamadas."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_config(self) -> dict:
+        return {"classifier_version": "test"}
+
+    async def is_scientific_paper(self, file_path, context=None):
+        self.calls += 1
+        return True, 0.9
+
+    async def close(self):
+        pass
+
+
+class CountingParagraphService:
+    """UC2 falso com versão configurável."""
+
+    def __init__(self, version: str = "v1"):
+        self.version = version
+        self.calls = 0
+
+    def get_config(self) -> dict:
+        return {"docling": self.version}
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        self.calls += 1
+        return [
+            Paragraph(index=i, text="the results show that neural networks work", word_count=7)
+            for i in range(8)
+        ]
+
+
+class StrictComplianceService(ComplianceService):
+    MIN_WORDS = 10
+
+
+class NoStopwordsTextAnalysis(TextAnalysisService):
+    def __init__(self):
+        super().__init__()
+        self.stopwords = set()
+
+
+def _orchestrator(store, uc1=None, uc2=None, text=None, compliance=None):
+    return DocumentAnalysisOrchestrator(
+        classification_service=uc1 or CountingClassificationService(),
+        paragraph_service=uc2 or CountingParagraphService(),
+        text_analysis_service=text or TextAnalysisService(),
+        compliance_service=compliance or ComplianceService(template_path=TEMPLATE_PATH),
+        stage_store=store
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StageStore(tmp_path / "stages.sqlite3")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "artigo.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+class TestIncrementalAnalysis:
+    """Testes de reaproveitamento por versão de etapa."""
+
+    def test_only_changed_stages_are_recomputed(self, store, pdf_path):
+        """Mudar stopwords e MIN_WORDS não reexecuta UC1 nem UC2."""
+        uc1, uc2 = CountingClassificationService(), CountingParagraphService()
+        first = asyncio.run(_orchestrator(store, uc1, uc2).analyze_document(pdf_path))
+
+        changed = _orchestrator(
+            store, uc1, uc2,
+            text=NoStopwordsTextAnalysis(),
+            compliance=StrictComplianceService(template_path=TEMPLATE_PATH)
+        )
+        second = asyncio.run(changed.analyze_document(pdf_path))
+
+        assert uc1.calls == 1 and uc2.calls == 1
+        assert not first.compliance.is_compliant
+        assert second.compliance.is_compliant
+        assert second.text_analysis.top_words[0].word == "the"  # stopwords desativadas
+
+    def test_uc2_version_change_reruns_uc2_and_uc3(self, store, pdf_path):
+        """Nova versão do UC2 invalida UC2 e UC3, mas não o UC1."""
+        uc1 = CountingClassificationService()
+        asyncio.run(_orchestrator(store, uc1).analyze_document(pdf_path))
+
+        uc2 = CountingParagraphService(version="v2")
+        orchestrator = _orchestrator(store, uc1, uc2)
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+
+        assert uc1.calls == 1
+        assert uc2.calls == 1
+        stats = store.get_stats(orchestrator.stage_versions)
+        assert stats["UC2"] == {"total": 1, "current": 1, "stale": 0}
+
+
+    def test_store_is_used_off_the_event_loop(self, tmp_path, pdf_path):
+        """Leituras e gravações de etapas (SQLite) não rodam na thread do event loop."""
+        threads = []
+
+        class RecordingStore(StageStore):
+            def get(self, *args, **kwargs):
+                threads.append(threading.current_thread())
+                return super().get(*args, **kwargs)
+
+            def put(self, *args, **kwargs):
+                threads.append(threading.current_thread())
+                super().put(*args, **kwargs)
+
+            def get_filename(self, *args, **kwargs):
+                threads.append(threading.current_thread())
+                return super().get_filename(*args, **kwargs)
+
+        store = RecordingStore(tmp_path / "recording.sqlite3")
+        orchestrator = _orchestrator(store)
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+        asyncio.run(orchestrator.reanalyze(compute_file_hash(pdf_path)))
+        store.close()
+
+        assert len(threads) == 3 + 3 + 1 + 3  # leituras, gravações, nome, leituras
+        assert threading.main_thread() not in threads
+
+
+class TestReanalysis:
+    """Testes da reanálise sem o arquivo original."""
+
+    def test_reanalyze_applies_current_rules(self, store, pdf_path):
+        """Reanálise usa UC1/UC2 armazenados e as regras atuais de UC4."""
+        asyncio.run(_orchestrator(store).analyze_document(pdf_path, original_filename="artigo.pdf"))
+        file_hash = compute_file_hash(pdf_path)
+
+        strict = _orchestrator(store, compliance=StrictComplianceService(template_path=TEMPLATE_PATH))
+        result = asyncio.run(strict.reanalyze(file_hash))
+
+        assert result.filename == "artigo.pdf"
+        assert len(result.paragraphs) == 8
+        assert result.compliance.is_compliant
+
+    def test_reanalyze_requires_current_uc2(self, store, pdf_path):
+        """UC2 desatualizado exige reenvio; hash desconhecido é LookupError."""
+        asyncio.run(_orchestrator(store).analyze_document(pdf_path))
+        orchestrator = _orchestrator(store, uc2=CountingParagraphService(version="v2"))
+
+        with pytest.raises(StageDataMissingError) as exc_info:
+            asyncio.run(orchestrator.reanalyze(compute_file_hash(pdf_path)))
+        assert exc_info.value.stages == ["UC2"]
+
+        with pytest.raises(LookupError):
+            asyncio.run(orchestrator.reanalyze("0" * 64))
+
+
+class TestRescoreCorpus:
+    """Testes do reprocessamento em lote (python -m app.rescore)."""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_rescore_updates_uc3_and_reports(self, store, tmp_path, workers):
+        """Todos os documentos são reprocessados e o UC3 novo é gravado."""
+        base = _orchestrator(store)
+        for i in range(5):
+            path = tmp_path / f"doc{i}.pdf"
+            path.write_bytes(b"%PDF-1.4 " + bytes([i]))
+            asyncio.run(base.analyze_document(path, original_filename=path.name))
+
+        changed = _orchestrator(
+            store,
+            text=NoStopwordsTextAnalysis(),
+            compliance=StrictComplianceService(template_path=TEMPLATE_PATH)
+        )
+        report = io.StringIO()
+        totals = rescore_corpus(changed, workers=workers, output=report)
+
+        lines = [json.loads(line) for line in report.getvalue().splitlines()]
+        assert totals["documents"] == 5 and totals["compliant"] == 5 and totals["errors"] == 0
+        assert sorted(line["filename"] for line in lines) == [f"doc{i}.pdf" for i in range(5)]
+        assert store.get_stats(changed.stage_versions)["UC3"] == {"total": 5, "current": 5, "stale": 0}
@@ -0,0 +1,175 @@
+"""
+Testes para a agregação de termos do acervo (Space-Saving e snapshots).
+
+EXPLICAÇÃO EDUCATIVA:
+Os fluxos de palavras seguem uma distribuição de Zipf (poucos termos muito
+frequentes, cauda longa), o caso em que o Space-Saving é mais preciso.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from app.core.cache import TieredCache
+from app.core.heavy_hitters import SpaceSaving
+from app.core.stage_store import StageStore
+from app.models import Paragraph
+from app.services import (
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    TermStatsAggregator,
+    TextAnalysisService,
+)
+
+from tests.test_orchestrator import TEMPLATE_PATH, FakeClassificationService, FakeParagraphService
+
+
+def _zipf_stream(size: int, vocabulary: int, seed: int) -> list:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return rng.choices([f"termo{i}" for i in range(vocabulary)], weights=weights, k=size)
+
+
+class TestSpaceSaving:
+    """Testes do resumo de heavy hitters."""
+
+    def test_error_bounds_hold_on_zipf_stream(self):
+        """count - error <= real <= count, erro <= N/capacidade e top-5 correto."""
+        stream = _zipf_stream(20000, 2000, seed=1)
+        truth = Counter(stream)
+        summary = SpaceSaving(capacity=100)
+        for term in stream:
+            summary.update(term)
+
+        assert len(summary) == 100
+        assert summary.total == len(stream)
+        for term, count, error in summary.top(100):
+            assert count - error <= truth[term] <= count
+            assert error <= len(stream) / 100
+        assert [t for t, _, _ in summary.top(5)] == [t for t, _ in truth.most_common(5)]
+
+    def test_merge_and_serialization_preserve_bounds(self):
+        """Resumos de dois processos combinados mantêm as garantias."""
+        first, second = _zipf_stream(10000, 2000, seed=2), _zipf_stream(10000, 2000, seed=3)
+        truth = Counter(first) + Counter(second)
+
+        a, b = SpaceSaving(100), SpaceSaving(100)
+        a.update_many(Counter(first))
+        b.update_many(Counter(second))
+        merged = SpaceSaving.from_dict(a.merge(b).to_dict())
+
+        assert merged.total == 20000
+        for term, count, error in merged.top(100):
+            assert count - error <= truth[term] <= count
+        assert [t for t, _, _ in merged.top(3)] == [t for t, _ in truth.most_common(3)]
+
+
+class TestStreamingCounts:
+    """Testes da contagem por parágrafo do UC3."""
+
+    def test_document_counts_are_mergeable(self):
+        """Contar o documento inteiro é igual a somar as contagens das partes."""
+        service = TextAnalysisService()
+        paragraphs = [
+            Paragraph(index=i, text=text, word_count=1)
+            for i, text in enumerate(["Deep learning, deep models.", "Learning-rate: 0.01!", "Models and DATA"])
+        ]
+
+        whole = service.count_words(paragraphs)
+        parts = service.count_words(paragraphs[:1]) + service.count_words(paragraphs[1:])
+
+        assert whole == parts
+        assert whole["deep"] == 2 and whole["learning"] == 2 and whole["01"] == 1
+        assert sum(whole.values()) == service.analyze_text(paragraphs).total_words
+
+
+class TestTermStatsAggregator:
+    """Testes das janelas de tempo e snapshots persistidos."""
+
+    def test_windows_snapshots_and_stopwords(self, tmp_path):
+        """Janelas selecionam buckets; snapshots de outros processos entram na consulta."""
+        db_path = tmp_path / "terms.sqlite3"
+        hour = 3600.0
+        base = time.time() // hour * hour - 10 * hour  # Dentro do período de retenção
+        writer = TermStatsAggregator(db_path, capacity=50, bucket_seconds=3600, stopwords={"the"})
+        writer.add_document({"the": 50, "neural": 10, "vision": 3}, timestamp=base + 5)
+        writer.add_document({"neural": 2, "graph": 9}, timestamp=base + hour + 5)
+        writer.close()
+
+        reader = TermStatsAggregator(db_path, capacity=50, bucket_seconds=3600)
+        reader.add_document({"graph": 4}, timestamp=base + hour + 100)  # ainda não gravado
+
+        first_hour = reader.top_terms(n=5, since=base, until=base + 10)
+        both_hours = reader.top_terms(n=2, since=base + 1800, until=base + 2 * hour)
+
+        assert [t["word"] for t in first_hour["terms"]] == ["neural", "vision"]
+        assert first_hour["documents"] == 1
+        assert both_hours["documents"] == 3
+        assert [(t["word"], t["count"]) for t in both_hours["terms"]] == [("graph", 13), ("neural", 12)]
+        assert both_hours["guaranteed_top"]
+        reader.close()
+
+
+class TestOrchestratorTerms:
+    """Testes da contagem de termos pelo orquestrador."""
+
+    @pytest.mark.parametrize("result_cache", [True, False])
+    def test_reupload_is_counted_once(self, tmp_path, result_cache):
+        """Reenvio do mesmo arquivo (cache de resultados ou etapas) não soma termos de novo."""
+        pdf_path = tmp_path / "artigo.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        term_stats = TermStatsAggregator(tmp_path / "terms.sqlite3")
+        orchestrator = DocumentAnalysisOrchestrator(
+            classification_service=FakeClassificationService(True, delay=0),
+            paragraph_service=FakeParagraphService(delay=0),
+            text_analysis_service=TextAnalysisService(),
+            compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+            result_cache_backend=TieredCache(
+                db_path=tmp_path / "results.sqlite3", namespace="analysis_result"
+            ) if result_cache else None,
+            stage_store=StageStore(tmp_path / "stages.sqlite3"),
+            term_stats=term_stats
+        )
+
+        for _ in range(3):
+            asyncio.run(orchestrator.analyze_document(pdf_path))
+        top = term_stats.top_terms(n=5)
+        term_stats.close()
+
+        assert top["documents"] == 1
+        assert {t["word"]: t["count"] for t in top["terms"]}["texto"] == 1
+
+    def test_terms_are_recorded_off_the_event_loop(self, tmp_path):
+        """add_document (snapshots no SQLite) não roda na thread do event loop."""
+        pdf_path = tmp_path / "artigo.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        term_stats = ThreadRecordingAggregator(tmp_path / "terms.sqlite3")
+        orchestrator = DocumentAnalysisOrchestrator(
+            classification_service=FakeClassificationService(True, delay=0),
+            paragraph_service=FakeParagraphService(delay=0),
+            text_analysis_service=TextAnalysisService(),
+            compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+            term_stats=term_stats
+        )
+
+        asyncio.run(orchestrator.analyze_document(pdf_path))
+        term_stats.close()
+
+        assert len(term_stats.threads) == 1
+        assert threading.main_thread() not in term_stats.threads
+
+
+class ThreadRecordingAggregator(TermStatsAggregator):
+    """Agregador que registra a thread de cada add_document."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+
+    def add_document(self, word_frequencies, timestamp=None):
+        self.threads.append(threading.current_thread())
+        return super().add_document(word_frequencies, timestamp)
@@ -0,0 +1,121 @@
+"""
+Testes para o tracing por requisição (spans em JSONL).
+
+EXPLICAÇÃO EDUCATIVA:
+Cada teste instala um Tracer próprio (set_tracer) gravando num arquivo
+temporário e lê o resultado com load_traces, como faria quem investiga
+uma requisição lenta.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import CPUExecutor, tracing
+from app.core.tracing import JsonlSpanExporter, Tracer, get_tracer, load_traces
+
+
+def traced_work(pages: int) -> int:
+    """Função executada no worker (nível de módulo para o ProcessPool)."""
+    with get_tracer().span("worker.convert", pages=pages):
+        return pages * 2
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """Instala um tracer de teste e restaura o anterior ao final."""
+    path = tmp_path / "traces.jsonl"
+    previous = tracing._tracer
+    yield path
+    tracing.set_tracer(previous)
+
+
+def _install(path, **kwargs) -> Tracer:
+    tracer = Tracer(exporter=JsonlSpanExporter(path), **kwargs)
+    tracing.set_tracer(tracer)
+    return tracer
+
+
+class TestTracer:
+    """Testes para Tracer e JsonlSpanExporter."""
+
+    def test_nested_spans_form_a_tree(self, trace_file):
+        """Spans abertos dentro de outro (inclusive em corrotinas) viram filhos."""
+        tracer = _install(trace_file, slow_threshold_ms=0)
+
+        async def scenario():
+            with tracer.span("analysis", bytes=10) as root:
+                async def stage(name):
+                    with tracer.span(name) as span:
+                        await asyncio.sleep(0.01)
+                        span.set_attributes(paragraphs=3)
+
+                await asyncio.gather(stage("UC1"), stage("UC2"))
+            return root
+
+        root = asyncio.run(scenario())
+        spans = load_traces(trace_file)[root.trace_id]
+
+        assert [span["name"] for span in spans] == ["analysis", "UC1", "UC2"]
+        assert all(span["parent_id"] == root.span_id for span in spans[1:])
+        assert spans[1]["attributes"] == {"paragraphs": 3}
+        assert spans[0]["sampling"] == "slow"
+
+    def test_tail_sampling_keeps_slow_and_failed_traces(self, trace_file):
+        """Rápidos são descartados (rate 0); lentos e com erro são gravados."""
+        tracer = _install(trace_file, sample_rate=0.0, slow_threshold_ms=30)
+
+        with tracer.span("fast"):
+            pass
+        with tracer.span("slow"):
+            asyncio.run(asyncio.sleep(0.04))
+        with pytest.raises(ValueError):
+            with tracer.span("failed"):
+                raise ValueError("página ilegível")
+
+        traces = load_traces(trace_file)
+        names = sorted(spans[0]["name"] for spans in traces.values())
+        failed = next(spans[0] for spans in traces.values() if spans[0]["name"] == "failed")
+
+        assert names == ["failed", "slow"]
+        assert failed["error"] == "ValueError: página ilegível"
+        assert tracer.get_stats()["traces"] == 3
+        assert tracer.get_stats()["in_progress"] == 0
+
+    def test_disabled_tracer_records_nothing(self, trace_file):
+        """Com enabled=False, span() não cria trace nem arquivo."""
+        tracer = _install(trace_file, enabled=False, slow_threshold_ms=0)
+
+        with tracer.span("analysis") as span:
+            span.set_attribute("bytes", 1)
+
+        assert not trace_file.exists()
+        assert tracer.get_stats()["traces"] == 0
+
+
+class TestExecutorPropagation:
+    """Spans criados nos workers do CPUExecutor."""
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_worker_spans_join_the_request_trace(self, trace_file, use_processes):
+        """Spans do worker (thread ou processo) entram sob o span do executor."""
+        tracer = _install(trace_file, slow_threshold_ms=0)
+        executor = CPUExecutor(process_workers=1, thread_workers=1, use_processes=use_processes)
+
+        async def scenario():
+            with tracer.span("analysis") as root:
+                result = await executor.run_in_process("UC2", traced_work, 4)
+            return root, result
+
+        try:
+            root, result = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        spans = {span["name"]: span for span in load_traces(trace_file)[root.trace_id]}
+
+        assert result == 8
+        assert spans["executor"]["parent_id"] == root.span_id
+        assert spans["executor"]["attributes"]["stage"] == "UC2"
+        assert spans["worker.convert"]["parent_id"] == spans["executor"]["span_id"]
+        assert spans["worker.convert"]["attributes"] == {"pages": 4}
@@ -0,0 +1,146 @@
+"""
+Testes para recebimento de uploads em streaming.
+
+EXPLICAÇÃO EDUCATIVA:
+Testa a detecção de tipo por magic bytes, o limite de tamanho aplicado
+bloco a bloco e o middleware que rejeita corpos grandes com 413.
+"""
+
+import asyncio
+import base64
+import io
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.uploads import (
+    UploadSizeLimitMiddleware,
+    sniff_content_type,
+    spool_fileobj,
+)
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+class TestUploads:
+    """Testes para os utilitários de upload."""
+
+    def test_sniff_content_type(self):
+        """Tipos suportados são reconhecidos pelos primeiros bytes."""
+        assert sniff_content_type(b"%PDF-1.7\n") == "application/pdf"
+        assert sniff_content_type(PNG_HEADER + b"resto") == "image/png"
+        assert sniff_content_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+        assert sniff_content_type(b"II*\x00") == "image/tiff"
+        assert sniff_content_type(b"texto qualquer") is None
+
+    def test_spool_detects_type_and_size(self):
+        """Conteúdo é copiado com tipo e tamanho corretos."""
+        content = PNG_HEADER + b"x" * 5000
+
+        upload = spool_fileobj(io.BytesIO(content), "a.png", max_bytes=10000, memory_bytes=1024)
+
+        assert upload.content_type == "image/png"
+        assert upload.size == len(content)
+        assert upload.read_bytes() == content
+        assert upload.to_base64() == base64.b64encode(content).decode("ascii")
+
+    def test_spool_rejects_large_file(self):
+        """Arquivo acima do limite gera 413."""
+        with pytest.raises(HTTPException) as exc_info:
+            spool_fileobj(io.BytesIO(b"%PDF-" + b"x" * 100), "a.pdf", max_bytes=50)
+
+        assert exc_info.value.status_code == 413
+
+    def test_spool_rejects_unknown_type(self):
+        """Conteúdo não reconhecido gera 415, mesmo com extensão válida."""
+        with pytest.raises(HTTPException) as exc_info:
+            spool_fileobj(io.BytesIO(b"nao sou pdf"), "a.pdf", max_bytes=1000)
+
+        assert exc_info.value.status_code == 415
+
+    def test_middleware_rejects_by_content_length(self):
+        """Content-Length acima do limite gera 413 sem chamar a aplicação."""
+        called = False
+        sent = []
+
+        async def app(scope, receive, send):
+            nonlocal called
+            called = True
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = UploadSizeLimitMiddleware(app, max_body_bytes=10, paths=("/classify",))
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/classify",
+            "headers": [(b"content-length", b"100")],
+        }
+
+        asyncio.run(middleware(scope, receive, send))
+
+        assert not called
+        assert sent[0]["status"] == 413
+
+    def test_middleware_rejects_streamed_body(self):
+        """Corpo sem Content-Length é interrompido ao passar do limite."""
+        chunks = [b"x" * 8, b"x" * 8, b"x" * 8]
+        sent = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                if not message.get("more_body"):
+                    break
+
+        async def receive():
+            return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = UploadSizeLimitMiddleware(app, max_body_bytes=10, paths=("/classify",))
+        scope = {"type": "http", "method": "POST", "path": "/classify", "headers": []}
+
+        asyncio.run(middleware(scope, receive, send))
+
+        assert sent[0]["status"] == 413
+        assert len(chunks) == 1  # O último bloco nem foi lido
+
+    def test_app_answers_413_for_chunked_upload(self):
+        """Upload chunked acima do limite gera 413 (e não 400) pela aplicação completa."""
+        from app import main
+
+        boundary = "limite"
+        sent_chunks = 0
+
+        async def body():
+            nonlocal sent_chunks
+            yield (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n'
+                "Content-Type: application/pdf\r\n\r\n%PDF-"
+            ).encode()
+            for _ in range(200):
+                sent_chunks += 1
+                yield b"x" * (1024 * 1024)
+
+        async def post():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(
+                    "/classify",
+                    content=body(),
+                    headers={"content-type": f"multipart/form-data; boundary={boundary}"}
+                )
+
+        response = asyncio.run(post())
+
+        assert response.status_code == 413
+        assert response.json()["errors"][0]["code"] == "HTTP_413"
+        assert sent_chunks < 200  # Interrompido logo após o limite
@@ -0,0 +1,133 @@
+"""
+Testes para o aquecimento na inicialização, o /ready e o perfil de importação.
+
+EXPLICAÇÃO EDUCATIVA:
+O aquecimento chama cada etapa diretamente com um PDF sintético: mesmo
+que o UC1 rejeite o documento, UC2..UC4 precisam rodar, e nada pode ir
+para o armazenamento de etapas ou para as estatísticas de termos.
+"""
+
+import asyncio
+import io
+from pathlib import Path
+
+from PyPDF2 import PdfReader
+
+from app.core.stage_store import StageStore
+from app.import_profile import DEFERRED_PACKAGES, parse_importtime, profile_imports
+from app.integrations.pdf_raster import PdfRasterizer
+from app.models import Paragraph
+from app.services import (
+    ComplianceService,
+    DocumentAnalysisOrchestrator,
+    TextAnalysisService,
+    WarmupState,
+    run_warmup,
+)
+from app.services.warmup import build_warmup_pdf
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "app" / "templates" / "compliance_report.md"
+
+
+class RejectingClassificationService:
+    """UC1 falso que rejeita tudo e guarda o contexto recebido."""
+
+    def __init__(self):
+        self.context = None
+
+    def get_config(self) -> dict:
+        return {"classifier_version": "test"}
+
+    async def is_scientific_paper(self, file_path, context=None):
+        self.context = context
+        return False, 0.99
+
+
+class FakeParagraphService:
+    """UC2 falso (opcionalmente com falha)."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = 0
+
+    def get_config(self) -> dict:
+        return {"docling": "test"}
+
+    async def detect_paragraphs_async(self, file_path, context=None, profile=None):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return [Paragraph(index=0, text="synthetic warmup paragraph text", word_count=4)]
+
+
+def _orchestrator(uc2=None, store=None):
+    return DocumentAnalysisOrchestrator(
+        classification_service=RejectingClassificationService(),
+        paragraph_service=uc2 or FakeParagraphService(),
+        text_analysis_service=TextAnalysisService(),
+        compliance_service=ComplianceService(template_path=TEMPLATE_PATH),
+        stage_store=store,
+        pdf_rasterizer=PdfRasterizer(dpi=36)
+    )
+
+
+class TestWarmup:
+    """Testes do aquecimento do pipeline."""
+
+    def test_warmup_pdf_has_text_layer(self):
+        """O documento sintético é um PDF válido com texto extraível."""
+        reader = PdfReader(io.BytesIO(build_warmup_pdf()))
+
+        assert len(reader.pages) == 1
+        assert "synthetic document" in reader.pages[0].extract_text()
+
+    def test_every_stage_runs_without_persisting(self, tmp_path):
+        """UC1 rejeitando não interrompe o aquecimento; nada é gravado."""
+        store = StageStore(tmp_path / "stages.sqlite3")
+        uc2 = FakeParagraphService()
+        orchestrator = _orchestrator(uc2, store)
+        state = WarmupState()
+
+        asyncio.run(run_warmup(orchestrator, state))
+
+        assert state.ready and state.status == "ready"
+        assert list(state.stages_ms) == ["STEP0", "RASTER", "UC1", "UC2", "UC3", "UC4"]
+        assert orchestrator.classification_service.context.gray.shape == (396, 306)  # 36 DPI
+        assert uc2.calls == 1
+        assert store.get_stats() == {}
+        store.close()
+
+    def test_failure_keeps_service_not_ready(self):
+        """Falha em uma etapa deixa o /ready em 503 com a mensagem."""
+        state = WarmupState()
+
+        asyncio.run(run_warmup(_orchestrator(FakeParagraphService(RuntimeError("docling ausente"))), state))
+
+        body = state.to_dict()
+        assert not body["ready"]
+        assert body["status"] == "failed"
+        assert body["error"] == "docling ausente"
+        assert body["duration_ms"] is not None
+
+
+class TestImportProfile:
+    """Testes do perfil de importação (cold start)."""
+
+    def test_parse_importtime(self):
+        """Cabeçalho é ignorado; tempos em ms e agrupados por pacote."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       500 |        500 |   numpy.core\n"
+            "import time:      1500 |       2000 | numpy\n"
+            "[INFO] linha da aplicação\n"
+        )
+
+        assert parse_importtime(output) == [("numpy.core", 0.5, 0.5), ("numpy", 1.5, 2.0)]
+
+    def test_app_main_defers_heavy_packages(self):
+        """Importar app.main não carrega docling, torch nem o SDK da Anthropic."""
+        profile = profile_imports("app.main")
+
+        assert profile.total_ms > 0
+        assert profile.loaded(DEFERRED_PACKAGES) == []
@@ -22,8 +22,18 @@ class SimpleDocumentClassifier:
         if img is None:
             return None
 
+        return self.extract_features_from_array(img)
+
+    def extract_features_from_array(self, img, binary=None):
+        """
+        Extract features from an already decoded grayscale image.
+
+        Lets callers that already hold the page raster (and possibly its
+        Otsu binarization) skip reading and decoding the file again.
+        """
         # Binarize image using Otsu's method
-        _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if binary is None:
+            _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
         # Feature 1: White space ratio (key for EMAIL detection)
         white_pixels = np.sum(binary == 255)
@@ -69,8 +79,14 @@ class SimpleDocumentClassifier:
         2. SCIENTIFIC_PUBLICATION: text_components > 1,200
         3. OTHER: Everything else
         """
-        features = self.extract_features(image_path)
+        return self.classify_features(self.extract_features(image_path))
+
+    def classify_array(self, img, binary=None):
+        """Classify an already decoded grayscale image (see classify)."""
+        return self.classify_features(self.extract_features_from_array(img, binary))
 
+    def classify_features(self, features):
+        """Apply the classification rules to extracted features."""
         if features is None:
             return 'other', 0.0, features
 